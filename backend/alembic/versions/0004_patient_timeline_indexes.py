@@ -0,0 +1,34 @@
+"""patient timeline indexes
+
+Revision ID: 0004_patient_timeline_indexes
+Revises: 0003_patient_mrn_number
+Create Date: 2025-01-03 00:10:00
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0004_patient_timeline_indexes"
+down_revision = "0003_patient_mrn_number"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_appointments_child_start", "appointments", ["child_id", "start_at"], unique=False)
+    op.create_index("ix_encounters_child_created", "encounters", ["child_id", "created_at"], unique=False)
+    op.create_index("ix_prescriptions_child_issued", "prescriptions", ["child_id", "issued_at"], unique=False)
+    op.create_index("ix_invoices_guardian_issued", "invoices", ["guardian_id", "issued_at"], unique=False)
+    op.create_index("ix_attachments_child_created", "attachments", ["child_id", "created_at"], unique=False)
+    op.create_index("ix_attachments_encounter", "attachments", ["encounter_id"], unique=False)
+    op.create_index("ix_attachments_note", "attachments", ["note_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_attachments_note", table_name="attachments")
+    op.drop_index("ix_attachments_encounter", table_name="attachments")
+    op.drop_index("ix_attachments_child_created", table_name="attachments")
+    op.drop_index("ix_invoices_guardian_issued", table_name="invoices")
+    op.drop_index("ix_prescriptions_child_issued", table_name="prescriptions")
+    op.drop_index("ix_encounters_child_created", table_name="encounters")
+    op.drop_index("ix_appointments_child_start", table_name="appointments")
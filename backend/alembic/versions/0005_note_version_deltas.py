@@ -0,0 +1,179 @@
+"""delta-encoded note versions
+
+Revision ID: 0005_note_version_deltas
+Revises: 0004_patient_timeline_indexes
+Create Date: 2025-01-04 00:10:00
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0005_note_version_deltas"
+down_revision = "0004_patient_timeline_indexes"
+branch_labels = None
+depends_on = None
+
+TEXT_FIELDS = (
+    "history_text",
+    "diagnosis_text",
+    "recommendations_text",
+    "therapy_plan_text",
+    "guardian_summary_text",
+)
+SNAPSHOT_INTERVAL = 20
+NOTE_BATCH_SIZE = 500
+
+note_versions = sa.table(
+    "note_versions",
+    sa.column("id", postgresql.UUID(as_uuid=True)),
+    sa.column("note_id", postgresql.UUID(as_uuid=True)),
+    sa.column("version_number", sa.Integer()),
+    sa.column("is_snapshot", sa.Boolean()),
+    sa.column("delta", postgresql.JSONB()),
+    *[sa.column(field, sa.Text()) for field in TEXT_FIELDS],
+)
+
+
+# Frozen copies of app.utils.text_delta as of this revision, so later changes to
+# the app cannot alter what this migration writes.
+def _encode_text_delta(old, new):
+    if old == new:
+        return None
+    if old is None or new is None:
+        return {"set": new}
+
+    limit = min(len(old), len(new))
+    prefix = 0
+    while prefix < limit and old[prefix] == new[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and old[-suffix - 1] == new[-suffix - 1]:
+        suffix += 1
+
+    replacement = new[prefix:len(new) - suffix]
+    if len(replacement) >= len(new):
+        return {"set": new}
+    return {"ops": [[prefix, len(old) - suffix, replacement]]}
+
+
+def _apply_text_delta(old, delta):
+    if delta is None:
+        return old
+    if "set" in delta:
+        return delta["set"]
+    if old is None:
+        raise ValueError("Cannot apply text delta to NULL value")
+    parts = []
+    position = 0
+    for start, end, text in delta["ops"]:
+        parts.append(old[position:start])
+        parts.append(text)
+        position = end
+    parts.append(old[position:])
+    return "".join(parts)
+
+
+def _encode_fields_delta(old, new):
+    delta = {}
+    for field, value in new.items():
+        field_delta = _encode_text_delta(old.get(field), value)
+        if field_delta is not None:
+            delta[field] = field_delta
+    return delta
+
+
+def _apply_fields_delta(old, delta):
+    values = dict(old)
+    for field, field_delta in delta.items():
+        values[field] = _apply_text_delta(values.get(field), field_delta)
+    return values
+
+
+def _iter_note_chain_batches(bind):
+    """Yields the version chains of up to NOTE_BATCH_SIZE notes at a time, keyset-paginated by note_id."""
+    last_note_id = None
+    while True:
+        ids_stmt = sa.select(note_versions.c.note_id).distinct().order_by(note_versions.c.note_id)
+        if last_note_id is not None:
+            ids_stmt = ids_stmt.where(note_versions.c.note_id > last_note_id)
+        note_ids = bind.execute(ids_stmt.limit(NOTE_BATCH_SIZE)).scalars().all()
+        if not note_ids:
+            return
+        rows = bind.execute(
+            sa.select(note_versions)
+            .where(note_versions.c.note_id.in_(note_ids))
+            .order_by(note_versions.c.note_id, note_versions.c.version_number)
+        )
+        chains: list = []
+        for row in rows:
+            if not chains or chains[-1][-1].note_id != row.note_id:
+                chains.append([])
+            chains[-1].append(row)
+        yield chains
+        last_note_id = note_ids[-1]
+
+
+def upgrade() -> None:
+    op.add_column(
+        "note_versions",
+        sa.Column("is_snapshot", sa.Boolean(), server_default=sa.text("true"), nullable=False),
+    )
+    op.add_column("note_versions", sa.Column("delta", postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+    bind = op.get_bind()
+    update_stmt = (
+        note_versions.update()
+        .where(note_versions.c.id == sa.bindparam("version_id"))
+        .values(
+            is_snapshot=False,
+            delta=sa.bindparam("new_delta"),
+            **{field: None for field in TEXT_FIELDS},
+        )
+    )
+    for chains in _iter_note_chain_batches(bind):
+        updates = []
+        for chain in chains:
+            previous = None
+            since_snapshot = 0
+            for row in chain:
+                texts = {field: getattr(row, field) for field in TEXT_FIELDS}
+                if previous is not None and since_snapshot < SNAPSHOT_INTERVAL:
+                    delta = _encode_fields_delta(previous, texts)
+                    full_size = sum(len(value) for value in texts.values() if value)
+                    if len(json.dumps(delta, ensure_ascii=False)) < full_size:
+                        updates.append({"version_id": row.id, "new_delta": delta})
+                        since_snapshot += 1
+                        previous = texts
+                        continue
+                since_snapshot = 1
+                previous = texts
+        if updates:
+            bind.execute(update_stmt, updates)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    update_stmt = (
+        note_versions.update()
+        .where(note_versions.c.id == sa.bindparam("version_id"))
+        .values(**{field: sa.bindparam(f"new_{field}") for field in TEXT_FIELDS})
+    )
+    for chains in _iter_note_chain_batches(bind):
+        updates = []
+        for chain in chains:
+            texts: dict = {}
+            for row in chain:
+                if row.is_snapshot:
+                    texts = {field: getattr(row, field) for field in TEXT_FIELDS}
+                    continue
+                texts = _apply_fields_delta(texts, row.delta or {})
+                updates.append({"version_id": row.id, **{f"new_{field}": texts.get(field) for field in TEXT_FIELDS}})
+        if updates:
+            bind.execute(update_stmt, updates)
+
+    op.drop_column("note_versions", "delta")
+    op.drop_column("note_versions", "is_snapshot")
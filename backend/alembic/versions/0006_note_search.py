@@ -0,0 +1,156 @@
+"""clinical note full-text search
+
+Revision ID: 0006_note_search
+Revises: 0005_note_version_deltas
+Create Date: 2025-01-05 00:10:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0006_note_search"
+down_revision = "0005_note_version_deltas"
+branch_labels = None
+depends_on = None
+
+SEARCH_CONFIG = "polish_notes"
+TEXT_WEIGHTS = {
+    "diagnosis_text": "A",
+    "history_text": "B",
+    "recommendations_text": "B",
+    "therapy_plan_text": "C",
+    "guardian_summary_text": "D",
+}
+NOTE_BATCH_SIZE = 500
+
+note_versions = sa.table(
+    "note_versions",
+    sa.column("note_id", postgresql.UUID(as_uuid=True)),
+    sa.column("version_number", sa.Integer()),
+    sa.column("is_snapshot", sa.Boolean()),
+    sa.column("delta", postgresql.JSONB()),
+    *[sa.column(field, sa.Text()) for field in TEXT_WEIGHTS],
+)
+clinical_notes = sa.table(
+    "clinical_notes",
+    sa.column("id", postgresql.UUID(as_uuid=True)),
+    sa.column("search_vector", postgresql.TSVECTOR()),
+)
+
+
+# Frozen copies of app.utils.text_delta as of this revision, so later changes to
+# the app cannot alter what this migration reads back.
+def _apply_text_delta(old, delta):
+    if delta is None:
+        return old
+    if "set" in delta:
+        return delta["set"]
+    if old is None:
+        raise ValueError("Cannot apply text delta to NULL value")
+    parts = []
+    position = 0
+    for start, end, text in delta["ops"]:
+        parts.append(old[position:start])
+        parts.append(text)
+        position = end
+    parts.append(old[position:])
+    return "".join(parts)
+
+
+def _apply_fields_delta(old, delta):
+    values = dict(old)
+    for field, field_delta in delta.items():
+        values[field] = _apply_text_delta(values.get(field), field_delta)
+    return values
+
+
+def _iter_latest_text_batches(bind):
+    """Yields the current texts of up to NOTE_BATCH_SIZE notes at a time, keyset-paginated by note_id."""
+    last_note_id = None
+    while True:
+        ids_stmt = sa.select(note_versions.c.note_id).distinct().order_by(note_versions.c.note_id)
+        if last_note_id is not None:
+            ids_stmt = ids_stmt.where(note_versions.c.note_id > last_note_id)
+        note_ids = bind.execute(ids_stmt.limit(NOTE_BATCH_SIZE)).scalars().all()
+        if not note_ids:
+            return
+        rows = bind.execute(
+            sa.select(note_versions)
+            .where(note_versions.c.note_id.in_(note_ids))
+            .order_by(note_versions.c.note_id, note_versions.c.version_number)
+        )
+        latest: dict = {}
+        for row in rows:
+            if row.is_snapshot:
+                latest[row.note_id] = {field: getattr(row, field) for field in TEXT_WEIGHTS}
+            else:
+                latest[row.note_id] = _apply_fields_delta(latest.get(row.note_id, {}), row.delta or {})
+        yield latest
+        last_note_id = note_ids[-1]
+
+
+def _create_search_config(bind) -> None:
+    op.execute(f"CREATE TEXT SEARCH CONFIGURATION {SEARCH_CONFIG} (COPY = simple)")
+    try:
+        with bind.begin_nested():
+            bind.exec_driver_sql(
+                "CREATE TEXT SEARCH DICTIONARY polish_ispell "
+                "(TEMPLATE = ispell, DictFile = polish, AffFile = polish, StopWords = polish)"
+            )
+    except sa.exc.DBAPIError:
+        # Polish ispell files are not installed on this server; words are indexed unstemmed.
+        return
+    op.execute(
+        f"ALTER TEXT SEARCH CONFIGURATION {SEARCH_CONFIG} "
+        "ALTER MAPPING FOR asciiword, asciihword, hword_asciipart, word, hword, hword_part "
+        "WITH polish_ispell, simple"
+    )
+
+
+def _search_vector_expression():
+    config = sa.literal(SEARCH_CONFIG, type_=postgresql.REGCONFIG)
+    vector = None
+    for field, weight in TEXT_WEIGHTS.items():
+        part = sa.func.setweight(
+            sa.func.to_tsvector(config, sa.func.coalesce(sa.bindparam(f"new_{field}", type_=sa.Text()), "")),
+            sa.literal_column(f"'{weight}'"),
+        )
+        vector = part if vector is None else vector.op("||", return_type=postgresql.TSVECTOR())(part)
+    return vector
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    _create_search_config(bind)
+    op.add_column("clinical_notes", sa.Column("search_vector", postgresql.TSVECTOR(), nullable=True))
+
+    update_stmt = (
+        clinical_notes.update()
+        .where(clinical_notes.c.id == sa.bindparam("note_id"))
+        .values(search_vector=_search_vector_expression())
+    )
+    for latest in _iter_latest_text_batches(bind):
+        bind.execute(
+            update_stmt,
+            [
+                {"note_id": note_id, **{f"new_{field}": texts.get(field) for field in TEXT_WEIGHTS}}
+                for note_id, texts in latest.items()
+            ],
+        )
+
+    op.create_index(
+        "ix_clinical_notes_search_vector",
+        "clinical_notes",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_clinical_notes_search_vector", table_name="clinical_notes")
+    op.drop_column("clinical_notes", "search_vector")
+    op.execute(f"DROP TEXT SEARCH CONFIGURATION IF EXISTS {SEARCH_CONFIG}")
+    op.execute("DROP TEXT SEARCH DICTIONARY IF EXISTS polish_ispell")
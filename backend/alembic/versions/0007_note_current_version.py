@@ -0,0 +1,43 @@
+"""clinical note current version pointer
+
+Revision ID: 0007_note_current_version
+Revises: 0006_note_search
+Create Date: 2025-01-06 00:10:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0007_note_current_version"
+down_revision = "0006_note_search"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("clinical_notes", sa.Column("current_version_id", postgresql.UUID(as_uuid=True), nullable=True))
+    op.execute(
+        """
+        UPDATE clinical_notes AS n
+        SET current_version_id = v.id
+        FROM note_versions AS v
+        WHERE v.note_id = n.id AND v.version_number = n.version
+        """
+    )
+    op.create_foreign_key(
+        "fk_clinical_notes_current_version",
+        "clinical_notes",
+        "note_versions",
+        ["current_version_id"],
+        ["id"],
+        ondelete="SET NULL",
+        deferrable=True,
+        initially="DEFERRED",
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("fk_clinical_notes_current_version", "clinical_notes", type_="foreignkey")
+    op.drop_column("clinical_notes", "current_version_id")
@@ -0,0 +1,30 @@
+"""token revocations
+
+Revision ID: 0008_token_revocations
+Revises: 0007_note_current_version
+Create Date: 2025-01-07 00:10:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0008_token_revocations"
+down_revision = "0007_note_current_version"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "token_revocations",
+        sa.Column("key", sa.String(length=80), primary_key=True),
+        sa.Column("revoked_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_token_revocations_expires_at", "token_revocations", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_token_revocations_expires_at", table_name="token_revocations")
+    op.drop_table("token_revocations")
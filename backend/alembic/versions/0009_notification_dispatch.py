@@ -0,0 +1,31 @@
+"""notification dispatch
+
+Revision ID: 0009_notification_dispatch
+Revises: 0008_token_revocations
+Create Date: 2025-01-08 00:10:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0009_notification_dispatch"
+down_revision = "0008_token_revocations"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("notifications", sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"))
+    # Only pending rows are polled; sent/failed history never enters the index.
+    op.create_index(
+        "ix_notifications_pending_due",
+        "notifications",
+        ["status", sa.text("scheduled_at NULLS FIRST")],
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_notifications_pending_due", table_name="notifications")
+    op.drop_column("notifications", "attempts")
@@ -0,0 +1,34 @@
+"""appointment reminders
+
+Revision ID: 0010_appointment_reminders
+Revises: 0009_notification_dispatch
+Create Date: 2025-01-09 00:10:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0010_appointment_reminders"
+down_revision = "0009_notification_dispatch"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_unique_constraint(
+        "uq_notifications_appointment_template",
+        "notifications",
+        ["appointment_id", "user_id", "template"],
+    )
+    op.create_index(
+        "ix_appointments_confirmed_start",
+        "appointments",
+        ["start_at"],
+        postgresql_where=sa.text("status = 'CONFIRMED'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_appointments_confirmed_start", table_name="appointments")
+    op.drop_constraint("uq_notifications_appointment_template", "notifications", type_="unique")
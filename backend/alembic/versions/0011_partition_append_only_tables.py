@@ -0,0 +1,111 @@
+"""monthly partitions for audit_logs and notifications
+
+Revision ID: 0011_partition_append_only_tables
+Revises: 0010_appointment_reminders
+Create Date: 2025-01-10 00:10:00
+
+"""
+import datetime as dt
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0011_partition_append_only_tables"
+down_revision = "0010_appointment_reminders"
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+
+FOREIGN_KEYS = {
+    "notifications": [
+        ("fk_notifications_user_id_users", "user_id", "users", "CASCADE"),
+        ("fk_notifications_appointment_id_appointments", "appointment_id", "appointments", "SET NULL"),
+    ],
+    "audit_logs": [
+        ("fk_audit_logs_actor_user_id_users", "actor_user_id", "users", "SET NULL"),
+    ],
+}
+
+
+# Frozen copies of the app.db.partitions helpers as of this revision. The partition
+# names must keep matching what the partition maintenance job creates later on.
+def _month_start(day: dt.date) -> dt.date:
+    return day.replace(day=1)
+
+
+def _add_months(day: dt.date, months: int) -> dt.date:
+    index = day.year * 12 + day.month - 1 + months
+    return dt.date(index // 12, index % 12 + 1, 1)
+
+
+def _month_partition_ddl(table: str, month: dt.date, *, parent: str) -> str:
+    start, end = _month_start(month), _add_months(month, 1)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {table}_y{start.year}m{start.month:02d} PARTITION OF {parent} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+
+
+def _default_partition_ddl(table: str, *, parent: str) -> str:
+    return f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {parent} DEFAULT"
+
+
+def _rebuild(table: str, *, partitioned: bool) -> None:
+    """Copies ``table`` into a new (un)partitioned table of the same shape and swaps it in."""
+    bind = op.get_bind()
+    staging = f"{table}_rebuild"
+    partition_clause = " PARTITION BY RANGE (created_at)" if partitioned else ""
+    op.execute(f"CREATE TABLE {staging} (LIKE {table} INCLUDING DEFAULTS){partition_clause}")
+    if partitioned:
+        first = bind.execute(sa.text(f"SELECT min(created_at) FROM {table}")).scalar()
+        month = _month_start((first or dt.datetime.now(dt.timezone.utc)).date())
+        last = _add_months(_month_start(dt.date.today()), MONTHS_AHEAD)
+        while month <= last:
+            op.execute(_month_partition_ddl(table, month, parent=staging))
+            month = _add_months(month, 1)
+        op.execute(_default_partition_ddl(table, parent=staging))
+    op.execute(f"INSERT INTO {staging} SELECT * FROM {table}")
+    op.execute(f"DROP TABLE {table}")
+    op.execute(f"ALTER TABLE {staging} RENAME TO {table}")
+    primary_key = "id, created_at" if partitioned else "id"
+    op.execute(f"ALTER TABLE {table} ADD CONSTRAINT pk_{table} PRIMARY KEY ({primary_key})")
+    for name, column, referenced, on_delete in FOREIGN_KEYS[table]:
+        op.create_foreign_key(name, table, referenced, [column], ["id"], ondelete=on_delete)
+
+
+def upgrade() -> None:
+    _rebuild("notifications", partitioned=True)
+    op.create_index("ix_notifications_user", "notifications", ["user_id"])
+    op.create_index(
+        "ix_notifications_pending_due",
+        "notifications",
+        ["status", sa.text("scheduled_at NULLS FIRST")],
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
+    # Unique constraints on a partitioned table must include created_at, which would defeat
+    # the reminder dedup; the planner serializes on an advisory lock and probes this instead.
+    op.create_index("ix_notifications_appointment_template", "notifications", ["appointment_id", "template"])
+
+    _rebuild("audit_logs", partitioned=True)
+    op.create_index("ix_audit_logs_resource_created", "audit_logs", ["resource_type", "resource_id", "created_at"])
+    op.create_index("ix_audit_logs_actor_created", "audit_logs", ["actor_user_id", "created_at"])
+
+
+def downgrade() -> None:
+    _rebuild("audit_logs", partitioned=False)
+
+    _rebuild("notifications", partitioned=False)
+    op.create_index("ix_notifications_user", "notifications", ["user_id"])
+    op.create_index(
+        "ix_notifications_pending_due",
+        "notifications",
+        ["status", sa.text("scheduled_at NULLS FIRST")],
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
+    op.create_unique_constraint(
+        "uq_notifications_appointment_template",
+        "notifications",
+        ["appointment_id", "user_id", "template"],
+    )
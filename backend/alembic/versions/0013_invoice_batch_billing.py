@@ -0,0 +1,38 @@
+"""invoice numbering counters and batch billing indexes
+
+Revision ID: 0013_invoice_batch_billing
+Revises: 0012_audit_log_brin
+Create Date: 2025-01-12 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0013_invoice_batch_billing"
+down_revision = "0012_audit_log_brin"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "invoice_number_counters",
+        sa.Column("series", sa.String(length=32), nullable=False),
+        sa.Column("last_value", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("series", name="pk_invoice_number_counters"),
+        sa.CheckConstraint("last_value >= 0", name="ck_invoice_number_counters_last_value"),
+    )
+    op.create_index("ix_invoices_appointment", "invoices", ["appointment_id"], unique=False)
+    op.create_index(
+        "ix_appointments_completed_start",
+        "appointments",
+        ["start_at"],
+        postgresql_where=sa.text("status = 'COMPLETED'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_appointments_completed_start", table_name="appointments")
+    op.drop_index("ix_invoices_appointment", table_name="invoices")
+    op.drop_table("invoice_number_counters")
@@ -0,0 +1,27 @@
+"""gist index on service price validity ranges
+
+Revision ID: 0014_service_price_validity_index
+Revises: 0013_invoice_batch_billing
+Create Date: 2025-01-13 00:00:00
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0014_service_price_validity_index"
+down_revision = "0013_invoice_batch_billing"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # service_id needs btree_gist (enabled in 0001). Not an exclusion constraint: re-running
+    # seed_services adds a new open-ended price without closing the previous one.
+    op.execute(
+        "CREATE INDEX ix_service_prices_validity ON service_prices "
+        "USING gist (service_id, daterange(valid_from, valid_to))"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_service_prices_validity", table_name="service_prices")
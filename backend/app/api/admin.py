@@ -1,21 +1,37 @@
+import csv
+import datetime as dt
+import io
+import json
+import uuid
+from typing import Iterator, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db, require_admin_user
-from app.db.models import User
+from app.api.deps import audit_access, get_db, require_admin_user
+from app.db.session import SessionLocal
+from app.utils.audit_log_cursor import AuditLogCursor
 from app.utils.patient_code import PatientCode
 from app.schemas.admin import (
+    AuditLogItem,
+    AuditLogPage,
     DoctorCreateRequest,
     DoctorCreateResponse,
     DoctorListItem,
     PasswordResetResponse,
     PatientCreateRequest,
     PatientCreateResponse,
+    PatientImportError,
+    PatientImportItem,
+    PatientImportResponse,
     PatientListItem,
 )
 from app.services.admin_service import AdminService
+from app.services.audit_service import AUDIT_QUERY_DEFAULT_DAYS, AuditLogFilter, AuditLogQueryService
+from app.services.patient_import_service import PatientImportService, iter_csv_rows, iter_jsonl_rows
+from app.services.token_service import AuthenticatedUser
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -24,7 +40,7 @@ router = APIRouter(prefix="/admin", tags=["admin"])
 def create_doctor(
     payload: DoctorCreateRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin_user),
+    current_user: AuthenticatedUser = Depends(require_admin_user),
 ) -> DoctorCreateResponse:
     service = AdminService(db)
     user, doctor, password = service.create_doctor(
@@ -51,7 +67,7 @@ def list_doctors(
     limit: int = Query(default=100, ge=1, le=500),
     offset: int = Query(default=0, ge=0),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin_user),
+    current_user: AuthenticatedUser = Depends(require_admin_user),
 ) -> list[DoctorListItem]:
     service = AdminService(db)
     rows = service.list_doctors(limit=limit, offset=offset)
@@ -73,7 +89,7 @@ def list_doctors(
 def create_patient(
     payload: PatientCreateRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin_user),
+    current_user: AuthenticatedUser = Depends(require_admin_user),
 ) -> PatientCreateResponse:
     service = AdminService(db)
     user, guardian, child, password, record_code = service.create_guardian_with_child(
@@ -106,12 +122,58 @@ def create_patient(
     )
 
 
+def _hash_imported_passwords(credentials: list[tuple[uuid.UUID, str]]) -> None:
+    db = SessionLocal()
+    try:
+        PatientImportService(db).hash_pending_passwords(credentials)
+    finally:
+        db.close()
+
+
+@router.post("/patients/import", response_model=PatientImportResponse)
+def import_patients(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: AuthenticatedUser = Depends(require_admin_user),
+) -> PatientImportResponse:
+    filename = (file.filename or "").lower()
+    if filename.endswith(".csv"):
+        iter_rows = iter_csv_rows
+    elif filename.endswith((".jsonl", ".ndjson")):
+        iter_rows = iter_jsonl_rows
+    else:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unsupported file type")
+
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", errors="replace", newline="")
+    result = PatientImportService(db).import_rows(iter_rows(stream))
+    # Accounts can log in once their hashes are written; this runs after the response is sent.
+    background_tasks.add_task(_hash_imported_passwords, result.pending_credentials)
+    return PatientImportResponse(
+        imported_count=len(result.imported),
+        error_count=len(result.errors),
+        patients=[
+            PatientImportItem(
+                line=item.line,
+                user_id=item.user_id,
+                guardian_id=item.guardian_id,
+                child_id=item.child_id,
+                guardian_email=item.guardian_email,
+                record_code=item.record_code,
+                temporary_password=item.temporary_password,
+            )
+            for item in result.imported
+        ],
+        errors=[PatientImportError(line=error.line, message=error.message) for error in result.errors],
+    )
+
+
 @router.get("/patients", response_model=list[PatientListItem])
 def list_patients(
     limit: int = Query(default=100, ge=1, le=500),
     offset: int = Query(default=0, ge=0),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin_user),
+    current_user: AuthenticatedUser = Depends(require_admin_user),
 ) -> list[PatientListItem]:
     service = AdminService(db)
     rows = service.list_patients(limit=limit, offset=offset)
@@ -136,7 +198,7 @@ def list_patients(
 def reset_user_password(
     user_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin_user),
+    current_user: AuthenticatedUser = Depends(require_admin_user),
 ) -> PasswordResetResponse:
     service = AdminService(db)
     user, password = service.reset_user_password(user_id=user_id)
@@ -146,3 +208,132 @@ def reset_user_password(
         role=user.role.value,
         temporary_password=password,
     )
+
+
+def audit_log_filter(
+    since: Optional[dt.datetime] = Query(default=None),
+    until: Optional[dt.datetime] = Query(default=None),
+    actor_user_id: Optional[UUID] = Query(default=None),
+    resource_type: Optional[str] = Query(default=None, max_length=120),
+    resource_id: Optional[str] = Query(default=None, max_length=64),
+    action: Optional[str] = Query(default=None, max_length=120),
+) -> AuditLogFilter:
+    """Query filters; the range defaults to the last ``AUDIT_QUERY_DEFAULT_DAYS`` days."""
+    for value in (since, until):
+        if value is not None and value.tzinfo is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="since/until need a timezone")
+    until = until or dt.datetime.now(dt.timezone.utc)
+    since = since or until - dt.timedelta(days=AUDIT_QUERY_DEFAULT_DAYS)
+    if since >= until:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="since must be before until")
+    return AuditLogFilter(
+        since=since,
+        until=until,
+        actor_user_id=actor_user_id,
+        resource_type=resource_type,
+        resource_id=resource_id,
+        action=action,
+    )
+
+
+# Reading the audit trail is itself audited.
+@router.get("/audit-logs", response_model=AuditLogPage, dependencies=[Depends(audit_access)])
+def list_audit_logs(
+    filters: AuditLogFilter = Depends(audit_log_filter),
+    cursor: Optional[str] = Query(default=None),
+    limit: int = Query(default=100, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: AuthenticatedUser = Depends(require_admin_user),
+) -> AuditLogPage:
+    after = None
+    if cursor:
+        try:
+            after = AuditLogCursor.decode(cursor)
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from exc
+
+    rows, next_key = AuditLogQueryService(db).page(filters, limit=limit, after=after)
+    return AuditLogPage(
+        items=[
+            AuditLogItem(
+                id=log.id,
+                created_at=log.created_at,
+                actor_user_id=log.actor_user_id,
+                actor_email=actor_email,
+                action=log.action,
+                resource_type=log.resource_type,
+                resource_id=log.resource_id,
+                ip_address=log.ip_address,
+                user_agent=log.user_agent,
+                meta=log.meta,
+            )
+            for log, actor_email in rows
+        ],
+        next_cursor=AuditLogCursor.encode(*next_key) if next_key else None,
+    )
+
+
+AUDIT_EXPORT_COLUMNS = (
+    "created_at",
+    "actor_user_id",
+    "actor_email",
+    "action",
+    "resource_type",
+    "resource_id",
+    "ip_address",
+    "user_agent",
+    "metadata",
+)
+
+
+# Spreadsheets evaluate cells starting with these as formulas; user agents and query strings are client-controlled.
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_cell(value: object) -> str:
+    text = str(value)
+    return f"'{text}" if text.startswith(CSV_FORMULA_PREFIXES) else text
+
+
+def _audit_log_csv(filters: AuditLogFilter) -> Iterator[str]:
+    # The request session is closed once the endpoint returns, so the export reads on its own.
+    db = SessionLocal()
+    try:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(AUDIT_EXPORT_COLUMNS)
+        for index, (log, actor_email) in enumerate(AuditLogQueryService(db).iter_rows(filters), start=1):
+            writer.writerow(
+                _csv_cell(value)
+                for value in (
+                    log.created_at.isoformat(),
+                    log.actor_user_id or "",
+                    actor_email or "",
+                    log.action,
+                    log.resource_type,
+                    log.resource_id or "",
+                    log.ip_address or "",
+                    log.user_agent or "",
+                    json.dumps(log.meta, ensure_ascii=False) if log.meta is not None else "",
+                )
+            )
+            if index % 500 == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+    finally:
+        db.close()
+
+
+@router.get("/audit-logs/export", dependencies=[Depends(audit_access)])
+def export_audit_logs(
+    filters: AuditLogFilter = Depends(audit_log_filter),
+    current_user: AuthenticatedUser = Depends(require_admin_user),
+) -> StreamingResponse:
+    filename = f"audit-logs-{filters.since:%Y%m%d}-{filters.until:%Y%m%d}.csv"
+    return StreamingResponse(
+        _audit_log_csv(filters),
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -1,25 +1,49 @@
-from fastapi import APIRouter, Depends
+import math
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db
+from app.api.deps import client_ip, get_current_user, get_db
+from app.core.rate_limit import login_rate_limiter
 from app.db.enums import UserRole
-from app.schemas.auth import LoginRequest, RegisterRequest, TokenResponse
+from app.schemas.auth import LoginRequest, LogoutRequest, RefreshRequest, RegisterRequest, TokenResponse
 from app.services.auth_service import AuthService
+from app.services.token_service import AuthenticatedUser, TokenPair, TokenService
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
+def _enforce_login_rate_limit(request: Request, email: str) -> None:
+    retry_after = login_rate_limiter.check(ip=client_ip(request), email=email)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+
+def _token_response(tokens: TokenPair) -> TokenResponse:
+    return TokenResponse(
+        access_token=tokens.access_token,
+        refresh_token=tokens.refresh_token,
+        expires_in=tokens.expires_in,
+    )
+
+
 @router.post("/login", response_model=TokenResponse)
-def login(payload: LoginRequest, db: Session = Depends(get_db)) -> TokenResponse:
+async def login(payload: LoginRequest, request: Request, db: Session = Depends(get_db)) -> TokenResponse:
+    _enforce_login_rate_limit(request, payload.email)
     service = AuthService(db)
-    token = service.login(payload.email, payload.password, allowed_roles=[UserRole.GUARDIAN])
-    return TokenResponse(access_token=token)
+    tokens = await service.login(payload.email, payload.password, allowed_roles=[UserRole.GUARDIAN])
+    return _token_response(tokens)
 
 
 @router.post("/staff-login", response_model=TokenResponse)
-def staff_login(payload: LoginRequest, db: Session = Depends(get_db)) -> TokenResponse:
+async def staff_login(payload: LoginRequest, request: Request, db: Session = Depends(get_db)) -> TokenResponse:
+    _enforce_login_rate_limit(request, payload.email)
     service = AuthService(db)
-    token = service.login(
+    tokens = await service.login(
         payload.email,
         payload.password,
         allowed_roles=[
@@ -29,11 +53,26 @@ def staff_login(payload: LoginRequest, db: Session = Depends(get_db)) -> TokenRe
             UserRole.THERAPIST,
         ],
     )
-    return TokenResponse(access_token=token)
+    return _token_response(tokens)
 
 
 @router.post("/register", response_model=TokenResponse, status_code=201)
-def register(payload: RegisterRequest, db: Session = Depends(get_db)) -> TokenResponse:
+async def register(payload: RegisterRequest, db: Session = Depends(get_db)) -> TokenResponse:
     service = AuthService(db)
-    token = service.register_guardian(payload.email, payload.password)
-    return TokenResponse(access_token=token)
+    tokens = await service.register_guardian(payload.email, payload.password)
+    return _token_response(tokens)
+
+
+@router.post("/refresh", response_model=TokenResponse)
+def refresh(payload: RefreshRequest, db: Session = Depends(get_db)) -> TokenResponse:
+    return _token_response(TokenService(db).refresh(payload.refresh_token))
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(
+    payload: LogoutRequest | None = None,
+    db: Session = Depends(get_db),
+    current_user: AuthenticatedUser = Depends(get_current_user),
+) -> Response:
+    TokenService(db).revoke(current_user, refresh_token=payload.refresh_token if payload else None)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -1,16 +1,24 @@
-from typing import Generator
-from uuid import UUID
+import datetime as dt
+from typing import Any, Generator, Iterable
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError
-from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from app.core.rate_limit import LOGIN_RATE_LIMIT_TRUST_FORWARDED
 from app.core.security import decode_access_token
 from app.db.enums import UserRole
-from app.db.models import User
 from app.db.session import get_session
+from app.services.audit_service import AuditEvent, AuditLogBuffer, get_audit_log_buffer
+from app.services.token_service import (
+    AUTH_TRUST_TOKEN_CLAIMS,
+    AUTH_TRUST_TOKEN_CLAIMS_MAX_AGE_SECONDS,
+    AccessTokenClaims,
+    AuthenticatedUser,
+    TokenService,
+    token_revocation_list,
+)
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -20,29 +28,37 @@ def get_db() -> Generator[Session, None, None]:
 auth_scheme = HTTPBearer(auto_error=False)
 
 
+def client_ip(request: Request) -> str | None:
+    if LOGIN_RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else None
+
+
 def get_current_user(
     credentials: HTTPAuthorizationCredentials | None = Depends(auth_scheme),
     db: Session = Depends(get_db),
-) -> User:
+) -> AuthenticatedUser:
     if not credentials:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing bearer token")
-    token = credentials.credentials
     try:
-        payload = decode_access_token(token)
-        subject = payload.get("sub")
-        if not subject:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-        user_id = UUID(subject)
+        claims = AccessTokenClaims.from_payload(decode_access_token(credentials.credentials))
     except (JWTError, ValueError) as exc:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token") from exc
 
-    user = db.execute(select(User).where(User.id == user_id)).scalar_one_or_none()
-    if not user or not user.is_active:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found or inactive")
-    return user
+    suspect = token_revocation_list.might_be_revoked(claims.revocation_keys())
+    if (
+        AUTH_TRUST_TOKEN_CLAIMS
+        and claims.is_self_contained
+        and not suspect
+        and claims.issued_within(AUTH_TRUST_TOKEN_CLAIMS_MAX_AGE_SECONDS)
+    ):
+        return claims.to_user()
+    return TokenService(db).authenticate(claims, check_revocations=suspect)
 
 
-def require_staff_user(current_user: User = Depends(get_current_user)) -> User:
+def require_staff_user(current_user: AuthenticatedUser = Depends(get_current_user)) -> AuthenticatedUser:
     if current_user.role not in {
         UserRole.ADMIN,
         UserRole.REGISTRATION,
@@ -53,13 +69,87 @@ def require_staff_user(current_user: User = Depends(get_current_user)) -> User:
     return current_user
 
 
-def require_guardian_user(current_user: User = Depends(get_current_user)) -> User:
+def require_guardian_user(current_user: AuthenticatedUser = Depends(get_current_user)) -> AuthenticatedUser:
     if current_user.role != UserRole.GUARDIAN:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
     return current_user
 
 
-def require_admin_user(current_user: User = Depends(get_current_user)) -> User:
+def require_admin_user(current_user: AuthenticatedUser = Depends(get_current_user)) -> AuthenticatedUser:
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
     return current_user
+
+
+# Guardians reach the same ChildProfile as /patient/children/{child_id}; log both as "patient"
+# so one resource filter finds every access to a child's record.
+AUDIT_RESOURCE_ALIASES = {"child": "patient"}
+
+
+def _audit_resource(template: str, path_params: dict[str, str]) -> tuple[str, str | None]:
+    """``/med/notes/{note_id}/sign`` -> ("note", <id>); routes without ids use their first segment."""
+    for name, value in path_params.items():
+        resource_type = name.removesuffix("_id")
+        return AUDIT_RESOURCE_ALIASES.get(resource_type, resource_type), str(value)
+    segments = [segment for segment in template.split("/") if segment]
+    return (segments[1] if len(segments) > 1 else segments[0]), None
+
+
+def audit_resources(request: Request, resource_type: str, resource_ids: Iterable[Any]) -> None:
+    """Has ``audit_access`` also log the request once per resource it read.
+
+    For records not named in the path: the patient behind a note or attachment, or the
+    children a search returned, so a ``resource_type``/``resource_id`` search finds every access.
+    """
+    request.state.audit_resources = [(resource_type, str(resource_id)) for resource_id in resource_ids]
+
+
+def _audited_resources(request: Request, template: str) -> list[tuple[str, str | None]]:
+    """The path resource (when the path names one) plus those reported through ``audit_resources``."""
+    path_resource = _audit_resource(template, request.path_params)
+    extra = getattr(request.state, "audit_resources", None) or []
+    if extra and path_resource[1] is None:
+        return extra
+    return [path_resource, *(resource for resource in extra if resource != path_resource)]
+
+
+def audit_access(
+    request: Request,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    audit_log: AuditLogBuffer = Depends(get_audit_log_buffer),
+) -> Generator[None, None, None]:
+    """Router dependency recording each authenticated request, with its outcome, in the audit log."""
+    route = request.scope.get("route")
+    status_code = getattr(route, "status_code", None) or status.HTTP_200_OK
+    try:
+        yield
+    except HTTPException as exc:
+        status_code = exc.status_code
+        raise
+    except Exception:
+        status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+        raise
+    finally:
+        template = getattr(route, "path", request.url.path)
+        resources = _audited_resources(request, template)
+        meta = {"status": status_code}
+        if request.query_params:
+            # Repeated parameters (?child_id=a&child_id=b) keep all their values.
+            query: dict[str, list[str]] = {}
+            for key, value in request.query_params.multi_items():
+                query.setdefault(key, []).append(value)
+            meta["query"] = {key: values if len(values) > 1 else values[0] for key, values in query.items()}
+        created_at = dt.datetime.now(dt.timezone.utc)
+        for resource_type, resource_id in resources:
+            audit_log.record(
+                AuditEvent(
+                    actor_user_id=current_user.id,
+                    action=f"{request.method} {template}",
+                    resource_type=resource_type,
+                    resource_id=resource_id,
+                    ip_address=client_ip(request),
+                    user_agent=request.headers.get("user-agent"),
+                    meta=meta,
+                    created_at=created_at,
+                )
+            )
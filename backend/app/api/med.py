@@ -1,14 +1,16 @@
 import datetime as dt
 import uuid
+from itertools import groupby
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile, status
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, UploadFile, status
 from fastapi.responses import FileResponse
-from sqlalchemy import or_, select
+from sqlalchemy import String, cast, literal, null, or_, select, tuple_, union_all
+from sqlalchemy.dialects.postgresql import UUID as PGUUID
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db, require_staff_user
+from app.api.deps import audit_access, audit_resources, get_db, require_staff_user
 from app.db.enums import AppointmentStatus, ContactChannel, Gender, NoteStatus, PatientStatus, UserRole
 from app.db.models import (
     Appointment,
@@ -27,7 +29,6 @@ from app.db.models import (
     Prescription,
     Service,
     Attachment,
-    User,
 )
 from app.schemas.patients import (
     AttachmentItem,
@@ -45,6 +46,10 @@ from app.schemas.patients import (
     NoteAddendum,
     NoteCreate,
     NoteDetails,
+    NoteDraftDetails,
+    NoteDraftSave,
+    NoteSearchItem,
+    NoteSearchPage,
     NoteSign,
     NoteUpdate,
     NoteVersionDetails,
@@ -55,11 +60,29 @@ from app.schemas.patients import (
     PatientSummary,
     PrescriptionListItem,
     InvoiceListItem,
+    TimelineItem,
+    TimelinePage,
 )
+from app.services.note_draft_service import (
+    DraftConflictError,
+    NoteDraft,
+    NoteDraftBuffer,
+    get_note_draft_buffer,
+    materialize_draft,
+)
+from app.services.note_search_service import NoteSearchService
+from app.services.note_version_service import (
+    NOTE_TEXT_FIELDS,
+    NoteVersionService,
+    content_from_chain,
+    current_chain_condition,
+)
+from app.services.token_service import AuthenticatedUser
 from app.utils.patient_code import PatientCode
-from app.utils.storage import resolve_storage_path, save_upload
+from app.utils.timeline_cursor import TimelineCursor
+from app.utils.storage import resolve_storage_path, save_upload, storage_file_response
 
-router = APIRouter(prefix="/med", tags=["med"])
+router = APIRouter(prefix="/med", tags=["med"], dependencies=[Depends(audit_access)])
 
 
 def calculate_age(date_of_birth: dt.date) -> int:
@@ -70,58 +93,56 @@ def calculate_age(date_of_birth: dt.date) -> int:
     return max(years, 0)
 
 
-def _ensure_clinical_access(current_user: User) -> None:
+def _ensure_clinical_access(current_user: AuthenticatedUser) -> None:
     if current_user.role not in {UserRole.ADMIN, UserRole.DOCTOR, UserRole.THERAPIST}:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
 
 
-def _get_doctor_for_user(db: Session, current_user: User) -> Doctor:
-    doctor = db.execute(select(Doctor).where(Doctor.user_id == current_user.id)).scalar_one_or_none()
-    if not doctor:
+def _get_doctor_id(current_user: AuthenticatedUser) -> UUID:
+    if not current_user.doctor_id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Doctor profile not found")
-    return doctor
+    return current_user.doctor_id
 
 
-def _ensure_patient_access(db: Session, current_user: User, child_id: UUID) -> Doctor | None:
+def _ensure_patient_access(db: Session, current_user: AuthenticatedUser, child_id: UUID) -> UUID | None:
+    """Returns the doctor id that scopes the patient's records, or None for unscoped roles."""
     if current_user.role in {UserRole.ADMIN, UserRole.REGISTRATION}:
         return None
     if current_user.role in {UserRole.DOCTOR, UserRole.THERAPIST}:
-        doctor = _get_doctor_for_user(db, current_user)
+        doctor_id = _get_doctor_id(current_user)
         appointment_exists = db.execute(
             select(Appointment.id)
-            .where(Appointment.child_id == child_id, Appointment.doctor_id == doctor.id)
+            .where(Appointment.child_id == child_id, Appointment.doctor_id == doctor_id)
             .limit(1)
         ).scalar_one_or_none()
         if appointment_exists:
-            return doctor
+            return doctor_id
         encounter_exists = db.execute(
             select(Encounter.id)
-            .where(Encounter.child_id == child_id, Encounter.doctor_id == doctor.id)
+            .where(Encounter.child_id == child_id, Encounter.doctor_id == doctor_id)
             .limit(1)
         ).scalar_one_or_none()
         if encounter_exists:
-            return doctor
+            return doctor_id
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="No access to patient")
     raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
 
 
-def _ensure_appointment_access(db: Session, current_user: User, appointment: Appointment) -> None:
+def _ensure_appointment_access(db: Session, current_user: AuthenticatedUser, appointment: Appointment) -> None:
     if current_user.role in {UserRole.ADMIN, UserRole.REGISTRATION}:
         return
     if current_user.role in {UserRole.DOCTOR, UserRole.THERAPIST}:
-        doctor = _get_doctor_for_user(db, current_user)
-        if appointment.doctor_id != doctor.id:
+        if appointment.doctor_id != _get_doctor_id(current_user):
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="No access to appointment")
         return
     raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
 
 
-def _ensure_encounter_access(db: Session, current_user: User, encounter: Encounter) -> None:
+def _ensure_encounter_access(db: Session, current_user: AuthenticatedUser, encounter: Encounter) -> None:
     if current_user.role in {UserRole.ADMIN, UserRole.REGISTRATION}:
         return
     if current_user.role in {UserRole.DOCTOR, UserRole.THERAPIST}:
-        doctor = _get_doctor_for_user(db, current_user)
-        if encounter.doctor_id != doctor.id:
+        if encounter.doctor_id != _get_doctor_id(current_user):
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="No access to encounter")
         return
     raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
@@ -150,7 +171,7 @@ def _resolve_attachment_child_id(db: Session, attachment: Attachment) -> UUID |
     return None
 
 
-def _note_to_details(note: ClinicalNote, version: NoteVersion) -> NoteDetails:
+def _note_to_details(note: ClinicalNote, version: NoteVersion, texts: dict[str, str | None]) -> NoteDetails:
     return NoteDetails(
         id=note.id,
         encounter_id=note.encounter_id,
@@ -166,22 +187,56 @@ def _note_to_details(note: ClinicalNote, version: NoteVersion) -> NoteDetails:
             id=version.id,
             version_number=version.version_number,
             is_addendum=version.is_addendum,
-            history_text=version.history_text,
-            diagnosis_text=version.diagnosis_text,
-            recommendations_text=version.recommendations_text,
-            therapy_plan_text=version.therapy_plan_text,
-            guardian_summary_text=version.guardian_summary_text,
+            history_text=texts["history_text"],
+            diagnosis_text=texts["diagnosis_text"],
+            recommendations_text=texts["recommendations_text"],
+            therapy_plan_text=texts["therapy_plan_text"],
+            guardian_summary_text=texts["guardian_summary_text"],
             created_by_user_id=version.created_by_user_id,
             created_at=version.created_at,
         ),
     )
 
 
+def _draft_to_details(draft: NoteDraft) -> NoteDraftDetails:
+    return NoteDraftDetails(
+        note_id=draft.note_id,
+        base_version=draft.base_version,
+        revision=draft.revision,
+        is_visible_to_guardian=draft.is_visible_to_guardian,
+        updated_at=draft.updated_at,
+        is_flushed=not draft.dirty,
+        conflict=draft.conflict,
+        **draft.texts,
+    )
+
+
+def _get_accessible_encounter(
+    request: Request, db: Session, current_user: AuthenticatedUser, encounter_id: UUID
+) -> Encounter:
+    """Loads the encounter and audits the request against its patient, including denied attempts."""
+    encounter = db.execute(select(Encounter).where(Encounter.id == encounter_id)).scalar_one_or_none()
+    if not encounter:
+        raise HTTPException(status_code=404, detail="Encounter not found")
+    audit_resources(request, "patient", [encounter.child_id])
+    _ensure_encounter_access(db, current_user, encounter)
+    return encounter
+
+
+def _get_accessible_note(
+    request: Request, db: Session, current_user: AuthenticatedUser, note_id: UUID
+) -> tuple[ClinicalNote, Encounter]:
+    note = db.execute(select(ClinicalNote).where(ClinicalNote.id == note_id)).scalar_one_or_none()
+    if not note:
+        raise HTTPException(status_code=404, detail="Note not found")
+    return note, _get_accessible_encounter(request, db, current_user, note.encounter_id)
+
+
 @router.get("/patients/{patient_id}/summary", response_model=PatientSummary)
 def get_patient_summary(
     patient_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_staff_user),
+    current_user: AuthenticatedUser = Depends(require_staff_user),
 ) -> PatientSummary:
     child = db.execute(select(ChildProfile).where(ChildProfile.id == patient_id)).scalar_one_or_none()
     if not child:
@@ -217,9 +272,10 @@ def get_patient_summary(
 
 @router.get("/patients/lookup", response_model=PatientLookupResponse)
 def lookup_patient(
+    request: Request,
     code: str = Query(..., min_length=1),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_staff_user),
+    current_user: AuthenticatedUser = Depends(require_staff_user),
 ) -> PatientLookupResponse:
     try:
         number = PatientCode.parse(code)
@@ -232,6 +288,7 @@ def lookup_patient(
     if not child:
         raise HTTPException(status_code=404, detail="Patient not found")
 
+    audit_resources(request, "patient", [child.id])
     _ensure_patient_access(db, current_user, child.id)
 
     full_name = f"{child.first_name} {child.last_name}".strip()
@@ -247,7 +304,7 @@ def lookup_patient(
 def get_patient_details(
     patient_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_staff_user),
+    current_user: AuthenticatedUser = Depends(require_staff_user),
 ) -> PatientDetails:
     child = db.execute(select(ChildProfile).where(ChildProfile.id == patient_id)).scalar_one_or_none()
     if not child:
@@ -354,27 +411,28 @@ def get_patient_details(
 
 @router.get("/patients/search", response_model=List[PatientSearchItem])
 def search_patients(
+    request: Request,
     query: str = Query(..., min_length=1),
     limit: int = Query(10, ge=1, le=25),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_staff_user),
+    current_user: AuthenticatedUser = Depends(require_staff_user),
 ) -> List[PatientSearchItem]:
     cleaned = query.strip()
     if not cleaned:
         return []
 
-    doctor = None
+    scope_doctor_id = None
     if current_user.role in {UserRole.DOCTOR, UserRole.THERAPIST}:
-        doctor = _get_doctor_for_user(db, current_user)
+        scope_doctor_id = _get_doctor_id(current_user)
 
     stmt = (
         select(ChildProfile, PatientProfile.full_name)
         .join(PatientProfile, PatientProfile.id == ChildProfile.guardian_id)
     )
-    if doctor:
+    if scope_doctor_id:
         stmt = (
             stmt.join(Appointment, Appointment.child_id == ChildProfile.id)
-            .where(Appointment.doctor_id == doctor.id)
+            .where(Appointment.doctor_id == scope_doctor_id)
         )
 
     try:
@@ -395,6 +453,7 @@ def search_patients(
         )
 
     rows = db.execute(stmt.distinct().limit(limit)).all()
+    audit_resources(request, "patient", [child.id for child, _ in rows])
     return [
         PatientSearchItem(
             id=child.id,
@@ -413,7 +472,7 @@ def update_patient_details(
     patient_id: UUID,
     payload: PatientDetailsUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_staff_user),
+    current_user: AuthenticatedUser = Depends(require_staff_user),
 ) -> PatientDetails:
     child = db.execute(select(ChildProfile).where(ChildProfile.id == patient_id)).scalar_one_or_none()
     if not child:
@@ -511,12 +570,12 @@ def get_patient_appointments(
     doctor_id: Optional[UUID] = Query(default=None),
     status: Optional[AppointmentStatus] = Query(default=None),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_staff_user),
+    current_user: AuthenticatedUser = Depends(require_staff_user),
 ) -> List[AppointmentItem]:
-    doctor = _ensure_patient_access(db, current_user, patient_id)
+    scope_doctor_id = _ensure_patient_access(db, current_user, patient_id)
     stmt = select(Appointment).where(Appointment.child_id == patient_id)
-    if doctor:
-        stmt = stmt.where(Appointment.doctor_id == doctor.id)
+    if scope_doctor_id:
+        stmt = stmt.where(Appointment.doctor_id == scope_doctor_id)
     if start_date:
         stmt = stmt.where(Appointment.start_at >= dt.datetime.combine(start_date, dt.time.min, tzinfo=dt.timezone.utc))
     if end_date:
@@ -542,9 +601,10 @@ def get_patient_appointments(
 
 @router.get("/appointments/{appointment_id}", response_model=AppointmentDetails)
 def get_appointment(
+    request: Request,
     appointment_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_staff_user),
+    current_user: AuthenticatedUser = Depends(require_staff_user),
 ) -> AppointmentDetails:
     appointment = db.execute(
         select(Appointment).where(Appointment.id == appointment_id)
@@ -552,6 +612,7 @@ def get_appointment(
     if not appointment:
         raise HTTPException(status_code=404, detail="Appointment not found")
 
+    audit_resources(request, "patient", [appointment.child_id])
     _ensure_appointment_access(db, current_user, appointment)
 
     return AppointmentDetails(
@@ -576,17 +637,18 @@ def get_appointment(
 
 @router.get("/doctor/appointments", response_model=List[DoctorAppointmentItem])
 def get_doctor_appointments(
+    request: Request,
     start_date: Optional[dt.date] = Query(default=None),
     end_date: Optional[dt.date] = Query(default=None),
     status: Optional[AppointmentStatus] = Query(default=None),
     doctor_id: Optional[UUID] = Query(default=None),
     limit: int = Query(default=50, ge=1, le=200),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_staff_user),
+    current_user: AuthenticatedUser = Depends(require_staff_user),
 ) -> List[DoctorAppointmentItem]:
     resolved_doctor_id: UUID | None = None
     if current_user.role in {UserRole.DOCTOR, UserRole.THERAPIST}:
-        resolved_doctor_id = _get_doctor_for_user(db, current_user).id
+        resolved_doctor_id = _get_doctor_id(current_user)
     elif doctor_id:
         resolved_doctor_id = doctor_id
 
@@ -607,6 +669,7 @@ def get_doctor_appointments(
         stmt = stmt.where(Appointment.status == status)
 
     rows = db.execute(stmt.order_by(Appointment.start_at.asc()).limit(limit)).all()
+    audit_resources(request, "patient", dict.fromkeys(child.id for _, child, _ in rows))
     return [
         DoctorAppointmentItem(
             id=appointment.id,
@@ -629,13 +692,14 @@ def get_patient_encounters(
     start_date: Optional[dt.date] = Query(default=None),
     end_date: Optional[dt.date] = Query(default=None),
     doctor_id: Optional[UUID] = Query(default=None),
+    include_notes: bool = Query(default=False),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_staff_user),
+    current_user: AuthenticatedUser = Depends(require_staff_user),
 ) -> List[EncounterItem]:
-    doctor = _ensure_patient_access(db, current_user, patient_id)
+    scope_doctor_id = _ensure_patient_access(db, current_user, patient_id)
     stmt = select(Encounter).where(Encounter.child_id == patient_id)
-    if doctor:
-        stmt = stmt.where(Encounter.doctor_id == doctor.id)
+    if scope_doctor_id:
+        stmt = stmt.where(Encounter.doctor_id == scope_doctor_id)
     if start_date:
         stmt = stmt.where(Encounter.created_at >= dt.datetime.combine(start_date, dt.time.min, tzinfo=dt.timezone.utc))
     if end_date:
@@ -643,7 +707,27 @@ def get_patient_encounters(
     if doctor_id:
         stmt = stmt.where(Encounter.doctor_id == doctor_id)
 
-    encounters = db.execute(stmt.order_by(Encounter.created_at.desc())).scalars().all()
+    notes: dict[UUID, NoteDetails] = {}
+    if include_notes:
+        # One statement: each encounter row is repeated once per version in its note's current chain.
+        rows = db.execute(
+            stmt.add_columns(ClinicalNote, NoteVersion)
+            .outerjoin(ClinicalNote, ClinicalNote.encounter_id == Encounter.id)
+            .outerjoin(NoteVersion, current_chain_condition())
+            .order_by(Encounter.created_at.desc(), Encounter.id, NoteVersion.version_number.asc())
+        ).all()
+        encounters = []
+        for _, group in groupby(rows, key=lambda row: row[0].id):
+            group = list(group)
+            encounter, note = group[0][0], group[0][1]
+            encounters.append(encounter)
+            chain = [row[2] for row in group if row[2] is not None]
+            if note and chain:
+                content = content_from_chain(chain)
+                notes[encounter.id] = _note_to_details(note, content.version, content.texts)
+    else:
+        encounters = db.execute(stmt.order_by(Encounter.created_at.desc())).scalars().all()
+
     return [
         EncounterItem(
             id=encounter.id,
@@ -653,6 +737,7 @@ def get_patient_encounters(
             started_at=encounter.started_at,
             ended_at=encounter.ended_at,
             created_at=encounter.created_at,
+            note=notes.get(encounter.id),
         )
         for encounter in encounters
     ]
@@ -660,15 +745,12 @@ def get_patient_encounters(
 
 @router.get("/encounters/{encounter_id}", response_model=EncounterDetails)
 def get_encounter(
+    request: Request,
     encounter_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_staff_user),
+    current_user: AuthenticatedUser = Depends(require_staff_user),
 ) -> EncounterDetails:
-    encounter = db.execute(select(Encounter).where(Encounter.id == encounter_id)).scalar_one_or_none()
-    if not encounter:
-        raise HTTPException(status_code=404, detail="Encounter not found")
-
-    _ensure_encounter_access(db, current_user, encounter)
+    encounter = _get_accessible_encounter(request, db, current_user, encounter_id)
 
     return EncounterDetails(
         id=encounter.id,
@@ -688,7 +770,7 @@ def get_encounter(
 def get_patient_prescriptions(
     patient_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_staff_user),
+    current_user: AuthenticatedUser = Depends(require_staff_user),
 ) -> List[PrescriptionListItem]:
     child = db.execute(select(ChildProfile).where(ChildProfile.id == patient_id)).scalar_one_or_none()
     if not child:
@@ -720,7 +802,7 @@ def get_patient_prescriptions(
 def get_patient_invoices(
     patient_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_staff_user),
+    current_user: AuthenticatedUser = Depends(require_staff_user),
 ) -> List[InvoiceListItem]:
     child = db.execute(select(ChildProfile).where(ChildProfile.id == patient_id)).scalar_one_or_none()
     if not child:
@@ -755,7 +837,7 @@ def get_patient_invoices(
 def get_patient_attachments(
     patient_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_staff_user),
+    current_user: AuthenticatedUser = Depends(require_staff_user),
 ) -> List[AttachmentItem]:
     child = db.execute(select(ChildProfile).where(ChildProfile.id == patient_id)).scalar_one_or_none()
     if not child:
@@ -793,6 +875,143 @@ def get_patient_attachments(
     ]
 
 
+def _patient_timeline_query(child: ChildProfile, scope_doctor_id: UUID | None):
+    no_text = cast(null(), String)
+    no_id = cast(null(), PGUUID(as_uuid=True))
+
+    appointments = (
+        select(
+            literal("appointment", String).label("kind"),
+            Appointment.id.label("id"),
+            Appointment.start_at.label("occurred_at"),
+            cast(Appointment.status, String).label("status"),
+            Service.name.label("label"),
+            Appointment.doctor_id.label("doctor_id"),
+            no_id.label("encounter_id"),
+        )
+        .join(Service, Service.id == Appointment.service_id)
+        .where(Appointment.child_id == child.id)
+    )
+    encounters = select(
+        literal("encounter", String),
+        Encounter.id,
+        Encounter.created_at,
+        cast(Encounter.status, String),
+        no_text,
+        Encounter.doctor_id,
+        no_id,
+    ).where(Encounter.child_id == child.id)
+    notes = (
+        select(
+            literal("note", String),
+            ClinicalNote.id,
+            ClinicalNote.created_at,
+            cast(ClinicalNote.status, String),
+            no_text,
+            Encounter.doctor_id,
+            ClinicalNote.encounter_id,
+        )
+        .join(Encounter, Encounter.id == ClinicalNote.encounter_id)
+        .where(Encounter.child_id == child.id)
+    )
+    if scope_doctor_id:
+        appointments = appointments.where(Appointment.doctor_id == scope_doctor_id)
+        encounters = encounters.where(Encounter.doctor_id == scope_doctor_id)
+        notes = notes.where(Encounter.doctor_id == scope_doctor_id)
+
+    prescriptions = select(
+        literal("prescription", String),
+        Prescription.id,
+        Prescription.issued_at,
+        no_text,
+        Prescription.code,
+        Prescription.doctor_id,
+        no_id,
+    ).where(Prescription.child_id == child.id)
+    invoices = select(
+        literal("invoice", String),
+        Invoice.id,
+        Invoice.issued_at,
+        cast(Invoice.status, String),
+        Invoice.number,
+        no_id,
+        no_id,
+    ).where(Invoice.guardian_id == child.guardian_id)
+
+    encounter_ids = select(Encounter.id).where(Encounter.child_id == child.id)
+    note_ids = select(ClinicalNote.id).where(ClinicalNote.encounter_id.in_(encounter_ids))
+    attachments = select(
+        literal("attachment", String),
+        Attachment.id,
+        Attachment.created_at,
+        no_text,
+        Attachment.file_name,
+        no_id,
+        Attachment.encounter_id,
+    ).where(
+        or_(
+            Attachment.child_id == child.id,
+            Attachment.encounter_id.in_(encounter_ids),
+            Attachment.note_id.in_(note_ids),
+        )
+    )
+
+    return union_all(appointments, encounters, notes, prescriptions, invoices, attachments).subquery("timeline")
+
+
+@router.get("/patients/{patient_id}/timeline", response_model=TimelinePage)
+def get_patient_timeline(
+    patient_id: UUID,
+    cursor: Optional[str] = Query(default=None),
+    limit: int = Query(default=50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user: AuthenticatedUser = Depends(require_staff_user),
+) -> TimelinePage:
+    child = db.execute(select(ChildProfile).where(ChildProfile.id == patient_id)).scalar_one_or_none()
+    if not child:
+        raise HTTPException(status_code=404, detail="Patient not found")
+
+    scope_doctor_id = _ensure_patient_access(db, current_user, child.id)
+
+    timeline = _patient_timeline_query(child, scope_doctor_id)
+    stmt = select(timeline)
+    if cursor:
+        try:
+            occurred_at, kind, item_id = TimelineCursor.decode(cursor)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+        stmt = stmt.where(
+            tuple_(timeline.c.occurred_at, timeline.c.kind, timeline.c.id) < tuple_(occurred_at, kind, item_id)
+        )
+
+    rows = db.execute(
+        stmt.order_by(timeline.c.occurred_at.desc(), timeline.c.kind.desc(), timeline.c.id.desc())
+        .limit(limit + 1)
+    ).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = TimelineCursor.encode(last.occurred_at, last.kind, last.id)
+
+    return TimelinePage(
+        items=[
+            TimelineItem(
+                id=row.id,
+                kind=row.kind,
+                occurred_at=row.occurred_at,
+                status=row.status,
+                label=row.label,
+                doctor_id=row.doctor_id,
+                encounter_id=row.encounter_id,
+            )
+            for row in rows
+        ],
+        next_cursor=next_cursor,
+    )
+
+
 @router.post("/patients/{patient_id}/attachments", response_model=AttachmentItem, status_code=201)
 def upload_patient_attachment(
     patient_id: UUID,
@@ -800,7 +1019,7 @@ def upload_patient_attachment(
     encounter_id: UUID | None = Form(default=None),
     note_id: UUID | None = Form(default=None),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_staff_user),
+    current_user: AuthenticatedUser = Depends(require_staff_user),
 ) -> AttachmentItem:
     child = db.execute(select(ChildProfile).where(ChildProfile.id == patient_id)).scalar_one_or_none()
     if not child:
@@ -847,10 +1066,8 @@ def upload_patient_attachment(
         storage_key=storage_key,
     )
     db.add(attachment)
-    db.commit()
-    db.refresh(attachment)
-
-    return AttachmentItem(
+    db.flush()
+    item = AttachmentItem(
         id=attachment.id,
         child_id=attachment.child_id,
         encounter_id=attachment.encounter_id,
@@ -860,13 +1077,17 @@ def upload_patient_attachment(
         size_bytes=attachment.size_bytes,
         created_at=attachment.created_at,
     )
+    db.commit()
+
+    return item
 
 
 @router.get("/attachments/{attachment_id}/download")
 def download_attachment(
+    request: Request,
     attachment_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_staff_user),
+    current_user: AuthenticatedUser = Depends(require_staff_user),
 ) -> FileResponse:
     attachment = db.execute(
         select(Attachment).where(Attachment.id == attachment_id)
@@ -878,6 +1099,7 @@ def download_attachment(
     if not child_id:
         raise HTTPException(status_code=404, detail="Attachment target not found")
 
+    audit_resources(request, "patient", [child_id])
     _ensure_patient_access(db, current_user, child_id)
 
     try:
@@ -888,22 +1110,19 @@ def download_attachment(
     if not path.exists():
         raise HTTPException(status_code=404, detail="File not found")
 
-    return FileResponse(path, media_type=attachment.mime_type, filename=attachment.file_name)
+    return storage_file_response(path, media_type=attachment.mime_type, filename=attachment.file_name)
 
 
 @router.post("/encounters/{encounter_id}/notes", response_model=NoteDetails, status_code=201)
 def create_note(
+    request: Request,
     encounter_id: UUID,
     payload: NoteCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_staff_user),
+    current_user: AuthenticatedUser = Depends(require_staff_user),
 ) -> NoteDetails:
     _ensure_clinical_access(current_user)
-    encounter = db.execute(select(Encounter).where(Encounter.id == encounter_id)).scalar_one_or_none()
-    if not encounter:
-        raise HTTPException(status_code=404, detail="Encounter not found")
-
-    _ensure_encounter_access(db, current_user, encounter)
+    encounter = _get_accessible_encounter(request, db, current_user, encounter_id)
 
     existing_note = db.execute(
         select(ClinicalNote).where(ClinicalNote.encounter_id == encounter_id)
@@ -919,6 +1138,7 @@ def create_note(
         author_user_id = doctor.user_id
 
     note = ClinicalNote(
+        id=uuid.uuid4(),
         encounter_id=encounter_id,
         author_user_id=author_user_id,
         is_visible_to_guardian=payload.is_visible_to_guardian,
@@ -926,155 +1146,277 @@ def create_note(
         version=1,
     )
     db.add(note)
-    db.flush()
 
-    version = NoteVersion(
-        note_id=note.id,
+    texts = payload.model_dump(include=set(NOTE_TEXT_FIELDS))
+    version = NoteVersionService(db).append(
+        note=note,
         version_number=1,
         is_addendum=False,
-        history_text=payload.history_text,
-        diagnosis_text=payload.diagnosis_text,
-        recommendations_text=payload.recommendations_text,
-        therapy_plan_text=payload.therapy_plan_text,
-        guardian_summary_text=payload.guardian_summary_text,
+        texts=texts,
         created_by_user_id=author_user_id,
     )
-    db.add(version)
+    db.flush()
+    details = _note_to_details(note, version, texts)
     db.commit()
-    db.refresh(note)
-    db.refresh(version)
 
-    return _note_to_details(note, version)
+    return details
+
+
+@router.get("/notes/search", response_model=NoteSearchPage)
+def search_notes(
+    request: Request,
+    query: str = Query(..., min_length=1),
+    patient_id: Optional[UUID] = None,
+    limit: int = Query(20, ge=1, le=50),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    current_user: AuthenticatedUser = Depends(require_staff_user),
+) -> NoteSearchPage:
+    _ensure_clinical_access(current_user)
+    cleaned = query.strip()
+    if not cleaned:
+        return NoteSearchPage(items=[])
+
+    scope_doctor_id = None
+    if current_user.role in {UserRole.DOCTOR, UserRole.THERAPIST}:
+        scope_doctor_id = _get_doctor_id(current_user)
+    if patient_id:
+        audit_resources(request, "patient", [patient_id])
+        _ensure_patient_access(db, current_user, patient_id)
+
+    result = NoteSearchService(db).search(
+        cleaned,
+        doctor_id=scope_doctor_id,
+        child_id=patient_id,
+        limit=limit,
+        offset=offset,
+    )
+    if not patient_id:
+        audit_resources(request, "patient", dict.fromkeys(hit.child_id for hit in result.hits))
+    items = [
+        NoteSearchItem(
+            note_id=hit.note_id,
+            encounter_id=hit.encounter_id,
+            patient_id=hit.child_id,
+            patient_name=hit.child_name,
+            status=hit.status.value if hasattr(hit.status, "value") else str(hit.status),
+            version=hit.version,
+            updated_at=hit.updated_at,
+            rank=hit.rank,
+            headline=hit.headline,
+        )
+        for hit in result.hits
+    ]
+    return NoteSearchPage(items=items, truncated=result.truncated)
 
 
 @router.patch("/notes/{note_id}", response_model=NoteDetails)
 def update_note(
+    request: Request,
     note_id: UUID,
     payload: NoteUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_staff_user),
+    current_user: AuthenticatedUser = Depends(require_staff_user),
+    drafts: NoteDraftBuffer = Depends(get_note_draft_buffer),
 ) -> NoteDetails:
     _ensure_clinical_access(current_user)
-    note = db.execute(select(ClinicalNote).where(ClinicalNote.id == note_id)).scalar_one_or_none()
-    if not note:
-        raise HTTPException(status_code=404, detail="Note not found")
-
-    encounter = db.execute(select(Encounter).where(Encounter.id == note.encounter_id)).scalar_one_or_none()
-    if not encounter:
-        raise HTTPException(status_code=404, detail="Encounter not found")
-    _ensure_encounter_access(db, current_user, encounter)
+    note, _ = _get_accessible_note(request, db, current_user, note_id)
 
     if _note_status_value(note) != NoteStatus.DRAFT.value:
         raise HTTPException(status_code=409, detail="Note is signed")
 
     version_number = note.version + 1
     updated_by_user_id = payload.updated_by_user_id or note.author_user_id
+    versions = NoteVersionService(db)
+    previous = versions.get_current_content(note.id)
 
     note.version = version_number
     if payload.is_visible_to_guardian is not None:
         note.is_visible_to_guardian = payload.is_visible_to_guardian
     note.updated_at = dt.datetime.now(dt.timezone.utc)
 
-    version = NoteVersion(
-        note_id=note.id,
+    texts = payload.model_dump(include=set(NOTE_TEXT_FIELDS))
+    version = versions.append(
+        note=note,
         version_number=version_number,
         is_addendum=False,
-        history_text=payload.history_text,
-        diagnosis_text=payload.diagnosis_text,
-        recommendations_text=payload.recommendations_text,
-        therapy_plan_text=payload.therapy_plan_text,
-        guardian_summary_text=payload.guardian_summary_text,
+        texts=texts,
         created_by_user_id=updated_by_user_id,
+        previous=previous,
     )
-    db.add(version)
+    db.flush()
+    details = _note_to_details(note, version, texts)
     db.commit()
-    db.refresh(note)
-    db.refresh(version)
+    drafts.discard(note_id)
 
-    return _note_to_details(note, version)
+    return details
+
+
+@router.put("/notes/{note_id}/draft", response_model=NoteDraftDetails)
+def save_note_draft(
+    request: Request,
+    note_id: UUID,
+    payload: NoteDraftSave,
+    db: Session = Depends(get_db),
+    current_user: AuthenticatedUser = Depends(require_staff_user),
+    drafts: NoteDraftBuffer = Depends(get_note_draft_buffer),
+) -> NoteDraftDetails:
+    _ensure_clinical_access(current_user)
+    texts = payload.model_dump(include=set(NOTE_TEXT_FIELDS))
+    draft_fields = {
+        "note_id": note_id,
+        "editor_user_id": current_user.id,
+        "texts": texts,
+        "is_visible_to_guardian": payload.is_visible_to_guardian,
+        "updated_by_user_id": payload.updated_by_user_id,
+        "expected_revision": payload.revision,
+    }
+    try:
+        try:
+            draft = drafts.save(**draft_fields)
+        except KeyError:
+            note, encounter = _get_accessible_note(request, db, current_user, note_id)
+            if _note_status_value(note) != NoteStatus.DRAFT.value:
+                raise HTTPException(status_code=409, detail="Note is signed")
+            if payload.base_version is not None and payload.base_version != note.version:
+                raise HTTPException(status_code=409, detail="Note version conflict")
+            current = drafts.get(note_id)
+            if current and current.conflict and payload.base_version is None:
+                # The buffered base is stale; the editor must reload the note and resend with its version.
+                raise HTTPException(status_code=409, detail=current.conflict)
+            draft = drafts.save(**draft_fields, base_version=note.version, child_id=encounter.child_id)
+    except DraftConflictError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+
+    if draft.child_id:
+        audit_resources(request, "patient", [draft.child_id])
+    return _draft_to_details(draft)
+
+
+@router.get("/notes/{note_id}/draft", response_model=NoteDraftDetails)
+def get_note_draft(
+    request: Request,
+    note_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: AuthenticatedUser = Depends(require_staff_user),
+    drafts: NoteDraftBuffer = Depends(get_note_draft_buffer),
+) -> NoteDraftDetails:
+    _ensure_clinical_access(current_user)
+    _get_accessible_note(request, db, current_user, note_id)
+    draft = drafts.get(note_id)
+    if not draft:
+        raise HTTPException(status_code=404, detail="Draft not found")
+    return _draft_to_details(draft)
+
+
+@router.post("/notes/{note_id}/draft/commit", response_model=NoteDetails)
+def commit_note_draft(
+    request: Request,
+    note_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: AuthenticatedUser = Depends(require_staff_user),
+    drafts: NoteDraftBuffer = Depends(get_note_draft_buffer),
+) -> NoteDetails:
+    _ensure_clinical_access(current_user)
+    note, _ = _get_accessible_note(request, db, current_user, note_id)
+    if _note_status_value(note) != NoteStatus.DRAFT.value:
+        raise HTTPException(status_code=409, detail="Note is signed")
+
+    draft = drafts.get(note_id)
+    if not draft:
+        raise HTTPException(status_code=404, detail="Draft not found")
+    if not draft.dirty:
+        latest = NoteVersionService(db).get_current_content(note.id)
+        if not latest:
+            raise HTTPException(status_code=400, detail="Note version missing")
+        return _note_to_details(note, latest.version, latest.texts)
+
+    try:
+        version = materialize_draft(db, note, draft)
+    except DraftConflictError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    db.flush()
+    details = _note_to_details(note, version, draft.texts)
+    db.commit()
+    drafts.mark_flushed(note_id, draft.revision, details.version)
+
+    return details
 
 
 @router.post("/notes/{note_id}/sign", response_model=NoteDetails)
 def sign_note(
+    request: Request,
     note_id: UUID,
     payload: NoteSign,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_staff_user),
+    current_user: AuthenticatedUser = Depends(require_staff_user),
+    drafts: NoteDraftBuffer = Depends(get_note_draft_buffer),
 ) -> NoteDetails:
     _ensure_clinical_access(current_user)
-    note = db.execute(select(ClinicalNote).where(ClinicalNote.id == note_id)).scalar_one_or_none()
-    if not note:
-        raise HTTPException(status_code=404, detail="Note not found")
-
-    encounter = db.execute(select(Encounter).where(Encounter.id == note.encounter_id)).scalar_one_or_none()
-    if not encounter:
-        raise HTTPException(status_code=404, detail="Encounter not found")
-    _ensure_encounter_access(db, current_user, encounter)
+    note, _ = _get_accessible_note(request, db, current_user, note_id)
 
     if _note_status_value(note) != NoteStatus.DRAFT.value:
         raise HTTPException(status_code=409, detail="Note already signed")
 
+    draft = drafts.get(note.id)
+    if draft and draft.dirty:
+        try:
+            latest_version = materialize_draft(db, note, draft)
+        except DraftConflictError as exc:
+            raise HTTPException(status_code=409, detail=str(exc)) from exc
+        latest_texts = draft.texts
+    else:
+        latest = NoteVersionService(db).get_current_content(note.id)
+        if not latest:
+            raise HTTPException(status_code=400, detail="Note version missing")
+        latest_version, latest_texts = latest.version, latest.texts
+
     note.status = NoteStatus.SIGNED
     note.signed_at = dt.datetime.now(dt.timezone.utc)
     note.signed_by_user_id = payload.signed_by_user_id or note.author_user_id
     note.updated_at = note.signed_at
 
-    latest_version = db.execute(
-        select(NoteVersion)
-        .where(NoteVersion.note_id == note.id)
-        .order_by(NoteVersion.version_number.desc())
-        .limit(1)
-    ).scalar_one_or_none()
-    if not latest_version:
-        raise HTTPException(status_code=400, detail="Note version missing")
-
+    db.flush()
+    details = _note_to_details(note, latest_version, latest_texts)
     db.commit()
-    db.refresh(note)
-    db.refresh(latest_version)
+    drafts.discard(note_id)
 
-    return _note_to_details(note, latest_version)
+    return details
 
 
 @router.post("/notes/{note_id}/addendum", response_model=NoteDetails)
 def add_note_addendum(
+    request: Request,
     note_id: UUID,
     payload: NoteAddendum,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_staff_user),
+    current_user: AuthenticatedUser = Depends(require_staff_user),
 ) -> NoteDetails:
     _ensure_clinical_access(current_user)
-    note = db.execute(select(ClinicalNote).where(ClinicalNote.id == note_id)).scalar_one_or_none()
-    if not note:
-        raise HTTPException(status_code=404, detail="Note not found")
-
-    encounter = db.execute(select(Encounter).where(Encounter.id == note.encounter_id)).scalar_one_or_none()
-    if not encounter:
-        raise HTTPException(status_code=404, detail="Encounter not found")
-    _ensure_encounter_access(db, current_user, encounter)
+    note, _ = _get_accessible_note(request, db, current_user, note_id)
 
     if _note_status_value(note) != NoteStatus.SIGNED.value:
         raise HTTPException(status_code=409, detail="Note must be signed before addendum")
 
     version_number = note.version + 1
     created_by_user_id = payload.created_by_user_id or note.signed_by_user_id or note.author_user_id
+    versions = NoteVersionService(db)
+    previous = versions.get_current_content(note.id)
 
     note.version = version_number
     note.updated_at = dt.datetime.now(dt.timezone.utc)
 
-    version = NoteVersion(
-        note_id=note.id,
+    texts = payload.model_dump(include=set(NOTE_TEXT_FIELDS))
+    version = versions.append(
+        note=note,
         version_number=version_number,
         is_addendum=True,
-        history_text=payload.history_text,
-        diagnosis_text=payload.diagnosis_text,
-        recommendations_text=payload.recommendations_text,
-        therapy_plan_text=payload.therapy_plan_text,
-        guardian_summary_text=payload.guardian_summary_text,
+        texts=texts,
         created_by_user_id=created_by_user_id,
+        previous=previous,
     )
-    db.add(version)
+    db.flush()
+    details = _note_to_details(note, version, texts)
     db.commit()
-    db.refresh(note)
-    db.refresh(version)
 
-    return _note_to_details(note, version)
+    return details
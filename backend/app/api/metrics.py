@@ -0,0 +1,63 @@
+import hmac
+
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics import METRICS_BEARER_TOKEN, METRICS_PUBLIC, registry
+from app.core.rate_limit import login_rate_limiter
+from app.core.security import bulk_password_hash_pool, password_hash_pool
+from app.services.token_service import token_revocation_list
+
+router = APIRouter(tags=["metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _hash_pool_stats(field: str):
+    def read() -> dict[tuple[str, ...], float]:
+        return {
+            ("interactive",): getattr(password_hash_pool.stats(), field),
+            ("bulk",): getattr(bulk_password_hash_pool.stats(), field),
+        }
+
+    return read
+
+
+registry.callback("password_hash_pending", "Password hash jobs queued or running.", _hash_pool_stats("pending"), ("pool",))
+registry.callback(
+    "password_hash_jobs_total", "Password hash jobs completed.", _hash_pool_stats("completed_total"), ("pool",), kind="counter"
+)
+registry.callback(
+    "password_hash_rejected_total", "Password hash jobs rejected by a full queue.", _hash_pool_stats("rejected_total"), ("pool",), kind="counter"
+)
+registry.callback(
+    "password_hash_seconds_total", "Time spent on password hash jobs.", _hash_pool_stats("seconds_total"), ("pool",), kind="counter"
+)
+
+
+def _login_attempts() -> dict[tuple[str, ...], float]:
+    stats = login_rate_limiter.stats()
+    return {
+        ("allowed",): stats.allowed_total,
+        ("limited_ip",): stats.limited_by_ip_total,
+        ("limited_email",): stats.limited_by_email_total,
+    }
+
+
+registry.callback("login_attempts_total", "Login attempts by rate-limit decision.", _login_attempts, ("decision",), kind="counter")
+registry.callback("token_revocation_keys", "Revocation keys in the local filter.", lambda: token_revocation_list.stats().keys)
+registry.callback(
+    "token_revocation_suspect_total",
+    "Token checks that hit the revocation filter and went to the database.",
+    lambda: token_revocation_list.stats().suspect_total,
+    kind="counter",
+)
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics(authorization: str | None = Header(default=None)) -> PlainTextResponse:
+    if not METRICS_PUBLIC and not (
+        METRICS_BEARER_TOKEN and hmac.compare_digest(authorization or "", f"Bearer {METRICS_BEARER_TOKEN}")
+    ):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
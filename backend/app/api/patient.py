@@ -3,12 +3,12 @@ import uuid
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
 from fastapi.responses import FileResponse
 from sqlalchemy import or_, select
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db, require_guardian_user
+from app.api.deps import audit_access, audit_resources, get_db, require_guardian_user
 from app.db.enums import AppointmentStatus
 from app.db.models import (
     Appointment,
@@ -24,17 +24,22 @@ from app.db.models import (
     Invoice,
     PatientProfile,
     Prescription,
-    User,
 )
 from app.schemas.patients import (
     AppointmentItem,
     AttachmentItem,
     AuthorizedPersonDetails,
+    ChildAppointments,
+    ChildAttachments,
     ChildContactDetails,
+    ChildDashboard,
+    ChildEncounters,
+    ChildPrescriptions,
     ConsentDetails,
     EmergencyContactDetails,
     EncounterItem,
     GuardianContactDetails,
+    GuardianDashboard,
     GuardianSummary,
     InvoiceListItem,
     PatientDetails,
@@ -42,11 +47,18 @@ from app.schemas.patients import (
     PrescriptionListItem,
 )
 from app.schemas.onboarding import PatientOnboardingRequest, PatientOnboardingResponse
+from app.services.guardian_dashboard_service import (
+    GuardianDashboardCache,
+    GuardianDashboardService,
+    attachment_owners,
+    get_guardian_dashboard_cache,
+)
 from app.services.patient_onboarding_service import PatientOnboardingService
+from app.services.token_service import AuthenticatedUser
 from app.utils.patient_code import PatientCode
-from app.utils.storage import resolve_storage_path, save_upload
+from app.utils.storage import resolve_storage_path, save_upload, storage_file_response
 
-router = APIRouter(prefix="/patient", tags=["patient"])
+router = APIRouter(prefix="/patient", tags=["patient"], dependencies=[Depends(audit_access)])
 
 
 def calculate_age(date_of_birth: dt.date) -> int:
@@ -57,7 +69,7 @@ def calculate_age(date_of_birth: dt.date) -> int:
     return max(years, 0)
 
 
-def _get_guardian_profile(db: Session, current_user: User) -> PatientProfile:
+def _get_guardian_profile(db: Session, current_user: AuthenticatedUser) -> PatientProfile:
     guardian = db.execute(
         select(PatientProfile).where(PatientProfile.user_id == current_user.id)
     ).scalar_one_or_none()
@@ -78,6 +90,26 @@ def _get_child_for_guardian(db: Session, guardian_id: UUID, child_id: UUID) -> C
     return child
 
 
+def _get_children_for_guardian(
+    db: Session, guardian_id: UUID, child_ids: Optional[List[UUID]]
+) -> List[ChildProfile]:
+    """The guardian's children among ``child_ids`` (all of them when omitted), checked in one query."""
+    stmt = select(ChildProfile).where(ChildProfile.guardian_id == guardian_id)
+    if child_ids:
+        stmt = stmt.where(ChildProfile.id.in_(child_ids))
+    children = db.execute(stmt.order_by(ChildProfile.date_of_birth, ChildProfile.id)).scalars().all()
+    if child_ids and len(children) != len(set(child_ids)):
+        raise HTTPException(status_code=404, detail="Patient not found")
+    return children
+
+
+def _group_by_child(children: List[ChildProfile], rows, child_id_of) -> dict[UUID, list]:
+    grouped: dict[UUID, list] = {child.id: [] for child in children}
+    for row in rows:
+        grouped[child_id_of(row)].append(row)
+    return grouped
+
+
 def _resolve_attachment_child_id(db: Session, attachment: Attachment) -> UUID | None:
     if attachment.child_id:
         return attachment.child_id
@@ -101,18 +133,331 @@ def _resolve_attachment_child_id(db: Session, attachment: Attachment) -> UUID |
 def patient_onboarding(
     payload: PatientOnboardingRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_guardian_user),
+    current_user: AuthenticatedUser = Depends(require_guardian_user),
 ) -> PatientOnboardingResponse:
     service = PatientOnboardingService(db)
     child, record_code = service.create_guardian_with_child(user=current_user, payload=payload)
     return PatientOnboardingResponse(child_id=child.id, record_code=record_code)
 
 
+@router.get("/dashboard", response_model=GuardianDashboard)
+def get_guardian_dashboard(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: AuthenticatedUser = Depends(require_guardian_user),
+    cache: GuardianDashboardCache = Depends(get_guardian_dashboard_cache),
+) -> GuardianDashboard:
+    cached = cache.get(current_user.id)
+    if cached:
+        audit_resources(request, "patient", [child.id for child in cached.children])
+        return cached
+
+    generation = cache.generation()
+    guardian = _get_guardian_profile(db, current_user)
+    data = GuardianDashboardService(db).load(guardian)
+    dashboard = GuardianDashboard(
+        guardian=GuardianSummary(
+            id=guardian.id,
+            full_name=guardian.full_name,
+            email=guardian.email,
+            phone=guardian.phone,
+        ),
+        children=[
+            ChildDashboard(
+                id=child.id,
+                full_name=f"{child.first_name} {child.last_name}".strip(),
+                date_of_birth=child.date_of_birth,
+                age=calculate_age(child.date_of_birth),
+                record_code=PatientCode.format(child.mrn_number),
+                status=child.status.value,
+                upcoming_appointments=[
+                    AppointmentItem(
+                        id=appt.id,
+                        doctor_id=appt.doctor_id,
+                        service_id=appt.service_id,
+                        status=appt.status.value,
+                        start_at=appt.start_at,
+                        end_at=appt.end_at,
+                    )
+                    for appt in data.upcoming_appointments.get(child.id, [])
+                ],
+                recent_prescriptions=[
+                    PrescriptionListItem(
+                        id=prescription.id,
+                        appointment_id=prescription.appointment_id,
+                        doctor_id=prescription.doctor_id,
+                        child_id=prescription.child_id,
+                        code=prescription.code,
+                        issued_at=prescription.issued_at,
+                        expires_at=prescription.expires_at,
+                    )
+                    for prescription in data.recent_prescriptions.get(child.id, [])
+                ],
+                latest_attachments=[
+                    AttachmentItem(
+                        id=attachment.id,
+                        child_id=attachment.child_id,
+                        encounter_id=attachment.encounter_id,
+                        note_id=attachment.note_id,
+                        file_name=attachment.file_name,
+                        mime_type=attachment.mime_type,
+                        size_bytes=attachment.size_bytes,
+                        created_at=attachment.created_at,
+                    )
+                    for attachment in data.latest_attachments.get(child.id, [])
+                ],
+            )
+            for child in data.children
+        ],
+        unpaid_invoices=[
+            InvoiceListItem(
+                id=invoice.id,
+                appointment_id=invoice.appointment_id,
+                guardian_id=invoice.guardian_id,
+                number=invoice.number,
+                status=invoice.status.value,
+                issued_at=invoice.issued_at,
+                due_at=invoice.due_at,
+                paid_at=invoice.paid_at,
+                total_amount=float(invoice.total_amount),
+                currency=invoice.currency,
+            )
+            for invoice in data.unpaid_invoices
+        ],
+    )
+    audit_resources(request, "patient", [child.id for child in dashboard.children])
+    cache.put(
+        current_user.id,
+        dashboard,
+        guardian_id=guardian.id,
+        child_ids=[child.id for child in data.children],
+        generation=generation,
+    )
+    return dashboard
+
+
+@router.get("/children", response_model=List[PatientSummary])
+def get_children_summaries(
+    request: Request,
+    child_id: Optional[List[UUID]] = Query(default=None),
+    db: Session = Depends(get_db),
+    current_user: AuthenticatedUser = Depends(require_guardian_user),
+) -> List[PatientSummary]:
+    guardian = _get_guardian_profile(db, current_user)
+    children = _get_children_for_guardian(db, guardian.id, child_id)
+    audit_resources(request, "patient", [child.id for child in children])
+    guardian_summary = GuardianSummary(
+        id=guardian.id,
+        full_name=guardian.full_name,
+        email=guardian.email,
+        phone=guardian.phone,
+    )
+    return [
+        PatientSummary(
+            id=child.id,
+            full_name=f"{child.first_name} {child.last_name}".strip(),
+            date_of_birth=child.date_of_birth,
+            age=calculate_age(child.date_of_birth),
+            mrn=child.mrn,
+            mrn_number=child.mrn_number,
+            record_code=PatientCode.format(child.mrn_number),
+            status=child.status.value,
+            tags=child.tags,
+            guardian=guardian_summary,
+        )
+        for child in children
+    ]
+
+
+@router.get("/children/appointments", response_model=List[ChildAppointments])
+def get_children_appointments(
+    request: Request,
+    child_id: Optional[List[UUID]] = Query(default=None),
+    start_date: Optional[dt.date] = Query(default=None),
+    end_date: Optional[dt.date] = Query(default=None),
+    status: Optional[AppointmentStatus] = Query(default=None),
+    db: Session = Depends(get_db),
+    current_user: AuthenticatedUser = Depends(require_guardian_user),
+) -> List[ChildAppointments]:
+    guardian = _get_guardian_profile(db, current_user)
+    children = _get_children_for_guardian(db, guardian.id, child_id)
+    audit_resources(request, "patient", [child.id for child in children])
+    if not children:
+        return []
+
+    stmt = select(Appointment).where(
+        Appointment.child_id.in_([child.id for child in children]),
+        Appointment.guardian_id == guardian.id,
+    )
+    if start_date:
+        stmt = stmt.where(
+            Appointment.start_at >= dt.datetime.combine(start_date, dt.time.min, tzinfo=dt.timezone.utc)
+        )
+    if end_date:
+        stmt = stmt.where(
+            Appointment.start_at <= dt.datetime.combine(end_date, dt.time.max, tzinfo=dt.timezone.utc)
+        )
+    if status:
+        stmt = stmt.where(Appointment.status == status)
+
+    appointments = db.execute(stmt.order_by(Appointment.start_at.desc())).scalars().all()
+    grouped = _group_by_child(children, appointments, lambda appt: appt.child_id)
+    return [
+        ChildAppointments(
+            child_id=owner_id,
+            items=[
+                AppointmentItem(
+                    id=appt.id,
+                    doctor_id=appt.doctor_id,
+                    service_id=appt.service_id,
+                    status=appt.status.value,
+                    start_at=appt.start_at,
+                    end_at=appt.end_at,
+                )
+                for appt in items
+            ],
+        )
+        for owner_id, items in grouped.items()
+    ]
+
+
+@router.get("/children/encounters", response_model=List[ChildEncounters])
+def get_children_encounters(
+    request: Request,
+    child_id: Optional[List[UUID]] = Query(default=None),
+    start_date: Optional[dt.date] = Query(default=None),
+    end_date: Optional[dt.date] = Query(default=None),
+    db: Session = Depends(get_db),
+    current_user: AuthenticatedUser = Depends(require_guardian_user),
+) -> List[ChildEncounters]:
+    guardian = _get_guardian_profile(db, current_user)
+    children = _get_children_for_guardian(db, guardian.id, child_id)
+    audit_resources(request, "patient", [child.id for child in children])
+    if not children:
+        return []
+
+    stmt = select(Encounter).where(
+        Encounter.child_id.in_([child.id for child in children]),
+        Encounter.guardian_id == guardian.id,
+    )
+    if start_date:
+        stmt = stmt.where(
+            Encounter.created_at >= dt.datetime.combine(start_date, dt.time.min, tzinfo=dt.timezone.utc)
+        )
+    if end_date:
+        stmt = stmt.where(
+            Encounter.created_at <= dt.datetime.combine(end_date, dt.time.max, tzinfo=dt.timezone.utc)
+        )
+
+    encounters = db.execute(stmt.order_by(Encounter.created_at.desc())).scalars().all()
+    grouped = _group_by_child(children, encounters, lambda encounter: encounter.child_id)
+    return [
+        ChildEncounters(
+            child_id=owner_id,
+            items=[
+                EncounterItem(
+                    id=encounter.id,
+                    appointment_id=encounter.appointment_id,
+                    doctor_id=encounter.doctor_id,
+                    status=encounter.status.value,
+                    started_at=encounter.started_at,
+                    ended_at=encounter.ended_at,
+                    created_at=encounter.created_at,
+                )
+                for encounter in items
+            ],
+        )
+        for owner_id, items in grouped.items()
+    ]
+
+
+@router.get("/children/prescriptions", response_model=List[ChildPrescriptions])
+def get_children_prescriptions(
+    request: Request,
+    child_id: Optional[List[UUID]] = Query(default=None),
+    db: Session = Depends(get_db),
+    current_user: AuthenticatedUser = Depends(require_guardian_user),
+) -> List[ChildPrescriptions]:
+    guardian = _get_guardian_profile(db, current_user)
+    children = _get_children_for_guardian(db, guardian.id, child_id)
+    audit_resources(request, "patient", [child.id for child in children])
+    if not children:
+        return []
+
+    prescriptions = db.execute(
+        select(Prescription)
+        .where(Prescription.child_id.in_([child.id for child in children]))
+        .order_by(Prescription.issued_at.desc())
+    ).scalars().all()
+
+    grouped = _group_by_child(children, prescriptions, lambda prescription: prescription.child_id)
+    return [
+        ChildPrescriptions(
+            child_id=owner_id,
+            items=[
+                PrescriptionListItem(
+                    id=prescription.id,
+                    appointment_id=prescription.appointment_id,
+                    doctor_id=prescription.doctor_id,
+                    child_id=prescription.child_id,
+                    code=prescription.code,
+                    issued_at=prescription.issued_at,
+                    expires_at=prescription.expires_at,
+                )
+                for prescription in items
+            ],
+        )
+        for owner_id, items in grouped.items()
+    ]
+
+
+@router.get("/children/attachments", response_model=List[ChildAttachments])
+def get_children_attachments(
+    request: Request,
+    child_id: Optional[List[UUID]] = Query(default=None),
+    db: Session = Depends(get_db),
+    current_user: AuthenticatedUser = Depends(require_guardian_user),
+) -> List[ChildAttachments]:
+    guardian = _get_guardian_profile(db, current_user)
+    children = _get_children_for_guardian(db, guardian.id, child_id)
+    audit_resources(request, "patient", [child.id for child in children])
+    if not children:
+        return []
+
+    owners = attachment_owners([child.id for child in children])
+    rows = db.execute(
+        select(Attachment, owners.c.owner_id)
+        .join(owners, owners.c.attachment_id == Attachment.id)
+        .order_by(Attachment.created_at.desc())
+    ).all()
+
+    grouped = _group_by_child(children, rows, lambda row: row.owner_id)
+    return [
+        ChildAttachments(
+            child_id=owner_id,
+            items=[
+                AttachmentItem(
+                    id=attachment.id,
+                    child_id=attachment.child_id,
+                    encounter_id=attachment.encounter_id,
+                    note_id=attachment.note_id,
+                    file_name=attachment.file_name,
+                    mime_type=attachment.mime_type,
+                    size_bytes=attachment.size_bytes,
+                    created_at=attachment.created_at,
+                )
+                for attachment, _owner_id in items
+            ],
+        )
+        for owner_id, items in grouped.items()
+    ]
+
+
 @router.get("/children/{child_id}/summary", response_model=PatientSummary)
 def get_child_summary(
     child_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_guardian_user),
+    current_user: AuthenticatedUser = Depends(require_guardian_user),
 ) -> PatientSummary:
     guardian = _get_guardian_profile(db, current_user)
     child = _get_child_for_guardian(db, guardian.id, child_id)
@@ -141,7 +486,7 @@ def get_child_summary(
 def get_child_details(
     child_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_guardian_user),
+    current_user: AuthenticatedUser = Depends(require_guardian_user),
 ) -> PatientDetails:
     guardian = _get_guardian_profile(db, current_user)
     child = _get_child_for_guardian(db, guardian.id, child_id)
@@ -244,7 +589,7 @@ def get_child_appointments(
     end_date: Optional[dt.date] = Query(default=None),
     status: Optional[AppointmentStatus] = Query(default=None),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_guardian_user),
+    current_user: AuthenticatedUser = Depends(require_guardian_user),
 ) -> List[AppointmentItem]:
     guardian = _get_guardian_profile(db, current_user)
     _get_child_for_guardian(db, guardian.id, child_id)
@@ -284,7 +629,7 @@ def get_child_encounters(
     start_date: Optional[dt.date] = Query(default=None),
     end_date: Optional[dt.date] = Query(default=None),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_guardian_user),
+    current_user: AuthenticatedUser = Depends(require_guardian_user),
 ) -> List[EncounterItem]:
     guardian = _get_guardian_profile(db, current_user)
     _get_child_for_guardian(db, guardian.id, child_id)
@@ -321,7 +666,7 @@ def get_child_encounters(
 def get_child_prescriptions(
     child_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_guardian_user),
+    current_user: AuthenticatedUser = Depends(require_guardian_user),
 ) -> List[PrescriptionListItem]:
     guardian = _get_guardian_profile(db, current_user)
     _get_child_for_guardian(db, guardian.id, child_id)
@@ -350,7 +695,7 @@ def get_child_prescriptions(
 def get_child_invoices(
     child_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_guardian_user),
+    current_user: AuthenticatedUser = Depends(require_guardian_user),
 ) -> List[InvoiceListItem]:
     guardian = _get_guardian_profile(db, current_user)
     _get_child_for_guardian(db, guardian.id, child_id)
@@ -382,7 +727,7 @@ def get_child_invoices(
 def get_child_attachments(
     child_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_guardian_user),
+    current_user: AuthenticatedUser = Depends(require_guardian_user),
 ) -> List[AttachmentItem]:
     guardian = _get_guardian_profile(db, current_user)
     _get_child_for_guardian(db, guardian.id, child_id)
@@ -422,7 +767,7 @@ def upload_child_attachment(
     child_id: UUID,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_guardian_user),
+    current_user: AuthenticatedUser = Depends(require_guardian_user),
 ) -> AttachmentItem:
     guardian = _get_guardian_profile(db, current_user)
     _get_child_for_guardian(db, guardian.id, child_id)
@@ -439,10 +784,8 @@ def upload_child_attachment(
         storage_key=storage_key,
     )
     db.add(attachment)
-    db.commit()
-    db.refresh(attachment)
-
-    return AttachmentItem(
+    db.flush()
+    item = AttachmentItem(
         id=attachment.id,
         child_id=attachment.child_id,
         encounter_id=attachment.encounter_id,
@@ -452,13 +795,17 @@ def upload_child_attachment(
         size_bytes=attachment.size_bytes,
         created_at=attachment.created_at,
     )
+    db.commit()
+
+    return item
 
 
 @router.get("/attachments/{attachment_id}/download")
 def download_child_attachment(
+    request: Request,
     attachment_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_guardian_user),
+    current_user: AuthenticatedUser = Depends(require_guardian_user),
 ) -> FileResponse:
     guardian = _get_guardian_profile(db, current_user)
     attachment = db.execute(
@@ -471,6 +818,7 @@ def download_child_attachment(
     if not child_id:
         raise HTTPException(status_code=404, detail="Attachment target not found")
 
+    audit_resources(request, "patient", [child_id])
     _get_child_for_guardian(db, guardian.id, child_id)
 
     try:
@@ -481,4 +829,4 @@ def download_child_attachment(
     if not path.exists():
         raise HTTPException(status_code=404, detail="File not found")
 
-    return FileResponse(path, media_type=attachment.mime_type, filename=attachment.file_name)
+    return storage_file_response(path, media_type=attachment.mime_type, filename=attachment.file_name)
@@ -0,0 +1,80 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+
+from app.api.deps import require_admin_user
+from app.core.profiling import RequestProfile, request_profile_store
+from app.schemas.profiling import (
+    LocationTimingItem,
+    RequestProfileItem,
+    RouteProfileItem,
+    StackSampleItem,
+    StatementTimingItem,
+)
+from app.services.token_service import AuthenticatedUser
+
+router = APIRouter(prefix="/profiling", tags=["profiling"])
+
+
+def _profile_item(profile: RequestProfile) -> RequestProfileItem:
+    return RequestProfileItem(
+        method=profile.method,
+        path=profile.path,
+        route=profile.route,
+        status_code=profile.status_code,
+        started_at=profile.started_at,
+        wall_ms=round(profile.wall_ms, 3),
+        db_ms=round(profile.db_ms, 3),
+        statement_count=profile.statement_count,
+        slowest_statements=[
+            StatementTimingItem(duration_ms=round(timing.duration_ms, 3), location=timing.location, sql=timing.sql)
+            for timing in profile.slowest_statements
+        ],
+        locations=[
+            LocationTimingItem(location=item.location, count=item.count, total_ms=round(item.total_ms, 3))
+            for item in profile.locations
+        ],
+        stacks=[StackSampleItem(stack=stack, samples=samples) for stack, samples in profile.stacks]
+        if profile.stacks is not None
+        else None,
+    )
+
+
+@router.get("/requests", response_model=List[RequestProfileItem])
+def list_request_profiles(
+    route: Optional[str] = Query(default=None),
+    min_wall_ms: float = Query(default=0, ge=0),
+    sampled_only: bool = Query(default=False),
+    limit: int = Query(default=50, ge=1, le=500),
+    current_user: AuthenticatedUser = Depends(require_admin_user),
+) -> List[RequestProfileItem]:
+    """Most recent profiles first; empty unless PROFILING_ENABLED is set."""
+    items = []
+    for profile in request_profile_store.recent():
+        if route and (profile.route or profile.path) != route:
+            continue
+        if profile.wall_ms < min_wall_ms or (sampled_only and profile.stacks is None):
+            continue
+        items.append(_profile_item(profile))
+        if len(items) >= limit:
+            break
+    return items
+
+
+@router.get("/routes", response_model=List[RouteProfileItem])
+def list_route_profiles(
+    current_user: AuthenticatedUser = Depends(require_admin_user),
+) -> List[RouteProfileItem]:
+    return [
+        RouteProfileItem(
+            method=summary.method,
+            route=summary.route,
+            requests=summary.requests,
+            wall_ms_p50=round(summary.wall_ms_p50, 3),
+            wall_ms_p95=round(summary.wall_ms_p95, 3),
+            db_ms_avg=round(summary.db_ms_avg, 3),
+            statements_avg=round(summary.statements_avg, 2),
+            statements_max=summary.statements_max,
+        )
+        for summary in request_profile_store.route_summaries()
+    ]
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, Request, Response, status
+
+from app.schemas.services import ServiceCatalogItem
+from app.services.service_catalog import SERVICE_CATALOG_MAX_AGE_SECONDS, ServiceCatalog, get_service_catalog
+
+router = APIRouter(prefix="/services", tags=["services"])
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison, as RFC 9110 prescribes for If-None-Match."""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+@router.get("", response_model=list[ServiceCatalogItem])
+def list_services(request: Request, catalog: ServiceCatalog = Depends(get_service_catalog)) -> Response:
+    snapshot = catalog.snapshot()
+    headers = {
+        "ETag": snapshot.etag,
+        "Cache-Control": f"public, max-age={SERVICE_CATALOG_MAX_AGE_SECONDS}, stale-while-revalidate=86400",
+    }
+    if _etag_matches(request.headers.get("if-none-match"), snapshot.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
@@ -0,0 +1,356 @@
+import bisect
+import math
+from abc import ABC, abstractmethod
+import os
+import threading
+import time
+from typing import Callable, Iterable, Sequence
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in {"1", "true", "yes"}
+# GET /metrics requires "Authorization: Bearer <token>". Without a token the route is not
+# mounted, unless METRICS_PUBLIC opts in for a listener that is only reachable internally.
+METRICS_BEARER_TOKEN = os.getenv("METRICS_BEARER_TOKEN") or None
+METRICS_PUBLIC = os.getenv("METRICS_PUBLIC", "false").lower() in {"1", "true", "yes"}
+METRICS_EXPOSED = METRICS_ENABLED and (METRICS_BEARER_TOKEN is not None or METRICS_PUBLIC)
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class _ShardedValues:
+    """Fixed-size float vector with one shard per writing thread.
+
+    Each thread only ever writes its own shard, so updates need no lock and cannot lose
+    increments; readers sum the shards and may see a scrape that is a few updates behind.
+    Shards of finished threads are kept so totals stay monotonic.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._local = threading.local()
+        self._shards: list[list[float]] = []
+
+    def shard(self) -> list[float]:
+        try:
+            return self._local.values
+        except AttributeError:
+            values = [0.0] * self.size
+            self._local.values = values
+            self._shards.append(values)
+            return values
+
+    def totals(self) -> list[float]:
+        totals = [0.0] * self.size
+        for values in list(self._shards):
+            for index, value in enumerate(values):
+                totals[index] += value
+        return totals
+
+
+class _Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _label_text(self, values: tuple[str, ...], extra: dict[str, str] | None = None) -> str:
+        pairs = list(zip(self.labelnames, values))
+        if extra:
+            pairs.extend(extra.items())
+        if not pairs:
+            return ""
+        rendered = ",".join(f'{name}="{_escape(str(value))}"' for name, value in pairs)
+        return "{" + rendered + "}"
+
+    @abstractmethod
+    def samples(self) -> Iterable[str]:
+        """Exposition lines for the current values."""
+
+
+class _LabelledMetric(_Metric):
+    """Metric holding one child per label combination; unlabelled metrics use a single default child."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._children: dict[tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self._child(())
+
+    def labels(self, *values: str):
+        child = self._children.get(values)
+        if child is None:
+            child = self._child(values)
+        return child
+
+    def _child(self, values: tuple[str, ...]):
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        with self._lock:
+            child = self._children.get(values)
+            if child is None:
+                child = self._new_child()
+                self._children[values] = child
+            return child
+
+    @abstractmethod
+    def _new_child(self):
+        """A fresh child holding the values of one label combination."""
+
+
+class _CounterChild(_ShardedValues):
+    def __init__(self) -> None:
+        super().__init__(1)
+
+    def inc(self, amount: float = 1.0) -> None:
+        try:
+            self._local.values[0] += amount
+        except AttributeError:
+            self.shard()[0] += amount
+
+    def value(self) -> float:
+        return self.totals()[0]
+
+
+class Counter(_LabelledMetric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        if not self.labelnames:
+            # Skip one call level on the hot path.
+            self.inc = self._default.inc
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.inc(amount)
+
+    def samples(self) -> Iterable[str]:
+        for values, child in list(self._children.items()):
+            yield f"{self.name}{self._label_text(values)} {_number(child.value())}"
+
+
+class Gauge(Counter):
+    """Up/down gauge; inc and dec from the same thread keep the per-thread shards balanced."""
+
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default.inc(-amount)
+
+
+class _HistogramChild(_ShardedValues):
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        # One slot per bucket, then +Inf, then the running sum.
+        super().__init__(len(buckets) + 2)
+        self.buckets = buckets
+
+    def observe(self, value: float) -> None:
+        try:
+            values = self._local.values
+        except AttributeError:
+            values = self.shard()
+        values[bisect.bisect_left(self.buckets, value)] += 1
+        values[-1] += value
+
+
+class Histogram(_LabelledMetric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> None:
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default.observe(value)
+
+    def samples(self) -> Iterable[str]:
+        for values, child in list(self._children.items()):
+            totals = child.totals()
+            cumulative = 0.0
+            for bound, count in zip((*self.buckets, math.inf), totals):
+                cumulative += count
+                le = "+Inf" if bound == math.inf else _number(bound)
+                yield f"{self.name}_bucket{self._label_text(values, {'le': le})} {_number(cumulative)}"
+            yield f"{self.name}_sum{self._label_text(values)} {_number(totals[-1])}"
+            yield f"{self.name}_count{self._label_text(values)} {_number(cumulative)}"
+
+
+class CallbackGauge(_Metric):
+    """Gauge read at scrape time, for state owned elsewhere (pool sizes, queue depths)."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], float | dict[tuple[str, ...], float]],
+        labelnames: Sequence[str] = (),
+        kind: str = "gauge",
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+        self.kind = kind
+
+    def samples(self) -> Iterable[str]:
+        result = self.callback()
+        if not isinstance(result, dict):
+            result = {(): result}
+        for values, value in result.items():
+            yield f"{self.name}{self._label_text(values)} {_number(value)}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._metrics
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(self, name: str, documentation: str, callback, labelnames: Sequence[str] = (), kind: str = "gauge"):
+        return self.register(CallbackGauge(name, documentation, callback, labelnames, kind))
+
+    def render(self) -> str:
+        """Prometheus text exposition format 0.0.4."""
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_requests_in_flight = registry.gauge("http_requests_in_flight", "HTTP requests currently being served.")
+http_request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route", "status"),
+)
+db_statements_total = registry.counter("db_statements_total", "SQL statements executed, by statement kind.", ("kind",))
+ai_request_duration_seconds = registry.histogram(
+    "ai_request_duration_seconds",
+    "Latency of AI upstream calls.",
+    ("operation",),
+    buckets=(0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0),
+)
+ai_requests_total = registry.counter("ai_requests_total", "AI upstream calls by outcome.", ("operation", "outcome"))
+ai_tokens_total = registry.counter("ai_tokens_total", "Tokens reported by the AI upstream.", ("operation", "kind"))
+storage_bytes_total = registry.counter("storage_bytes_total", "Attachment storage I/O in bytes.", ("direction",))
+audit_events_total = registry.counter("audit_events_total", "Audit events by pipeline stage.", ("stage",))
+notifications_total = registry.counter(
+    "notifications_total", "Notification delivery attempts by channel and outcome.", ("channel", "outcome")
+)
+
+
+_STATEMENT_KINDS = {"SELECT": "select", "WITH": "select", "INSERT": "insert", "UPDATE": "update", "DELETE": "delete"}
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany) -> None:
+    head = statement.lstrip(" \n(")[:8].split(None, 1)
+    db_statements_total.labels(_STATEMENT_KINDS.get(head[0].upper() if head else "", "other")).inc()
+
+
+def install_engine_metrics(engine) -> None:
+    from sqlalchemy import event
+
+    if not event.contains(engine, "after_cursor_execute", _count_statement):
+        event.listen(engine, "after_cursor_execute", _count_statement)
+
+    def pool_state() -> dict[tuple[str, ...], float]:
+        pool = engine.pool
+        state = {}
+        for name in ("size", "checkedin", "checkedout", "overflow"):
+            reader = getattr(pool, name, None)
+            if reader is not None:
+                state[(name,)] = reader()
+        return state
+
+    if "db_pool_connections" not in registry:
+        registry.callback("db_pool_connections", "SQLAlchemy connection pool state.", pool_state, ("state",))
+
+
+class MetricsMiddleware:
+    """ASGI middleware feeding the in-flight gauge and the per-route latency histogram."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_requests_in_flight.dec()
+            route = scope.get("route")
+            http_request_duration_seconds.labels(
+                scope["method"],
+                getattr(route, "path", UNMATCHED_ROUTE),
+                str(status_code),
+            ).observe(elapsed)
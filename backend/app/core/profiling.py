@@ -0,0 +1,299 @@
+import contextvars
+import datetime as dt
+import heapq
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in {"1", "true", "yes"}
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0.01"))
+PROFILING_SAMPLE_INTERVAL_SECONDS = float(os.getenv("PROFILING_SAMPLE_INTERVAL_SECONDS", "0.005"))
+PROFILING_SLOW_STATEMENTS = int(os.getenv("PROFILING_SLOW_STATEMENTS", "5"))
+PROFILING_HISTORY = int(os.getenv("PROFILING_HISTORY", "500"))
+PROFILING_LOG_MIN_MS = float(os.getenv("PROFILING_LOG_MIN_MS", "0"))
+
+APP_ROOT = Path(__file__).resolve().parents[1]
+# Frames from these files are plumbing, never the call site worth reporting.
+_SKIPPED_FILES = {str(APP_ROOT / "core" / "profiling.py"), str(APP_ROOT / "db" / "session.py")}
+_API_ROOT = str(APP_ROOT / "api")
+_MAX_SQL_LENGTH = 500
+_MAX_STACKS = 25
+
+
+@dataclass
+class StatementTiming:
+    duration_ms: float
+    location: str
+    sql: str
+
+
+@dataclass
+class LocationTiming:
+    location: str
+    count: int
+    total_ms: float
+
+
+@dataclass
+class RequestProfile:
+    method: str
+    path: str
+    route: str | None = None
+    status_code: int | None = None
+    started_at: dt.datetime = field(default_factory=lambda: dt.datetime.now(dt.timezone.utc))
+    wall_ms: float = 0.0
+    db_ms: float = 0.0
+    statement_count: int = 0
+    slowest_statements: list[StatementTiming] = field(default_factory=list)
+    locations: list[LocationTiming] = field(default_factory=list)
+    stacks: list[tuple[str, int]] | None = None
+
+    def as_log_record(self) -> dict[str, Any]:
+        record = asdict(self)
+        record["started_at"] = self.started_at.isoformat()
+        record["stacks"] = len(self.stacks) if self.stacks else 0
+        return record
+
+
+@dataclass
+class RouteProfileSummary:
+    method: str
+    route: str
+    requests: int
+    wall_ms_p50: float
+    wall_ms_p95: float
+    db_ms_avg: float
+    statements_avg: float
+    statements_max: int
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class _RequestRecorder:
+    """Mutable per-request state; statements may be recorded from threadpool threads."""
+
+    def __init__(self, profile: RequestProfile, slow_limit: int) -> None:
+        self.profile = profile
+        self.slow_limit = slow_limit
+        self._lock = threading.Lock()
+        self._slowest: list[tuple[float, int, StatementTiming]] = []
+        self._locations: dict[str, list[float]] = defaultdict(lambda: [0, 0.0])
+
+    def record(self, statement: str, duration: float, location: str) -> None:
+        duration_ms = duration * 1000
+        with self._lock:
+            self.profile.statement_count += 1
+            self.profile.db_ms += duration_ms
+            totals = self._locations[location]
+            totals[0] += 1
+            totals[1] += duration_ms
+            timing = StatementTiming(duration_ms=duration_ms, location=location, sql=statement[:_MAX_SQL_LENGTH])
+            entry = (duration_ms, self.profile.statement_count, timing)
+            if len(self._slowest) < self.slow_limit:
+                heapq.heappush(self._slowest, entry)
+            elif self.slow_limit:
+                heapq.heappushpop(self._slowest, entry)
+
+    def finish(self) -> RequestProfile:
+        with self._lock:
+            self.profile.slowest_statements = [timing for _, _, timing in sorted(self._slowest, reverse=True)]
+            self.profile.locations = sorted(
+                (LocationTiming(location=location, count=int(count), total_ms=total) for location, (count, total) in self._locations.items()),
+                key=lambda item: item.total_ms,
+                reverse=True,
+            )
+        return self.profile
+
+
+_current_recorder: contextvars.ContextVar[_RequestRecorder | None] = contextvars.ContextVar(
+    "request_profile_recorder", default=None
+)
+
+
+def _call_site() -> str:
+    """First frame inside the app package above the SQLAlchemy call, e.g. ``api/med.py:512 list_encounters``."""
+    frame = sys._getframe(2)
+    root = str(APP_ROOT)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(root) and filename not in _SKIPPED_FILES:
+            return f"{filename[len(root) + 1:]}:{frame.f_lineno} {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "<unknown>"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current_recorder.get() is not None:
+        conn.info.setdefault("profiling_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    recorder = _current_recorder.get()
+    started = conn.info.get("profiling_started")
+    if recorder is None or not started:
+        return
+    recorder.record(statement, time.perf_counter() - started.pop(), _call_site())
+
+
+def install_statement_listeners(engine: Engine) -> None:
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class StackSampler:
+    """Samples thread stacks while a request runs, keeping those that pass through an endpoint.
+
+    Sync endpoints run on threadpool threads that cannot be told apart from the outside, so
+    stacks of concurrent requests are mixed in. Background workers never run endpoint code
+    and are dropped.
+    """
+
+    def __init__(self, interval_seconds: float = PROFILING_SAMPLE_INTERVAL_SECONDS) -> None:
+        self.interval_seconds = interval_seconds
+        self._stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="request-stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> list[tuple[str, int]]:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        return self._stacks.most_common(_MAX_STACKS)
+
+    def _run(self) -> None:
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval_seconds):
+            for ident, frame in sys._current_frames().items():
+                if ident != own_ident:
+                    stack = self._fold(frame)
+                    if stack:
+                        self._stacks[stack] += 1
+
+    @staticmethod
+    def _fold(frame) -> str | None:
+        frames = []
+        endpoint_depth = 0
+        while frame is not None:
+            code = frame.f_code
+            frames.append(f"{Path(code.co_filename).stem}:{code.co_name}")
+            if code.co_filename.startswith(_API_ROOT):
+                endpoint_depth = len(frames)
+            frame = frame.f_back
+        if not endpoint_depth:
+            return None
+        # Outermost endpoint frame first, as flame graph tools expect.
+        return ";".join(reversed(frames[:endpoint_depth]))
+
+
+class RequestProfileStore:
+    """Bounded in-memory history of request profiles."""
+
+    def __init__(self, maxlen: int = PROFILING_HISTORY) -> None:
+        self._lock = threading.Lock()
+        self._profiles: deque[RequestProfile] = deque(maxlen=maxlen)
+
+    def add(self, profile: RequestProfile) -> None:
+        with self._lock:
+            self._profiles.append(profile)
+
+    def recent(self) -> list[RequestProfile]:
+        with self._lock:
+            return list(reversed(self._profiles))
+
+    def route_summaries(self) -> list[RouteProfileSummary]:
+        grouped: dict[tuple[str, str], list[RequestProfile]] = defaultdict(list)
+        for profile in self.recent():
+            grouped[(profile.method, profile.route or profile.path)].append(profile)
+        summaries = []
+        for (method, route), profiles in grouped.items():
+            wall = sorted(profile.wall_ms for profile in profiles)
+            summaries.append(
+                RouteProfileSummary(
+                    method=method,
+                    route=route,
+                    requests=len(profiles),
+                    wall_ms_p50=_percentile(wall, 0.5),
+                    wall_ms_p95=_percentile(wall, 0.95),
+                    db_ms_avg=sum(profile.db_ms for profile in profiles) / len(profiles),
+                    statements_avg=sum(profile.statement_count for profile in profiles) / len(profiles),
+                    statements_max=max(profile.statement_count for profile in profiles),
+                )
+            )
+        return sorted(summaries, key=lambda summary: summary.wall_ms_p95, reverse=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._profiles.clear()
+
+
+request_profile_store = RequestProfileStore()
+
+
+class ProfilingMiddleware:
+    """ASGI middleware recording wall time, DB time and statement attribution per request."""
+
+    def __init__(
+        self,
+        app,
+        *,
+        engine: Engine,
+        store: RequestProfileStore = request_profile_store,
+        sample_rate: float = PROFILING_SAMPLE_RATE,
+        slow_statements: int = PROFILING_SLOW_STATEMENTS,
+    ) -> None:
+        self.app = app
+        self.store = store
+        self.sample_rate = sample_rate
+        self.slow_statements = slow_statements
+        install_statement_listeners(engine)
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(method=scope["method"], path=scope["path"])
+        recorder = _RequestRecorder(profile, self.slow_statements)
+        sampler = StackSampler() if random.random() < self.sample_rate else None
+
+        async def send_wrapper(message) -> None:
+            if message["type"] == "http.response.start":
+                profile.status_code = message["status"]
+            await send(message)
+
+        token = _current_recorder.set(recorder)
+        started = time.perf_counter()
+        if sampler:
+            sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profile.wall_ms = (time.perf_counter() - started) * 1000
+            if sampler:
+                profile.stacks = sampler.stop()
+            _current_recorder.reset(token)
+            route = scope.get("route")
+            profile.route = getattr(route, "path", None)
+            self.store.add(recorder.finish())
+            if profile.wall_ms >= PROFILING_LOG_MIN_MS:
+                logger.info(json.dumps({"event": "request_profile", **profile.as_log_record()}))
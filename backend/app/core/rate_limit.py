@@ -0,0 +1,178 @@
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Protocol
+
+LOGIN_RATE_LIMIT_ENABLED = os.getenv("LOGIN_RATE_LIMIT_ENABLED", "true").lower() in {"1", "true", "yes"}
+LOGIN_RATE_LIMIT_IP_BURST = float(os.getenv("LOGIN_RATE_LIMIT_IP_BURST", "20"))
+LOGIN_RATE_LIMIT_IP_PER_MINUTE = float(os.getenv("LOGIN_RATE_LIMIT_IP_PER_MINUTE", "30"))
+LOGIN_RATE_LIMIT_EMAIL_BURST = float(os.getenv("LOGIN_RATE_LIMIT_EMAIL_BURST", "5"))
+LOGIN_RATE_LIMIT_EMAIL_PER_MINUTE = float(os.getenv("LOGIN_RATE_LIMIT_EMAIL_PER_MINUTE", "5"))
+LOGIN_RATE_LIMIT_REDIS_URL = os.getenv("LOGIN_RATE_LIMIT_REDIS_URL")
+LOGIN_RATE_LIMIT_TRUST_FORWARDED = os.getenv("LOGIN_RATE_LIMIT_TRUST_FORWARDED", "false").lower() in {"1", "true", "yes"}
+
+
+@dataclass(frozen=True)
+class TokenBucketRule:
+    capacity: float
+    refill_per_second: float
+
+    @classmethod
+    def per_minute(cls, burst: float, per_minute: float) -> "TokenBucketRule":
+        return cls(capacity=burst, refill_per_second=per_minute / 60.0)
+
+
+class TokenBucketBackend(Protocol):
+    def take(self, key: str, rule: TokenBucketRule) -> float:
+        """Consumes one token; returns 0 when allowed, otherwise seconds until a token is available."""
+
+    def reset(self) -> None:
+        ...
+
+
+class InMemoryTokenBucketBackend:
+    """Process-local buckets; the stand-in used when no shared backend is configured."""
+
+    def __init__(self, *, max_keys: int = 100_000, clock=time.monotonic) -> None:
+        self._lock = threading.Lock()
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._max_keys = max_keys
+        self._clock = clock
+
+    def take(self, key: str, rule: TokenBucketRule) -> float:
+        now = self._clock()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (rule.capacity, now))
+            tokens = min(rule.capacity, tokens + (now - updated_at) * rule.refill_per_second)
+            if tokens >= 1.0:
+                self._store(key, tokens - 1.0, now)
+                return 0.0
+            self._store(key, tokens, now)
+            return (1.0 - tokens) / rule.refill_per_second
+
+    def _store(self, key: str, tokens: float, now: float) -> None:
+        # Re-inserting keeps the dict in least-recently-touched order for eviction.
+        if self._buckets.pop(key, None) is None and len(self._buckets) >= self._max_keys:
+            self._buckets.pop(next(iter(self._buckets)))
+        self._buckets[key] = (tokens, now)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+class RedisTokenBucketBackend:
+    """Buckets shared by all API workers, updated atomically by a Lua script."""
+
+    SCRIPT = """
+    local capacity = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(bucket[1]) or capacity
+    local ts = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + (now - ts) * rate)
+    local wait = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+    else
+        wait = (1 - tokens) / rate
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+    return tostring(wait)
+    """
+
+    def __init__(self, url: str, *, prefix: str = "ratelimit:") -> None:
+        import redis  # optional dependency, only needed when a shared backend is configured
+
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(self.SCRIPT)
+        self._prefix = prefix
+
+    def take(self, key: str, rule: TokenBucketRule) -> float:
+        wait = self._script(
+            keys=[f"{self._prefix}{key}"],
+            args=[rule.capacity, rule.refill_per_second, time.time()],
+        )
+        return float(wait)
+
+    def reset(self) -> None:
+        for key in self._client.scan_iter(f"{self._prefix}*"):
+            self._client.delete(key)
+
+
+@dataclass
+class LoginRateLimitStats:
+    allowed_total: int
+    limited_by_ip_total: int
+    limited_by_email_total: int
+
+
+class LoginRateLimiter:
+    """Per-IP and per-email token buckets checked before any database or hashing work."""
+
+    def __init__(
+        self,
+        backend: TokenBucketBackend,
+        *,
+        ip_rule: TokenBucketRule,
+        email_rule: TokenBucketRule,
+        enabled: bool = True,
+    ) -> None:
+        self.backend = backend
+        self.ip_rule = ip_rule
+        self.email_rule = email_rule
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._allowed = 0
+        self._limited_by_ip = 0
+        self._limited_by_email = 0
+
+    def check(self, *, ip: str | None, email: str) -> float:
+        """Returns 0 when the attempt may proceed, otherwise the Retry-After in seconds."""
+        if not self.enabled:
+            return 0.0
+        if ip:
+            wait = self.backend.take(f"login:ip:{ip}", self.ip_rule)
+            if wait:
+                self._count("ip")
+                return wait
+        wait = self.backend.take(f"login:email:{email.strip().lower()}", self.email_rule)
+        self._count("email" if wait else None)
+        return wait
+
+    def _count(self, limited_by: str | None) -> None:
+        with self._lock:
+            if limited_by == "ip":
+                self._limited_by_ip += 1
+            elif limited_by == "email":
+                self._limited_by_email += 1
+            else:
+                self._allowed += 1
+
+    def stats(self) -> LoginRateLimitStats:
+        with self._lock:
+            return LoginRateLimitStats(
+                allowed_total=self._allowed,
+                limited_by_ip_total=self._limited_by_ip,
+                limited_by_email_total=self._limited_by_email,
+            )
+
+    def reset(self) -> None:
+        self.backend.reset()
+
+
+def _build_backend() -> TokenBucketBackend:
+    if LOGIN_RATE_LIMIT_REDIS_URL:
+        return RedisTokenBucketBackend(LOGIN_RATE_LIMIT_REDIS_URL)
+    return InMemoryTokenBucketBackend()
+
+
+login_rate_limiter = LoginRateLimiter(
+    _build_backend(),
+    ip_rule=TokenBucketRule.per_minute(LOGIN_RATE_LIMIT_IP_BURST, LOGIN_RATE_LIMIT_IP_PER_MINUTE),
+    email_rule=TokenBucketRule.per_minute(LOGIN_RATE_LIMIT_EMAIL_BURST, LOGIN_RATE_LIMIT_EMAIL_PER_MINUTE),
+    enabled=LOGIN_RATE_LIMIT_ENABLED,
+)
@@ -1,19 +1,140 @@
+import asyncio
 import datetime as dt
+import multiprocessing
 import os
-from typing import Any
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Sequence
 
-from jose import jwt
+from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 SECRET_KEY = os.getenv("JWT_SECRET", "change-me-in-env")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+ACCESS_TOKEN_TYPE = "access"
+REFRESH_TOKEN_TYPE = "refresh"
 PASSWORD_HASH_SCHEME = os.getenv("PASSWORD_HASH_SCHEME", "pbkdf2_sha256")
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "1024"))
+PASSWORD_HASH_BULK_WORKERS = int(os.getenv("PASSWORD_HASH_BULK_WORKERS", "1"))
+# Stored instead of a hash while the real one is still being computed; never verifies.
+UNUSABLE_PASSWORD_PREFIX = "!"
 
 pwd_context = CryptContext(schemes=[PASSWORD_HASH_SCHEME], deprecated="auto")
 
 
+class PasswordHashPoolBusy(Exception):
+    pass
+
+
+@dataclass
+class PasswordHashPoolStats:
+    workers: int
+    max_pending: int
+    pending: int
+    max_pending_seen: int
+    submitted_total: int
+    completed_total: int
+    rejected_total: int
+    seconds_total: float
+
+
+class PasswordHashPool:
+    """Bounded process pool for pbkdf2 work, keeping CPU-bound hashing off the API process.
+
+    ``pending`` counts queued plus running jobs; once it reaches ``max_pending`` new jobs
+    are rejected with PasswordHashPoolBusy instead of queueing without bound.
+    """
+
+    def __init__(self, *, max_workers: int, max_pending: int) -> None:
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._max_pending_seen = 0
+        self._submitted = 0
+        self._completed = 0
+        self._rejected = 0
+        self._seconds = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: the API process runs threads and holds DB connections, which must not be forked.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise PasswordHashPoolBusy("Password hashing queue is full")
+            self._pending += 1
+            self._submitted += 1
+            self._max_pending_seen = max(self._max_pending_seen, self._pending)
+            executor = self._get_executor()
+        started = time.perf_counter()
+        try:
+            future = executor.submit(fn, *args)
+        except Exception:
+            self._finish(started)
+            raise
+        future.add_done_callback(lambda _: self._finish(started))
+        return future
+
+    def _finish(self, started: float) -> None:
+        with self._lock:
+            self._pending -= 1
+            self._completed += 1
+            self._seconds += time.perf_counter() - started
+
+    def hash(self, password: str) -> str:
+        return self.submit(get_password_hash, password).result()
+
+    def hash_many(self, passwords: Sequence[str]) -> list[str]:
+        futures = [self.submit(get_password_hash, password) for password in passwords]
+        return [future.result() for future in futures]
+
+    async def hash_async(self, password: str) -> str:
+        return await asyncio.wrap_future(self.submit(get_password_hash, password))
+
+    async def verify_async(self, plain_password: str, hashed_password: str) -> bool:
+        if hashed_password.startswith(UNUSABLE_PASSWORD_PREFIX):
+            return False
+        return await asyncio.wrap_future(self.submit(verify_password, plain_password, hashed_password))
+
+    def stats(self) -> PasswordHashPoolStats:
+        with self._lock:
+            return PasswordHashPoolStats(
+                workers=self.max_workers,
+                max_pending=self.max_pending,
+                pending=self._pending,
+                max_pending_seen=self._max_pending_seen,
+                submitted_total=self._submitted,
+                completed_total=self._completed,
+                rejected_total=self._rejected,
+                seconds_total=self._seconds,
+            )
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
+    if hashed_password.startswith(UNUSABLE_PASSWORD_PREFIX):
+        return False
     return pwd_context.verify(plain_password, hashed_password)
 
 
@@ -21,14 +142,70 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+# Logins, registrations and admin resets share one pool; bulk jobs get their own so
+# an import cannot queue thousands of hashes in front of interactive requests.
+password_hash_pool = PasswordHashPool(max_workers=PASSWORD_HASH_WORKERS, max_pending=PASSWORD_HASH_MAX_PENDING)
+bulk_password_hash_pool = PasswordHashPool(max_workers=PASSWORD_HASH_BULK_WORKERS, max_pending=sys.maxsize)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hash_pool.verify_async(plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_hash_pool.hash_async(password)
+
+
+def hash_password_offloaded(password: str) -> str:
+    """Blocking variant for sync endpoints; the calling thread waits without holding the GIL."""
+    return password_hash_pool.hash(password)
+
+
+def hash_passwords(passwords: Sequence[str]) -> list[str]:
+    """Hashes many passwords on the bulk pool, preserving order."""
+    return bulk_password_hash_pool.hash_many(passwords)
+
+
 def create_access_token(subject: str, extra: dict[str, Any] | None = None) -> str:
     now = dt.datetime.now(dt.timezone.utc)
     expire = now + dt.timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    payload: dict[str, Any] = {"sub": subject, "exp": expire}
+    payload: dict[str, Any] = {
+        "sub": subject,
+        "exp": expire,
+        # Fractional NumericDate (RFC 7519 allows it) so a login right after a revocation is not caught by it.
+        "iat": now.timestamp(),
+        "jti": str(uuid.uuid4()),
+        "typ": ACCESS_TOKEN_TYPE,
+    }
     if extra:
         payload.update(extra)
     return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
 
+def create_refresh_token(subject: str, family_id: str) -> str:
+    """Refresh tokens carry no role claims; ``fam`` ties every rotation of one login together."""
+    now = dt.datetime.now(dt.timezone.utc)
+    payload: dict[str, Any] = {
+        "sub": subject,
+        "exp": now + dt.timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+        "iat": now.timestamp(),
+        "jti": str(uuid.uuid4()),
+        "fam": family_id,
+        "typ": REFRESH_TOKEN_TYPE,
+    }
+    return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+
+
 def decode_access_token(token: str) -> dict[str, Any]:
-    return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    # Tokens issued before refresh tokens existed have no ``typ`` and are access tokens.
+    if payload.get("typ", ACCESS_TOKEN_TYPE) != ACCESS_TOKEN_TYPE:
+        raise JWTError("Not an access token")
+    return payload
+
+
+def decode_refresh_token(token: str) -> dict[str, Any]:
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    if payload.get("typ") != REFRESH_TOKEN_TYPE:
+        raise JWTError("Not a refresh token")
+    return payload
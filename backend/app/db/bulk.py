@@ -0,0 +1,25 @@
+from typing import BinaryIO, Iterable, Sequence
+
+from sqlalchemy.orm import Session
+
+
+def copy_rows(db: Session, table: str, columns: Sequence[str], rows: Iterable[Sequence]) -> None:
+    """Streams rows into ``table`` with COPY on the session's connection and transaction.
+
+    Enum columns take the member name, as SQLAlchemy stores them.
+    """
+    dbapi_connection = db.connection().connection.dbapi_connection
+    with dbapi_connection.cursor() as cursor:
+        with cursor.copy(f"COPY {table} ({', '.join(columns)}) FROM STDIN") as copy:
+            for row in rows:
+                copy.write_row(row)
+
+
+def copy_table_to(db: Session, table: str, stream: BinaryIO) -> int:
+    """Writes ``table`` as CSV with a header row to ``stream``; returns the number of rows."""
+    dbapi_connection = db.connection().connection.dbapi_connection
+    with dbapi_connection.cursor() as cursor:
+        with cursor.copy(f"COPY {table} TO STDOUT (FORMAT csv, HEADER)") as copy:
+            for data in copy:
+                stream.write(data)
+        return cursor.rowcount
@@ -0,0 +1,65 @@
+"""Commit hooks that keep process-local caches of rarely changing tables honest."""
+
+from itertools import chain
+from typing import Callable, Hashable
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session, sessionmaker
+
+from app.db.session import SessionLocal
+
+# Key reported for ORM bulk statements, whose rows are unknown: treat everything as changed.
+ANY_ROW = None
+
+
+def track_commits(
+    models: tuple[type, ...],
+    callback: Callable[[set[Hashable]], None],
+    *,
+    key: Callable[[object], Hashable],
+    session_factory: sessionmaker = SessionLocal,
+) -> None:
+    """Calls ``callback(keys)`` after each commit of a ``session_factory`` session that changed ``models``.
+
+    ``keys`` holds ``key(instance)`` of every flushed instance, taken at flush time while its
+    attributes are loaded, plus ``ANY_ROW`` for ORM-enabled bulk INSERT/UPDATE/DELETE. Core
+    statements against the bare tables and writes from other processes are not seen.
+    """
+    flag = ("changed", callback)
+    mappers = {model.__mapper__ for model in models}
+
+    def track_flush(session: Session, _flush_context) -> None:
+        keys = {
+            key(instance)
+            for instance in chain(session.new, session.dirty, session.deleted)
+            if isinstance(instance, models)
+        }
+        if keys:
+            session.info.setdefault(flag, set()).update(keys)
+
+    def track_statement(state: ORMExecuteState) -> None:
+        if (state.is_insert or state.is_update or state.is_delete) and state.bind_mapper in mappers:
+            state.session.info.setdefault(flag, set()).add(ANY_ROW)
+
+    def after_commit(session: Session) -> None:
+        keys = session.info.pop(flag, None)
+        if keys:
+            callback(keys)
+
+    def after_rollback(session: Session) -> None:
+        session.info.pop(flag, None)
+
+    event.listen(session_factory, "after_flush", track_flush)
+    event.listen(session_factory, "do_orm_execute", track_statement)
+    event.listen(session_factory, "after_commit", after_commit)
+    event.listen(session_factory, "after_rollback", after_rollback)
+
+
+def on_commit_of(
+    models: tuple[type, ...],
+    callback: Callable[[], None],
+    *,
+    session_factory: sessionmaker = SessionLocal,
+) -> None:
+    """Calls ``callback()`` after each commit of a ``session_factory`` session that changed ``models``."""
+    track_commits(models, lambda _keys: callback(), key=lambda _instance: ANY_ROW, session_factory=session_factory)
@@ -2,7 +2,7 @@ import datetime as dt
 import uuid
 
 import sqlalchemy as sa
-from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
 from .base import Base
@@ -338,6 +338,7 @@ class ClinicalNote(Base):
     __table_args__ = (
         sa.UniqueConstraint("encounter_id", name="uq_clinical_notes_encounter"),
     )
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, server_default=sa.text("gen_random_uuid()"))
     encounter_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), sa.ForeignKey("encounters.id", ondelete="CASCADE"), nullable=False)
@@ -347,6 +348,18 @@ class ClinicalNote(Base):
     version: Mapped[int] = mapped_column(sa.Integer, nullable=False, server_default="1")
     signed_at: Mapped[dt.datetime | None] = mapped_column(sa.DateTime(timezone=True))
     signed_by_user_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="SET NULL"))
+    current_version_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True),
+        sa.ForeignKey(
+            "note_versions.id",
+            ondelete="SET NULL",
+            use_alter=True,
+            deferrable=True,
+            initially="DEFERRED",
+            name="fk_clinical_notes_current_version",
+        ),
+    )
+    search_vector: Mapped[str | None] = mapped_column(TSVECTOR, deferred=True)
     created_at: Mapped[dt.datetime] = mapped_column(sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()"))
     updated_at: Mapped[dt.datetime] = mapped_column(sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()"))
 
@@ -356,11 +369,14 @@ class NoteVersion(Base):
     __table_args__ = (
         sa.UniqueConstraint("note_id", "version_number", name="uq_note_versions_note_version"),
     )
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, server_default=sa.text("gen_random_uuid()"))
     note_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), sa.ForeignKey("clinical_notes.id", ondelete="CASCADE"), nullable=False)
     version_number: Mapped[int] = mapped_column(sa.Integer, nullable=False)
     is_addendum: Mapped[bool] = mapped_column(sa.Boolean, nullable=False, server_default=sa.text("false"))
+    is_snapshot: Mapped[bool] = mapped_column(sa.Boolean, nullable=False, server_default=sa.text("true"))
+    delta: Mapped[dict | None] = mapped_column(JSONB)
     history_text: Mapped[str | None] = mapped_column(sa.Text)
     diagnosis_text: Mapped[str | None] = mapped_column(sa.Text)
     recommendations_text: Mapped[str | None] = mapped_column(sa.Text)
@@ -378,6 +394,7 @@ class Attachment(Base):
             name="ck_attachments_target",
         ),
     )
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, server_default=sa.text("gen_random_uuid()"))
     child_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), sa.ForeignKey("child_profiles.id", ondelete="CASCADE"))
@@ -445,6 +462,17 @@ class InvoiceItem(Base):
     amount: Mapped[sa.Numeric] = mapped_column(sa.Numeric(10, 2), nullable=False)
 
 
+class InvoiceNumberCounter(Base):
+    __tablename__ = "invoice_number_counters"
+    __table_args__ = (
+        sa.CheckConstraint("last_value >= 0", name="ck_invoice_number_counters_last_value"),
+    )
+
+    series: Mapped[str] = mapped_column(sa.String(32), primary_key=True)
+    last_value: Mapped[int] = mapped_column(sa.Integer, nullable=False)
+
+
+# Range-partitioned by month on created_at, primary key (id, created_at); see app.db.partitions.
 class Notification(Base):
     __tablename__ = "notifications"
 
@@ -457,10 +485,12 @@ class Notification(Base):
     payload: Mapped[dict | None] = mapped_column(JSONB)
     scheduled_at: Mapped[dt.datetime | None] = mapped_column(sa.DateTime(timezone=True))
     sent_at: Mapped[dt.datetime | None] = mapped_column(sa.DateTime(timezone=True))
+    attempts: Mapped[int] = mapped_column(sa.Integer, nullable=False, server_default="0")
     error: Mapped[str | None] = mapped_column(sa.Text)
     created_at: Mapped[dt.datetime] = mapped_column(sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()"))
 
 
+# Range-partitioned by month on created_at, primary key (id, created_at); see app.db.partitions.
 class AuditLog(Base):
     __tablename__ = "audit_logs"
 
@@ -473,3 +503,11 @@ class AuditLog(Base):
     user_agent: Mapped[str | None] = mapped_column(sa.String(255))
     meta: Mapped[dict | None] = mapped_column("metadata", JSONB)
     created_at: Mapped[dt.datetime] = mapped_column(sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()"))
+
+
+class TokenRevocation(Base):
+    __tablename__ = "token_revocations"
+
+    key: Mapped[str] = mapped_column(sa.String(80), primary_key=True)
+    revoked_at: Mapped[dt.datetime] = mapped_column(sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()"))
+    expires_at: Mapped[dt.datetime] = mapped_column(sa.DateTime(timezone=True), nullable=False)
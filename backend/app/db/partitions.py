@@ -0,0 +1,255 @@
+"""Monthly range partitions of the append-only tables on ``created_at``.
+
+    python -m app.db.partitions             # create the partitions for the coming months
+    python -m app.db.partitions --archive   # also export and drop partitions past retention
+
+Run it daily from cron; the API also creates upcoming partitions at startup. Rows that miss
+every monthly partition land in ``<table>_default`` instead of failing the insert; the next
+run creates their months and moves them out, so they are archived with everything else.
+"""
+
+import argparse
+import datetime as dt
+import gzip
+import logging
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.db.bulk import copy_table_to
+from app.utils.storage import ROOT_DIR
+
+logger = logging.getLogger(__name__)
+
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+PARTITION_ARCHIVE_DIR = Path(os.getenv("PARTITION_ARCHIVE_DIR", str(ROOT_DIR / "storage" / "archive")))
+# table -> months of partitions kept online
+PARTITION_RETENTION_MONTHS = {
+    "audit_logs": int(os.getenv("AUDIT_LOG_RETENTION_MONTHS", "60")),
+    "notifications": int(os.getenv("NOTIFICATION_RETENTION_MONTHS", "12")),
+}
+
+
+@dataclass(frozen=True)
+class MonthPartition:
+    table: str
+    name: str
+    start: dt.date
+    end: dt.date
+
+
+def month_start(day: dt.date) -> dt.date:
+    return day.replace(day=1)
+
+
+def add_months(day: dt.date, months: int) -> dt.date:
+    index = day.year * 12 + day.month - 1 + months
+    return dt.date(index // 12, index % 12 + 1, 1)
+
+
+def month_partition_name(table: str, month: dt.date) -> str:
+    return f"{table}_y{month.year}m{month.month:02d}"
+
+
+def month_partition_ddl(table: str, month: dt.date, *, parent: str | None = None) -> str:
+    """DDL for the partition holding ``month``; ``parent`` overrides the table it attaches to."""
+    start, end = month_start(month), add_months(month, 1)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {month_partition_name(table, start)} PARTITION OF {parent or table} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+
+
+def default_partition_ddl(table: str, *, parent: str | None = None) -> str:
+    return f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {parent or table} DEFAULT"
+
+
+def is_partitioned(db: Session, table: str) -> bool:
+    return db.execute(
+        text(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+            "WHERE c.relname = :table AND c.relnamespace = current_schema()::regnamespace)"
+        ),
+        {"table": table},
+    ).scalar_one()
+
+
+def list_month_partitions(db: Session, table: str) -> list[MonthPartition]:
+    names = db.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits i "
+            "JOIN pg_class parent ON parent.oid = i.inhparent "
+            "JOIN pg_class child ON child.oid = i.inhrelid "
+            "WHERE parent.relname = :table AND parent.relnamespace = current_schema()::regnamespace"
+        ),
+        {"table": table},
+    ).scalars()
+    pattern = re.compile(rf"^{re.escape(table)}_y(\d{{4}})m(\d{{2}})$")
+    partitions = []
+    for name in names:
+        match = pattern.match(name)
+        if match:
+            start = dt.date(int(match[1]), int(match[2]), 1)
+            partitions.append(MonthPartition(table, name, start, add_months(start, 1)))
+    return sorted(partitions, key=lambda partition: partition.start)
+
+
+def default_partition_months(db: Session, table: str) -> list[dt.date]:
+    """Months with rows stranded in ``<table>_default`` (their partition did not exist in time)."""
+    if db.execute(text("SELECT to_regclass(:name)"), {"name": f"{table}_default"}).scalar() is None:
+        return []
+    return list(
+        db.execute(
+            text(f"SELECT DISTINCT date_trunc('month', created_at)::date FROM {table}_default ORDER BY 1")
+        ).scalars()
+    )
+
+
+def create_month_partition(db: Session, table: str, month: dt.date, *, move_default_rows: bool) -> int:
+    """Creates the partition for ``month``, first moving its rows out of the default partition.
+
+    Postgres refuses to create a partition whose rows sit in the default partition, so the
+    default is detached for the move and attached again; inserts wait on the parent's lock
+    meanwhile. Returns how many rows were moved; the caller commits.
+    """
+    if not move_default_rows:
+        db.execute(text(month_partition_ddl(table, month)))
+        return 0
+    default = f"{table}_default"
+    bounds = {"start": month_start(month), "end": add_months(month_start(month), 1)}
+    db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {default}"))
+    db.execute(text(month_partition_ddl(table, month)))
+    moved = db.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {default} WHERE created_at >= :start AND created_at < :end RETURNING *) "
+            f"INSERT INTO {table} SELECT * FROM moved"
+        ),
+        bounds,
+    ).rowcount
+    db.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT"))
+    return moved
+
+
+def ensure_partitions(
+    db: Session, table: str, *, today: dt.date | None = None, months_ahead: int = PARTITION_MONTHS_AHEAD
+) -> list[str]:
+    """Creates the partitions from this month through ``months_ahead``, plus any month stranded in
+    the default partition; no-op on unpartitioned tables.
+
+    Each month commits on its own, so one failure does not hold back the others; failures are
+    raised together once every month has been tried.
+    """
+    if not is_partitioned(db, table):
+        return []
+    existing = {partition.name for partition in list_month_partitions(db, table)}
+    current = month_start(today or dt.date.today())
+    stranded = set(default_partition_months(db, table))
+    db.commit()
+    months = sorted(stranded | {add_months(current, offset) for offset in range(months_ahead + 1)})
+    created, failed = [], []
+    for month in months:
+        name = month_partition_name(table, month)
+        if name in existing:
+            continue
+        try:
+            moved = create_month_partition(db, table, month, move_default_rows=month in stranded)
+            db.commit()
+        except SQLAlchemyError:
+            db.rollback()
+            logger.exception("Failed to create partition %s", name)
+            failed.append(name)
+            continue
+        if moved:
+            logger.warning("Moved %s rows of %s out of %s_default", moved, name, table)
+        created.append(name)
+    if failed:
+        raise RuntimeError(f"Could not create partitions {', '.join(failed)}; their rows stay in {table}_default")
+    return created
+
+
+def ensure_all_partitions(session_factory: Callable[[], Session]) -> None:
+    for table in PARTITION_RETENTION_MONTHS:
+        db = session_factory()
+        try:
+            created = ensure_partitions(db, table)
+            if created:
+                logger.info("Created partitions %s", ", ".join(created))
+        except Exception:  # noqa: BLE001
+            db.rollback()
+            logger.exception("Failed to create partitions of %s", table)
+        finally:
+            db.close()
+
+
+def archive_partitions(
+    db: Session,
+    table: str,
+    *,
+    retention_months: int,
+    archive_dir: Path = PARTITION_ARCHIVE_DIR,
+    today: dt.date | None = None,
+) -> list[Path]:
+    """Exports partitions that ended more than ``retention_months`` ago to gzip CSV, then drops them.
+
+    The export runs while the partition is still attached (nothing writes to past months), so
+    the parent is locked only for the short DETACH + DROP. A failed run leaves the partition
+    in place and can simply be repeated.
+    """
+    cutoff = add_months(month_start(today or dt.date.today()), -retention_months)
+    archived = []
+    for partition in list_month_partitions(db, table):
+        if partition.end > cutoff:
+            continue
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        target = archive_dir / f"{partition.name}.csv.gz"
+        partial = target.with_suffix(".gz.partial")
+        with gzip.open(partial, "wb") as archive:
+            rows = copy_table_to(db, partition.name, archive)
+        db.rollback()
+        partial.replace(target)
+        db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {partition.name}"))
+        db.execute(text(f"DROP TABLE {partition.name}"))
+        db.commit()
+        logger.info("Archived %s rows of %s to %s", rows, partition.name, target)
+        archived.append(target)
+    return archived
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Maintain monthly partitions of audit_logs and notifications.")
+    parser.add_argument("--archive", action="store_true", help="Export and drop partitions past retention.")
+    parser.add_argument("--archive-dir", type=Path, default=PARTITION_ARCHIVE_DIR)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    failed = False
+    try:
+        for table, retention_months in PARTITION_RETENTION_MONTHS.items():
+            try:
+                created = ensure_partitions(db, table)
+                print(f"{table}: created {', '.join(created) or 'no'} partitions")
+            except RuntimeError as exc:
+                print(f"{table}: {exc}")
+                failed = True
+            if args.archive:
+                for path in archive_partitions(
+                    db, table, retention_months=retention_months, archive_dir=args.archive_dir
+                ):
+                    print(f"{table}: archived to {path}")
+    finally:
+        db.close()
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,821 @@
+"""Deterministic synthetic clinic data for load and scale testing.
+
+    python -m app.db.seed_synthetic --size medium --seed 7
+
+Rows are generated in batches of families and streamed in with COPY. The same size,
+seed and end date always produce the same rows and ids; only record numbers come from
+the database sequence. Every synthetic account logs in with ``SYNTHETIC_PASSWORD``.
+"""
+
+import argparse
+import datetime as dt
+import json
+import os
+import random
+import time
+import uuid
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Callable, Iterator
+from zoneinfo import ZoneInfo
+
+import sqlalchemy as sa
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import Session
+
+from app.core.security import get_password_hash
+from app.services.note_version_service import (
+    NOTE_SEARCH_WEIGHTS,
+    NOTE_TEXT_FIELDS,
+    note_search_config,
+    version_delta,
+)
+from app.utils.storage import ROOT_DIR
+
+from .bulk import copy_rows
+from .enums import (
+    AppointmentSource,
+    AppointmentStatus,
+    ConsentType,
+    ContactChannel,
+    EncounterStatus,
+    Gender,
+    InvoiceStatus,
+    NoteStatus,
+    ServiceType,
+    UserRole,
+)
+from .models import (
+    Appointment,
+    Attachment,
+    ChildProfile,
+    ClinicalNote,
+    Encounter,
+    Invoice,
+    PatientProfile,
+    Prescription,
+    Service,
+    User,
+)
+from .seed_services import seed_services
+from .session import SessionLocal
+
+SYNTHETIC_PASSWORD = os.getenv("SYNTHETIC_PASSWORD", "demo123")
+CLINIC_TIMEZONE = ZoneInfo("Europe/Warsaw")
+DAY_START_HOUR = 8
+# Hour-long slots from 08:00; services last at most 50 minutes, so slots never overlap.
+SLOTS_PER_DAY = 8
+FUTURE_DAYS = 30
+FAMILIES_PER_BATCH = 1000
+# PESEL serials per birth date and sex are split into 50 blocks by seed, so datasets
+# whose seeds differ modulo 50 can share a database.
+PESEL_SEED_BLOCKS = 50
+PESEL_BLOCK_SIZE = 100
+NOTE_TEXTS_TABLE = "synthetic_note_texts"
+
+
+@dataclass(frozen=True)
+class SyntheticSize:
+    doctors: int
+    families: int
+    years: int
+    visits_per_child_year: tuple[int, int] = (1, 4)
+
+
+SIZE_PRESETS = {
+    "small": SyntheticSize(doctors=4, families=300, years=1),
+    "medium": SyntheticSize(doctors=40, families=15_000, years=2),
+    "large": SyntheticSize(doctors=300, families=200_000, years=3),
+}
+
+USER_COLUMNS = ("id", "email", "hashed_password", "role", "is_active", "is_verified", "phone")
+DOCTOR_COLUMNS = ("id", "user_id", "specialization", "license_number", "buffer_minutes", "timezone")
+SCHEDULE_COLUMNS = ("doctor_id", "day_of_week", "start_time", "end_time", "timezone")
+GUARDIAN_COLUMNS = (
+    "id",
+    "user_id",
+    "full_name",
+    "email",
+    "phone",
+    "address_line",
+    "city",
+    "postal_code",
+    "preferred_contact_channel",
+)
+GUARDIAN_CONTACT_COLUMNS = ("guardian_id", "channel", "value", "is_primary", "is_verified")
+CHILD_COLUMNS = ("id", "guardian_id", "first_name", "last_name", "date_of_birth", "gender", "pesel", "mrn_number")
+CHILD_CONTACT_COLUMNS = ("child_id", "address_line", "city", "postal_code", "school_name", "class_name")
+CONSENT_COLUMNS = ("guardian_id", "child_id", "consent_type")
+EMERGENCY_CONTACT_COLUMNS = ("child_id", "full_name", "relation", "phone")
+APPOINTMENT_COLUMNS = (
+    "id",
+    "doctor_id",
+    "service_id",
+    "guardian_id",
+    "child_id",
+    "status",
+    "source",
+    "start_at",
+    "end_at",
+    "price_amount",
+    "created_at",
+    "cancelled_at",
+    "cancellation_reason",
+)
+ENCOUNTER_COLUMNS = (
+    "id",
+    "appointment_id",
+    "doctor_id",
+    "guardian_id",
+    "child_id",
+    "status",
+    "started_at",
+    "ended_at",
+    "created_at",
+)
+CLINICAL_NOTE_COLUMNS = (
+    "id",
+    "encounter_id",
+    "author_user_id",
+    "status",
+    "is_visible_to_guardian",
+    "version",
+    "signed_at",
+    "signed_by_user_id",
+    "current_version_id",
+    "created_at",
+    "updated_at",
+)
+NOTE_VERSION_COLUMNS = (
+    "id",
+    "note_id",
+    "version_number",
+    "is_addendum",
+    "is_snapshot",
+    "delta",
+    *NOTE_TEXT_FIELDS,
+    "created_by_user_id",
+    "created_at",
+)
+PRESCRIPTION_COLUMNS = ("id", "appointment_id", "doctor_id", "child_id", "code", "issued_at", "expires_at")
+PRESCRIPTION_ITEM_COLUMNS = ("prescription_id", "medication_name", "dosage", "instructions", "quantity")
+ATTACHMENT_COLUMNS = (
+    "id",
+    "child_id",
+    "encounter_id",
+    "uploaded_by_user_id",
+    "file_name",
+    "mime_type",
+    "size_bytes",
+    "storage_key",
+    "created_at",
+)
+INVOICE_COLUMNS = (
+    "id",
+    "appointment_id",
+    "guardian_id",
+    "number",
+    "status",
+    "issued_at",
+    "due_at",
+    "paid_at",
+    "total_amount",
+)
+INVOICE_ITEM_COLUMNS = ("invoice_id", "service_id", "description", "quantity", "unit_price", "amount")
+
+# Foreign key order; clinical_notes.current_version_id is checked at commit.
+COPY_ORDER = (
+    ("users", USER_COLUMNS),
+    ("doctors", DOCTOR_COLUMNS),
+    ("schedules", SCHEDULE_COLUMNS),
+    ("patient_profiles", GUARDIAN_COLUMNS),
+    ("guardian_contacts", GUARDIAN_CONTACT_COLUMNS),
+    ("child_profiles", CHILD_COLUMNS),
+    ("child_contacts", CHILD_CONTACT_COLUMNS),
+    ("consents", CONSENT_COLUMNS),
+    ("emergency_contacts", EMERGENCY_CONTACT_COLUMNS),
+    ("appointments", APPOINTMENT_COLUMNS),
+    ("encounters", ENCOUNTER_COLUMNS),
+    ("clinical_notes", CLINICAL_NOTE_COLUMNS),
+    ("note_versions", NOTE_VERSION_COLUMNS),
+    ("prescriptions", PRESCRIPTION_COLUMNS),
+    ("prescription_items", PRESCRIPTION_ITEM_COLUMNS),
+    ("attachments", ATTACHMENT_COLUMNS),
+    ("invoices", INVOICE_COLUMNS),
+    ("invoice_items", INVOICE_ITEM_COLUMNS),
+)
+
+GUARDIAN_FIRST_NAMES = ("Anna", "Katarzyna", "Magdalena", "Agnieszka", "Piotr", "Tomasz", "Pawel", "Marcin", "Ewa", "Michal")
+CHILD_FIRST_NAMES = ("Ola", "Zuzia", "Hania", "Lena", "Maja", "Kuba", "Antek", "Szymon", "Filip", "Janek", "Zosia", "Stas")
+LAST_NAMES = ("Nowak", "Kowalski", "Wisniewski", "Wojcik", "Kaminski", "Lewandowski", "Zielinski", "Szymanski", "Dabrowski", "Mazur")
+CITIES = (("Gdansk", "80-001"), ("Gdynia", "81-301"), ("Sopot", "81-701"), ("Pruszcz Gdanski", "83-000"), ("Rumia", "84-230"))
+STREETS = ("Dluga", "Grunwaldzka", "Morska", "Slowackiego", "Kartuska", "Lipowa", "Polna", "Szkolna")
+SPECIALIZATIONS = ("Psychiatria dzieci i mlodziezy", "Psychologia kliniczna", "Neurologopedia", "Psychoterapia", "Seksuologia")
+RELATIONS = ("Babcia", "Dziadek", "Ciocia", "Wujek")
+CANCELLATION_REASONS = ("Choroba dziecka", "Wyjazd", "Zmiana terminu", "Brak mozliwosci dojazdu")
+MEDICATIONS = (("Sertralina", "25 mg rano"), ("Melatonina", "1 mg wieczorem"), ("Hydroksyzyna", "10 mg doraznie"))
+NOTE_PHRASES = {
+    "history_text": (
+        "Opiekun zglasza trudnosci z zasypianiem.",
+        "Dziecko zle znosi zmiany w planie dnia.",
+        "W szkole pojawiaja sie konflikty z rowiesnikami.",
+        "Od kilku tygodni obnizony nastroj i wycofanie.",
+        "Napady zlosci glownie w godzinach popoludniowych.",
+    ),
+    "diagnosis_text": (
+        "Zaburzenia lekowe.",
+        "Epizod depresyjny lagodny.",
+        "Zaburzenia adaptacyjne.",
+        "ADHD, typ mieszany.",
+        "Zaburzenia snu.",
+    ),
+    "recommendations_text": (
+        "Kontrola za 4 tygodnie.",
+        "Dziennik snu prowadzony przez opiekuna.",
+        "Konsultacja z pedagogiem szkolnym.",
+        "Ograniczenie ekranow wieczorem.",
+    ),
+    "therapy_plan_text": (
+        "Psychoterapia indywidualna raz w tygodniu.",
+        "Trening umiejetnosci spolecznych.",
+        "Psychoedukacja opiekunow.",
+        "Techniki relaksacyjne.",
+    ),
+    "guardian_summary_text": (
+        "Prosimy o obserwacje snu i nastroju.",
+        "Zalecenia przekazane opiekunowi.",
+        "Kolejna wizyta zgodnie z planem.",
+    ),
+}
+
+_PESEL_WEIGHTS = (1, 3, 7, 9, 1, 3, 7, 9, 1, 3)
+_PLACEHOLDER_PDF = b"%PDF-1.4\n% synthetic attachment\n"
+
+
+def synthetic_email(seed: int, local_part: str) -> str:
+    return f"synthetic.{seed}.{local_part}@example.test"
+
+
+@dataclass
+class SyntheticBatch:
+    rows: dict[str, list] = field(default_factory=lambda: defaultdict(list))
+    note_texts: list[tuple] = field(default_factory=list)
+    files: list[tuple[str, int]] = field(default_factory=list)
+
+
+@dataclass
+class _DoctorRef:
+    doctor_id: uuid.UUID
+    user_id: uuid.UUID
+    slots: bytearray
+
+
+class SyntheticClinic:
+    """Generates the rows of a synthetic clinic without touching the database.
+
+    ``services`` are (id, name, duration in minutes, price) of the individual services
+    visits are booked for. Each doctor has a grid of weekday slots; a visit takes the
+    first free slot at or after a random one, so active appointments never overlap.
+    """
+
+    def __init__(
+        self,
+        size: SyntheticSize,
+        *,
+        seed: int,
+        end_date: dt.date,
+        services: list[tuple[uuid.UUID, str, int, Decimal]],
+        password_hash: str,
+    ) -> None:
+        self.size = size
+        self.seed = seed
+        self.end_date = end_date
+        self.services = services
+        self.password_hash = password_hash
+        self.rng = random.Random(seed)
+        self.now = dt.datetime.combine(end_date, dt.time(), CLINIC_TIMEZONE)
+        first_day = end_date - dt.timedelta(days=365 * size.years)
+        self.days = [
+            day
+            for day in (first_day + dt.timedelta(days=offset) for offset in range(365 * size.years + FUTURE_DAYS))
+            if day.weekday() < 5
+        ]
+        self._doctors: list[_DoctorRef] = []
+        self._pesel_serials: Counter[tuple[dt.date, Gender]] = Counter()
+        self._pesel_base = (seed % PESEL_SEED_BLOCKS) * PESEL_BLOCK_SIZE
+        self._invoice_serial = 0
+        self._prescription_serial = 0
+
+    def batches(self, families_per_batch: int = FAMILIES_PER_BATCH) -> Iterator[SyntheticBatch]:
+        batch = SyntheticBatch()
+        self._add_staff(batch)
+        for index in range(self.size.families):
+            self._add_family(batch, index)
+            if (index + 1) % families_per_batch == 0:
+                yield batch
+                batch = SyntheticBatch()
+        if batch.rows:
+            yield batch
+
+    def _uuid(self) -> uuid.UUID:
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def _phone(self) -> str:
+        return f"5{self.rng.randrange(10**8):08d}"
+
+    def _add_user(
+        self,
+        batch: SyntheticBatch,
+        local_part: str,
+        role: UserRole,
+        phone: str | None = None,
+    ) -> tuple[uuid.UUID, str]:
+        user_id = self._uuid()
+        email = synthetic_email(self.seed, local_part)
+        batch.rows["users"].append((user_id, email, self.password_hash, role.name, True, True, phone))
+        return user_id, email
+
+    def _add_staff(self, batch: SyntheticBatch) -> None:
+        self._add_user(batch, "admin", UserRole.ADMIN)
+        for index in range(self.size.doctors):
+            user_id, _ = self._add_user(batch, f"doctor{index}", UserRole.DOCTOR, self._phone())
+            doctor = _DoctorRef(
+                doctor_id=self._uuid(),
+                user_id=user_id,
+                slots=bytearray(len(self.days) * SLOTS_PER_DAY),
+            )
+            self._doctors.append(doctor)
+            batch.rows["doctors"].append(
+                (
+                    doctor.doctor_id,
+                    user_id,
+                    self.rng.choice(SPECIALIZATIONS),
+                    str(self.rng.randrange(10**6, 10**7)),
+                    0,
+                    str(CLINIC_TIMEZONE),
+                )
+            )
+            for day_of_week in range(5):
+                batch.rows["schedules"].append(
+                    (
+                        doctor.doctor_id,
+                        day_of_week,
+                        dt.time(DAY_START_HOUR),
+                        dt.time(DAY_START_HOUR + SLOTS_PER_DAY),
+                        str(CLINIC_TIMEZONE),
+                    )
+                )
+
+    def _add_family(self, batch: SyntheticBatch, index: int) -> None:
+        rng = self.rng
+        guardian_id = self._uuid()
+        last_name = rng.choice(LAST_NAMES)
+        phone = self._phone() if rng.random() < 0.6 else None
+        user_id, email = self._add_user(batch, f"guardian{index}", UserRole.GUARDIAN, phone)
+        city, postal_code = rng.choice(CITIES)
+        address_line = f"ul. {rng.choice(STREETS)} {rng.randint(1, 120)}"
+        channel = ContactChannel.PHONE if phone and rng.random() < 0.3 else ContactChannel.EMAIL
+        batch.rows["patient_profiles"].append(
+            (
+                guardian_id,
+                user_id,
+                f"{rng.choice(GUARDIAN_FIRST_NAMES)} {last_name}",
+                email,
+                phone,
+                address_line,
+                city,
+                postal_code,
+                channel.name,
+            )
+        )
+        batch.rows["guardian_contacts"].append((guardian_id, ContactChannel.EMAIL.name, email, True, True))
+        if phone:
+            batch.rows["guardian_contacts"].append((guardian_id, ContactChannel.PHONE.name, phone, False, False))
+
+        children = rng.choices((1, 2, 3), weights=(70, 22, 8))[0]
+        for _ in range(children):
+            child_id = self._uuid()
+            date_of_birth = self.end_date - dt.timedelta(days=rng.randint(3 * 365, 17 * 365))
+            gender = rng.choice((Gender.FEMALE, Gender.MALE))
+            batch.rows["child_profiles"].append(
+                [
+                    child_id,
+                    guardian_id,
+                    rng.choice(CHILD_FIRST_NAMES),
+                    last_name,
+                    date_of_birth,
+                    gender.name,
+                    self._pesel(date_of_birth, gender),
+                    None,
+                ]
+            )
+            if rng.random() < 0.7:
+                batch.rows["child_contacts"].append(
+                    (
+                        child_id,
+                        address_line,
+                        city,
+                        postal_code,
+                        f"SP nr {rng.randint(1, 90)}",
+                        f"{rng.randint(1, 8)}{rng.choice('ABC')}",
+                    )
+                )
+            for consent_type in (ConsentType.RODO, ConsentType.GUARDIAN):
+                batch.rows["consents"].append((guardian_id, child_id, consent_type.name))
+            if rng.random() < 0.3:
+                batch.rows["emergency_contacts"].append(
+                    (child_id, f"{rng.choice(GUARDIAN_FIRST_NAMES)} {last_name}", rng.choice(RELATIONS), self._phone())
+                )
+
+            doctor = rng.choice(self._doctors)
+            visits = sum(rng.randint(*self.size.visits_per_child_year) for _ in range(self.size.years))
+            for _ in range(visits):
+                self._add_visit(batch, doctor, guardian_id, child_id)
+
+    def _pesel(self, date_of_birth: dt.date, gender: Gender) -> str:
+        serial = (self._pesel_base + self._pesel_serials[(date_of_birth, gender)]) % 5000
+        self._pesel_serials[(date_of_birth, gender)] += 1
+        month = date_of_birth.month + (20 if date_of_birth.year >= 2000 else 0)
+        # The tenth digit is odd for men; serials past 999 carry into it.
+        sex_digit = 2 * (serial // 1000) + (gender == Gender.MALE)
+        digits = f"{date_of_birth.year % 100:02d}{month:02d}{date_of_birth.day:02d}{serial % 1000:03d}{sex_digit}"
+        checksum = (10 - sum(weight * int(digit) for weight, digit in zip(_PESEL_WEIGHTS, digits)) % 10) % 10
+        return f"{digits}{checksum}"
+
+    def _book(self, doctor: _DoctorRef) -> dt.datetime | None:
+        index = doctor.slots.find(0, self.rng.randrange(len(doctor.slots)))
+        if index < 0:
+            index = doctor.slots.find(0)
+            if index < 0:
+                return None
+        doctor.slots[index] = 1
+        day = self.days[index // SLOTS_PER_DAY]
+        return dt.datetime.combine(day, dt.time(DAY_START_HOUR + index % SLOTS_PER_DAY), CLINIC_TIMEZONE)
+
+    def _add_visit(self, batch: SyntheticBatch, doctor: _DoctorRef, guardian_id: uuid.UUID, child_id: uuid.UUID) -> None:
+        rng = self.rng
+        start_at = self._book(doctor)
+        if start_at is None:
+            return
+        service_id, service_name, duration, price = rng.choice(self.services)
+        end_at = start_at + dt.timedelta(minutes=duration)
+        if start_at >= self.now:
+            status = AppointmentStatus.CONFIRMED if rng.random() < 0.7 else AppointmentStatus.REQUESTED
+        else:
+            status = rng.choices(
+                (AppointmentStatus.COMPLETED, AppointmentStatus.CANCELLED, AppointmentStatus.NO_SHOW),
+                weights=(80, 12, 8),
+            )[0]
+        cancelled_at, cancellation_reason = None, None
+        if status == AppointmentStatus.CANCELLED:
+            cancelled_at = start_at - dt.timedelta(days=rng.randint(1, 5))
+            cancellation_reason = rng.choice(CANCELLATION_REASONS)
+        appointment_id = self._uuid()
+        batch.rows["appointments"].append(
+            (
+                appointment_id,
+                doctor.doctor_id,
+                service_id,
+                guardian_id,
+                child_id,
+                status.name,
+                rng.choice((AppointmentSource.ONLINE, AppointmentSource.STAFF)).name,
+                start_at,
+                end_at,
+                price,
+                min(start_at - dt.timedelta(days=rng.randint(7, 30)), self.now),
+                cancelled_at,
+                cancellation_reason,
+            )
+        )
+        if status != AppointmentStatus.COMPLETED:
+            return
+
+        encounter_id = self._uuid()
+        batch.rows["encounters"].append(
+            (
+                encounter_id,
+                appointment_id,
+                doctor.doctor_id,
+                guardian_id,
+                child_id,
+                EncounterStatus.CLOSED.name,
+                start_at,
+                end_at,
+                start_at,
+            )
+        )
+        if rng.random() < 0.9:
+            self._add_note(batch, doctor, encounter_id, end_at)
+        if rng.random() < 0.15:
+            self._add_prescription(batch, doctor, appointment_id, child_id, end_at)
+        if rng.random() < 0.1:
+            self._add_attachment(batch, doctor, encounter_id, child_id, end_at)
+        self._add_invoice(batch, appointment_id, guardian_id, service_id, service_name, price, end_at)
+
+    def _add_note(self, batch: SyntheticBatch, doctor: _DoctorRef, encounter_id: uuid.UUID, written_at: dt.datetime) -> None:
+        rng = self.rng
+        note_id = self._uuid()
+        texts = {
+            field: " ".join(rng.sample(NOTE_PHRASES[field], rng.randint(1, 2)))
+            for field in NOTE_TEXT_FIELDS
+        }
+        versions = rng.randint(1, 5)
+        previous: dict[str, str | None] | None = None
+        chain_length = 0
+        version_id = None
+        for number in range(1, versions + 1):
+            if previous is not None:
+                texts = dict(texts)
+                edited = rng.choice(NOTE_TEXT_FIELDS)
+                texts[edited] = f"{texts[edited]} {rng.choice(NOTE_PHRASES[edited])}"
+            delta = version_delta(previous, chain_length, texts) if previous is not None else None
+            chain_length = 1 if delta is None else chain_length + 1
+            version_id = self._uuid()
+            batch.rows["note_versions"].append(
+                (
+                    version_id,
+                    note_id,
+                    number,
+                    False,
+                    delta is None,
+                    json.dumps(delta, ensure_ascii=False) if delta is not None else None,
+                    *(texts[field] if delta is None else None for field in NOTE_TEXT_FIELDS),
+                    doctor.user_id,
+                    written_at,
+                )
+            )
+            previous = texts
+            written_at += dt.timedelta(minutes=rng.randint(2, 90))
+        batch.rows["clinical_notes"].append(
+            (
+                note_id,
+                encounter_id,
+                doctor.user_id,
+                NoteStatus.SIGNED.name,
+                rng.random() < 0.5,
+                versions,
+                written_at,
+                doctor.user_id,
+                version_id,
+                written_at,
+                written_at,
+            )
+        )
+        batch.note_texts.append((note_id, *(texts[field] for field in NOTE_TEXT_FIELDS)))
+
+    def _add_prescription(
+        self,
+        batch: SyntheticBatch,
+        doctor: _DoctorRef,
+        appointment_id: uuid.UUID,
+        child_id: uuid.UUID,
+        issued_at: dt.datetime,
+    ) -> None:
+        self._prescription_serial += 1
+        prescription_id = self._uuid()
+        batch.rows["prescriptions"].append(
+            (
+                prescription_id,
+                appointment_id,
+                doctor.doctor_id,
+                child_id,
+                f"RX/SYN/{self.seed}/{self._prescription_serial:08d}",
+                issued_at,
+                issued_at + dt.timedelta(days=30),
+            )
+        )
+        for medication, dosage in self.rng.sample(MEDICATIONS, self.rng.randint(1, 2)):
+            batch.rows["prescription_items"].append((prescription_id, medication, dosage, "Zgodnie z zaleceniem", "1 op."))
+
+    def _add_attachment(
+        self,
+        batch: SyntheticBatch,
+        doctor: _DoctorRef,
+        encounter_id: uuid.UUID,
+        child_id: uuid.UUID,
+        uploaded_at: dt.datetime,
+    ) -> None:
+        attachment_id = self._uuid()
+        size_bytes = self.rng.randint(2_048, 32_768)
+        storage_key = f"storage/attachments/synthetic/{attachment_id}.pdf"
+        batch.rows["attachments"].append(
+            (
+                attachment_id,
+                child_id,
+                encounter_id,
+                doctor.user_id,
+                "wynik_badania.pdf",
+                "application/pdf",
+                size_bytes,
+                storage_key,
+                uploaded_at,
+            )
+        )
+        batch.files.append((storage_key, size_bytes))
+
+    def _add_invoice(
+        self,
+        batch: SyntheticBatch,
+        appointment_id: uuid.UUID,
+        guardian_id: uuid.UUID,
+        service_id: uuid.UUID,
+        service_name: str,
+        price: Decimal,
+        issued_at: dt.datetime,
+    ) -> None:
+        self._invoice_serial += 1
+        invoice_id = self._uuid()
+        paid_at = issued_at + dt.timedelta(days=self.rng.randint(0, 10))
+        paid = paid_at < self.now and self.rng.random() < 0.85
+        batch.rows["invoices"].append(
+            (
+                invoice_id,
+                appointment_id,
+                guardian_id,
+                f"FV/SYN/{self.seed}/{self._invoice_serial:08d}",
+                (InvoiceStatus.PAID if paid else InvoiceStatus.UNPAID).name,
+                issued_at,
+                issued_at + dt.timedelta(days=14),
+                paid_at if paid else None,
+                price,
+            )
+        )
+        batch.rows["invoice_items"].append((invoice_id, service_id, service_name, 1, price, price))
+
+
+def _search_vector_update() -> sa.Update:
+    """Sets ``search_vector`` for the notes staged in NOTE_TEXTS_TABLE, weighted like the app does."""
+    texts = sa.table(NOTE_TEXTS_TABLE, sa.column("note_id"), *(sa.column(field, sa.Text) for field in NOTE_TEXT_FIELDS))
+    vector = None
+    for field in NOTE_TEXT_FIELDS:
+        part = func.setweight(
+            func.to_tsvector(note_search_config(), func.coalesce(texts.c[field], "")),
+            sa.literal_column(f"'{NOTE_SEARCH_WEIGHTS[field]}'"),
+        )
+        vector = part if vector is None else vector.op("||", return_type=TSVECTOR)(part)
+    notes = ClinicalNote.__table__
+    return sa.update(notes).where(notes.c.id == texts.c.note_id).values(search_vector=vector)
+
+
+def _assign_record_numbers(db: Session, children: list[list]) -> None:
+    numbers = db.execute(
+        select(func.nextval(text("'mrn_number_seq'"))).select_from(func.generate_series(1, len(children)))
+    ).scalars().all()
+    for child, number in zip(children, numbers):
+        child[-1] = number
+
+
+def _write_attachment_files(files: list[tuple[str, int]]) -> None:
+    for storage_key, size_bytes in files:
+        path = ROOT_DIR / storage_key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(_PLACEHOLDER_PDF.ljust(size_bytes, b"\n"))
+
+
+def load_synthetic_clinic(
+    db: Session,
+    size: SyntheticSize,
+    *,
+    seed: int = 0,
+    end_date: dt.date | None = None,
+    attachment_files: bool = False,
+    families_per_batch: int = FAMILIES_PER_BATCH,
+    progress: Callable[[Counter[str]], None] | None = None,
+) -> Counter[str]:
+    """Loads a synthetic clinic, committing per batch; returns row counts per table.
+
+    ``attachment_files`` also writes placeholder files so attachment downloads work.
+    """
+    if db.execute(select(User.id).where(User.email == synthetic_email(seed, "admin"))).first():
+        raise RuntimeError(f"Synthetic data for seed {seed} is already loaded")
+    services = db.execute(
+        select(Service.id, Service.name, Service.default_duration_minutes, Service.default_price)
+        .where(Service.service_type == ServiceType.INDIVIDUAL, Service.is_active.is_(True))
+        .order_by(Service.name)
+    ).all()
+    if not services:
+        raise RuntimeError("No services available; run seed_services first.")
+
+    clinic = SyntheticClinic(
+        size,
+        seed=seed,
+        end_date=end_date or dt.date.today(),
+        services=[tuple(service) for service in services],
+        password_hash=get_password_hash(SYNTHETIC_PASSWORD),
+    )
+    search_vector_update = _search_vector_update()
+    counts: Counter[str] = Counter()
+    for batch in clinic.batches(families_per_batch):
+        if batch.rows["child_profiles"]:
+            _assign_record_numbers(db, batch.rows["child_profiles"])
+        for table, columns in COPY_ORDER:
+            rows = batch.rows.get(table)
+            if rows:
+                copy_rows(db, table, columns, rows)
+                counts[table] += len(rows)
+        if batch.note_texts:
+            db.execute(
+                text(
+                    f"CREATE TEMP TABLE IF NOT EXISTS {NOTE_TEXTS_TABLE} "
+                    f"(note_id uuid, {', '.join(f'{field} text' for field in NOTE_TEXT_FIELDS)}) "
+                    "ON COMMIT DELETE ROWS"
+                )
+            )
+            copy_rows(db, NOTE_TEXTS_TABLE, ("note_id", *NOTE_TEXT_FIELDS), batch.note_texts)
+            db.execute(search_vector_update)
+        db.commit()
+        if attachment_files:
+            _write_attachment_files(batch.files)
+        if progress:
+            progress(counts)
+
+    # Fresh planner statistics, so benchmarks run against realistic plans straight away.
+    for table, _ in COPY_ORDER:
+        db.execute(text(f"ANALYZE {table}"))
+    db.commit()
+    return counts
+
+
+def delete_synthetic_clinic(db: Session, seed: int) -> int:
+    """Removes everything loaded for ``seed``; returns the number of accounts deleted."""
+    users = select(User.id).where(User.email.like(synthetic_email(seed, "%"))).scalar_subquery()
+    guardians = select(PatientProfile.id).where(PatientProfile.user_id.in_(users)).scalar_subquery()
+    encounters = select(Encounter.id).where(Encounter.guardian_id.in_(guardians)).scalar_subquery()
+    children = select(ChildProfile.id).where(ChildProfile.guardian_id.in_(guardians)).scalar_subquery()
+    # Everything below users is RESTRICT towards them; deletes cascade from each statement's table.
+    db.execute(sa.delete(ClinicalNote).where(ClinicalNote.encounter_id.in_(encounters)))
+    storage_keys = db.execute(
+        sa.delete(Attachment).where(Attachment.child_id.in_(children)).returning(Attachment.storage_key)
+    ).scalars().all()
+    db.execute(sa.delete(Encounter).where(Encounter.guardian_id.in_(guardians)))
+    db.execute(sa.delete(Prescription).where(Prescription.child_id.in_(children)))
+    db.execute(sa.delete(Invoice).where(Invoice.guardian_id.in_(guardians)))
+    db.execute(sa.delete(Appointment).where(Appointment.guardian_id.in_(guardians)))
+    deleted = db.execute(sa.delete(User).where(User.id.in_(users))).rowcount
+    db.commit()
+    for storage_key in storage_keys:
+        (ROOT_DIR / storage_key).unlink(missing_ok=True)
+    return deleted
+
+
+def _print_progress(counts: Counter[str]) -> None:
+    print(f"  {counts['patient_profiles']} families, {counts['appointments']} appointments", flush=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load deterministic synthetic clinic data.")
+    parser.add_argument("--size", choices=sorted(SIZE_PRESETS), default="small")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--end-date",
+        type=dt.date.fromisoformat,
+        default=None,
+        help="Day past visits end on (default: today); future visits run 30 days beyond it.",
+    )
+    parser.add_argument(
+        "--attachment-files",
+        action="store_true",
+        help="Also write placeholder attachment files so downloads can be benchmarked.",
+    )
+    parser.add_argument("--delete", action="store_true", help="Remove the data of --seed instead of loading it.")
+    args = parser.parse_args()
+
+    session = SessionLocal()
+    if args.delete:
+        try:
+            print(f"Deleted {delete_synthetic_clinic(session, args.seed)} synthetic accounts for seed {args.seed}")
+        finally:
+            session.close()
+        return
+
+    seed_services()
+    started = time.perf_counter()
+    try:
+        counts = load_synthetic_clinic(
+            session,
+            SIZE_PRESETS[args.size],
+            seed=args.seed,
+            end_date=args.end_date,
+            attachment_files=args.attachment_files,
+            progress=_print_progress,
+        )
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+    print(f"Seed synthetic OK ({args.size}, seed {args.seed}) in {time.perf_counter() - started:.1f}s")
+    for table, _ in COPY_ORDER:
+        print(f"  {table}: {counts[table]}")
+    print(f"Admin: {synthetic_email(args.seed, 'admin')}")
+    print(f"Doctors: {synthetic_email(args.seed, 'doctor0')} ... doctor{SIZE_PRESETS[args.size].doctors - 1}")
+    print(f"Guardians: {synthetic_email(args.seed, 'guardian0')} ... guardian{SIZE_PRESETS[args.size].families - 1}")
+    print(f"Password: {SYNTHETIC_PASSWORD}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import os
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -7,9 +8,56 @@ from app.api.auth import router as auth_router
 from app.api.ai import router as ai_router
 from app.api.admin import router as admin_router
 from app.api.med import router as med_router
+from app.api.metrics import router as metrics_router
 from app.api.patient import router as patient_router
+from app.api.profiling import router as profiling_router
+from app.api.services import router as services_router
+from app.core.metrics import METRICS_ENABLED, METRICS_EXPOSED, MetricsMiddleware, install_engine_metrics
+from app.core.profiling import PROFILING_ENABLED, ProfilingMiddleware
+from app.core.security import bulk_password_hash_pool, password_hash_pool
+from app.db.partitions import ensure_all_partitions
+from app.db.session import SessionLocal, engine
+from app.services.audit_service import AuditLogFlusher, audit_log_buffer
+from app.services.note_draft_service import NoteDraftFlusher, note_draft_buffer
+from app.services.notification_service import NOTIFICATION_WORKER_ENABLED, NotificationWorker
+from app.services.reminder_service import REMINDER_SCHEDULER_ENABLED, ReminderScheduler
+from app.services.service_price_service import ServicePriceSyncer, service_price_cache
+from app.services.token_service import TokenRevocationSyncer, token_revocation_list
 
-app = FastAPI(title="Akademia Mysli API", version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    ensure_all_partitions(SessionLocal)
+    audit_flusher = AuditLogFlusher(audit_log_buffer)
+    audit_flusher.start()
+    draft_flusher = NoteDraftFlusher(note_draft_buffer, SessionLocal)
+    draft_flusher.start()
+    revocation_syncer = TokenRevocationSyncer(token_revocation_list, SessionLocal)
+    revocation_syncer.start()
+    price_syncer = ServicePriceSyncer(service_price_cache, SessionLocal)
+    price_syncer.start()
+    notification_worker = NotificationWorker(SessionLocal) if NOTIFICATION_WORKER_ENABLED else None
+    if notification_worker:
+        notification_worker.start()
+    reminder_scheduler = ReminderScheduler(SessionLocal) if REMINDER_SCHEDULER_ENABLED else None
+    if reminder_scheduler:
+        reminder_scheduler.start()
+    try:
+        yield
+    finally:
+        if reminder_scheduler:
+            reminder_scheduler.stop()
+        if notification_worker:
+            notification_worker.stop()
+        price_syncer.stop()
+        revocation_syncer.stop()
+        draft_flusher.stop()
+        audit_flusher.stop()
+        password_hash_pool.shutdown()
+        bulk_password_hash_pool.shutdown()
+
+
+app = FastAPI(title="Akademia Mysli API", version="0.1.0", lifespan=lifespan)
 
 origins_env = os.getenv("CORS_ORIGINS")
 if origins_env:
@@ -32,8 +80,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware, engine=engine)
+if METRICS_ENABLED:
+    install_engine_metrics(engine)
+    app.add_middleware(MetricsMiddleware)
+
 app.include_router(auth_router)
 app.include_router(ai_router)
 app.include_router(admin_router)
 app.include_router(med_router)
 app.include_router(patient_router)
+app.include_router(profiling_router)
+app.include_router(services_router)
+if METRICS_EXPOSED:
+    app.include_router(metrics_router)
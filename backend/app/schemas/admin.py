@@ -83,3 +83,43 @@ class PasswordResetResponse(BaseModel):
     email: str
     role: str
     temporary_password: str
+
+
+class PatientImportItem(BaseModel):
+    line: int
+    user_id: UUID
+    guardian_id: UUID
+    child_id: UUID
+    guardian_email: str
+    record_code: str
+    temporary_password: str
+
+
+class PatientImportError(BaseModel):
+    line: int
+    message: str
+
+
+class PatientImportResponse(BaseModel):
+    imported_count: int
+    error_count: int
+    patients: list[PatientImportItem]
+    errors: list[PatientImportError]
+
+
+class AuditLogItem(BaseModel):
+    id: UUID
+    created_at: datetime.datetime
+    actor_user_id: UUID | None = None
+    actor_email: str | None = None
+    action: str
+    resource_type: str
+    resource_id: str | None = None
+    ip_address: str | None = None
+    user_agent: str | None = None
+    meta: dict | None = None
+
+
+class AuditLogPage(BaseModel):
+    items: list[AuditLogItem]
+    next_cursor: str | None = None
@@ -158,6 +158,7 @@ class EncounterItem(BaseModel):
     started_at: Optional[dt.datetime] = None
     ended_at: Optional[dt.datetime] = None
     created_at: dt.datetime
+    note: Optional["NoteDetails"] = None
 
 
 class PrescriptionListItem(BaseModel):
@@ -260,6 +261,23 @@ class NoteAddendum(NoteContent):
     created_by_user_id: Optional[UUID] = None
 
 
+class NoteDraftSave(NoteContent):
+    base_version: Optional[int] = None
+    revision: Optional[int] = None
+    updated_by_user_id: Optional[UUID] = None
+    is_visible_to_guardian: Optional[bool] = None
+
+
+class NoteDraftDetails(NoteContent):
+    note_id: UUID
+    base_version: int
+    revision: int
+    is_visible_to_guardian: Optional[bool] = None
+    updated_at: dt.datetime
+    is_flushed: bool
+    conflict: Optional[str] = None
+
+
 class NoteSign(BaseModel):
     signed_by_user_id: Optional[UUID] = None
 
@@ -289,3 +307,74 @@ class NoteDetails(BaseModel):
     created_at: dt.datetime
     updated_at: dt.datetime
     current_version: NoteVersionDetails
+
+
+class NoteSearchItem(BaseModel):
+    note_id: UUID
+    encounter_id: UUID
+    patient_id: UUID
+    patient_name: str
+    status: str
+    version: int
+    updated_at: dt.datetime
+    rank: float
+    headline: str
+
+
+class NoteSearchPage(BaseModel):
+    items: List[NoteSearchItem]
+    # Only the most recently updated matches are ranked; set when older ones were left out.
+    truncated: bool = False
+
+
+class TimelineItem(BaseModel):
+    id: UUID
+    kind: str
+    occurred_at: dt.datetime
+    status: Optional[str] = None
+    label: Optional[str] = None
+    doctor_id: Optional[UUID] = None
+    encounter_id: Optional[UUID] = None
+
+
+class TimelinePage(BaseModel):
+    items: List[TimelineItem]
+    next_cursor: Optional[str] = None
+
+
+class ChildDashboard(BaseModel):
+    id: UUID
+    full_name: str
+    date_of_birth: dt.date
+    age: int
+    record_code: str
+    status: str
+    upcoming_appointments: List[AppointmentItem]
+    recent_prescriptions: List[PrescriptionListItem]
+    latest_attachments: List[AttachmentItem]
+
+
+class GuardianDashboard(BaseModel):
+    guardian: GuardianSummary
+    children: List[ChildDashboard]
+    unpaid_invoices: List[InvoiceListItem]
+
+
+class ChildAppointments(BaseModel):
+    child_id: UUID
+    items: List[AppointmentItem]
+
+
+class ChildEncounters(BaseModel):
+    child_id: UUID
+    items: List[EncounterItem]
+
+
+class ChildPrescriptions(BaseModel):
+    child_id: UUID
+    items: List[PrescriptionListItem]
+
+
+class ChildAttachments(BaseModel):
+    child_id: UUID
+    items: List[AttachmentItem]
@@ -0,0 +1,45 @@
+import datetime
+
+from pydantic import BaseModel
+
+
+class StatementTimingItem(BaseModel):
+    duration_ms: float
+    location: str
+    sql: str
+
+
+class LocationTimingItem(BaseModel):
+    location: str
+    count: int
+    total_ms: float
+
+
+class StackSampleItem(BaseModel):
+    stack: str
+    samples: int
+
+
+class RequestProfileItem(BaseModel):
+    method: str
+    path: str
+    route: str | None = None
+    status_code: int | None = None
+    started_at: datetime.datetime
+    wall_ms: float
+    db_ms: float
+    statement_count: int
+    slowest_statements: list[StatementTimingItem]
+    locations: list[LocationTimingItem]
+    stacks: list[StackSampleItem] | None = None
+
+
+class RouteProfileItem(BaseModel):
+    method: str
+    route: str
+    requests: int
+    wall_ms_p50: float
+    wall_ms_p95: float
+    db_ms_avg: float
+    statements_avg: float
+    statements_max: int
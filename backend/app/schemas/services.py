@@ -0,0 +1,19 @@
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from app.db.enums import ServiceType
+
+
+class ServiceCatalogItem(BaseModel):
+    id: UUID
+    name: str
+    description: str
+    service_type: ServiceType
+    duration_minutes: int
+    price: float
+    currency: str
+    min_age: int | None = None
+    max_age: int | None = None
+    group_capacity: int | None = None
+    waitlist_enabled: bool
@@ -7,7 +7,7 @@ from fastapi import HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app.core.security import get_password_hash
+from app.core.security import PasswordHashPoolBusy, hash_password_offloaded
 from app.db.enums import ConsentType, ContactChannel, Gender, UserRole
 from app.db.models import (
     ChildContact,
@@ -18,9 +18,15 @@ from app.db.models import (
     PatientProfile,
     User,
 )
+from app.services.token_service import TokenService
 from app.utils.patient_code import PatientCode
 
 
+def generate_temporary_password(length: int = 12) -> str:
+    alphabet = string.ascii_letters + string.digits
+    return "".join(secrets.choice(alphabet) for _ in range(length))
+
+
 class AdminService:
     def __init__(self, db: Session) -> None:
         self.db = db
@@ -48,7 +54,7 @@ class AdminService:
         password = self._generate_password()
         user = User(
             email=email,
-            hashed_password=get_password_hash(password),
+            hashed_password=self._hash_password(password),
             role=role,
             is_active=True,
             is_verified=True,
@@ -71,8 +77,17 @@ class AdminService:
         return user, doctor, password
 
     def _generate_password(self, length: int = 12) -> str:
-        alphabet = string.ascii_letters + string.digits
-        return "".join(secrets.choice(alphabet) for _ in range(length))
+        return generate_temporary_password(length)
+
+    def _hash_password(self, password: str) -> str:
+        try:
+            return hash_password_offloaded(password)
+        except PasswordHashPoolBusy as exc:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Password hashing is busy, retry shortly",
+                headers={"Retry-After": "1"},
+            ) from exc
 
     def create_guardian_with_child(
         self,
@@ -104,7 +119,7 @@ class AdminService:
         password = self._generate_password()
         user = User(
             email=guardian_email,
-            hashed_password=get_password_hash(password),
+            hashed_password=self._hash_password(password),
             role=UserRole.GUARDIAN,
             is_active=True,
             is_verified=True,
@@ -226,6 +241,7 @@ class AdminService:
         if not user:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
         password = self._generate_password()
-        user.hashed_password = get_password_hash(password)
+        user.hashed_password = self._hash_password(password)
         self.db.commit()
+        TokenService(self.db).revoke_user(user_id)
         return user, password
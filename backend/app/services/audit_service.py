@@ -0,0 +1,260 @@
+import datetime as dt
+import json
+import logging
+import os
+import threading
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, Callable, Iterator
+
+from sqlalchemy import Select, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.core.metrics import audit_events_total, registry
+from app.db.bulk import copy_rows
+from app.db.models import AuditLog, User
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+AUDIT_BUFFER_CAPACITY = int(os.getenv("AUDIT_BUFFER_CAPACITY", "20000"))
+AUDIT_FLUSH_BATCH_SIZE = int(os.getenv("AUDIT_FLUSH_BATCH_SIZE", "500"))
+AUDIT_FLUSH_INTERVAL_SECONDS = float(os.getenv("AUDIT_FLUSH_INTERVAL_SECONDS", "1"))
+AUDIT_BACKPRESSURE_TIMEOUT_SECONDS = float(os.getenv("AUDIT_BACKPRESSURE_TIMEOUT_SECONDS", "2"))
+AUDIT_QUERY_DEFAULT_DAYS = int(os.getenv("AUDIT_QUERY_DEFAULT_DAYS", "90"))
+AUDIT_EXPORT_BATCH_SIZE = int(os.getenv("AUDIT_EXPORT_BATCH_SIZE", "2000"))
+
+AUDIT_LOG_COLUMNS = (
+    "actor_user_id",
+    "action",
+    "resource_type",
+    "resource_id",
+    "ip_address",
+    "user_agent",
+    "metadata",
+    "created_at",
+)
+
+
+@dataclass(frozen=True)
+class AuditEvent:
+    actor_user_id: uuid.UUID | None
+    action: str
+    resource_type: str
+    resource_id: str | None
+    ip_address: str | None
+    user_agent: str | None
+    meta: dict[str, Any] | None
+    created_at: dt.datetime
+
+    def copy_row(self) -> tuple:
+        return (
+            self.actor_user_id,
+            self.action[:120],
+            self.resource_type[:120],
+            self.resource_id[:64] if self.resource_id else None,
+            self.ip_address[:45] if self.ip_address else None,
+            self.user_agent[:255] if self.user_agent else None,
+            json.dumps(self.meta, default=str) if self.meta is not None else None,
+            self.created_at,
+        )
+
+
+class AuditLogBuffer:
+    """Bounded in-process queue of audit events, written to ``audit_logs`` in COPY batches.
+
+    Nothing is ever dropped: when the buffer is full, ``record`` waits for the flusher, and
+    past ``backpressure_timeout`` writes a batch itself from the request thread (failing the
+    request if the database is unreachable rather than serving it unaudited).
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        *,
+        capacity: int = AUDIT_BUFFER_CAPACITY,
+        batch_size: int = AUDIT_FLUSH_BATCH_SIZE,
+        backpressure_timeout: float = AUDIT_BACKPRESSURE_TIMEOUT_SECONDS,
+    ) -> None:
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.backpressure_timeout = backpressure_timeout
+        self.session_factory = session_factory
+        self._events: deque[AuditEvent] = deque()
+        self._lock = threading.Lock()
+        self._batch_ready = threading.Condition(self._lock)
+        self._space_available = threading.Condition(self._lock)
+        # Held while a batch is being written so only one writer removes events at a time.
+        self._flush_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def record(self, event: AuditEvent) -> None:
+        with self._lock:
+            if len(self._events) >= self.capacity:
+                self._batch_ready.notify()
+                self._space_available.wait_for(
+                    lambda: len(self._events) < self.capacity, timeout=self.backpressure_timeout
+                )
+            overflow = len(self._events) >= self.capacity
+            if not overflow:
+                self._events.append(event)
+                if len(self._events) >= self.batch_size:
+                    self._batch_ready.notify()
+        if overflow:
+            audit_events_total.labels("backpressure").inc()
+            self.flush_batch()
+            self.record(event)
+            return
+        audit_events_total.labels("recorded").inc()
+
+    def wait_for_batch(self, timeout: float, stop: threading.Event) -> None:
+        with self._lock:
+            self._batch_ready.wait_for(lambda: len(self._events) >= self.batch_size or stop.is_set(), timeout=timeout)
+
+    def wake(self) -> None:
+        with self._lock:
+            self._batch_ready.notify_all()
+
+    def flush_batch(self) -> int:
+        """Writes up to ``batch_size`` of the oldest events and commits; on failure they stay queued."""
+        with self._flush_lock:
+            with self._lock:
+                batch = list(islice(self._events, self.batch_size))
+            if not batch:
+                return 0
+            db = self.session_factory()
+            try:
+                copy_rows(db, "audit_logs", AUDIT_LOG_COLUMNS, (event.copy_row() for event in batch))
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+            with self._lock:
+                for _ in batch:
+                    self._events.popleft()
+                self._space_available.notify_all()
+        audit_events_total.labels("flushed").inc(len(batch))
+        return len(batch)
+
+    def flush_all(self) -> int:
+        flushed = 0
+        while batch := self.flush_batch():
+            flushed += batch
+        return flushed
+
+
+audit_log_buffer = AuditLogBuffer(SessionLocal)
+registry.callback("audit_buffer_events", "Audit events waiting to be written.", lambda: len(audit_log_buffer))
+
+
+def get_audit_log_buffer() -> AuditLogBuffer:
+    return audit_log_buffer
+
+
+class AuditLogFlusher:
+    """Background thread writing audit batches as they fill up, or every ``interval_seconds``."""
+
+    def __init__(self, buffer: AuditLogBuffer, *, interval_seconds: float = AUDIT_FLUSH_INTERVAL_SECONDS) -> None:
+        self.buffer = buffer
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="audit-log-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops the thread and writes everything still buffered."""
+        self._stop.set()
+        self.buffer.wake()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        try:
+            flushed = self.buffer.flush_all()
+            logger.info("Flushed %s audit events on shutdown", flushed)
+        except Exception:  # noqa: BLE001
+            logger.exception("Failed to flush %s audit events on shutdown", len(self.buffer))
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.buffer.wait_for_batch(self.interval_seconds, self._stop)
+            if self._stop.is_set():
+                return
+            try:
+                while self.buffer.flush_batch() == self.buffer.batch_size and not self._stop.is_set():
+                    pass
+            except Exception:  # noqa: BLE001
+                logger.exception("Failed to flush audit events; %s still buffered", len(self.buffer))
+                self._stop.wait(self.interval_seconds)
+
+
+@dataclass(frozen=True)
+class AuditLogFilter:
+    since: dt.datetime
+    until: dt.datetime
+    actor_user_id: uuid.UUID | None = None
+    resource_type: str | None = None
+    resource_id: str | None = None
+    # Prefix of "METHOD /route/template": "GET " matches every read.
+    action: str | None = None
+
+
+class AuditLogQueryService:
+    """Searches ``audit_logs`` newest first.
+
+    Every query is bounded by ``since``/``until`` so only the matching monthly partitions are
+    scanned; within them the actor and resource filters use the composite indexes and plain
+    time ranges the BRIN index on ``created_at``.
+    """
+
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    def _statement(self, filters: AuditLogFilter) -> Select:
+        stmt = (
+            select(AuditLog, User.email)
+            .outerjoin(User, User.id == AuditLog.actor_user_id)
+            .where(AuditLog.created_at >= filters.since, AuditLog.created_at < filters.until)
+        )
+        if filters.actor_user_id:
+            stmt = stmt.where(AuditLog.actor_user_id == filters.actor_user_id)
+        if filters.resource_type:
+            stmt = stmt.where(AuditLog.resource_type == filters.resource_type)
+        if filters.resource_id:
+            stmt = stmt.where(AuditLog.resource_id == filters.resource_id)
+        if filters.action:
+            stmt = stmt.where(AuditLog.action.startswith(filters.action, autoescape=True))
+        return stmt.order_by(AuditLog.created_at.desc(), AuditLog.id.desc())
+
+    def page(
+        self,
+        filters: AuditLogFilter,
+        *,
+        limit: int,
+        after: tuple[dt.datetime, uuid.UUID] | None = None,
+    ) -> tuple[list[tuple[AuditLog, str | None]], tuple[dt.datetime, uuid.UUID] | None]:
+        """Returns up to ``limit`` rows older than ``after`` and the key to continue from."""
+        stmt = self._statement(filters)
+        if after:
+            stmt = stmt.where(tuple_(AuditLog.created_at, AuditLog.id) < tuple_(*after))
+        rows = [tuple(row) for row in self.db.execute(stmt.limit(limit + 1)).all()]
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        last = rows[-1][0]
+        return rows, (last.created_at, last.id)
+
+    def iter_rows(self, filters: AuditLogFilter) -> Iterator[tuple[AuditLog, str | None]]:
+        """Streams every matching row through a server-side cursor."""
+        result = self.db.execute(self._statement(filters).execution_options(yield_per=AUDIT_EXPORT_BATCH_SIZE))
+        for log, actor_email in result:
+            yield log, actor_email
@@ -1,43 +1,89 @@
+import uuid
 from typing import Iterable
 
 from fastapi import HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from app.core.security import create_access_token, get_password_hash, verify_password
+from app.core.security import (
+    PasswordHashPoolBusy,
+    get_password_hash_async,
+    verify_password_async,
+)
 from app.db.enums import UserRole
-from app.db.models import User
+from app.db.models import Doctor, User
+from app.services.token_service import TokenPair, issue_token_pair
 
 
 class AuthService:
+    """Login and registration; database work runs in the threadpool, hashing in the process pool."""
+
     def __init__(self, db: Session) -> None:
         self.db = db
 
-    def login(self, email: str, password: str, allowed_roles: Iterable[UserRole] | None = None) -> str:
-        user = self.db.execute(select(User).where(User.email == email)).scalar_one_or_none()
+    async def login(self, email: str, password: str, allowed_roles: Iterable[UserRole] | None = None) -> TokenPair:
+        user, doctor_id = await run_in_threadpool(self._find_user, email)
         if not user or not user.is_active:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
         if allowed_roles and user.role not in set(allowed_roles):
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
-        if not verify_password(password, user.hashed_password):
+        if not await self._verify(password, user.hashed_password):
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
-        return create_access_token(subject=str(user.id), extra={"role": user.role.value})
+        return issue_token_pair(user_id=user.id, role=user.role, email=user.email, doctor_id=doctor_id)
 
-    def register_guardian(self, email: str, password: str) -> str:
-        existing = self.db.execute(select(User).where(User.email == email)).scalar_one_or_none()
+    async def register_guardian(self, email: str, password: str) -> TokenPair:
+        existing, _ = await run_in_threadpool(self._find_user, email)
         if existing:
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="User already exists")
 
+        try:
+            hashed_password = await get_password_hash_async(password)
+        except PasswordHashPoolBusy as exc:
+            raise self._busy() from exc
+        user_id = await run_in_threadpool(self._create_guardian, email, hashed_password)
+        return issue_token_pair(user_id=user_id, role=UserRole.GUARDIAN, email=email)
+
+    def _find_user(self, email: str) -> tuple[User | None, uuid.UUID | None]:
+        row = self.db.execute(
+            select(User, Doctor.id)
+            .outerjoin(Doctor, Doctor.user_id == User.id)
+            .where(User.email == email)
+        ).first()
+        user, doctor_id = row if row else (None, None)
+        # Return the connection to the pool before waiting on the hash; a login burst
+        # would otherwise hold one connection per queued verification.
+        if user:
+            self.db.expunge(user)
+        self.db.rollback()
+        return user, doctor_id
+
+    def _create_guardian(self, email: str, hashed_password: str) -> uuid.UUID:
+        user_id = uuid.uuid4()
         user = User(
+            id=user_id,
             email=email,
-            hashed_password=get_password_hash(password),
+            hashed_password=hashed_password,
             role=UserRole.GUARDIAN,
             is_active=True,
             is_verified=False,
         )
         self.db.add(user)
         self.db.commit()
-        return create_access_token(subject=str(user.id), extra={"role": user.role.value})
+        return user_id
+
+    async def _verify(self, password: str, hashed_password: str) -> bool:
+        try:
+            return await verify_password_async(password, hashed_password)
+        except PasswordHashPoolBusy as exc:
+            raise self._busy() from exc
+
+    def _busy(self) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication is busy, retry shortly",
+            headers={"Retry-After": "1"},
+        )
@@ -0,0 +1,198 @@
+import argparse
+import datetime as dt
+import logging
+import os
+from dataclasses import dataclass
+from zoneinfo import ZoneInfo
+
+import sqlalchemy as sa
+from sqlalchemy import and_, exists, func, or_, select
+from sqlalchemy.dialects.postgresql import distinct_on, insert
+from sqlalchemy.orm import Session
+
+from app.db.enums import AppointmentStatus
+from app.db.models import Appointment, Doctor, Invoice, InvoiceItem, InvoiceNumberCounter, Service, ServicePrice
+
+logger = logging.getLogger(__name__)
+
+BILLING_TIMEZONE = ZoneInfo(os.getenv("BILLING_TIMEZONE", "Europe/Warsaw"))
+INVOICE_PAYMENT_DAYS = int(os.getenv("INVOICE_PAYMENT_DAYS", "14"))
+BILLING_LOOKBACK_DAYS = int(os.getenv("BILLING_LOOKBACK_DAYS", "31"))
+# Serializes billing runs across processes; any constant key shared by all of them works.
+BILLING_LOCK_KEY = 4_217_300_046
+
+
+@dataclass
+class InvoiceRun:
+    invoiced: int
+    # COMPLETED visits in the window left uninvoiced because no price was valid on their date.
+    missing_price: int
+
+
+def invoice_series(issued_at: dt.datetime) -> str:
+    """Numbering restarts every month of issue: FV/2026/10/00001, FV/2026/10/00002, ..."""
+    local = issued_at.astimezone(BILLING_TIMEZONE)
+    return f"FV/{local:%Y/%m}"
+
+
+def month_window(month: dt.date) -> tuple[dt.datetime, dt.datetime]:
+    start = dt.datetime(month.year, month.month, 1, tzinfo=BILLING_TIMEZONE)
+    end = dt.datetime(month.year + month.month // 12, month.month % 12 + 1, 1, tzinfo=BILLING_TIMEZONE)
+    return start, end
+
+
+class BillingService:
+    """Issues one invoice per COMPLETED appointment, priced by the ``ServicePrice`` valid that day.
+
+    A run is a single statement over every appointment in the window: it picks the price rows,
+    reserves a block of numbers on the month's ``invoice_number_counters`` row and inserts the
+    invoices and their items. The counter row is locked until commit, so numbers stay unique
+    and gap-free against any other issuer, and a rolled-back run gives its block back. Runs
+    are serialized with an advisory lock so two jobs never bill the same appointment.
+    """
+
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    def issue(self, *, since: dt.datetime, until: dt.datetime, now: dt.datetime | None = None) -> InvoiceRun:
+        """Invoices appointments starting in ``[since, until)``; the caller commits."""
+        now = now or dt.datetime.now(dt.timezone.utc)
+        self.db.execute(select(func.pg_advisory_xact_lock(BILLING_LOCK_KEY)))
+        invoiced = self.db.execute(self._issue_statement(since, until, now)).scalar_one()
+        missing_price = self.db.execute(
+            select(func.count()).select_from(Appointment).where(*self._uninvoiced(since, until))
+        ).scalar_one()
+        if missing_price:
+            logger.warning("%s completed appointments have no valid service price", missing_price)
+        return InvoiceRun(invoiced=invoiced, missing_price=missing_price)
+
+    def _uninvoiced(self, since: dt.datetime, until: dt.datetime) -> list:
+        return [
+            Appointment.status == AppointmentStatus.COMPLETED,
+            Appointment.start_at >= since,
+            Appointment.start_at < until,
+            ~exists().where(Invoice.appointment_id == Appointment.id),
+        ]
+
+    def _issue_statement(self, since: dt.datetime, until: dt.datetime, now: dt.datetime):
+        visit_date = sa.cast(func.timezone(Doctor.timezone, Appointment.start_at), sa.Date)
+        # DISTINCT ON keeps a single price should two ranges ever overlap: the latest one wins.
+        priced = (
+            select(
+                Appointment.id.label("appointment_id"),
+                Appointment.guardian_id,
+                Appointment.service_id,
+                Appointment.start_at,
+                Service.name.label("description"),
+                ServicePrice.price,
+                ServicePrice.currency,
+            )
+            .join(Doctor, Doctor.id == Appointment.doctor_id)
+            .join(Service, Service.id == Appointment.service_id)
+            .join(
+                ServicePrice,
+                and_(
+                    ServicePrice.service_id == Appointment.service_id,
+                    ServicePrice.valid_from <= visit_date,
+                    or_(ServicePrice.valid_to.is_(None), ServicePrice.valid_to > visit_date),
+                ),
+            )
+            .where(*self._uninvoiced(since, until))
+            .ext(distinct_on(Appointment.id))
+            .order_by(Appointment.id, ServicePrice.valid_from.desc())
+            .subquery("priced")
+        )
+        # Materialized so gen_random_uuid() yields one id shared by the invoice and its item.
+        candidates = (
+            select(
+                priced,
+                func.gen_random_uuid().label("invoice_id"),
+                func.row_number().over(order_by=(priced.c.start_at, priced.c.appointment_id)).label("position"),
+            )
+            .cte("candidates")
+            .prefix_with("MATERIALIZED")
+        )
+        batch_size = select(func.count()).select_from(candidates).scalar_subquery()
+
+        series = invoice_series(now)
+        counters = InvoiceNumberCounter.__table__
+        reserve = insert(counters).from_select(
+            ["series", "last_value"],
+            select(sa.literal(series), batch_size).where(batch_size > 0),
+        )
+        counter = (
+            reserve.on_conflict_do_update(
+                index_elements=[counters.c.series],
+                set_={"last_value": counters.c.last_value + reserve.excluded.last_value},
+            )
+            .returning(counters.c.last_value)
+            .cte("counter")
+        )
+        sequence = counter.c.last_value - batch_size + candidates.c.position
+        number = sa.literal(f"{series}/") + func.lpad(sa.cast(sequence, sa.Text), 5, "0")
+
+        invoices = (
+            insert(Invoice.__table__)
+            .from_select(
+                ["id", "appointment_id", "guardian_id", "number", "issued_at", "due_at", "total_amount", "currency"],
+                select(
+                    candidates.c.invoice_id,
+                    candidates.c.appointment_id,
+                    candidates.c.guardian_id,
+                    number,
+                    sa.literal(now, sa.DateTime(timezone=True)),
+                    sa.literal(now + dt.timedelta(days=INVOICE_PAYMENT_DAYS), sa.DateTime(timezone=True)),
+                    candidates.c.price,
+                    candidates.c.currency,
+                ).join(counter, sa.true()),
+            )
+            .returning(sa.literal(1))
+            .cte("invoices")
+        )
+        items = (
+            insert(InvoiceItem.__table__)
+            .from_select(
+                ["invoice_id", "service_id", "description", "quantity", "unit_price", "amount"],
+                select(
+                    candidates.c.invoice_id,
+                    candidates.c.service_id,
+                    candidates.c.description,
+                    sa.literal(1),
+                    candidates.c.price,
+                    candidates.c.price,
+                ),
+            )
+            .cte("items")
+        )
+        # Items reference invoices inserted by the same statement; foreign keys are checked at its end.
+        return select(func.count()).select_from(invoices).add_cte(items)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Invoice completed appointments.")
+    parser.add_argument(
+        "--month",
+        type=lambda value: dt.datetime.strptime(value, "%Y-%m").date(),
+        help=f"Bill appointments of this month (YYYY-MM); default: the last {BILLING_LOOKBACK_DAYS} days.",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    from app.db.session import SessionLocal
+
+    if args.month:
+        since, until = month_window(args.month)
+    else:
+        until = dt.datetime.now(dt.timezone.utc)
+        since = until - dt.timedelta(days=BILLING_LOOKBACK_DAYS)
+    db = SessionLocal()
+    try:
+        result = BillingService(db).issue(since=since, until=until)
+        db.commit()
+    finally:
+        db.close()
+    print(f"Issued {result.invoiced} invoices; {result.missing_price} appointments have no valid price.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+import datetime as dt
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from typing import Hashable, Iterable
+
+from sqlalchemy import Select, Subquery, func, select, union_all
+from sqlalchemy.orm import Session, aliased
+
+from app.db.change_tracking import ANY_ROW, track_commits
+from app.db.enums import AppointmentStatus, InvoiceStatus
+from app.db.models import (
+    Appointment,
+    Attachment,
+    ChildProfile,
+    ClinicalNote,
+    Encounter,
+    Invoice,
+    PatientProfile,
+    Prescription,
+)
+from app.schemas.patients import GuardianDashboard
+
+DASHBOARD_ITEMS_PER_CHILD = int(os.getenv("DASHBOARD_ITEMS_PER_CHILD", "5"))
+DASHBOARD_CACHE_TTL_SECONDS = float(os.getenv("DASHBOARD_CACHE_TTL_SECONDS", "60"))
+DASHBOARD_CACHE_MAX_ENTRIES = int(os.getenv("DASHBOARD_CACHE_MAX_ENTRIES", "10000"))
+
+
+def attachment_owners(child_ids: list[uuid.UUID]) -> Subquery:
+    """``(attachment_id, owner_id)`` of attachments filed on the children, their encounters or notes."""
+    return union_all(
+        select(Attachment.id.label("attachment_id"), Attachment.child_id.label("owner_id")).where(
+            Attachment.child_id.in_(child_ids)
+        ),
+        select(Attachment.id, Encounter.child_id)
+        .join(Encounter, Encounter.id == Attachment.encounter_id)
+        .where(Attachment.child_id.is_(None), Encounter.child_id.in_(child_ids)),
+        select(Attachment.id, Encounter.child_id)
+        .join(ClinicalNote, ClinicalNote.id == Attachment.note_id)
+        .join(Encounter, Encounter.id == ClinicalNote.encounter_id)
+        .where(Attachment.child_id.is_(None), Attachment.encounter_id.is_(None), Encounter.child_id.in_(child_ids)),
+    ).subquery("owners")
+
+
+@dataclass
+class GuardianDashboardData:
+    children: list[ChildProfile]
+    upcoming_appointments: dict[uuid.UUID, list[Appointment]]
+    recent_prescriptions: dict[uuid.UUID, list[Prescription]]
+    latest_attachments: dict[uuid.UUID, list[Attachment]]
+    unpaid_invoices: list[Invoice]
+
+
+class GuardianDashboardService:
+    """Loads a guardian's dashboard in a fixed number of queries, however many children they have.
+
+    Each per-child list is a single ``row_number()`` query over all the children, keeping the
+    first ``per_child`` rows of every partition.
+    """
+
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    def load(
+        self,
+        guardian: PatientProfile,
+        *,
+        now: dt.datetime | None = None,
+        per_child: int = DASHBOARD_ITEMS_PER_CHILD,
+    ) -> GuardianDashboardData:
+        now = now or dt.datetime.now(dt.timezone.utc)
+        children = self.db.execute(
+            select(ChildProfile)
+            .where(ChildProfile.guardian_id == guardian.id)
+            .order_by(ChildProfile.date_of_birth, ChildProfile.id)
+        ).scalars().all()
+        child_ids = [child.id for child in children]
+        return GuardianDashboardData(
+            children=children,
+            upcoming_appointments=self.upcoming_appointments(guardian.id, child_ids, now=now, per_child=per_child),
+            recent_prescriptions=self.recent_prescriptions(child_ids, per_child=per_child),
+            latest_attachments=self.latest_attachments(child_ids, per_child=per_child),
+            unpaid_invoices=self.unpaid_invoices(guardian.id),
+        )
+
+    def upcoming_appointments(
+        self, guardian_id: uuid.UUID, child_ids: list[uuid.UUID], *, now: dt.datetime, per_child: int
+    ) -> dict[uuid.UUID, list[Appointment]]:
+        if not child_ids:
+            return {}
+        ranked = select(
+            Appointment,
+            func.row_number()
+            .over(partition_by=Appointment.child_id, order_by=(Appointment.start_at, Appointment.id))
+            .label("rank"),
+        ).where(
+            Appointment.child_id.in_(child_ids),
+            Appointment.guardian_id == guardian_id,
+            Appointment.status.in_([AppointmentStatus.REQUESTED, AppointmentStatus.CONFIRMED]),
+            Appointment.start_at >= now,
+        )
+        return self._first_per_child(Appointment, ranked, "child_id", per_child)
+
+    def recent_prescriptions(
+        self, child_ids: list[uuid.UUID], *, per_child: int
+    ) -> dict[uuid.UUID, list[Prescription]]:
+        if not child_ids:
+            return {}
+        ranked = select(
+            Prescription,
+            func.row_number()
+            .over(partition_by=Prescription.child_id, order_by=(Prescription.issued_at.desc(), Prescription.id))
+            .label("rank"),
+        ).where(Prescription.child_id.in_(child_ids))
+        return self._first_per_child(Prescription, ranked, "child_id", per_child)
+
+    def latest_attachments(
+        self, child_ids: list[uuid.UUID], *, per_child: int
+    ) -> dict[uuid.UUID, list[Attachment]]:
+        """Attachments of the children directly or through their encounters and notes, newest first."""
+        if not child_ids:
+            return {}
+        owners = attachment_owners(child_ids)
+        ranked = select(
+            Attachment,
+            owners.c.owner_id,
+            func.row_number()
+            .over(partition_by=owners.c.owner_id, order_by=(Attachment.created_at.desc(), Attachment.id))
+            .label("rank"),
+        ).join(owners, owners.c.attachment_id == Attachment.id)
+        return self._first_per_child(Attachment, ranked, "owner_id", per_child)
+
+    def unpaid_invoices(self, guardian_id: uuid.UUID) -> list[Invoice]:
+        return self.db.execute(
+            select(Invoice)
+            .where(Invoice.guardian_id == guardian_id, Invoice.status == InvoiceStatus.UNPAID)
+            .order_by(Invoice.due_at.asc().nulls_last(), Invoice.issued_at, Invoice.id)
+        ).scalars().all()
+
+    def _first_per_child(self, model: type, ranked: Select, owner_column: str, per_child: int) -> dict[uuid.UUID, list]:
+        ranked = ranked.subquery("ranked")
+        rows = self.db.execute(
+            select(aliased(model, ranked), ranked.c[owner_column])
+            .where(ranked.c.rank <= per_child)
+            .order_by(ranked.c.rank)
+        ).all()
+        grouped: dict[uuid.UUID, list] = defaultdict(list)
+        for item, owner_id in rows:
+            grouped[owner_id].append(item)
+        return dict(grouped)
+
+
+@dataclass
+class _CachedDashboard:
+    dashboard: GuardianDashboard
+    guardian_id: uuid.UUID
+    child_ids: frozenset[uuid.UUID]
+    expires_at: float
+
+
+class GuardianDashboardCache:
+    """Built dashboards by guardian user id, for ``ttl_seconds`` at most.
+
+    Local commits touching a guardian's children, appointments, encounters, prescriptions,
+    attachments or invoices drop that guardian's entry (see ``invalidate``). The TTL bounds
+    how long writes from other processes or Core statements, such as the billing job, go unseen.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float = DASHBOARD_CACHE_TTL_SECONDS,
+        max_entries: int = DASHBOARD_CACHE_MAX_ENTRIES,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[uuid.UUID, _CachedDashboard] = OrderedDict()
+        self._generation = 0
+
+    def get(self, user_id: uuid.UUID) -> GuardianDashboard | None:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return entry.dashboard
+
+    def generation(self) -> int:
+        return self._generation
+
+    def put(
+        self,
+        user_id: uuid.UUID,
+        dashboard: GuardianDashboard,
+        *,
+        guardian_id: uuid.UUID,
+        child_ids: Iterable[uuid.UUID],
+        generation: int,
+    ) -> None:
+        """Stores ``dashboard`` unless something was invalidated since ``generation`` was read."""
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[user_id] = _CachedDashboard(
+                dashboard, guardian_id, frozenset(child_ids), time.monotonic() + self.ttl_seconds
+            )
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, keys: set[Hashable]) -> None:
+        """Drops the entries matching ``("guardian", id)``/``("child", id)`` keys; ``ANY_ROW`` drops all."""
+        guardian_ids = {value for kind, value in keys - {ANY_ROW} if kind == "guardian"}
+        child_ids = {value for kind, value in keys - {ANY_ROW} if kind == "child"}
+        with self._lock:
+            self._generation += 1
+            if ANY_ROW in keys:
+                self._entries.clear()
+                return
+            for user_id in [
+                user_id
+                for user_id, entry in self._entries.items()
+                if entry.guardian_id in guardian_ids or entry.child_ids & child_ids
+            ]:
+                del self._entries[user_id]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+def _dashboard_key(instance: object) -> Hashable:
+    if isinstance(instance, PatientProfile):
+        return ("guardian", instance.id)
+    if isinstance(instance, (ChildProfile, Appointment, Encounter, Invoice)):
+        return ("guardian", instance.guardian_id)
+    if isinstance(instance, Prescription):
+        return ("child", instance.child_id)
+    if isinstance(instance, Attachment) and instance.child_id:
+        return ("child", instance.child_id)
+    return ANY_ROW
+
+
+guardian_dashboard_cache = GuardianDashboardCache()
+track_commits(
+    (PatientProfile, ChildProfile, Appointment, Encounter, Prescription, Attachment, Invoice),
+    guardian_dashboard_cache.invalidate,
+    key=_dashboard_key,
+)
+
+
+def get_guardian_dashboard_cache() -> GuardianDashboardCache:
+    return guardian_dashboard_cache
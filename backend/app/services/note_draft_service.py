@@ -0,0 +1,224 @@
+import datetime as dt
+import logging
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field, replace
+from typing import Callable
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db.enums import NoteStatus
+from app.db.models import ClinicalNote, NoteVersion
+from app.services.note_version_service import NOTE_TEXT_FIELDS, NoteVersionService
+
+logger = logging.getLogger(__name__)
+
+NOTE_DRAFT_IDLE_SECONDS = float(os.getenv("NOTE_DRAFT_IDLE_SECONDS", "120"))
+NOTE_DRAFT_RETENTION_SECONDS = float(os.getenv("NOTE_DRAFT_RETENTION_SECONDS", "3600"))
+NOTE_DRAFT_FLUSH_INTERVAL_SECONDS = float(os.getenv("NOTE_DRAFT_FLUSH_INTERVAL_SECONDS", "15"))
+
+
+class DraftConflictError(Exception):
+    pass
+
+
+@dataclass
+class NoteDraft:
+    note_id: uuid.UUID
+    editor_user_id: uuid.UUID
+    base_version: int
+    revision: int
+    texts: dict[str, str | None]
+    is_visible_to_guardian: bool | None
+    updated_by_user_id: uuid.UUID | None
+    updated_at: dt.datetime
+    touched_at: float = field(default_factory=time.monotonic)
+    dirty: bool = True
+    # Why the flusher could not materialize this draft; kept until the editor rebases it with a new base_version.
+    conflict: str | None = None
+    # The note's patient, so autosaves served from the buffer are still audited against it.
+    child_id: uuid.UUID | None = None
+
+
+class NoteDraftBuffer:
+    """In-process keyed store for autosaved note drafts.
+
+    Every method takes the lock and returns copies, so the same interface can be
+    backed by a shared store (e.g. Redis hashes) when running several workers.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._drafts: dict[uuid.UUID, NoteDraft] = {}
+
+    def get(self, note_id: uuid.UUID) -> NoteDraft | None:
+        with self._lock:
+            draft = self._drafts.get(note_id)
+            return replace(draft) if draft else None
+
+    def save(
+        self,
+        *,
+        note_id: uuid.UUID,
+        editor_user_id: uuid.UUID,
+        texts: dict[str, str | None],
+        is_visible_to_guardian: bool | None,
+        updated_by_user_id: uuid.UUID | None,
+        expected_revision: int | None,
+        base_version: int | None = None,
+        child_id: uuid.UUID | None = None,
+    ) -> NoteDraft:
+        """Stores a draft; without ``base_version`` only an existing, unconflicted draft of the same editor is updated."""
+        with self._lock:
+            current = self._drafts.get(note_id)
+            if base_version is None and (
+                current is None or current.editor_user_id != editor_user_id or current.conflict
+            ):
+                raise KeyError(note_id)
+            if current and expected_revision is not None and current.revision != expected_revision:
+                raise DraftConflictError("Draft revision conflict")
+            if current and expected_revision is None and current.editor_user_id != editor_user_id:
+                raise DraftConflictError("Draft is being edited by another user")
+            draft = NoteDraft(
+                note_id=note_id,
+                editor_user_id=editor_user_id,
+                base_version=base_version if base_version is not None else current.base_version,
+                revision=(current.revision if current else 0) + 1,
+                texts={name: texts.get(name) for name in NOTE_TEXT_FIELDS},
+                is_visible_to_guardian=is_visible_to_guardian,
+                updated_by_user_id=updated_by_user_id,
+                updated_at=dt.datetime.now(dt.timezone.utc),
+                child_id=child_id if child_id is not None else (current.child_id if current else None),
+            )
+            self._drafts[note_id] = draft
+            return replace(draft)
+
+    def mark_flushed(self, note_id: uuid.UUID, revision: int, version: int) -> None:
+        with self._lock:
+            draft = self._drafts.get(note_id)
+            if not draft:
+                return
+            draft.base_version = version
+            if draft.revision == revision:
+                draft.dirty = False
+
+    def mark_conflicted(self, note_id: uuid.UUID, revision: int, reason: str) -> None:
+        with self._lock:
+            draft = self._drafts.get(note_id)
+            if draft and draft.revision == revision:
+                draft.conflict = reason
+
+    def discard(self, note_id: uuid.UUID) -> None:
+        with self._lock:
+            self._drafts.pop(note_id, None)
+
+    def collect(self, *, idle_seconds: float, retention_seconds: float) -> list[NoteDraft]:
+        """Evicts long-idle clean or conflicted drafts and returns the other dirty drafts idle for ``idle_seconds``."""
+        now = time.monotonic()
+        with self._lock:
+            for note_id, draft in list(self._drafts.items()):
+                if (not draft.dirty or draft.conflict) and now - draft.touched_at >= retention_seconds:
+                    del self._drafts[note_id]
+            return [
+                replace(draft)
+                for draft in self._drafts.values()
+                if draft.dirty and not draft.conflict and now - draft.touched_at >= idle_seconds
+            ]
+
+
+note_draft_buffer = NoteDraftBuffer()
+
+
+def get_note_draft_buffer() -> NoteDraftBuffer:
+    return note_draft_buffer
+
+
+def materialize_draft(db: Session, note: ClinicalNote, draft: NoteDraft) -> NoteVersion:
+    """Writes the buffered draft as the next NoteVersion; the caller commits."""
+    if note.version != draft.base_version:
+        raise DraftConflictError("Note changed since draft was started")
+    versions = NoteVersionService(db)
+    previous = versions.get_current_content(note.id)
+
+    note.version = note.version + 1
+    if draft.is_visible_to_guardian is not None:
+        note.is_visible_to_guardian = draft.is_visible_to_guardian
+    note.updated_at = dt.datetime.now(dt.timezone.utc)
+
+    return versions.append(
+        note=note,
+        version_number=note.version,
+        is_addendum=False,
+        texts=draft.texts,
+        created_by_user_id=draft.updated_by_user_id or note.author_user_id,
+        previous=previous,
+    )
+
+
+def flush_draft(db: Session, buffer: NoteDraftBuffer, draft: NoteDraft) -> NoteVersion | None:
+    note = db.execute(select(ClinicalNote).where(ClinicalNote.id == draft.note_id)).scalar_one_or_none()
+    if not note or note.status != NoteStatus.DRAFT:
+        buffer.discard(draft.note_id)
+        return None
+    version = materialize_draft(db, note, draft)
+    db.commit()
+    buffer.mark_flushed(draft.note_id, draft.revision, note.version)
+    return version
+
+
+class NoteDraftFlusher:
+    """Background thread materializing drafts that stopped receiving autosaves."""
+
+    def __init__(
+        self,
+        buffer: NoteDraftBuffer,
+        session_factory: Callable[[], Session],
+        *,
+        interval_seconds: float = NOTE_DRAFT_FLUSH_INTERVAL_SECONDS,
+        idle_seconds: float = NOTE_DRAFT_IDLE_SECONDS,
+        retention_seconds: float = NOTE_DRAFT_RETENTION_SECONDS,
+    ) -> None:
+        self.buffer = buffer
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds
+        self.idle_seconds = idle_seconds
+        self.retention_seconds = retention_seconds
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="note-draft-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self.flush(idle_seconds=0)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            self.flush(idle_seconds=self.idle_seconds)
+
+    def flush(self, *, idle_seconds: float) -> int:
+        flushed = 0
+        for draft in self.buffer.collect(idle_seconds=idle_seconds, retention_seconds=self.retention_seconds):
+            db = self.session_factory()
+            try:
+                if flush_draft(db, self.buffer, draft):
+                    flushed += 1
+            except DraftConflictError as exc:
+                db.rollback()
+                self.buffer.mark_conflicted(draft.note_id, draft.revision, str(exc))
+                logger.warning("Draft for note %s conflicts with the note: %s", draft.note_id, exc)
+            except Exception:  # noqa: BLE001
+                db.rollback()
+                logger.exception("Failed to flush draft for note %s", draft.note_id)
+            finally:
+                db.close()
+        return flushed
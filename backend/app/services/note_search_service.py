@@ -0,0 +1,148 @@
+import datetime as dt
+import html
+import os
+import uuid
+from dataclasses import dataclass
+
+from sqlalchemy import Text, func, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session
+
+from app.db.enums import NoteStatus
+from app.db.models import ChildProfile, ClinicalNote, Encounter
+from app.services.note_version_service import NOTE_TEXT_FIELDS, NoteVersionService, note_search_config
+
+NOTE_SEARCH_RANK_WINDOW = int(os.getenv("NOTE_SEARCH_RANK_WINDOW", "2000"))
+NOTE_SEARCH_HEADLINE_OPTIONS = (
+    'StartSel=<mark>, StopSel=</mark>, MaxWords=30, MinWords=10, MaxFragments=2, FragmentDelimiter=" … "'
+)
+
+
+@dataclass
+class NoteSearchHit:
+    note_id: uuid.UUID
+    encounter_id: uuid.UUID
+    child_id: uuid.UUID
+    child_name: str
+    status: NoteStatus
+    version: int
+    updated_at: dt.datetime
+    rank: float
+    headline: str
+
+
+@dataclass
+class NoteSearchResult:
+    hits: list[NoteSearchHit]
+    # More notes matched than the rank window holds; older matches were not ranked.
+    truncated: bool
+
+
+class NoteSearchService:
+    """Ranked full-text search over the latest version of each clinical note."""
+
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    def search(
+        self,
+        query: str,
+        *,
+        doctor_id: uuid.UUID | None = None,
+        child_id: uuid.UUID | None = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> NoteSearchResult:
+        tsquery = func.websearch_to_tsquery(note_search_config(), query)
+        candidates = (
+            select(ClinicalNote.id)
+            .join(Encounter, Encounter.id == ClinicalNote.encounter_id)
+            .where(ClinicalNote.search_vector.op("@@")(tsquery))
+        )
+        if doctor_id is not None:
+            # Same rule as opening the note: only notes of the doctor's own encounters.
+            candidates = candidates.where(Encounter.doctor_id == doctor_id)
+        if child_id is not None:
+            candidates = candidates.where(Encounter.child_id == child_id)
+        # Ranking reads every matching tsvector, so only the most recent matches are ranked. One
+        # extra candidate tells whether the window cut any off; it is not ranked itself.
+        candidates = (
+            candidates.add_columns(func.row_number().over(order_by=ClinicalNote.updated_at.desc()).label("position"))
+            .order_by(ClinicalNote.updated_at.desc())
+            .limit(NOTE_SEARCH_RANK_WINDOW + 1)
+            .cte("candidates")
+        )
+        truncated = (
+            select(func.count()).select_from(candidates).scalar_subquery() > NOTE_SEARCH_RANK_WINDOW
+        ).label("truncated")
+
+        rank = func.ts_rank_cd(ClinicalNote.search_vector, tsquery)
+        stmt = (
+            select(
+                ClinicalNote.id,
+                ClinicalNote.encounter_id,
+                ClinicalNote.status,
+                ClinicalNote.version,
+                ClinicalNote.updated_at,
+                Encounter.child_id,
+                ChildProfile.first_name,
+                ChildProfile.last_name,
+                rank.label("rank"),
+                truncated,
+            )
+            .join(candidates, candidates.c.id == ClinicalNote.id)
+            .join(Encounter, Encounter.id == ClinicalNote.encounter_id)
+            .join(ChildProfile, ChildProfile.id == Encounter.child_id)
+            .where(candidates.c.position <= NOTE_SEARCH_RANK_WINDOW)
+        )
+
+        rows = self.db.execute(
+            stmt.order_by(rank.desc(), ClinicalNote.updated_at.desc(), ClinicalNote.id)
+            .limit(limit)
+            .offset(offset)
+        ).all()
+        if not rows:
+            if not offset:
+                return NoteSearchResult([], truncated=False)
+            return NoteSearchResult([], truncated=self.db.execute(select(truncated)).scalar_one())
+
+        contents = NoteVersionService(self.db).get_current_contents(row.id for row in rows)
+        headlines = self._headlines(
+            [self._searchable_text(contents[row.id].texts if row.id in contents else {}) for row in rows],
+            tsquery,
+        )
+        hits = [
+            NoteSearchHit(
+                note_id=row.id,
+                encounter_id=row.encounter_id,
+                child_id=row.child_id,
+                child_name=f"{row.first_name} {row.last_name}".strip(),
+                status=row.status,
+                version=row.version,
+                updated_at=row.updated_at,
+                rank=row.rank,
+                headline=headline,
+            )
+            for row, headline in zip(rows, headlines)
+        ]
+        return NoteSearchResult(hits, truncated=rows[0].truncated)
+
+    def _searchable_text(self, texts: dict[str, str | None]) -> str:
+        return "\n".join(texts[field] for field in NOTE_TEXT_FIELDS if texts.get(field))
+
+    def _headlines(self, bodies: list[str], tsquery) -> list[str]:
+        """Highlights all result bodies in one round-trip, keeping their order.
+
+        The bodies are HTML-escaped first, so the ``<mark>`` selectors are the only markup in a
+        headline; an escaped entity is a single token to the parser and is never cut in half.
+        """
+        escaped = [html.escape(body, quote=False) for body in bodies]
+        unnested = func.unnest(literal(escaped, type_=ARRAY(Text))).table_valued(
+            "body", with_ordinality="position"
+        ).render_derived()
+        rows = self.db.execute(
+            select(func.ts_headline(note_search_config(), unnested.c.body, tsquery, NOTE_SEARCH_HEADLINE_OPTIONS))
+            .select_from(unnested)
+            .order_by(unnested.c.position)
+        ).scalars().all()
+        return list(rows)
@@ -0,0 +1,192 @@
+import json
+import os
+import uuid
+from dataclasses import dataclass
+from itertools import groupby
+from typing import Iterable
+
+from sqlalchemy import and_, func, literal, literal_column, select
+from sqlalchemy.dialects.postgresql import REGCONFIG, TSVECTOR
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.db.models import ClinicalNote, NoteVersion
+from app.utils.text_delta import apply_fields_delta, encode_fields_delta
+
+NOTE_TEXT_FIELDS = (
+    "history_text",
+    "diagnosis_text",
+    "recommendations_text",
+    "therapy_plan_text",
+    "guardian_summary_text",
+)
+NOTE_SNAPSHOT_INTERVAL = int(os.getenv("NOTE_SNAPSHOT_INTERVAL", "20"))
+# Created by migration 0006, which also built the stored vectors with it; queries must use the same one.
+NOTE_SEARCH_CONFIG = "polish_notes"
+NOTE_SEARCH_WEIGHTS = {
+    "diagnosis_text": "A",
+    "history_text": "B",
+    "recommendations_text": "B",
+    "therapy_plan_text": "C",
+    "guardian_summary_text": "D",
+}
+
+
+@dataclass
+class NoteVersionContent:
+    version: NoteVersion
+    texts: dict[str, str | None]
+    chain_length: int
+
+
+def snapshot_texts(version: NoteVersion) -> dict[str, str | None]:
+    return {field: getattr(version, field) for field in NOTE_TEXT_FIELDS}
+
+
+def reconstruct_chain(chain: list[NoteVersion]) -> dict[str, str | None]:
+    if not chain or not chain[0].is_snapshot:
+        raise ValueError("Note version chain must start with a snapshot")
+    texts = snapshot_texts(chain[0])
+    for version in chain[1:]:
+        if version.is_snapshot:
+            texts = snapshot_texts(version)
+        else:
+            texts = apply_fields_delta(texts, version.delta or {})
+    return texts
+
+
+def content_from_chain(chain: list[NoteVersion]) -> NoteVersionContent:
+    return NoteVersionContent(version=chain[-1], texts=reconstruct_chain(chain), chain_length=len(chain))
+
+
+def current_chain_condition() -> ColumnElement:
+    """Joins a ClinicalNote to the versions from its latest snapshot up to ``current_version_id``."""
+    snapshot = aliased(NoteVersion)
+    current = aliased(NoteVersion)
+    current_number = (
+        select(current.version_number)
+        .where(current.id == ClinicalNote.current_version_id)
+        .correlate(ClinicalNote)
+        .scalar_subquery()
+    )
+    latest_snapshot = (
+        select(func.max(snapshot.version_number))
+        .where(
+            snapshot.note_id == ClinicalNote.id,
+            snapshot.is_snapshot.is_(True),
+            snapshot.version_number <= current_number,
+        )
+        .correlate(ClinicalNote)
+        .scalar_subquery()
+    )
+    return and_(
+        NoteVersion.note_id == ClinicalNote.id,
+        NoteVersion.version_number.between(latest_snapshot, current_number),
+    )
+
+
+def note_search_config() -> ColumnElement:
+    return literal(NOTE_SEARCH_CONFIG, type_=REGCONFIG)
+
+
+def note_search_vector(texts: dict[str, str | None]) -> ColumnElement:
+    """Builds the weighted tsvector expression stored on the note for its latest texts."""
+    parts = [
+        func.setweight(
+            func.to_tsvector(note_search_config(), texts[field]),
+            literal_column(f"'{NOTE_SEARCH_WEIGHTS[field]}'"),
+        )
+        for field in NOTE_TEXT_FIELDS
+        if texts.get(field)
+    ]
+    if not parts:
+        return func.to_tsvector(note_search_config(), "")
+    vector = parts[0]
+    for part in parts[1:]:
+        vector = vector.op("||", return_type=TSVECTOR)(part)
+    return vector
+
+
+def version_delta(
+    previous_texts: dict[str, str | None],
+    chain_length: int,
+    texts: dict[str, str | None],
+) -> dict | None:
+    """Delta to store for ``texts`` on a chain of ``chain_length``; None when a snapshot is due or smaller."""
+    if chain_length >= NOTE_SNAPSHOT_INTERVAL:
+        return None
+    delta = encode_fields_delta(previous_texts, texts)
+    full_size = sum(len(value) for value in texts.values() if value)
+    if len(json.dumps(delta, ensure_ascii=False)) >= full_size:
+        return None
+    return delta
+
+
+class NoteVersionService:
+    """Stores note versions as periodic full snapshots followed by per-field deltas."""
+
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    def get_content(self, note_id: uuid.UUID, version_number: int | None = None) -> NoteVersionContent | None:
+        snapshot_stmt = select(func.max(NoteVersion.version_number)).where(
+            NoteVersion.note_id == note_id,
+            NoteVersion.is_snapshot.is_(True),
+        )
+        chain_stmt = select(NoteVersion).where(NoteVersion.note_id == note_id)
+        if version_number is not None:
+            snapshot_stmt = snapshot_stmt.where(NoteVersion.version_number <= version_number)
+            chain_stmt = chain_stmt.where(NoteVersion.version_number <= version_number)
+        chain = self.db.execute(
+            chain_stmt.where(NoteVersion.version_number >= snapshot_stmt.scalar_subquery())
+            .order_by(NoteVersion.version_number.asc())
+        ).scalars().all()
+        if not chain:
+            return None
+        return content_from_chain(list(chain))
+
+    def get_current_contents(self, note_ids: Iterable[uuid.UUID]) -> dict[uuid.UUID, NoteVersionContent]:
+        """Reconstructs the current content of many notes with a single chain query."""
+        note_ids = list(note_ids)
+        if not note_ids:
+            return {}
+        versions = self.db.execute(
+            select(NoteVersion)
+            .join(ClinicalNote, current_chain_condition())
+            .where(ClinicalNote.id.in_(note_ids))
+            .order_by(NoteVersion.note_id, NoteVersion.version_number.asc())
+        ).scalars().all()
+        return {
+            note_id: content_from_chain(list(chain))
+            for note_id, chain in groupby(versions, key=lambda version: version.note_id)
+        }
+
+    def get_current_content(self, note_id: uuid.UUID) -> NoteVersionContent | None:
+        return self.get_current_contents([note_id]).get(note_id)
+
+    def append(
+        self,
+        *,
+        note: ClinicalNote,
+        version_number: int,
+        is_addendum: bool,
+        texts: dict[str, str | None],
+        created_by_user_id: uuid.UUID,
+        previous: NoteVersionContent | None = None,
+    ) -> NoteVersion:
+        texts = {field: texts.get(field) for field in NOTE_TEXT_FIELDS}
+        delta = version_delta(previous.texts, previous.chain_length, texts) if previous is not None else None
+        version = NoteVersion(
+            id=uuid.uuid4(),
+            note_id=note.id,
+            version_number=version_number,
+            is_addendum=is_addendum,
+            is_snapshot=delta is None,
+            delta=delta,
+            created_by_user_id=created_by_user_id,
+            **(texts if delta is None else {}),
+        )
+        note.current_version_id = version.id
+        note.search_vector = note_search_vector(texts)
+        self.db.add(version)
+        return version
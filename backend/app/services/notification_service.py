@@ -0,0 +1,230 @@
+import argparse
+import datetime as dt
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Callable
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.metrics import notifications_total
+from app.db.enums import NotificationChannel, NotificationStatus
+from app.db.models import Notification, PatientProfile, User
+from app.services.notification_transports import (
+    NotificationDeliveryError,
+    NotificationTransport,
+    OutgoingMessage,
+    PermanentNotificationError,
+    build_transports,
+)
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATION_WORKER_ENABLED = os.getenv("NOTIFICATION_WORKER_ENABLED", "true").lower() in {"1", "true", "yes"}
+NOTIFICATION_POLL_SECONDS = float(os.getenv("NOTIFICATION_POLL_SECONDS", "5"))
+NOTIFICATION_BATCH_SIZE = int(os.getenv("NOTIFICATION_BATCH_SIZE", "50"))
+NOTIFICATION_MAX_ATTEMPTS = int(os.getenv("NOTIFICATION_MAX_ATTEMPTS", "6"))
+NOTIFICATION_RETRY_BASE_SECONDS = float(os.getenv("NOTIFICATION_RETRY_BASE_SECONDS", "30"))
+NOTIFICATION_RETRY_MAX_SECONDS = float(os.getenv("NOTIFICATION_RETRY_MAX_SECONDS", "3600"))
+
+# template -> (subject, body); fields are filled from the notification payload.
+NOTIFICATION_TEMPLATES: dict[str, tuple[str, str]] = {
+    "appointment_reminder_24h": (
+        "Przypomnienie o jutrzejszej wizycie",
+        "Przypominamy o wizycie ({service_name}) dla: {child_first_name}, {start_local}.",
+    ),
+    "appointment_reminder_2h": (
+        "Wizyta za 2 godziny",
+        "Wizyta ({service_name}) dla: {child_first_name} rozpocznie się o {start_local}.",
+    ),
+}
+
+
+def render_notification(template: str, payload: dict[str, Any] | None) -> tuple[str, str]:
+    """Fills a registered template; unregistered templates must carry ``subject``/``body`` in the payload."""
+    payload = payload or {}
+    if template not in NOTIFICATION_TEMPLATES:
+        if "body" not in payload:
+            raise PermanentNotificationError(f"Unknown notification template: {template}")
+        return str(payload.get("subject", "")), str(payload["body"])
+    subject, body = NOTIFICATION_TEMPLATES[template]
+    try:
+        return subject.format_map(payload), body.format_map(payload)
+    except (KeyError, IndexError) as exc:
+        raise PermanentNotificationError(f"Template {template} is missing {exc}") from exc
+
+
+def retry_delay(attempts: int, *, base_seconds: float, max_seconds: float) -> dt.timedelta:
+    """Exponential backoff with +-20% jitter so failed batches do not retry in lockstep."""
+    delay = min(max_seconds, base_seconds * 2 ** max(attempts - 1, 0))
+    return dt.timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+class NotificationDispatcher:
+    """Claims due notifications with FOR UPDATE SKIP LOCKED and hands them to the channel transports.
+
+    Rows stay locked until the batch commits, so any number of processes can poll the same
+    table without sending a notification twice; a process dying mid-batch releases its rows
+    for another attempt (delivery is at-least-once).
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        transports: dict[NotificationChannel, NotificationTransport],
+        *,
+        batch_size: int = NOTIFICATION_BATCH_SIZE,
+        max_attempts: int = NOTIFICATION_MAX_ATTEMPTS,
+        retry_base_seconds: float = NOTIFICATION_RETRY_BASE_SECONDS,
+        retry_max_seconds: float = NOTIFICATION_RETRY_MAX_SECONDS,
+    ) -> None:
+        self.db = db
+        self.transports = transports
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+
+    def dispatch_batch(self) -> int:
+        """Sends one batch of due notifications and commits; returns how many were claimed."""
+        now = dt.datetime.now(dt.timezone.utc)
+        rows = self.db.execute(
+            select(Notification, User.email, func.coalesce(User.phone, PatientProfile.phone))
+            .join(User, User.id == Notification.user_id)
+            .outerjoin(PatientProfile, PatientProfile.user_id == User.id)
+            .where(
+                Notification.status == NotificationStatus.PENDING,
+                or_(Notification.scheduled_at.is_(None), Notification.scheduled_at <= now),
+            )
+            .order_by(Notification.scheduled_at.asc().nulls_first())
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True, of=Notification)
+        ).all()
+        for notification, email, phone in rows:
+            self._deliver(notification, email if notification.channel == NotificationChannel.EMAIL else phone)
+        self.db.commit()
+        return len(rows)
+
+    def _deliver(self, notification: Notification, recipient: str | None) -> None:
+        now = dt.datetime.now(dt.timezone.utc)
+        notification.attempts += 1
+        try:
+            if not recipient:
+                raise PermanentNotificationError(f"User has no {notification.channel.value} address")
+            transport = self.transports.get(notification.channel)
+            if transport is None:
+                raise PermanentNotificationError(f"No transport configured for {notification.channel.value}")
+            subject, body = render_notification(notification.template, notification.payload)
+            transport.send(
+                OutgoingMessage(
+                    notification_id=notification.id,
+                    channel=notification.channel,
+                    recipient=recipient,
+                    subject=subject,
+                    body=body,
+                )
+            )
+        except Exception as exc:  # noqa: BLE001
+            if not isinstance(exc, NotificationDeliveryError):
+                # Retried like any other failure rather than aborting the batch, whose earlier
+                # messages were already handed to their transports and would be sent again.
+                logger.exception("Unexpected error delivering notification %s", notification.id)
+                exc = NotificationDeliveryError(f"{exc.__class__.__name__}: {exc}")
+            notification.error = str(exc)
+            if isinstance(exc, PermanentNotificationError) or notification.attempts >= self.max_attempts:
+                notification.status = NotificationStatus.FAILED
+                notifications_total.labels(notification.channel.value, "failed").inc()
+                logger.warning("Notification %s failed: %s", notification.id, exc)
+                return
+            notification.scheduled_at = now + retry_delay(
+                notification.attempts, base_seconds=self.retry_base_seconds, max_seconds=self.retry_max_seconds
+            )
+            notifications_total.labels(notification.channel.value, "retried").inc()
+            return
+        notification.status = NotificationStatus.SENT
+        notification.sent_at = now
+        notification.error = None
+        notifications_total.labels(notification.channel.value, "sent").inc()
+
+
+class NotificationWorker:
+    """Background thread draining due notifications, then polling every ``interval_seconds``."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        transports: dict[NotificationChannel, NotificationTransport] | None = None,
+        *,
+        interval_seconds: float = NOTIFICATION_POLL_SECONDS,
+        batch_size: int = NOTIFICATION_BATCH_SIZE,
+    ) -> None:
+        self.session_factory = session_factory
+        self.transports = transports if transports is not None else build_transports()
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="notification-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            self.drain()
+            if self._stop.wait(self.interval_seconds):
+                return
+
+    def drain(self) -> int:
+        """Dispatches full batches until the queue has no due notifications left (or the worker stops)."""
+        dispatched = 0
+        while not self._stop.is_set():
+            db = self.session_factory()
+            try:
+                claimed = NotificationDispatcher(db, self.transports, batch_size=self.batch_size).dispatch_batch()
+            except Exception:  # noqa: BLE001
+                db.rollback()
+                logger.exception("Failed to dispatch notifications")
+                return dispatched
+            finally:
+                db.close()
+            dispatched += claimed
+            if claimed < self.batch_size:
+                return dispatched
+        return dispatched
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Send due notifications; run one process per worker.")
+    parser.add_argument("--once", action="store_true", help="Drain the due notifications and exit.")
+    parser.add_argument("--batch-size", type=int, default=NOTIFICATION_BATCH_SIZE)
+    parser.add_argument("--interval", type=float, default=NOTIFICATION_POLL_SECONDS)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    from app.db.session import SessionLocal
+
+    worker = NotificationWorker(SessionLocal, interval_seconds=args.interval, batch_size=args.batch_size)
+    if args.once:
+        logger.info("Dispatched %s notifications", worker.drain())
+        return
+    worker.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        worker.stop()
+
+
+if __name__ == "__main__":
+    main()
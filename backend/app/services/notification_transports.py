@@ -0,0 +1,122 @@
+import json
+import os
+import smtplib
+import threading
+import uuid
+from dataclasses import dataclass
+from email.message import EmailMessage
+from pathlib import Path
+from typing import Protocol
+
+from app.db.enums import NotificationChannel
+from app.utils.storage import ROOT_DIR
+
+NOTIFICATION_EMAIL_TRANSPORT = os.getenv("NOTIFICATION_EMAIL_TRANSPORT", "file")
+NOTIFICATION_SMS_TRANSPORT = os.getenv("NOTIFICATION_SMS_TRANSPORT", "file")
+NOTIFICATION_OUTBOX_DIR = Path(os.getenv("NOTIFICATION_OUTBOX_DIR", str(ROOT_DIR / "storage" / "outbox")))
+SMTP_HOST = os.getenv("SMTP_HOST", "localhost")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "25"))
+SMTP_USERNAME = os.getenv("SMTP_USERNAME")
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "false").lower() in {"1", "true", "yes"}
+SMTP_FROM = os.getenv("SMTP_FROM", "no-reply@akademiamysli.pl")
+SMTP_TIMEOUT_SECONDS = float(os.getenv("SMTP_TIMEOUT_SECONDS", "10"))
+
+
+class NotificationDeliveryError(Exception):
+    """Delivery failed but may succeed later; the notification is retried with backoff."""
+
+
+class PermanentNotificationError(NotificationDeliveryError):
+    """Delivery can never succeed (no recipient, rejected address, unknown template)."""
+
+
+@dataclass(frozen=True)
+class OutgoingMessage:
+    notification_id: uuid.UUID
+    channel: NotificationChannel
+    recipient: str
+    subject: str
+    body: str
+
+
+class NotificationTransport(Protocol):
+    def send(self, message: OutgoingMessage) -> None: ...
+
+
+class FileSinkTransport:
+    """Local stand-in for a provider: appends each message as a JSON line to ``<channel>.jsonl``."""
+
+    def __init__(self, directory: Path = NOTIFICATION_OUTBOX_DIR) -> None:
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    def send(self, message: OutgoingMessage) -> None:
+        line = json.dumps(
+            {
+                "notification_id": str(message.notification_id),
+                "recipient": message.recipient,
+                "subject": message.subject,
+                "body": message.body,
+            },
+            ensure_ascii=False,
+        )
+        try:
+            with self._lock:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                with (self.directory / f"{message.channel.value.lower()}.jsonl").open("a", encoding="utf-8") as outbox:
+                    outbox.write(line + "\n")
+        except OSError as exc:
+            raise NotificationDeliveryError(str(exc) or exc.__class__.__name__) from exc
+
+
+class SmtpTransport:
+    def __init__(
+        self,
+        *,
+        host: str = SMTP_HOST,
+        port: int = SMTP_PORT,
+        sender: str = SMTP_FROM,
+        username: str | None = SMTP_USERNAME,
+        password: str | None = SMTP_PASSWORD,
+        starttls: bool = SMTP_STARTTLS,
+        timeout: float = SMTP_TIMEOUT_SECONDS,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+
+    def send(self, message: OutgoingMessage) -> None:
+        email = EmailMessage()
+        email["From"] = self.sender
+        email["To"] = message.recipient
+        email["Subject"] = message.subject
+        email.set_content(message.body)
+        try:
+            with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+                if self.starttls:
+                    smtp.starttls()
+                if self.username:
+                    smtp.login(self.username, self.password or "")
+                smtp.send_message(email)
+        except smtplib.SMTPRecipientsRefused as exc:
+            raise PermanentNotificationError(f"Recipient refused: {message.recipient}") from exc
+        except (smtplib.SMTPException, OSError) as exc:
+            raise NotificationDeliveryError(str(exc) or exc.__class__.__name__) from exc
+
+
+def build_transports() -> dict[NotificationChannel, NotificationTransport]:
+    """Transports selected by NOTIFICATION_EMAIL_TRANSPORT (file|smtp) and NOTIFICATION_SMS_TRANSPORT (file)."""
+    if NOTIFICATION_EMAIL_TRANSPORT not in {"file", "smtp"}:
+        raise RuntimeError(f"Unknown email transport: {NOTIFICATION_EMAIL_TRANSPORT}")
+    if NOTIFICATION_SMS_TRANSPORT != "file":
+        raise RuntimeError(f"Unknown SMS transport: {NOTIFICATION_SMS_TRANSPORT}")
+    file_sink = FileSinkTransport()
+    return {
+        NotificationChannel.EMAIL: SmtpTransport() if NOTIFICATION_EMAIL_TRANSPORT == "smtp" else file_sink,
+        NotificationChannel.SMS: file_sink,
+    }
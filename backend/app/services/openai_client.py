@@ -1,9 +1,11 @@
 import os
+import time
 from dataclasses import dataclass
 from typing import List
 
 import httpx
 
+from app.core.metrics import ai_request_duration_seconds, ai_requests_total, ai_tokens_total
 from app.schemas.ai import ChatMessage
 
 
@@ -27,7 +29,7 @@ class OpenAIClient:
             timeout=float(os.getenv("OPENAI_TIMEOUT", "20")),
         )
 
-    def generate(self, system_prompt: str, messages: List[ChatMessage]) -> str:
+    def generate(self, system_prompt: str, messages: List[ChatMessage], *, operation: str = "chat") -> str:
         payload = {
             "model": self.config.model,
             "messages": [
@@ -44,11 +46,28 @@ class OpenAIClient:
             "Content-Type": "application/json",
         }
         url = f"{self.config.base_url}/chat/completions"
-        with httpx.Client(timeout=self.config.timeout) as client:
-            response = client.post(url, json=payload, headers=headers)
-            response.raise_for_status()
-        data = response.json()
-        return data["choices"][0]["message"]["content"].strip()
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            with httpx.Client(timeout=self.config.timeout) as client:
+                response = client.post(url, json=payload, headers=headers)
+                response.raise_for_status()
+            data = response.json()
+            content = data["choices"][0]["message"]["content"].strip()
+            outcome = "ok"
+        except httpx.TimeoutException:
+            outcome = "timeout"
+            raise
+        except httpx.HTTPStatusError:
+            outcome = "http_error"
+            raise
+        finally:
+            ai_request_duration_seconds.labels(operation).observe(time.perf_counter() - started)
+            ai_requests_total.labels(operation, outcome).inc()
+        usage = data.get("usage") or {}
+        ai_tokens_total.labels(operation, "prompt").inc(usage.get("prompt_tokens", 0))
+        ai_tokens_total.labels(operation, "completion").inc(usage.get("completion_tokens", 0))
+        return content
 
 
 class OpenAIService:
@@ -69,7 +88,7 @@ class OpenAIService:
             content_parts.append(f"Kontekst: {context}")
         content_parts.append(f"Wpis: {note}")
         messages = [ChatMessage(role="user", text="\n".join(content_parts))]
-        return self.client.generate(system_prompt, messages)
+        return self.client.generate(system_prompt, messages, operation="clinical_suggestions")
 
     def public_chat(self, history: List[ChatMessage], message: str) -> str:
         system_prompt = (
@@ -81,4 +100,4 @@ class OpenAIService:
             "Jeśli użytkownik pyta o cennik lub wolne terminy, skieruj go do zakładki \"Rejestracja\" lub \"Usługi\"."
         )
         messages = [*history, ChatMessage(role="user", text=message)]
-        return self.client.generate(system_prompt, messages)
+        return self.client.generate(system_prompt, messages, operation="public_chat")
@@ -0,0 +1,317 @@
+import csv
+import os
+import uuid
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, Sequence, TextIO
+
+from pydantic import ValidationError
+from sqlalchemy import func, select, text, update
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.core.security import UNUSABLE_PASSWORD_PREFIX, hash_passwords
+from app.db.bulk import copy_rows
+from app.db.enums import ConsentType, ContactChannel, UserRole
+from app.db.models import ChildProfile, User
+from app.schemas.admin import PatientCreateRequest
+from app.services.admin_service import generate_temporary_password
+from app.utils.patient_code import PatientCode
+
+PATIENT_IMPORT_BATCH_SIZE = int(os.getenv("PATIENT_IMPORT_BATCH_SIZE", "1000"))
+PASSWORD_HASH_BATCH_SIZE = int(os.getenv("PASSWORD_HASH_BATCH_SIZE", "500"))
+
+USER_COLUMNS = ("id", "email", "hashed_password", "role", "is_active", "is_verified", "phone")
+GUARDIAN_COLUMNS = (
+    "id",
+    "user_id",
+    "full_name",
+    "email",
+    "phone",
+    "address_line",
+    "city",
+    "postal_code",
+    "preferred_contact_channel",
+)
+GUARDIAN_CONTACT_COLUMNS = ("guardian_id", "channel", "value", "is_primary", "is_verified")
+CHILD_COLUMNS = ("id", "guardian_id", "first_name", "last_name", "date_of_birth", "gender", "pesel", "mrn_number")
+CHILD_CONTACT_COLUMNS = ("child_id", "address_line", "city", "postal_code", "school_name", "class_name")
+CONSENT_COLUMNS = ("guardian_id", "child_id", "consent_type")
+
+
+@dataclass
+class PatientImportRowError:
+    line: int
+    message: str
+
+
+@dataclass
+class ImportedPatient:
+    line: int
+    user_id: uuid.UUID
+    guardian_id: uuid.UUID
+    child_id: uuid.UUID
+    guardian_email: str
+    record_code: str
+    temporary_password: str
+
+
+@dataclass
+class PatientImportResult:
+    imported: list[ImportedPatient] = field(default_factory=list)
+    errors: list[PatientImportRowError] = field(default_factory=list)
+    pending_credentials: list[tuple[uuid.UUID, str]] = field(default_factory=list)
+
+
+@dataclass
+class _GuardianRef:
+    user_id: uuid.UUID
+    guardian_id: uuid.UUID
+    password: str
+
+
+@dataclass
+class _Batch:
+    users: list[tuple] = field(default_factory=list)
+    guardians: list[tuple] = field(default_factory=list)
+    guardian_contacts: list[tuple] = field(default_factory=list)
+    children: list[list] = field(default_factory=list)
+    child_contacts: list[tuple] = field(default_factory=list)
+    consents: list[tuple] = field(default_factory=list)
+    imported: list[ImportedPatient] = field(default_factory=list)
+    new_guardian_emails: list[str] = field(default_factory=list)
+    credentials: list[tuple[uuid.UUID, str]] = field(default_factory=list)
+
+
+def iter_csv_rows(stream: TextIO) -> Iterator[tuple[int, dict]]:
+    """Yields (line, row) pairs; CSV headers are PatientCreateRequest field names."""
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield reader.line_num, {
+            key.strip(): (value.strip() or None) if isinstance(value, str) else value
+            for key, value in row.items()
+            if key
+        }
+
+
+def iter_jsonl_rows(stream: TextIO) -> Iterator[tuple[int, str]]:
+    for line_number, line in enumerate(stream, start=1):
+        if line.strip():
+            yield line_number, line
+
+
+def _format_validation_error(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}" for error in exc.errors()
+    )
+
+
+class PatientImportService:
+    """Imports guardians with children in batches using COPY.
+
+    Rows are validated one at a time and written per batch, so memory stays bounded
+    by the batch size. Accounts are created with an unusable password;
+    ``hash_pending_passwords`` fills in the real hashes afterwards on the process pool.
+    Rows sharing a guardian email are imported as siblings under one guardian.
+    """
+
+    def __init__(self, db: Session, *, batch_size: int = PATIENT_IMPORT_BATCH_SIZE) -> None:
+        self.db = db
+        self.batch_size = batch_size
+        self._guardians: dict[str, _GuardianRef] = {}
+        self._pesels: set[str] = set()
+
+    def import_rows(self, rows: Iterable[tuple[int, dict | str]]) -> PatientImportResult:
+        result = PatientImportResult()
+        batch: list[tuple[int, PatientCreateRequest]] = []
+        for line, raw in rows:
+            try:
+                if isinstance(raw, str):
+                    record = PatientCreateRequest.model_validate_json(raw)
+                else:
+                    record = PatientCreateRequest.model_validate(raw)
+            except ValidationError as exc:
+                result.errors.append(PatientImportRowError(line=line, message=_format_validation_error(exc)))
+                continue
+            batch.append((line, record))
+            if len(batch) >= self.batch_size:
+                self._import_batch(batch, result)
+                batch = []
+        if batch:
+            self._import_batch(batch, result)
+        return result
+
+    def hash_pending_passwords(self, credentials: Sequence[tuple[uuid.UUID, str]]) -> int:
+        """Replaces the placeholder hashes of imported accounts, committing per chunk."""
+        updated = 0
+        for start in range(0, len(credentials), PASSWORD_HASH_BATCH_SIZE):
+            chunk = credentials[start:start + PASSWORD_HASH_BATCH_SIZE]
+            hashes = hash_passwords([password for _, password in chunk])
+            self.db.execute(
+                update(User),
+                [
+                    {"id": user_id, "hashed_password": hashed}
+                    for (user_id, _), hashed in zip(chunk, hashes)
+                ],
+            )
+            self.db.commit()
+            updated += len(chunk)
+        return updated
+
+    def _import_batch(self, records: list[tuple[int, PatientCreateRequest]], result: PatientImportResult) -> None:
+        new_emails = {record.guardian_email for _, record in records} - self._guardians.keys()
+        existing_emails = set(
+            self.db.execute(select(User.email).where(User.email.in_(new_emails))).scalars()
+        ) if new_emails else set()
+        pesels = {record.child_pesel for _, record in records if record.child_pesel}
+        existing_pesels = set(
+            self.db.execute(select(ChildProfile.pesel).where(ChildProfile.pesel.in_(pesels))).scalars()
+        ) if pesels else set()
+
+        batch = _Batch()
+        batch_pesels: set[str] = set()
+        for line, record in records:
+            if record.guardian_email in existing_emails:
+                result.errors.append(PatientImportRowError(line=line, message="User already exists"))
+                continue
+            pesel = record.child_pesel
+            if pesel and (pesel in existing_pesels or pesel in self._pesels or pesel in batch_pesels):
+                result.errors.append(PatientImportRowError(line=line, message="Duplicate PESEL"))
+                continue
+            if pesel:
+                batch_pesels.add(pesel)
+            self._add_record(batch, line, record)
+
+        if not batch.children:
+            return
+
+        numbers = self.db.execute(
+            select(func.nextval(text("'mrn_number_seq'"))).select_from(func.generate_series(1, len(batch.children)))
+        ).scalars().all()
+        for child, imported, number in zip(batch.children, batch.imported, numbers):
+            child[-1] = number
+            imported.record_code = PatientCode.format(number)
+
+        try:
+            self._copy("users", USER_COLUMNS, batch.users)
+            self._copy("patient_profiles", GUARDIAN_COLUMNS, batch.guardians)
+            self._copy("guardian_contacts", GUARDIAN_CONTACT_COLUMNS, batch.guardian_contacts)
+            self._copy("child_profiles", CHILD_COLUMNS, batch.children)
+            self._copy("child_contacts", CHILD_CONTACT_COLUMNS, batch.child_contacts)
+            self._copy("consents", CONSENT_COLUMNS, batch.consents)
+            self.db.commit()
+        except DBAPIError as exc:
+            self.db.rollback()
+            for email in batch.new_guardian_emails:
+                self._guardians.pop(email, None)
+            message = f"Batch rejected by database: {exc.orig or exc}".splitlines()[0]
+            result.errors.extend(PatientImportRowError(line=item.line, message=message) for item in batch.imported)
+            return
+
+        self._pesels.update(batch_pesels)
+        result.imported.extend(batch.imported)
+        result.pending_credentials.extend(batch.credentials)
+
+    def _add_record(self, batch: _Batch, line: int, record: PatientCreateRequest) -> None:
+        guardian = self._guardians.get(record.guardian_email)
+        if guardian is None:
+            guardian = _GuardianRef(
+                user_id=uuid.uuid4(),
+                guardian_id=uuid.uuid4(),
+                password=generate_temporary_password(),
+            )
+            self._guardians[record.guardian_email] = guardian
+            batch.new_guardian_emails.append(record.guardian_email)
+            batch.credentials.append((guardian.user_id, guardian.password))
+            batch.users.append(
+                (
+                    guardian.user_id,
+                    record.guardian_email,
+                    UNUSABLE_PASSWORD_PREFIX,
+                    UserRole.GUARDIAN.name,
+                    True,
+                    True,
+                    record.guardian_phone,
+                )
+            )
+            batch.guardians.append(
+                (
+                    guardian.guardian_id,
+                    guardian.user_id,
+                    record.guardian_full_name,
+                    record.guardian_email,
+                    record.guardian_phone,
+                    record.guardian_address_line,
+                    record.guardian_city,
+                    record.guardian_postal_code,
+                    record.guardian_preferred_contact_channel.name
+                    if record.guardian_preferred_contact_channel
+                    else None,
+                )
+            )
+            if record.guardian_email:
+                batch.guardian_contacts.append(
+                    (guardian.guardian_id, ContactChannel.EMAIL.name, record.guardian_email, True, True)
+                )
+            if record.guardian_phone:
+                batch.guardian_contacts.append(
+                    (
+                        guardian.guardian_id,
+                        ContactChannel.PHONE.name,
+                        record.guardian_phone,
+                        not bool(record.guardian_email),
+                        False,
+                    )
+                )
+
+        child_id = uuid.uuid4()
+        batch.children.append(
+            [
+                child_id,
+                guardian.guardian_id,
+                record.child_first_name,
+                record.child_last_name,
+                record.child_date_of_birth,
+                record.child_gender.name if record.child_gender else None,
+                record.child_pesel,
+                None,
+            ]
+        )
+        has_child_contact = any(
+            [
+                record.child_address_line,
+                record.child_city,
+                record.child_postal_code,
+                record.child_school_name,
+                record.child_class_name,
+            ]
+        )
+        if has_child_contact:
+            batch.child_contacts.append(
+                (
+                    child_id,
+                    record.child_address_line,
+                    record.child_city,
+                    record.child_postal_code,
+                    record.child_school_name,
+                    record.child_class_name,
+                )
+            )
+        if record.consent_rodo:
+            batch.consents.append((guardian.guardian_id, child_id, ConsentType.RODO.name))
+        if record.consent_guardian:
+            batch.consents.append((guardian.guardian_id, child_id, ConsentType.GUARDIAN.name))
+        batch.imported.append(
+            ImportedPatient(
+                line=line,
+                user_id=guardian.user_id,
+                guardian_id=guardian.guardian_id,
+                child_id=child_id,
+                guardian_email=record.guardian_email,
+                record_code="",
+                temporary_password=guardian.password,
+            )
+        )
+
+    def _copy(self, table: str, columns: Sequence[str], rows: list) -> None:
+        if rows:
+            copy_rows(self.db, table, columns, rows)
@@ -1,5 +1,5 @@
 from fastapi import HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 
 from app.db.enums import ConsentType, ContactChannel
@@ -12,6 +12,7 @@ from app.db.models import (
     User,
 )
 from app.schemas.onboarding import PatientOnboardingRequest
+from app.services.token_service import AuthenticatedUser
 from app.utils.patient_code import PatientCode
 
 
@@ -22,7 +23,7 @@ class PatientOnboardingService:
     def create_guardian_with_child(
         self,
         *,
-        user: User,
+        user: AuthenticatedUser,
         payload: PatientOnboardingRequest,
     ) -> tuple[ChildProfile, str]:
         existing_guardian = self.db.execute(
@@ -45,7 +46,8 @@ class PatientOnboardingService:
         self.db.flush()
 
         if payload.guardian_phone:
-            user.phone = payload.guardian_phone
+            # The caller is a token-derived AuthenticatedUser, not an ORM row, so write it explicitly.
+            self.db.execute(update(User).where(User.id == user.id).values(phone=payload.guardian_phone))
 
         self.db.add(
             GuardianContact(
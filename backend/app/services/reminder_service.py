@@ -0,0 +1,281 @@
+import argparse
+import datetime as dt
+import logging
+import os
+import threading
+import uuid
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+import sqlalchemy as sa
+from sqlalchemy import and_, delete, exists, func, or_, select, update
+from sqlalchemy.dialects.postgresql import JSONB, insert
+from sqlalchemy.orm import Session
+
+from app.db.enums import AppointmentStatus, ContactChannel, NotificationChannel, NotificationStatus
+from app.db.models import Appointment, ChildProfile, Doctor, Notification, PatientProfile, Service, User
+
+logger = logging.getLogger(__name__)
+
+REMINDER_SCHEDULER_ENABLED = os.getenv("REMINDER_SCHEDULER_ENABLED", "true").lower() in {"1", "true", "yes"}
+REMINDER_SCHEDULE_SECONDS = float(os.getenv("REMINDER_SCHEDULE_SECONDS", "300"))
+REMINDER_HORIZON_HOURS = float(os.getenv("REMINDER_HORIZON_HOURS", "48"))
+
+# template -> how long before the appointment start the reminder goes out
+APPOINTMENT_REMINDERS: dict[str, dt.timedelta] = {
+    "appointment_reminder_24h": dt.timedelta(hours=24),
+    "appointment_reminder_2h": dt.timedelta(hours=2),
+}
+# Serializes planning runs across API processes; any constant key shared by all of them works.
+REMINDER_PLANNER_LOCK_KEY = 4_217_300_042
+
+
+@dataclass
+class ReminderPlan:
+    planned: int
+    removed: int
+
+
+class ReminderService:
+    """Keeps one notification per upcoming CONFIRMED appointment and reminder template.
+
+    Planning is a single statement over every appointment in the horizon: it rewrites the
+    reminders whose appointment moved (or whose channel changed while still pending) and
+    inserts the missing ones, so reruns are no-ops. A DELETE then drops pending reminders of
+    cancelled, moved or started visits. ``notifications`` is partitioned and cannot carry a
+    unique constraint on the reminder key, so runs are serialized with an advisory lock.
+    """
+
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    def plan(
+        self,
+        *,
+        now: dt.datetime | None = None,
+        horizon: dt.timedelta = dt.timedelta(hours=REMINDER_HORIZON_HOURS),
+        appointment_ids: Iterable[uuid.UUID] | None = None,
+    ) -> ReminderPlan:
+        """Plans reminders for appointments starting within ``horizon``; the caller commits."""
+        self.db.execute(select(func.pg_advisory_xact_lock(REMINDER_PLANNER_LOCK_KEY)))
+        return self._plan(now=now, horizon=horizon, appointment_ids=appointment_ids)
+
+    def plan_exclusive(
+        self,
+        *,
+        now: dt.datetime | None = None,
+        horizon: dt.timedelta = dt.timedelta(hours=REMINDER_HORIZON_HOURS),
+    ) -> ReminderPlan | None:
+        """Like ``plan`` but skips the run when another process is planning; commits."""
+        locked = self.db.execute(select(func.pg_try_advisory_xact_lock(REMINDER_PLANNER_LOCK_KEY))).scalar_one()
+        if not locked:
+            self.db.rollback()
+            return None
+        result = self._plan(now=now, horizon=horizon, appointment_ids=None)
+        self.db.commit()
+        return result
+
+    def _plan(
+        self, *, now: dt.datetime | None, horizon: dt.timedelta, appointment_ids: Iterable[uuid.UUID] | None
+    ) -> ReminderPlan:
+        now = now or dt.datetime.now(dt.timezone.utc)
+        appointment_ids = list(appointment_ids) if appointment_ids is not None else None
+        planned = self.db.execute(self._upsert_statement(now, horizon, appointment_ids)).scalar_one()
+        removed = self.db.execute(self._cleanup_statement(now, appointment_ids)).rowcount
+        return ReminderPlan(planned=planned, removed=removed)
+
+    def _upsert_statement(
+        self, now: dt.datetime, horizon: dt.timedelta, appointment_ids: list[uuid.UUID] | None
+    ):
+        reminders = sa.values(
+            sa.column("template", sa.String),
+            sa.column("lead", sa.Interval),
+            name="reminders",
+        ).data(list(APPOINTMENT_REMINDERS.items()))
+        remind_at = Appointment.start_at - reminders.c.lead
+        channel = sa.cast(
+            sa.case(
+                (
+                    and_(
+                        PatientProfile.preferred_contact_channel == ContactChannel.SMS,
+                        func.coalesce(User.phone, PatientProfile.phone).is_not(None),
+                    ),
+                    NotificationChannel.SMS.value,
+                ),
+                else_=NotificationChannel.EMAIL.value,
+            ),
+            Notification.__table__.c.channel.type,
+        )
+        payload = sa.type_coerce(
+            func.jsonb_build_object(
+                "appointment_start_at",
+                Appointment.start_at,
+                "start_local",
+                func.to_char(func.timezone(Doctor.timezone, Appointment.start_at), "DD.MM.YYYY HH24:MI"),
+                "child_first_name",
+                ChildProfile.first_name,
+                "service_name",
+                Service.name,
+            ),
+            JSONB,
+        )
+        planned_query = (
+            select(
+                PatientProfile.user_id.label("user_id"),
+                Appointment.id.label("appointment_id"),
+                channel.label("channel"),
+                reminders.c.template,
+                payload.label("payload"),
+                remind_at.label("scheduled_at"),
+            )
+            .select_from(Appointment)
+            .join(reminders, sa.true())
+            .join(PatientProfile, PatientProfile.id == Appointment.guardian_id)
+            .join(User, User.id == PatientProfile.user_id)
+            .join(ChildProfile, ChildProfile.id == Appointment.child_id)
+            .join(Doctor, Doctor.id == Appointment.doctor_id)
+            .join(Service, Service.id == Appointment.service_id)
+            .where(
+                Appointment.status == AppointmentStatus.CONFIRMED,
+                Appointment.start_at > now,
+                Appointment.start_at <= now + horizon,
+                remind_at > now,
+            )
+        )
+        if appointment_ids is not None:
+            planned_query = planned_query.where(Appointment.id.in_(appointment_ids))
+        planned = planned_query.cte("planned")
+
+        notifications = Notification.__table__
+        same_reminder = and_(
+            notifications.c.appointment_id == planned.c.appointment_id,
+            notifications.c.user_id == planned.c.user_id,
+            notifications.c.template == planned.c.template,
+        )
+        start_changed = notifications.c.payload["appointment_start_at"].astext.cast(
+            sa.DateTime(timezone=True)
+        ) != planned.c.payload["appointment_start_at"].astext.cast(sa.DateTime(timezone=True))
+        updated = (
+            update(notifications)
+            .where(
+                same_reminder,
+                or_(
+                    start_changed,
+                    and_(
+                        notifications.c.status == NotificationStatus.PENDING,
+                        notifications.c.channel != planned.c.channel,
+                    ),
+                ),
+            )
+            .values(
+                channel=planned.c.channel,
+                payload=planned.c.payload,
+                scheduled_at=planned.c.scheduled_at,
+                status=NotificationStatus.PENDING,
+                attempts=0,
+                sent_at=None,
+                error=None,
+            )
+            .returning(sa.literal(1))
+            .cte("updated")
+        )
+        columns = ["user_id", "appointment_id", "channel", "template", "payload", "scheduled_at"]
+        inserted = (
+            insert(notifications)
+            .from_select(
+                columns,
+                select(*(planned.c[name] for name in columns)).where(~exists().where(same_reminder)),
+            )
+            .returning(sa.literal(1))
+            .cte("inserted")
+        )
+        # Both CTEs see the same snapshot; UPDATE never changes which reminders exist.
+        return select(
+            select(func.count()).select_from(updated).scalar_subquery()
+            + select(func.count()).select_from(inserted).scalar_subquery()
+        )
+
+    def _cleanup_statement(self, now: dt.datetime, appointment_ids: list[uuid.UUID] | None):
+        still_planned = exists().where(
+            Appointment.id == Notification.appointment_id,
+            Appointment.status == AppointmentStatus.CONFIRMED,
+            Appointment.start_at > now,
+            Appointment.start_at
+            == Notification.payload["appointment_start_at"].astext.cast(sa.DateTime(timezone=True)),
+        )
+        statement = delete(Notification).where(
+            Notification.status == NotificationStatus.PENDING,
+            Notification.template.in_(APPOINTMENT_REMINDERS),
+            ~still_planned,
+        )
+        if appointment_ids is not None:
+            statement = statement.where(Notification.appointment_id.in_(appointment_ids))
+        return statement.execution_options(synchronize_session=False)
+
+
+class ReminderScheduler:
+    """Background thread re-planning appointment reminders every ``interval_seconds``."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        *,
+        interval_seconds: float = REMINDER_SCHEDULE_SECONDS,
+    ) -> None:
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="reminder-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            self.run_once()
+            if self._stop.wait(self.interval_seconds):
+                return
+
+    def run_once(self) -> ReminderPlan | None:
+        db = self.session_factory()
+        try:
+            result = ReminderService(db).plan_exclusive()
+            if result and (result.planned or result.removed):
+                logger.info("Planned %s appointment reminders, removed %s", result.planned, result.removed)
+            return result
+        except Exception:  # noqa: BLE001
+            db.rollback()
+            logger.exception("Failed to plan appointment reminders")
+            return None
+        finally:
+            db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Plan appointment reminder notifications.")
+    parser.add_argument("--horizon-hours", type=float, default=REMINDER_HORIZON_HOURS)
+    args = parser.parse_args()
+
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        result = ReminderService(db).plan_exclusive(horizon=dt.timedelta(hours=args.horizon_hours))
+    finally:
+        db.close()
+    if result is None:
+        print("Another process is planning reminders; nothing done.")
+    else:
+        print(f"Planned {result.planned} reminders, removed {result.removed}.")
+
+
+if __name__ == "__main__":
+    main()
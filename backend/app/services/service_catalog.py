@@ -0,0 +1,128 @@
+import datetime as dt
+import hashlib
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable
+from zoneinfo import ZoneInfo
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db.change_tracking import on_commit_of
+from app.db.models import Service, ServicePrice
+from app.db.session import SessionLocal
+from app.schemas.services import ServiceCatalogItem
+from app.services.service_price_service import ServicePriceService
+
+logger = logging.getLogger(__name__)
+
+SERVICE_CATALOG_TIMEZONE = ZoneInfo(os.getenv("SERVICE_CATALOG_TIMEZONE", "Europe/Warsaw"))
+# Bounds how long another process's catalog edit can go unseen here.
+SERVICE_CATALOG_TTL_SECONDS = float(os.getenv("SERVICE_CATALOG_TTL_SECONDS", "300"))
+SERVICE_CATALOG_MAX_AGE_SECONDS = int(os.getenv("SERVICE_CATALOG_MAX_AGE_SECONDS", "300"))
+
+_catalog_adapter = TypeAdapter(list[ServiceCatalogItem])
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    body: bytes
+    etag: str
+    built_on: dt.date
+    built_at: float
+
+
+class ServiceCatalog:
+    """The active services with today's prices, serialized once to JSON and shared by requests.
+
+    The snapshot is rebuilt on the first request after a local commit to ``services`` or
+    ``service_prices``, after midnight (prices are dated) and once ``ttl_seconds`` old. The
+    ETag is a hash of the body, so a rebuild that changes nothing keeps client caches valid.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        *,
+        ttl_seconds: float = SERVICE_CATALOG_TTL_SECONDS,
+    ) -> None:
+        self.session_factory = session_factory
+        self.ttl_seconds = ttl_seconds
+        # _build_lock lets one request rebuild at a time; _lock guards the snapshot and generation.
+        self._build_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._snapshot: CatalogSnapshot | None = None
+        self._generation = 0
+
+    def snapshot(self) -> CatalogSnapshot:
+        current = self._snapshot
+        if current and self._is_fresh(current):
+            return current
+        with self._build_lock:
+            with self._lock:
+                previous, generation = self._snapshot, self._generation
+            if previous and self._is_fresh(previous):
+                return previous
+            db = self.session_factory()
+            try:
+                current = self.build(db)
+            finally:
+                db.close()
+            with self._lock:
+                # A commit invalidated the catalog while we read; serve this build once, keep none.
+                if generation != self._generation:
+                    return current
+                self._snapshot = current
+            if current.etag != (previous.etag if previous else None):
+                logger.info("Rebuilt service catalog %s", current.etag)
+            return current
+
+    def build(self, db: Session) -> CatalogSnapshot:
+        today = dt.datetime.now(SERVICE_CATALOG_TIMEZONE).date()
+        services = db.execute(select(Service).where(Service.is_active.is_(True)).order_by(Service.name)).scalars().all()
+        prices = ServicePriceService(db)
+        items = []
+        for service in services:
+            quote = prices.price_at(service.id, today)
+            items.append(
+                ServiceCatalogItem(
+                    id=service.id,
+                    name=service.name,
+                    description=service.description,
+                    service_type=service.service_type,
+                    duration_minutes=service.default_duration_minutes,
+                    price=float(quote.price if quote else service.default_price),
+                    currency=quote.currency if quote else service.currency,
+                    min_age=service.min_age,
+                    max_age=service.max_age,
+                    group_capacity=service.group_capacity,
+                    waitlist_enabled=service.waitlist_enabled,
+                )
+            )
+        db.rollback()
+        body = _catalog_adapter.dump_json(items)
+        etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        return CatalogSnapshot(body=body, etag=etag, built_on=today, built_at=time.monotonic())
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._snapshot = None
+            self._generation += 1
+
+    def _is_fresh(self, snapshot: CatalogSnapshot) -> bool:
+        return (
+            time.monotonic() - snapshot.built_at < self.ttl_seconds
+            and snapshot.built_on == dt.datetime.now(SERVICE_CATALOG_TIMEZONE).date()
+        )
+
+
+service_catalog = ServiceCatalog(SessionLocal)
+on_commit_of((Service, ServicePrice), service_catalog.invalidate)
+
+
+def get_service_catalog() -> ServiceCatalog:
+    return service_catalog
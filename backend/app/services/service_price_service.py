@@ -0,0 +1,198 @@
+import datetime as dt
+import logging
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_right
+from collections import defaultdict
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Callable, Iterable
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import DATERANGE
+from sqlalchemy.orm import Session
+
+from app.db.change_tracking import on_commit_of
+from app.db.models import ServicePrice
+
+logger = logging.getLogger(__name__)
+
+SERVICE_PRICE_SYNC_SECONDS = float(os.getenv("SERVICE_PRICE_SYNC_SECONDS", "300"))
+
+
+@dataclass(frozen=True)
+class PriceQuote:
+    price: Decimal
+    currency: str
+    valid_from: dt.date
+    valid_to: dt.date | None
+
+
+class PriceHistory:
+    """Price history of one service flattened into sorted, non-overlapping segments.
+
+    Where ranges overlap the one that started last wins, as in billing. ``price_at`` is a
+    binary search over the segment starts.
+    """
+
+    def __init__(self, quotes: Iterable[PriceQuote]) -> None:
+        quotes = list(quotes)
+        bounds = sorted({quote.valid_from for quote in quotes} | {quote.valid_to for quote in quotes if quote.valid_to})
+        self._starts: list[dt.date] = []
+        self._quotes: list[PriceQuote | None] = []
+        for start in bounds:
+            covering = [
+                quote
+                for quote in quotes
+                if quote.valid_from <= start and (quote.valid_to is None or quote.valid_to > start)
+            ]
+            self._starts.append(start)
+            self._quotes.append(max(covering, key=lambda quote: quote.valid_from) if covering else None)
+
+    def price_at(self, day: dt.date) -> PriceQuote | None:
+        index = bisect_right(self._starts, day) - 1
+        return self._quotes[index] if index >= 0 else None
+
+
+class ServicePriceCache:
+    """Process-local price histories of every service, loaded from ``service_prices``.
+
+    Local commits that touch ``service_prices`` invalidate it (see ``on_commit_of``); until
+    the syncer has reloaded, lookups fall back to the database. Other processes' changes
+    arrive with the next periodic sync.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._histories: dict[uuid.UUID, PriceHistory] | None = None
+        self._generation = 0
+        self._changed = threading.Event()
+
+    @property
+    def loaded(self) -> bool:
+        return self._histories is not None
+
+    def histories(self) -> dict[uuid.UUID, PriceHistory] | None:
+        return self._histories
+
+    def load(self, db: Session) -> int:
+        with self._lock:
+            generation = self._generation
+            self._changed.clear()
+        rows = db.execute(
+            select(
+                ServicePrice.service_id,
+                ServicePrice.price,
+                ServicePrice.currency,
+                ServicePrice.valid_from,
+                ServicePrice.valid_to,
+            )
+        ).all()
+        db.rollback()
+        quotes: dict[uuid.UUID, list[PriceQuote]] = defaultdict(list)
+        for service_id, price, currency, valid_from, valid_to in rows:
+            quotes[service_id].append(PriceQuote(price, currency, valid_from, valid_to))
+        histories = {service_id: PriceHistory(service_quotes) for service_id, service_quotes in quotes.items()}
+        with self._lock:
+            # A commit invalidated the cache while we read; keep falling back until the next load.
+            if generation != self._generation:
+                return 0
+            self._histories = histories
+        return len(rows)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._histories = None
+            self._generation += 1
+        self._changed.set()
+
+    def wait_for_change(self, timeout: float) -> bool:
+        return self._changed.wait(timeout)
+
+    def wake(self) -> None:
+        self._changed.set()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histories = None
+            self._changed.clear()
+
+
+service_price_cache = ServicePriceCache()
+on_commit_of((ServicePrice,), service_price_cache.invalidate)
+
+
+class ServicePriceService:
+    def __init__(self, db: Session, cache: ServicePriceCache = service_price_cache) -> None:
+        self.db = db
+        self.cache = cache
+
+    def price_at(self, service_id: uuid.UUID, day: dt.date) -> PriceQuote | None:
+        """Price of ``service_id`` on ``day``, or None when no range covers it."""
+        histories = self.cache.histories()
+        if histories is not None:
+            history = histories.get(service_id)
+            return history.price_at(day) if history else None
+        return self._price_at_from_db(service_id, day)
+
+    def _price_at_from_db(self, service_id: uuid.UUID, day: dt.date) -> PriceQuote | None:
+        # Matches the GiST index on (service_id, daterange(valid_from, valid_to)).
+        validity = func.daterange(ServicePrice.valid_from, ServicePrice.valid_to, type_=DATERANGE)
+        row = self.db.execute(
+            select(ServicePrice.price, ServicePrice.currency, ServicePrice.valid_from, ServicePrice.valid_to)
+            .where(ServicePrice.service_id == service_id, validity.contains(day))
+            .order_by(ServicePrice.valid_from.desc())
+            .limit(1)
+        ).first()
+        return PriceQuote(*row) if row else None
+
+
+class ServicePriceSyncer:
+    """Background thread reloading the price cache after local changes and every ``interval_seconds``."""
+
+    def __init__(
+        self,
+        cache: ServicePriceCache,
+        session_factory: Callable[[], Session],
+        *,
+        interval_seconds: float = SERVICE_PRICE_SYNC_SECONDS,
+    ) -> None:
+        self.cache = cache
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self.sync()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="service-price-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self.cache.wake()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            self.cache.wait_for_change(self.interval_seconds)
+            if self._stop.is_set():
+                return
+            self.sync()
+
+    def sync(self) -> None:
+        db = self.session_factory()
+        started = time.perf_counter()
+        try:
+            prices = self.cache.load(db)
+            logger.debug("Loaded %s service prices in %.3fs", prices, time.perf_counter() - started)
+        except Exception:  # noqa: BLE001
+            db.rollback()
+            logger.exception("Failed to load service prices")
+        finally:
+            db.close()
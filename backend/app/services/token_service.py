@@ -0,0 +1,403 @@
+import datetime as dt
+import logging
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable
+
+from fastapi import HTTPException, status
+from jose import JWTError
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.security import (
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    REFRESH_TOKEN_EXPIRE_DAYS,
+    create_access_token,
+    create_refresh_token,
+    decode_refresh_token,
+)
+from app.db.enums import UserRole
+from app.db.models import Doctor, TokenRevocation, User
+from app.utils.bloom_filter import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+# Trust role/email/doctor claims of unrevoked access tokens instead of loading the user per request.
+# Trusted requests skip the users.is_active check, so claims are only trusted for tokens issued
+# within AUTH_TRUST_TOKEN_CLAIMS_MAX_AGE_SECONDS; older tokens load the user again. A deactivated
+# user therefore keeps access for at most that long (or until the token expires, if sooner).
+AUTH_TRUST_TOKEN_CLAIMS = os.getenv("AUTH_TRUST_TOKEN_CLAIMS", "false").lower() in {"1", "true", "yes"}
+AUTH_TRUST_TOKEN_CLAIMS_MAX_AGE_SECONDS = float(os.getenv("AUTH_TRUST_TOKEN_CLAIMS_MAX_AGE_SECONDS", "300"))
+# The database is only consulted for tokens the revocation filter flags. A revocation made by
+# another worker reaches this worker's filter on its next sync, so a revoked access token can
+# still be accepted here for up to TOKEN_REVOCATION_SYNC_SECONDS. Revocations made by this
+# worker take effect immediately.
+TOKEN_REVOCATION_SYNC_SECONDS = float(os.getenv("TOKEN_REVOCATION_SYNC_SECONDS", "30"))
+TOKEN_REVOCATION_FALSE_POSITIVE_RATE = float(os.getenv("TOKEN_REVOCATION_FALSE_POSITIVE_RATE", "0.001"))
+
+
+def token_revocation_key(token_id: str) -> str:
+    return f"jti:{token_id}"
+
+
+def user_revocation_key(user_id: uuid.UUID) -> str:
+    return f"user:{user_id}"
+
+
+def family_revocation_key(family_id: str) -> str:
+    return f"fam:{family_id}"
+
+
+def _timestamp(value: Any) -> dt.datetime | None:
+    return dt.datetime.fromtimestamp(value, dt.timezone.utc) if value is not None else None
+
+
+@dataclass
+class AuthenticatedUser:
+    id: uuid.UUID
+    email: str
+    role: UserRole
+    doctor_id: uuid.UUID | None = None
+    token_id: str | None = None
+    token_expires_at: dt.datetime | None = None
+
+
+@dataclass
+class AccessTokenClaims:
+    user_id: uuid.UUID
+    role: UserRole | None
+    email: str | None
+    doctor_id: uuid.UUID | None
+    token_id: str | None
+    family_id: str | None
+    issued_at: dt.datetime | None
+    expires_at: dt.datetime | None
+
+    @classmethod
+    def from_payload(cls, payload: dict[str, Any]) -> "AccessTokenClaims":
+        subject = payload.get("sub")
+        if not subject:
+            raise ValueError("Token has no subject")
+        return cls(
+            user_id=uuid.UUID(subject),
+            role=UserRole(payload["role"]) if payload.get("role") else None,
+            email=payload.get("email"),
+            doctor_id=uuid.UUID(payload["doc"]) if payload.get("doc") else None,
+            token_id=payload.get("jti"),
+            family_id=payload.get("fam"),
+            issued_at=_timestamp(payload.get("iat")),
+            expires_at=_timestamp(payload.get("exp")),
+        )
+
+    @property
+    def is_self_contained(self) -> bool:
+        """Tokens issued before the claims were added still need the database."""
+        return bool(self.role and self.email and self.token_id and self.issued_at)
+
+    def issued_within(self, seconds: float) -> bool:
+        if self.issued_at is None:
+            return False
+        return dt.datetime.now(dt.timezone.utc) - self.issued_at <= dt.timedelta(seconds=seconds)
+
+    def revocation_keys(self) -> list[str]:
+        keys = [user_revocation_key(self.user_id)]
+        if self.token_id:
+            keys.append(token_revocation_key(self.token_id))
+        if self.family_id:
+            keys.append(family_revocation_key(self.family_id))
+        return keys
+
+    def to_user(self) -> AuthenticatedUser:
+        return AuthenticatedUser(
+            id=self.user_id,
+            email=self.email or "",
+            role=self.role,
+            doctor_id=self.doctor_id,
+            token_id=self.token_id,
+            token_expires_at=self.expires_at,
+        )
+
+
+@dataclass
+class TokenPair:
+    access_token: str
+    refresh_token: str
+    expires_in: int
+
+
+def issue_token_pair(
+    *,
+    user_id: uuid.UUID,
+    role: UserRole,
+    email: str,
+    doctor_id: uuid.UUID | None = None,
+    family_id: str | None = None,
+) -> TokenPair:
+    family_id = family_id or str(uuid.uuid4())
+    claims: dict[str, Any] = {"role": role.value, "email": email, "fam": family_id}
+    if doctor_id:
+        claims["doc"] = str(doctor_id)
+    return TokenPair(
+        access_token=create_access_token(subject=str(user_id), extra=claims),
+        refresh_token=create_refresh_token(subject=str(user_id), family_id=family_id),
+        expires_in=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    )
+
+
+@dataclass
+class TokenRevocationStats:
+    synced: bool
+    keys: int
+    recent_keys: int
+    filter_bytes: int
+    syncs_total: int
+    checks_total: int
+    suspect_total: int
+
+
+class TokenRevocationList:
+    """Process-local view of ``token_revocations`` consulted before a token is trusted.
+
+    ``sync`` rebuilds a Bloom filter from the table; keys revoked by this process since
+    the last sync are kept in an exact set. A hit only means "check the database", and
+    until the first sync every token is treated as a hit.
+    """
+
+    def __init__(self, false_positive_rate: float = TOKEN_REVOCATION_FALSE_POSITIVE_RATE) -> None:
+        self.false_positive_rate = false_positive_rate
+        self._lock = threading.Lock()
+        self._filter: BloomFilter | None = None
+        self._keys = 0
+        self._recent: set[str] = set()
+        self._syncs = 0
+        self._checks = 0
+        self._suspects = 0
+
+    def might_be_revoked(self, keys: Iterable[str]) -> bool:
+        with self._lock:
+            bloom, recent = self._filter, self._recent
+            self._checks += 1
+            suspect = bloom is None or any(key in recent or key in bloom for key in keys)
+            if suspect:
+                self._suspects += 1
+            return suspect
+
+    def add(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            self._recent = self._recent | set(keys)
+
+    def sync(self, db: Session) -> int:
+        with self._lock:
+            # Keys added from here on may be committed after the query below reads the table.
+            covered = set(self._recent)
+        db.execute(delete(TokenRevocation).where(TokenRevocation.expires_at <= func.now()))
+        db.commit()
+        keys = db.execute(select(TokenRevocation.key)).scalars().all()
+        db.rollback()
+        bloom = BloomFilter(max(len(keys), 1024), self.false_positive_rate)
+        for key in keys:
+            bloom.add(key)
+        with self._lock:
+            self._filter = bloom
+            self._keys = len(keys)
+            self._recent = self._recent - covered
+            self._syncs += 1
+        return len(keys)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._filter = None
+            self._keys = 0
+            self._recent = set()
+
+    def stats(self) -> TokenRevocationStats:
+        with self._lock:
+            return TokenRevocationStats(
+                synced=self._filter is not None,
+                keys=self._keys,
+                recent_keys=len(self._recent),
+                filter_bytes=self._filter.nbytes if self._filter else 0,
+                syncs_total=self._syncs,
+                checks_total=self._checks,
+                suspect_total=self._suspects,
+            )
+
+
+token_revocation_list = TokenRevocationList()
+
+
+class TokenRevocationSyncer:
+    """Background thread reloading the revocation filter so other workers' revocations arrive."""
+
+    def __init__(
+        self,
+        revocations: TokenRevocationList,
+        session_factory: Callable[[], Session],
+        *,
+        interval_seconds: float = TOKEN_REVOCATION_SYNC_SECONDS,
+    ) -> None:
+        self.revocations = revocations
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self.sync()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="token-revocation-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            self.sync()
+
+    def sync(self) -> None:
+        db = self.session_factory()
+        started = time.perf_counter()
+        try:
+            keys = self.revocations.sync(db)
+            logger.debug("Loaded %s token revocations in %.3fs", keys, time.perf_counter() - started)
+        except Exception:  # noqa: BLE001
+            db.rollback()
+            logger.exception("Failed to sync token revocations")
+        finally:
+            db.close()
+
+
+class TokenService:
+    """Refresh-token rotation and revocation; revocations are rows keyed by token, family or user."""
+
+    def __init__(self, db: Session, revocations: TokenRevocationList = token_revocation_list) -> None:
+        self.db = db
+        self.revocations = revocations
+
+    def authenticate(self, claims: AccessTokenClaims, *, check_revocations: bool) -> AuthenticatedUser:
+        if check_revocations and self._is_revoked(claims.revocation_keys(), claims.issued_at):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
+        row = self._load_user(claims.user_id)
+        if not row or not row[0].is_active:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found or inactive")
+        user, doctor_id = row
+        return AuthenticatedUser(
+            id=user.id,
+            email=user.email,
+            role=user.role,
+            doctor_id=doctor_id,
+            token_id=claims.token_id,
+            token_expires_at=claims.expires_at,
+        )
+
+    def refresh(self, refresh_token: str) -> TokenPair:
+        try:
+            payload = decode_refresh_token(refresh_token)
+            user_id = uuid.UUID(payload["sub"])
+            token_id, family_id = str(payload["jti"]), str(payload["fam"])
+            issued_at, expires_at = _timestamp(payload["iat"]), _timestamp(payload["exp"])
+        except (JWTError, KeyError, ValueError) as exc:
+            raise self._invalid_refresh() from exc
+
+        if self._is_revoked([user_revocation_key(user_id), family_revocation_key(family_id)], issued_at):
+            raise self._invalid_refresh()
+
+        # Rotation: the presented token is revoked as it is used. Losing the insert race
+        # means it was used before, so the whole family is ended.
+        rotated = self.db.execute(
+            insert(TokenRevocation)
+            .values(key=token_revocation_key(token_id), expires_at=expires_at)
+            .on_conflict_do_nothing()
+            .returning(TokenRevocation.key)
+        ).first()
+        if rotated is None:
+            self._store({family_revocation_key(family_id): self._refresh_horizon()})
+            raise self._invalid_refresh()
+
+        row = self._load_user(user_id)
+        self.db.commit()
+        if not row or not row[0].is_active:
+            raise self._invalid_refresh()
+        user, doctor_id = row
+        return issue_token_pair(
+            user_id=user.id,
+            role=user.role,
+            email=user.email,
+            doctor_id=doctor_id,
+            family_id=family_id,
+        )
+
+    def revoke(self, user: AuthenticatedUser, refresh_token: str | None = None) -> None:
+        """Logout: ends the presented access token and, when given, the refresh token's family."""
+        entries: dict[str, dt.datetime] = {}
+        if user.token_id and user.token_expires_at:
+            entries[token_revocation_key(user.token_id)] = user.token_expires_at
+        if refresh_token:
+            try:
+                payload = decode_refresh_token(refresh_token)
+            except JWTError:
+                payload = {}
+            if payload.get("sub") == str(user.id) and payload.get("fam"):
+                entries[family_revocation_key(str(payload["fam"]))] = self._refresh_horizon()
+        if entries:
+            self._store(entries)
+
+    def revoke_user(self, user_id: uuid.UUID) -> None:
+        """Ends every token issued to the user so far, e.g. after a password reset."""
+        key = user_revocation_key(user_id)
+        # Not now(): that is the transaction start, which may predate tokens issued meanwhile.
+        revoked_at = dt.datetime.now(dt.timezone.utc)
+        expires_at = self._refresh_horizon()
+        self.db.execute(
+            insert(TokenRevocation)
+            .values(key=key, revoked_at=revoked_at, expires_at=expires_at)
+            .on_conflict_do_update(
+                index_elements=[TokenRevocation.key],
+                set_={"revoked_at": revoked_at, "expires_at": expires_at},
+            )
+        )
+        self.db.commit()
+        self.revocations.add([key])
+
+    def _store(self, entries: dict[str, dt.datetime]) -> None:
+        self.db.execute(
+            insert(TokenRevocation)
+            .values([{"key": key, "expires_at": expires_at} for key, expires_at in entries.items()])
+            .on_conflict_do_nothing()
+        )
+        self.db.commit()
+        self.revocations.add(entries)
+
+    def _is_revoked(self, keys: list[str], issued_at: dt.datetime | None) -> bool:
+        rows = self.db.execute(
+            select(TokenRevocation.key, TokenRevocation.revoked_at).where(TokenRevocation.key.in_(keys))
+        ).all()
+        for key, revoked_at in rows:
+            if not key.startswith("user:"):
+                return True
+            # Tokens with a whole-second ``iat`` from the revocation's second count as revoked.
+            if issued_at is None or issued_at <= revoked_at:
+                return True
+        return False
+
+    def _load_user(self, user_id: uuid.UUID) -> tuple[User, uuid.UUID | None] | None:
+        row = self.db.execute(
+            select(User, Doctor.id)
+            .outerjoin(Doctor, Doctor.user_id == User.id)
+            .where(User.id == user_id)
+        ).first()
+        return tuple(row) if row else None
+
+    def _refresh_horizon(self) -> dt.datetime:
+        return dt.datetime.now(dt.timezone.utc) + dt.timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+
+    def _invalid_refresh(self) -> HTTPException:
+        return HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
@@ -0,0 +1,26 @@
+import base64
+import datetime as dt
+from uuid import UUID
+
+
+class AuditLogCursor:
+    SEPARATOR = "|"
+
+    @classmethod
+    def encode(cls, created_at: dt.datetime, log_id: UUID) -> str:
+        raw = cls.SEPARATOR.join([created_at.isoformat(), str(log_id)])
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+    @classmethod
+    def decode(cls, cursor: str) -> tuple[dt.datetime, UUID]:
+        padded = cursor.strip() + "=" * (-len(cursor.strip()) % 4)
+        try:
+            raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+            created_at, log_id = raw.split(cls.SEPARATOR)
+            parsed_at = dt.datetime.fromisoformat(created_at)
+            parsed_id = UUID(log_id)
+        except (ValueError, UnicodeError) as exc:
+            raise ValueError("Invalid audit log cursor") from exc
+        if parsed_at.tzinfo is None:
+            raise ValueError("Invalid audit log cursor")
+        return parsed_at, parsed_id
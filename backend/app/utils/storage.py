@@ -5,6 +5,9 @@ from pathlib import Path
 from uuid import UUID
 
 from fastapi import UploadFile
+from fastapi.responses import FileResponse
+
+from app.core.metrics import storage_bytes_total
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 STORAGE_DIR = ROOT_DIR / "storage" / "attachments"
@@ -17,7 +20,9 @@ def save_upload(upload: UploadFile, attachment_id: UUID) -> tuple[str, int]:
     target_path = STORAGE_DIR / filename
     with target_path.open("wb") as buffer:
         shutil.copyfileobj(upload.file, buffer)
-    return str(target_path.relative_to(ROOT_DIR)), target_path.stat().st_size
+    size = target_path.stat().st_size
+    storage_bytes_total.labels("write").inc(size)
+    return str(target_path.relative_to(ROOT_DIR)), size
 
 
 def resolve_storage_path(storage_key: str) -> Path:
@@ -25,3 +30,8 @@ def resolve_storage_path(storage_key: str) -> Path:
     if ROOT_DIR not in path.parents and path != ROOT_DIR:
         raise ValueError("Invalid storage key")
     return path
+
+
+def storage_file_response(path: Path, *, media_type: str | None, filename: str) -> FileResponse:
+    storage_bytes_total.labels("read").inc(path.stat().st_size)
+    return FileResponse(path, media_type=media_type, filename=filename)
@@ -0,0 +1,64 @@
+from typing import Any, Mapping
+
+# A field delta is either {"ops": [[start, end, text], ...]} replacing old[start:end]
+# with text (positions refer to the previous value), or {"set": value} when the
+# previous or new value is NULL or when ops would not be smaller than the value.
+
+
+def encode_text_delta(old: str | None, new: str | None) -> dict[str, Any] | None:
+    if old == new:
+        return None
+    if old is None or new is None:
+        return {"set": new}
+
+    limit = min(len(old), len(new))
+    prefix = 0
+    while prefix < limit and old[prefix] == new[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and old[-suffix - 1] == new[-suffix - 1]:
+        suffix += 1
+
+    replacement = new[prefix:len(new) - suffix]
+    if len(replacement) >= len(new):
+        return {"set": new}
+    return {"ops": [[prefix, len(old) - suffix, replacement]]}
+
+
+def apply_text_delta(old: str | None, delta: Mapping[str, Any] | None) -> str | None:
+    if delta is None:
+        return old
+    if "set" in delta:
+        return delta["set"]
+    if old is None:
+        raise ValueError("Cannot apply text delta to NULL value")
+    parts: list[str] = []
+    position = 0
+    for start, end, text in delta["ops"]:
+        parts.append(old[position:start])
+        parts.append(text)
+        position = end
+    parts.append(old[position:])
+    return "".join(parts)
+
+
+def encode_fields_delta(
+    old: Mapping[str, str | None],
+    new: Mapping[str, str | None],
+) -> dict[str, dict[str, Any]]:
+    delta: dict[str, dict[str, Any]] = {}
+    for field, value in new.items():
+        field_delta = encode_text_delta(old.get(field), value)
+        if field_delta is not None:
+            delta[field] = field_delta
+    return delta
+
+
+def apply_fields_delta(
+    old: Mapping[str, str | None],
+    delta: Mapping[str, Mapping[str, Any]],
+) -> dict[str, str | None]:
+    values = dict(old)
+    for field, field_delta in delta.items():
+        values[field] = apply_text_delta(values.get(field), field_delta)
+    return values
@@ -0,0 +1,26 @@
+import base64
+import datetime as dt
+from uuid import UUID
+
+
+class TimelineCursor:
+    SEPARATOR = "|"
+
+    @classmethod
+    def encode(cls, occurred_at: dt.datetime, kind: str, item_id: UUID) -> str:
+        raw = cls.SEPARATOR.join([occurred_at.isoformat(), kind, str(item_id)])
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+    @classmethod
+    def decode(cls, cursor: str) -> tuple[dt.datetime, str, UUID]:
+        padded = cursor.strip() + "=" * (-len(cursor.strip()) % 4)
+        try:
+            raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+            occurred_at, kind, item_id = raw.split(cls.SEPARATOR)
+            parsed_at = dt.datetime.fromisoformat(occurred_at)
+            parsed_id = UUID(item_id)
+        except (ValueError, UnicodeError) as exc:
+            raise ValueError("Invalid timeline cursor") from exc
+        if parsed_at.tzinfo is None:
+            raise ValueError("Invalid timeline cursor")
+        return parsed_at, kind, parsed_id
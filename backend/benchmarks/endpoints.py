@@ -0,0 +1,480 @@
+"""Endpoint benchmarks against a synthetic dataset, with a stored baseline.
+
+    python -m app.db.seed_synthetic --size small --seed 0
+    python -m benchmarks.endpoints                      # compare with benchmarks/baseline.json
+    python -m benchmarks.endpoints --save-baseline      # record a new baseline
+
+Requests run through the ASGI app in-process, lifespan included, or against a running
+server with ``--base-url``. Either way the harness needs DATABASE_URL: it looks up the
+synthetic accounts and patients, and creates scratch encounters for the note writes.
+Rows and files the run creates are removed at the end, so runs can be repeated.
+The in-process run turns the login rate limiter off; a remote server needs
+LOGIN_RATE_LIMIT_ENABLED=false for the login scenario.
+
+Exits with status 1 when a scenario regresses against the baseline.
+"""
+
+import argparse
+import asyncio
+import datetime as dt
+import itertools
+import json
+import platform
+import sys
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+
+import httpx
+import sqlalchemy as sa
+from sqlalchemy import select
+
+from app.core.rate_limit import login_rate_limiter
+from app.db.enums import EncounterStatus, UserRole
+from app.db.models import Appointment, Attachment, ChildProfile, Doctor, Encounter, User
+from app.db.seed_synthetic import SYNTHETIC_PASSWORD, synthetic_email
+from app.db.session import SessionLocal
+from app.utils.storage import resolve_storage_path
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+BENCHMARK_DOCTORS = 4
+SEARCH_TERMS = ("zaburzenia", "snu", "szkole", "terapia", "nastroj", "kontrola")
+PATIENT_SEARCH_TERMS = ("Nowak", "Kowalski", "Mazur", "Wojcik", "Zielinski")
+UPLOAD_BYTES = b"%PDF-1.4\n% benchmark upload\n".ljust(16_384, b"\n")
+NOTE_TEXTS = {
+    "history_text": "Opiekun zglasza trudnosci z zasypianiem.",
+    "diagnosis_text": "Zaburzenia snu.",
+    "recommendations_text": "Dziennik snu prowadzony przez opiekuna.",
+}
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    requests: int
+    errors: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    throughput_rps: float
+
+
+@dataclass
+class BenchmarkData:
+    doctor_emails: list[str]
+    patients: list[tuple[int, uuid.UUID]]
+    encounters: list[tuple[int, uuid.UUID]]
+    guardian_emails: list[str]
+    tokens: list[str] = field(default_factory=list)
+    notes: list[tuple[int, str]] = field(default_factory=list)
+    attachments: list[tuple[int, str]] = field(default_factory=list)
+
+    def headers(self, doctor: int) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self.tokens[doctor]}"}
+
+
+@dataclass
+class Scenario:
+    """One endpoint under load; ``request`` builds the n-th call from ``BenchmarkData``."""
+
+    name: str
+    request: Callable[[BenchmarkData, int], tuple[str, str, dict[str, Any]]]
+    on_success: Callable[[BenchmarkData, int, httpx.Response], None] | None = None
+    # Scenarios that consume rows are capped by what earlier ones produced and get no warmup.
+    capacity: Callable[[BenchmarkData], int] | None = None
+
+
+def _patient(data: BenchmarkData, index: int) -> tuple[int, uuid.UUID]:
+    return data.patients[index % len(data.patients)]
+
+
+def _patient_get(suffix: str) -> Callable[[BenchmarkData, int], tuple[str, str, dict[str, Any]]]:
+    def build(data: BenchmarkData, index: int) -> tuple[str, str, dict[str, Any]]:
+        doctor, patient_id = _patient(data, index)
+        return "GET", f"/med/patients/{patient_id}/{suffix}", {"headers": data.headers(doctor)}
+
+    return build
+
+
+def _remember(target: str, key: str) -> Callable[[BenchmarkData, int, httpx.Response], None]:
+    def record(data: BenchmarkData, index: int, response: httpx.Response) -> None:
+        doctor = data.encounters[index][0] if target == "notes" else _patient(data, index)[0]
+        getattr(data, target).append((doctor, response.json()[key]))
+
+    return record
+
+
+SCENARIOS = [
+    Scenario(
+        "login",
+        lambda data, index: (
+            "POST",
+            "/auth/login",
+            {"json": {"email": data.guardian_emails[index % len(data.guardian_emails)], "password": SYNTHETIC_PASSWORD}},
+        ),
+    ),
+    Scenario(
+        "note_search",
+        lambda data, index: (
+            "GET",
+            "/med/notes/search",
+            {
+                "params": {"query": SEARCH_TERMS[index % len(SEARCH_TERMS)]},
+                "headers": data.headers(index % len(data.tokens)),
+            },
+        ),
+    ),
+    Scenario(
+        "patient_search",
+        lambda data, index: (
+            "GET",
+            "/med/patients/search",
+            {
+                "params": {"query": PATIENT_SEARCH_TERMS[index % len(PATIENT_SEARCH_TERMS)]},
+                "headers": data.headers(index % len(data.tokens)),
+            },
+        ),
+    ),
+    Scenario("patient_details", _patient_get("details")),
+    Scenario("patient_timeline", _patient_get("timeline")),
+    Scenario("patient_encounters", _patient_get("encounters")),
+    Scenario("patient_invoices", _patient_get("invoices")),
+    Scenario(
+        "doctor_appointments",
+        lambda data, index: ("GET", "/med/doctor/appointments", {"headers": data.headers(index % len(data.tokens))}),
+    ),
+    Scenario(
+        "attachment_upload",
+        lambda data, index: (
+            "POST",
+            f"/med/patients/{_patient(data, index)[1]}/attachments",
+            {
+                "headers": data.headers(_patient(data, index)[0]),
+                "files": {"file": (f"benchmark-{index}.pdf", UPLOAD_BYTES, "application/pdf")},
+            },
+        ),
+        on_success=_remember("attachments", "id"),
+    ),
+    Scenario(
+        "attachment_download",
+        lambda data, index: (
+            "GET",
+            f"/med/attachments/{data.attachments[index][1]}/download",
+            {"headers": data.headers(data.attachments[index][0])},
+        ),
+        capacity=lambda data: len(data.attachments),
+    ),
+    Scenario(
+        "note_create",
+        lambda data, index: (
+            "POST",
+            f"/med/encounters/{data.encounters[index][1]}/notes",
+            {"json": NOTE_TEXTS, "headers": data.headers(data.encounters[index][0])},
+        ),
+        on_success=_remember("notes", "id"),
+        capacity=lambda data: len(data.encounters),
+    ),
+    Scenario(
+        "note_update",
+        lambda data, index: (
+            "PATCH",
+            f"/med/notes/{data.notes[index][1]}",
+            {
+                "json": {**NOTE_TEXTS, "therapy_plan_text": f"Psychoterapia indywidualna, sesja {index}."},
+                "headers": data.headers(data.notes[index][0]),
+            },
+        ),
+        capacity=lambda data: len(data.notes),
+    ),
+    Scenario(
+        "note_sign",
+        lambda data, index: (
+            "POST",
+            f"/med/notes/{data.notes[index][1]}/sign",
+            {"json": {}, "headers": data.headers(data.notes[index][0])},
+        ),
+        capacity=lambda data: len(data.notes),
+    ),
+]
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    data: BenchmarkData,
+    *,
+    requests: int,
+    concurrency: int,
+    warmup: int,
+) -> ScenarioResult:
+    total = min(requests, scenario.capacity(data)) if scenario.capacity else requests
+    if scenario.capacity is None:
+        for index in range(warmup):
+            method, url, kwargs = scenario.request(data, index)
+            response = await client.request(method, url, **kwargs)
+            # Warmup writes are recorded like measured ones, so cleanup_data removes them too.
+            if response.status_code < 400 and scenario.on_success:
+                scenario.on_success(data, index, response)
+
+    indexes = itertools.count()
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal errors
+        while (index := next(indexes)) < total:
+            method, url, kwargs = scenario.request(data, index)
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+            elif scenario.on_success:
+                scenario.on_success(data, index, response)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+    ordered = sorted(latencies) or [0.0]
+    return ScenarioResult(
+        name=scenario.name,
+        requests=len(latencies),
+        errors=errors,
+        p50_ms=round(_percentile(ordered, 0.50) * 1000, 2),
+        p95_ms=round(_percentile(ordered, 0.95) * 1000, 2),
+        p99_ms=round(_percentile(ordered, 0.99) * 1000, 2),
+        throughput_rps=round(len(latencies) / wall, 1) if wall else 0.0,
+    )
+
+
+def prepare_data(seed: int, requests: int) -> BenchmarkData:
+    """Finds the synthetic accounts and patients and adds one scratch encounter per note write."""
+    session = SessionLocal()
+    try:
+        doctors = session.execute(
+            select(Doctor.id, User.email)
+            .join(User, User.id == Doctor.user_id)
+            .where(User.email.in_([synthetic_email(seed, f"doctor{index}") for index in range(BENCHMARK_DOCTORS)]))
+            .order_by(User.email)
+        ).all()
+        if not doctors:
+            raise SystemExit(f"No synthetic data for seed {seed}; run python -m app.db.seed_synthetic --seed {seed}")
+
+        patients: list[tuple[int, uuid.UUID, uuid.UUID]] = []
+        for position, (doctor_id, _) in enumerate(doctors):
+            rows = session.execute(
+                select(ChildProfile.id, ChildProfile.guardian_id)
+                .where(ChildProfile.id.in_(select(Appointment.child_id).where(Appointment.doctor_id == doctor_id)))
+                .order_by(ChildProfile.id)
+                .limit(max(1, requests // len(doctors)))
+            ).all()
+            patients.extend((position, child_id, guardian_id) for child_id, guardian_id in rows)
+
+        now = dt.datetime.now(dt.timezone.utc)
+        encounters = []
+        for index in range(requests):
+            position, child_id, guardian_id = patients[index % len(patients)]
+            encounter_id = uuid.uuid4()
+            session.add(
+                Encounter(
+                    id=encounter_id,
+                    doctor_id=doctors[position][0],
+                    guardian_id=guardian_id,
+                    child_id=child_id,
+                    status=EncounterStatus.OPEN,
+                    started_at=now,
+                )
+            )
+            encounters.append((position, encounter_id))
+        session.commit()
+
+        guardian_emails = session.execute(
+            select(User.email)
+            .where(User.email.like(synthetic_email(seed, "guardian%")), User.role == UserRole.GUARDIAN)
+            .order_by(User.email)
+            .limit(requests)
+        ).scalars().all()
+        return BenchmarkData(
+            doctor_emails=[email for _, email in doctors],
+            patients=[(position, child_id) for position, child_id, _ in patients],
+            encounters=encounters,
+            guardian_emails=list(guardian_emails),
+        )
+    finally:
+        session.close()
+
+
+def cleanup_data(data: BenchmarkData) -> None:
+    session = SessionLocal()
+    try:
+        attachment_ids = [uuid.UUID(attachment_id) for _, attachment_id in data.attachments]
+        storage_keys = session.execute(
+            sa.delete(Attachment).where(Attachment.id.in_(attachment_ids)).returning(Attachment.storage_key)
+        ).scalars().all()
+        # Notes written by the run cascade with their scratch encounters.
+        session.execute(sa.delete(Encounter).where(Encounter.id.in_([encounter_id for _, encounter_id in data.encounters])))
+        session.commit()
+    finally:
+        session.close()
+    for storage_key in storage_keys:
+        resolve_storage_path(storage_key).unlink(missing_ok=True)
+
+
+async def run_benchmarks(
+    data: BenchmarkData,
+    *,
+    base_url: str | None,
+    only: set[str] | None,
+    requests: int,
+    concurrency: int,
+    warmup: int,
+) -> list[ScenarioResult]:
+    if base_url:
+        client = httpx.AsyncClient(base_url=base_url, timeout=60)
+        lifespan = None
+    else:
+        from app.main import app
+
+        login_rate_limiter.enabled = False
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=60)
+        lifespan = app.router.lifespan_context(app)
+
+    results = []
+    async with client:
+        if lifespan is not None:
+            await lifespan.__aenter__()
+        try:
+            for email in data.doctor_emails:
+                response = await client.post("/auth/staff-login", json={"email": email, "password": SYNTHETIC_PASSWORD})
+                response.raise_for_status()
+                data.tokens.append(response.json()["access_token"])
+            for scenario in SCENARIOS:
+                # Producers always run, so a filtered run still has notes and attachments to work on.
+                if only and scenario.name not in only and scenario.on_success is None:
+                    continue
+                result = await run_scenario(
+                    client, scenario, data, requests=requests, concurrency=concurrency, warmup=warmup
+                )
+                if not only or scenario.name in only:
+                    results.append(result)
+                    print(_format_row(result), flush=True)
+        finally:
+            if lifespan is not None:
+                await lifespan.__aexit__(None, None, None)
+    return results
+
+
+def compare_to_baseline(
+    results: list[ScenarioResult],
+    baseline: dict[str, dict[str, float]],
+    *,
+    tolerance: float,
+    floor_ms: float,
+) -> list[str]:
+    """Regressions: p95 worse by more than ``tolerance`` and ``floor_ms``, lower throughput, or new errors."""
+    regressions = []
+    for result in results:
+        reference = baseline.get(result.name)
+        if reference is None:
+            continue
+        p95_limit = max(reference["p95_ms"] * (1 + tolerance), reference["p95_ms"] + floor_ms)
+        if result.p95_ms > p95_limit:
+            regressions.append(f"{result.name}: p95 {result.p95_ms} ms, baseline {reference['p95_ms']} ms")
+        if result.throughput_rps < reference["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{result.name}: {result.throughput_rps} req/s, baseline {reference['throughput_rps']} req/s"
+            )
+        if result.errors > reference.get("errors", 0):
+            regressions.append(f"{result.name}: {result.errors} errors, baseline {reference.get('errors', 0)}")
+    return regressions
+
+
+def _format_row(result: ScenarioResult) -> str:
+    return (
+        f"{result.name:<22} {result.requests:>6} {result.errors:>6} {result.p50_ms:>9.2f} "
+        f"{result.p95_ms:>9.2f} {result.p99_ms:>9.2f} {result.throughput_rps:>9.1f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark API endpoints against synthetic data.")
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic dataset to run against.")
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per scenario.")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--only", help="Comma-separated scenario names.")
+    parser.add_argument("--base-url", help="Benchmark a running server instead of the in-process app.")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.5, help="Allowed relative p95/throughput change; p95 of writes is noisy."
+    )
+    parser.add_argument("--floor-ms", type=float, default=2.0, help="p95 changes below this are never flagged.")
+    parser.add_argument("--json", type=Path, help="Also write the results to this file.")
+    args = parser.parse_args()
+
+    only = set(args.only.split(",")) if args.only else None
+    unknown = (only or set()) - {scenario.name for scenario in SCENARIOS}
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    data = prepare_data(args.seed, args.requests)
+    print(f"{'scenario':<22} {'count':>6} {'errors':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9}")
+    try:
+        results = asyncio.run(
+            run_benchmarks(
+                data,
+                base_url=args.base_url,
+                only=only,
+                requests=args.requests,
+                concurrency=args.concurrency,
+                warmup=args.warmup,
+            )
+        )
+    finally:
+        cleanup_data(data)
+
+    report = {
+        "meta": {
+            "seed": args.seed,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "target": args.base_url or "in-process",
+            "python": platform.python_version(),
+            "recorded_at": dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds"),
+        },
+        "scenarios": {result.name: asdict(result) for result in results},
+    }
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2) + "\n")
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one.")
+        return
+
+    stored = json.loads(args.baseline.read_text())
+    for key in ("requests", "concurrency", "target"):
+        if stored["meta"].get(key) != report["meta"][key]:
+            print(f"Note: baseline was recorded with {key}={stored['meta'].get(key)}")
+    regressions = compare_to_baseline(
+        results, stored["scenarios"], tolerance=args.tolerance, floor_ms=args.floor_ms
+    )
+    if regressions:
+        print("Regressions against baseline:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print(f"No regressions against baseline ({stored['meta'].get('recorded_at')}).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import os
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from query_budgets import BUDGETED_PREFIXES, QUERY_BUDGETS
+
+
+class StatementRecorder:
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.statements.append(statement)
+
+    @contextmanager
+    def capture(self):
+        from sqlalchemy import event
+
+        from app.db.session import engine
+
+        self.statements = []
+        event.listen(engine, "before_cursor_execute", self._record)
+        try:
+            yield self
+        finally:
+            event.remove(engine, "before_cursor_execute", self._record)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def statements_after_first_write(self) -> list[str]:
+        for index, statement in enumerate(self.statements):
+            if statement.lstrip().upper().startswith(("INSERT", "UPDATE", "DELETE")):
+                return self.statements[index:]
+        return []
+
+    def reads_after_first_write(self) -> list[str]:
+        return [
+            statement
+            for statement in self.statements_after_first_write()
+            if statement.lstrip().upper().startswith("SELECT")
+        ]
+
+
+class QueryBudgetClient(TestClient):
+    """TestClient that fails the test when a request runs more SQL statements than its route's budget.
+
+    Budgets are keyed by method and route template, so an N+1 on any path through an
+    endpoint shows up as soon as a test exercises it with more than one row.
+    """
+
+    def __init__(self, app, budgets: dict[tuple[str, str], int], recorder: StatementRecorder) -> None:
+        self.budgets = budgets
+        self.recorder = recorder
+        self.last_route: str | None = None
+        super().__init__(self._capture_route(app))
+
+    def _capture_route(self, app):
+        async def wrapper(scope, receive, send) -> None:
+            try:
+                await app(scope, receive, send)
+            finally:
+                if scope["type"] == "http":
+                    self.last_route = getattr(scope.get("route"), "path", None)
+
+        return wrapper
+
+    def request(self, method, url, *args, **kwargs):
+        self.last_route = None
+        with self.recorder.capture():
+            response = super().request(method, url, *args, **kwargs)
+        self._check_budget(method.upper(), self.last_route, self.recorder.statements)
+        return response
+
+    def _check_budget(self, method: str, route: str | None, statements: list[str]) -> None:
+        if not route or not route.startswith(BUDGETED_PREFIXES):
+            return
+        budget = self.budgets.get((method, route))
+        if budget is None:
+            pytest.fail(f"No query budget declared for {method} {route} in tests/query_budgets.py")
+        if len(statements) > budget:
+            listing = "\n".join(f"  {index + 1}. {' '.join(sql.split())[:200]}" for index, sql in enumerate(statements))
+            pytest.fail(f"{method} {route} ran {len(statements)} SQL statements, budget is {budget}:\n{listing}")
+
+
+@pytest.fixture(autouse=True)
+def reset_login_rate_limits(monkeypatch):
+    from app.core.rate_limit import InMemoryTokenBucketBackend, login_rate_limiter
+
+    # A fresh private backend per test: never reset buckets a configured Redis shares with other processes.
+    monkeypatch.setattr(login_rate_limiter, "backend", InMemoryTokenBucketBackend())
+    yield
+
+
+@pytest.fixture
+def sql_statements():
+    if not os.getenv("DATABASE_URL"):
+        pytest.skip("DATABASE_URL not set")
+    return StatementRecorder()
+
+
+@pytest.fixture
+def query_budget_client():
+    if not os.getenv("DATABASE_URL"):
+        pytest.skip("DATABASE_URL not set")
+    from app.db.session import SessionLocal
+    from app.main import app
+    from app.services.token_service import token_revocation_list
+
+    # Budgets describe the steady state, where the lifespan has loaded the revocation filter.
+    session = SessionLocal()
+    try:
+        token_revocation_list.sync(session)
+    finally:
+        session.close()
+    yield QueryBudgetClient(app, QUERY_BUDGETS, StatementRecorder())
+    token_revocation_list.reset()
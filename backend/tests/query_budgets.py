@@ -0,0 +1,70 @@
+"""Maximum SQL statements per request, by method and route template.
+
+Counts include authentication. Raise a budget only together with the change that
+needs the extra round-trip, and say why in the commit.
+"""
+
+BUDGETED_PREFIXES = ("/med/", "/patient/", "/admin/", "/services")
+
+QUERY_BUDGETS: dict[tuple[str, str], int] = {
+    # /med
+    ("GET", "/med/patients/{patient_id}/summary"): 4,
+    ("GET", "/med/patients/lookup"): 3,
+    # One query per contact/consent collection, independent of row counts.
+    ("GET", "/med/patients/{patient_id}/details"): 9,
+    ("GET", "/med/patients/search"): 2,
+    # Writes, then reloads the same nine-query view it returns.
+    ("PATCH", "/med/patients/{patient_id}/details"): 16,
+    ("GET", "/med/patients/{patient_id}/appointments"): 3,
+    ("GET", "/med/appointments/{appointment_id}"): 2,
+    ("GET", "/med/doctor/appointments"): 3,
+    ("GET", "/med/patients/{patient_id}/encounters"): 3,
+    ("GET", "/med/encounters/{encounter_id}"): 2,
+    ("GET", "/med/patients/{patient_id}/prescriptions"): 4,
+    ("GET", "/med/patients/{patient_id}/invoices"): 4,
+    ("GET", "/med/patients/{patient_id}/attachments"): 4,
+    ("GET", "/med/patients/{patient_id}/timeline"): 4,
+    ("POST", "/med/patients/{patient_id}/attachments"): 4,
+    ("GET", "/med/attachments/{attachment_id}/download"): 3,
+    ("POST", "/med/encounters/{encounter_id}/notes"): 6,
+    ("GET", "/med/notes/search"): 4,
+    ("PATCH", "/med/notes/{note_id}"): 6,
+    ("PUT", "/med/notes/{note_id}/draft"): 3,
+    ("GET", "/med/notes/{note_id}/draft"): 3,
+    ("POST", "/med/notes/{note_id}/draft/commit"): 6,
+    ("POST", "/med/notes/{note_id}/sign"): 6,
+    ("POST", "/med/notes/{note_id}/addendum"): 6,
+    # /patient
+    # With a guardian phone: the users.phone update and a second contact row.
+    ("POST", "/patient/onboarding"): 10,
+    # Guardian, children, one ranked query per section and unpaid invoices; 1 when cached.
+    ("GET", "/patient/dashboard"): 7,
+    # Batched over the requested children: guardian, children (the ownership check), one IN query.
+    ("GET", "/patient/children"): 3,
+    ("GET", "/patient/children/appointments"): 4,
+    ("GET", "/patient/children/encounters"): 4,
+    ("GET", "/patient/children/prescriptions"): 4,
+    ("GET", "/patient/children/attachments"): 4,
+    ("GET", "/patient/children/{child_id}/summary"): 3,
+    ("GET", "/patient/children/{child_id}/details"): 8,
+    ("GET", "/patient/children/{child_id}/appointments"): 4,
+    ("GET", "/patient/children/{child_id}/encounters"): 4,
+    ("GET", "/patient/children/{child_id}/prescriptions"): 4,
+    ("GET", "/patient/children/{child_id}/invoices"): 4,
+    ("GET", "/patient/children/{child_id}/attachments"): 4,
+    ("POST", "/patient/children/{child_id}/attachments"): 4,
+    ("GET", "/patient/attachments/{attachment_id}/download"): 4,
+    # /admin
+    ("POST", "/admin/doctors"): 6,
+    ("GET", "/admin/doctors"): 2,
+    ("POST", "/admin/patients"): 11,
+    ("POST", "/admin/patients/import"): 5,
+    ("GET", "/admin/patients"): 2,
+    ("POST", "/admin/users/{user_id}/reset-password"): 5,
+    ("GET", "/admin/audit-logs"): 2,
+    # One server-side cursor, fetched in batches, however many rows the export holds.
+    ("GET", "/admin/audit-logs/export"): 2,
+    # /services
+    # Served from the in-process catalog snapshot; only the request after a change rebuilds it.
+    ("GET", "/services"): 0,
+}
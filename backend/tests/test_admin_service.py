@@ -0,0 +1,58 @@
+import os
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+from sqlalchemy import select
+
+if not os.getenv("DATABASE_URL"):
+    pytest.skip("DATABASE_URL not set", allow_module_level=True)
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.core.security import get_password_hash, password_hash_pool
+from app.db.enums import UserRole
+from app.db.models import User
+from app.db.session import SessionLocal
+
+
+def test_admin_password_paths_answer_503_when_the_hash_queue_is_full(query_budget_client, monkeypatch):
+    client = query_budget_client
+    session = SessionLocal()
+    tag = uuid.uuid4().hex[:8]
+    admin = User(
+        email=f"admin-busy-{tag}@example.com",
+        hashed_password=get_password_hash("demo123"),
+        role=UserRole.ADMIN,
+        is_active=True,
+        is_verified=True,
+    )
+    session.add(admin)
+    session.commit()
+    try:
+        login = client.post("/auth/staff-login", json={"email": admin.email, "password": "demo123"})
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        hashed_before = admin.hashed_password
+
+        monkeypatch.setattr(password_hash_pool, "max_pending", 0)
+        doctor = client.post(
+            "/admin/doctors",
+            json={"email": f"doctor-busy-{tag}@example.com", "specialization": "Neurologopedia"},
+            headers=headers,
+        )
+        reset = client.post(f"/admin/users/{admin.id}/reset-password", headers=headers)
+
+        for response in (doctor, reset):
+            assert response.status_code == 503
+            assert response.headers["retry-after"] == "1"
+        session.refresh(admin)
+        assert admin.hashed_password == hashed_before
+        created = session.execute(select(User.id).where(User.email == f"doctor-busy-{tag}@example.com")).first()
+        assert created is None
+    finally:
+        session.rollback()
+        session.delete(admin)
+        session.commit()
+        session.close()
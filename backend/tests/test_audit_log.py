@@ -0,0 +1,237 @@
+import csv
+import datetime as dt
+import io
+import os
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+if not os.getenv("DATABASE_URL"):
+    pytest.skip("DATABASE_URL not set", allow_module_level=True)
+
+from sqlalchemy import select
+
+from app.db.models import Attachment, AuditLog
+from app.db.session import SessionLocal
+from app.services.audit_service import AuditEvent, AuditLogBuffer, audit_log_buffer
+
+
+def _event(action: str) -> AuditEvent:
+    return AuditEvent(
+        actor_user_id=None,
+        action=action,
+        resource_type="patient",
+        resource_id=str(uuid.uuid4()),
+        ip_address="127.0.0.1",
+        user_agent="pytest",
+        meta={"status": 200},
+        created_at=dt.datetime.now(dt.timezone.utc),
+    )
+
+
+def _logged(db, action_prefix: str) -> list[AuditLog]:
+    return db.execute(select(AuditLog).where(AuditLog.action.like(f"{action_prefix}%"))).scalars().all()
+
+
+def test_full_buffer_applies_backpressure_without_losing_events():
+    tag = uuid.uuid4().hex
+    buffer = AuditLogBuffer(SessionLocal, capacity=3, batch_size=2, backpressure_timeout=0)
+    for index in range(7):
+        buffer.record(_event(f"{tag} {index}"))
+
+    assert len(buffer) <= 3
+    buffer.flush_all()
+    assert len(buffer) == 0
+    db = SessionLocal()
+    rows = _logged(db, tag)
+    db.close()
+    assert sorted(row.action for row in rows) == [f"{tag} {index}" for index in range(7)]
+    assert rows[0].meta == {"status": 200}
+
+
+def test_med_requests_are_audited(query_budget_client):
+    from test_med_endpoints import _create_seed_data
+
+    seed = _create_seed_data()
+    db = SessionLocal()
+    db.add_all([seed["guardian_user"], seed["doctor_user"]])
+    db.flush()
+    db.add_all([seed["guardian"], seed["doctor"], seed["service"]])
+    db.flush()
+    db.add(seed["child"])
+    db.flush()
+    db.add(seed["appointment"])
+    db.commit()
+
+    login = query_budget_client.post(
+        "/auth/staff-login", json={"email": seed["doctor_user"].email, "password": "demo123"}
+    )
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}", "User-Agent": "audit-test"}
+    patient_id = seed["child"].id
+    assert query_budget_client.get(f"/med/patients/{patient_id}/details", headers=headers).status_code == 200
+    assert query_budget_client.get(f"/med/patients/{uuid.uuid4()}/details", headers=headers).status_code == 404
+    audit_log_buffer.flush_all()
+
+    rows = db.execute(
+        select(AuditLog)
+        .where(AuditLog.actor_user_id == seed["doctor_user"].id)
+        .order_by(AuditLog.created_at)
+    ).scalars().all()
+    db.close()
+    assert [(row.action, row.resource_type, row.meta["status"]) for row in rows] == [
+        ("GET /med/patients/{patient_id}/details", "patient", 200),
+        ("GET /med/patients/{patient_id}/details", "patient", 404),
+    ]
+    assert rows[0].resource_id == str(patient_id)
+    assert rows[0].user_agent == "audit-test"
+
+
+def test_audit_log_search_pages_by_key_and_exports_csv(query_budget_client):
+    from app.core.security import get_password_hash
+    from app.db.enums import UserRole
+    from app.db.models import User
+
+    db = SessionLocal()
+    tag = uuid.uuid4().hex[:8]
+    admin = User(
+        email=f"admin-{tag}@example.com",
+        hashed_password=get_password_hash("demo123"),
+        role=UserRole.ADMIN,
+        is_active=True,
+        is_verified=True,
+    )
+    db.add(admin)
+    db.commit()
+    child_id = str(uuid.uuid4())
+    now = dt.datetime.now(dt.timezone.utc)
+    for days_ago, action in [
+        (1, "GET /med/patients/{patient_id}/details"),
+        (40, "GET /patient/children/{child_id}/details"),
+        (45, "PATCH /med/patients/{patient_id}/details"),
+        (70, "GET /med/patients/{patient_id}/timeline"),
+        (200, "GET /med/patients/{patient_id}/details"),
+    ]:
+        audit_log_buffer.record(
+            AuditEvent(
+                actor_user_id=admin.id,
+                action=action,
+                resource_type="patient",
+                resource_id=child_id,
+                ip_address="10.0.0.1",
+                user_agent='=HYPERLINK("http://example.com")' if days_ago == 1 else "pytest",
+                meta={"status": 200},
+                created_at=now - dt.timedelta(days=days_ago),
+            )
+        )
+    audit_log_buffer.flush_all()
+    db.close()
+
+    login = query_budget_client.post("/auth/staff-login", json={"email": admin.email, "password": "demo123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    params = {"resource_type": "patient", "resource_id": child_id, "action": "GET ", "limit": 2}
+
+    first = query_budget_client.get("/admin/audit-logs", params=params, headers=headers)
+    assert first.status_code == 200
+    page = first.json()
+    assert [item["action"] for item in page["items"]] == [
+        "GET /med/patients/{patient_id}/details",
+        "GET /patient/children/{child_id}/details",
+    ]
+    assert page["items"][0]["actor_email"] == admin.email
+    second = query_budget_client.get(
+        "/admin/audit-logs", params={**params, "cursor": page["next_cursor"]}, headers=headers
+    ).json()
+    # The 200-day-old read is outside the default 90-day window.
+    assert [item["action"] for item in second["items"]] == ["GET /med/patients/{patient_id}/timeline"]
+    assert second["next_cursor"] is None
+
+    export = query_budget_client.get(
+        "/admin/audit-logs/export",
+        params={"resource_id": child_id, "since": (now - dt.timedelta(days=365)).isoformat()},
+        headers=headers,
+    )
+    assert export.status_code == 200
+    assert export.headers["content-type"].startswith("text/csv")
+    lines = export.text.splitlines()
+    assert lines[0].startswith("created_at,actor_user_id,actor_email,action")
+    assert len(lines) == 6
+    # Client-controlled text is exported as text, never as a spreadsheet formula.
+    user_agents = [row["user_agent"] for row in csv.DictReader(io.StringIO(export.text))]
+    assert user_agents.count("'=HYPERLINK(\"http://example.com\")") == 1
+    assert not any(agent.startswith("=") for agent in user_agents)
+
+    bad_range = query_budget_client.get(
+        "/admin/audit-logs", params={"since": now.isoformat(), "until": now.isoformat()}, headers=headers
+    )
+    assert bad_range.status_code == 400
+
+
+def test_clinical_reads_are_audited_against_the_patient(query_budget_client):
+    from test_med_endpoints import _create_seed_data
+
+    from app.utils.storage import resolve_storage_path
+
+    seed = _create_seed_data()
+    db = SessionLocal()
+    db.add_all([seed["guardian_user"], seed["doctor_user"]])
+    db.flush()
+    db.add_all([seed["guardian"], seed["doctor"], seed["service"]])
+    db.flush()
+    db.add(seed["child"])
+    db.flush()
+    db.add(seed["appointment"])
+    db.flush()
+    db.add(seed["encounter"])
+    db.commit()
+
+    client = query_budget_client
+    login = client.post("/auth/staff-login", json={"email": seed["doctor_user"].email, "password": "demo123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    patient_id = seed["child"].id
+
+    note = client.post(
+        f"/med/encounters/{seed['encounter'].id}/notes", json={"history_text": "Wywiad."}, headers=headers
+    ).json()
+    for text in ("Wywiad uzupełniony.", "Wywiad uzupełniony ponownie."):
+        draft = client.put(f"/med/notes/{note['id']}/draft", json={"history_text": text}, headers=headers)
+        assert draft.status_code == 200
+    assert client.get(f"/med/notes/{note['id']}/draft", headers=headers).status_code == 200
+    upload = client.post(
+        f"/med/patients/{patient_id}/attachments",
+        files={"file": ("opinia.pdf", b"%PDF-1.4 test", "application/pdf")},
+        headers=headers,
+    ).json()
+    try:
+        download = client.get(f"/med/attachments/{upload['id']}/download", headers=headers)
+        assert download.status_code == 200
+    finally:
+        db.rollback()
+        storage_key = db.execute(select(Attachment.storage_key).where(Attachment.id == upload["id"])).scalar_one()
+        resolve_storage_path(storage_key).unlink(missing_ok=True)
+    assert client.get("/med/doctor/appointments", headers=headers).status_code == 200
+    audit_log_buffer.flush_all()
+
+    actions = db.execute(
+        select(AuditLog.action).where(
+            AuditLog.actor_user_id == seed["doctor_user"].id,
+            AuditLog.resource_type == "patient",
+            AuditLog.resource_id == str(patient_id),
+        )
+    ).scalars().all()
+    db.close()
+    assert sorted(actions) == sorted(
+        [
+            "POST /med/encounters/{encounter_id}/notes",
+            "PUT /med/notes/{note_id}/draft",
+            "PUT /med/notes/{note_id}/draft",
+            "GET /med/notes/{note_id}/draft",
+            "POST /med/patients/{patient_id}/attachments",
+            "GET /med/attachments/{attachment_id}/download",
+            "GET /med/doctor/appointments",
+        ]
+    )
@@ -0,0 +1,122 @@
+import os
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.utils.bloom_filter import BloomFilter
+
+
+def test_bloom_filter_has_no_false_negatives():
+    keys = [f"jti:{uuid.uuid4()}" for _ in range(2000)]
+    bloom = BloomFilter(len(keys), 0.001)
+    for key in keys:
+        bloom.add(key)
+
+    assert all(key in bloom for key in keys)
+    false_positives = sum(f"jti:{uuid.uuid4()}" in bloom for _ in range(20000))
+    assert false_positives < 100
+
+
+def _create_doctor(db):
+    from app.core.security import get_password_hash
+    from app.db.enums import UserRole
+    from app.db.models import Doctor, User
+
+    user = User(
+        id=uuid.uuid4(),
+        email=f"doctor_{uuid.uuid4().hex}@example.com",
+        hashed_password=get_password_hash("demo123"),
+        role=UserRole.DOCTOR,
+    )
+    db.add(user)
+    db.flush()
+    db.add(Doctor(id=uuid.uuid4(), user_id=user.id, specialization="Neurologopedia"))
+    db.commit()
+    return user.id, user.email
+
+
+@pytest.fixture
+def doctor_tokens():
+    if not os.getenv("DATABASE_URL"):
+        pytest.skip("DATABASE_URL not set")
+    from fastapi.testclient import TestClient
+
+    from app.db.session import SessionLocal
+    from app.main import app
+
+    client = TestClient(app)
+    db = SessionLocal()
+    user_id, email = _create_doctor(db)
+    response = client.post("/auth/staff-login", json={"email": email, "password": "demo123"})
+    assert response.status_code == 200
+    yield client, db, user_id, response.json()
+    db.close()
+
+
+def test_refresh_rotates_and_reuse_ends_the_family(doctor_tokens):
+    client, _, _, tokens = doctor_tokens
+
+    rotated = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert rotated.status_code == 200
+    assert rotated.json()["refresh_token"] != tokens["refresh_token"]
+
+    reused = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert reused.status_code == 401
+    latest = client.post("/auth/refresh", json={"refresh_token": rotated.json()["refresh_token"]})
+    assert latest.status_code == 401
+    headers = {"Authorization": f"Bearer {rotated.json()['access_token']}"}
+    assert client.get("/med/doctor/appointments", headers=headers).status_code == 401
+
+
+def test_trusted_claims_skip_user_lookup_until_revoked(doctor_tokens, sql_statements, monkeypatch):
+    from app.services.token_service import token_revocation_list
+
+    client, db, _, tokens = doctor_tokens
+    monkeypatch.setattr("app.api.deps.AUTH_TRUST_TOKEN_CLAIMS", True)
+    token_revocation_list.sync(db)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    with sql_statements.capture():
+        response = client.get("/med/doctor/appointments", headers=headers)
+    assert response.status_code == 200
+    assert not [statement for statement in sql_statements.statements if "FROM users" in statement]
+
+    assert client.post("/auth/logout", headers=headers).status_code == 204
+    assert client.get("/med/doctor/appointments", headers=headers).status_code == 401
+
+
+def test_password_reset_revokes_issued_tokens(doctor_tokens):
+    from app.services.token_service import TokenService
+
+    client, db, user_id, tokens = doctor_tokens
+    TokenService(db).revoke_user(user_id)
+
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    assert client.get("/med/doctor/appointments", headers=headers).status_code == 401
+    assert client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
+
+
+def test_trusted_claims_recheck_deactivated_users_once_the_token_ages(doctor_tokens, monkeypatch):
+    from sqlalchemy import update
+
+    from app.db.models import User
+    from app.services.token_service import token_revocation_list
+
+    client, db, user_id, tokens = doctor_tokens
+    monkeypatch.setattr("app.api.deps.AUTH_TRUST_TOKEN_CLAIMS", True)
+    token_revocation_list.sync(db)
+    db.execute(update(User).where(User.id == user_id).values(is_active=False))
+    db.commit()
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    # Within the trust window the claims stand in for the user row.
+    assert client.get("/med/doctor/appointments", headers=headers).status_code == 200
+    monkeypatch.setattr("app.api.deps.AUTH_TRUST_TOKEN_CLAIMS_MAX_AGE_SECONDS", 0)
+    response = client.get("/med/doctor/appointments", headers=headers)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "User not found or inactive"
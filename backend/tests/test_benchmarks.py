@@ -0,0 +1,29 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.endpoints import ScenarioResult, compare_to_baseline
+
+
+def _result(name: str, p95_ms: float, throughput_rps: float, errors: int = 0) -> ScenarioResult:
+    return ScenarioResult(name, 200, errors, p95_ms / 2, p95_ms, p95_ms * 1.2, throughput_rps)
+
+
+def test_compare_to_baseline_flags_only_real_regressions():
+    baseline = {
+        "login": {"p95_ms": 200.0, "throughput_rps": 50.0, "errors": 0},
+        "note_search": {"p95_ms": 1.0, "throughput_rps": 900.0, "errors": 0},
+        "note_sign": {"p95_ms": 100.0, "throughput_rps": 60.0, "errors": 0},
+    }
+    results = [
+        _result("login", 240.0, 45.0),
+        _result("note_search", 2.5, 900.0),
+        _result("note_sign", 160.0, 40.0, errors=3),
+        _result("new_scenario", 5000.0, 1.0),
+    ]
+
+    regressions = compare_to_baseline(results, baseline, tolerance=0.25, floor_ms=2.0)
+
+    assert [line.split(":")[0] for line in regressions] == ["note_sign"] * 3
@@ -0,0 +1,139 @@
+import datetime as dt
+import os
+import sys
+import uuid
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.services.billing_service import invoice_series, month_window
+
+
+def test_invoice_series_and_month_window_use_the_clinic_timezone():
+    # 23:30 UTC on the last day of October is already November in Warsaw.
+    assert invoice_series(dt.datetime(2026, 10, 31, 23, 30, tzinfo=dt.timezone.utc)) == "FV/2026/11"
+    start, end = month_window(dt.date(2026, 12, 1))
+    assert (start.isoformat(), end.isoformat()) == ("2026-12-01T00:00:00+01:00", "2027-01-01T00:00:00+01:00")
+
+
+def test_completed_appointments_are_invoiced_once_at_the_price_valid_that_day():
+    if not os.getenv("DATABASE_URL"):
+        pytest.skip("DATABASE_URL not set")
+    from sqlalchemy import delete, select
+
+    from app.db.enums import AppointmentStatus, Gender, ServiceType, UserRole
+    from app.db.models import (
+        Appointment,
+        ChildProfile,
+        Doctor,
+        Invoice,
+        InvoiceItem,
+        PatientProfile,
+        Service,
+        ServicePrice,
+        User,
+    )
+    from app.db.session import SessionLocal
+    from app.services.billing_service import BillingService
+
+    db = SessionLocal()
+    tag = uuid.uuid4().hex
+    guardian_user = User(email=f"guardian_{tag}@example.com", hashed_password="x", role=UserRole.GUARDIAN)
+    doctor_user = User(email=f"doctor_{tag}@example.com", hashed_password="x", role=UserRole.DOCTOR)
+    db.add_all([guardian_user, doctor_user])
+    db.flush()
+    guardian = PatientProfile(user_id=guardian_user.id, full_name="Anna Nowak")
+    doctor = Doctor(user_id=doctor_user.id, specialization="Psychologia kliniczna")
+    priced, unpriced = (
+        Service(
+            name=f"{name} {tag}",
+            description="Konsultacja psychologiczna.",
+            service_type=ServiceType.INDIVIDUAL,
+            default_duration_minutes=50,
+            default_price=Decimal("200.00"),
+        )
+        for name in ("Konsultacja", "Diagnoza")
+    )
+    db.add_all([guardian, doctor, priced, unpriced])
+    db.flush()
+    db.add_all(
+        [
+            ServicePrice(
+                service_id=priced.id, price=Decimal("200.00"), valid_from=dt.date(2031, 1, 1), valid_to=dt.date(2031, 5, 15)
+            ),
+            ServicePrice(service_id=priced.id, price=Decimal("250.00"), valid_from=dt.date(2031, 5, 15)),
+        ]
+    )
+    child = ChildProfile(
+        guardian_id=guardian.id, first_name="Ola", last_name="Nowak", date_of_birth=dt.date(2018, 1, 1), gender=Gender.FEMALE
+    )
+    db.add(child)
+    db.flush()
+
+    def appointment(start: dt.datetime, service: Service, status: AppointmentStatus) -> Appointment:
+        row = Appointment(
+            doctor_id=doctor.id,
+            service_id=service.id,
+            guardian_id=guardian.id,
+            child_id=child.id,
+            status=status,
+            start_at=start,
+            end_at=start + dt.timedelta(minutes=50),
+            price_amount=Decimal("180.00"),
+        )
+        db.add(row)
+        return row
+
+    # 22:30 UTC on 14 May is already the 15th in Warsaw, so the new price applies.
+    before = appointment(dt.datetime(2031, 5, 10, 9, tzinfo=dt.timezone.utc), priced, AppointmentStatus.COMPLETED)
+    after = appointment(dt.datetime(2031, 5, 14, 22, 30, tzinfo=dt.timezone.utc), priced, AppointmentStatus.COMPLETED)
+    appointment(dt.datetime(2031, 5, 12, 9, tzinfo=dt.timezone.utc), unpriced, AppointmentStatus.COMPLETED)
+    appointment(dt.datetime(2031, 5, 20, 9, tzinfo=dt.timezone.utc), priced, AppointmentStatus.CONFIRMED)
+    db.commit()
+
+    since, until = month_window(dt.date(2031, 5, 1))
+    now = dt.datetime(2031, 6, 1, 6, tzinfo=dt.timezone.utc)
+    try:
+        first = BillingService(db).issue(since=since, until=until, now=now)
+        db.commit()
+        assert (first.invoiced, first.missing_price) == (2, 1)
+        again = BillingService(db).issue(since=since, until=until, now=now)
+        db.commit()
+        assert (again.invoiced, again.missing_price) == (0, 1)
+
+        invoices = {
+            invoice.appointment_id: invoice
+            for invoice in db.execute(
+                select(Invoice).where(Invoice.guardian_id == guardian.id)
+            ).scalars()
+        }
+        assert set(invoices) == {before.id, after.id}
+        assert (invoices[before.id].total_amount, invoices[after.id].total_amount) == (Decimal("200.00"), Decimal("250.00"))
+        assert invoices[before.id].due_at == now + dt.timedelta(days=14)
+        series, first_number = invoices[before.id].number.rsplit("/", 1)
+        assert series == "FV/2031/06"
+        assert invoices[after.id].number == f"{series}/{int(first_number) + 1:05d}"
+
+        items = db.execute(
+            select(InvoiceItem).where(InvoiceItem.invoice_id.in_([invoice.id for invoice in invoices.values()]))
+        ).scalars().all()
+        assert sorted((item.description, item.amount) for item in items) == [
+            (priced.name, Decimal("200.00")),
+            (priced.name, Decimal("250.00")),
+        ]
+    finally:
+        db.rollback()
+        # The run counts every unpriced visit in the window, so leave none behind for reruns.
+        db.execute(delete(Invoice).where(Invoice.guardian_id == guardian.id))
+        db.execute(delete(Appointment).where(Appointment.guardian_id == guardian.id))
+        db.execute(delete(ChildProfile).where(ChildProfile.id == child.id))
+        db.execute(delete(Service).where(Service.id.in_([priced.id, unpriced.id])))
+        db.execute(delete(Doctor).where(Doctor.id == doctor.id))
+        db.execute(delete(PatientProfile).where(PatientProfile.id == guardian.id))
+        db.execute(delete(User).where(User.id.in_([guardian_user.id, doctor_user.id])))
+        db.commit()
+        db.close()
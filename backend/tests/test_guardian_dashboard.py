@@ -0,0 +1,337 @@
+import datetime as dt
+import os
+import sys
+import uuid
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+import sqlalchemy as sa
+
+if not os.getenv("DATABASE_URL"):
+    pytest.skip("DATABASE_URL not set", allow_module_level=True)
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.core.security import get_password_hash
+from app.db.enums import (
+    AppointmentSource,
+    AppointmentStatus,
+    EncounterStatus,
+    Gender,
+    InvoiceStatus,
+    ServiceType,
+    UserRole,
+)
+from app.db.models import (
+    Appointment,
+    Attachment,
+    AuditLog,
+    ChildProfile,
+    Doctor,
+    Encounter,
+    Invoice,
+    PatientProfile,
+    Prescription,
+    Service,
+    User,
+)
+from app.db.session import SessionLocal
+from app.services.audit_service import audit_log_buffer
+from app.services.guardian_dashboard_service import DASHBOARD_ITEMS_PER_CHILD, guardian_dashboard_cache
+
+
+def _appointment(doctor, service, guardian, child, start_at, status=AppointmentStatus.CONFIRMED):
+    return Appointment(
+        id=uuid.uuid4(),
+        doctor_id=doctor.id,
+        service_id=service.id,
+        guardian_id=guardian.id,
+        child_id=child.id,
+        status=status,
+        source=AppointmentSource.ONLINE,
+        start_at=start_at,
+        end_at=start_at + dt.timedelta(minutes=50),
+        price_amount=Decimal("150.00"),
+    )
+
+
+def _create_family(now):
+    suffix = uuid.uuid4().hex
+    guardian_user = User(
+        id=uuid.uuid4(),
+        email=f"guardian_{suffix}@example.com",
+        hashed_password=get_password_hash("demo123"),
+        role=UserRole.GUARDIAN,
+    )
+    doctor_user = User(
+        id=uuid.uuid4(),
+        email=f"doctor_{suffix}@example.com",
+        hashed_password=get_password_hash("demo123"),
+        role=UserRole.DOCTOR,
+    )
+    guardian = PatientProfile(
+        id=uuid.uuid4(),
+        user_id=guardian_user.id,
+        full_name="Anna Nowak",
+        email=guardian_user.email,
+    )
+    older = ChildProfile(
+        id=uuid.uuid4(),
+        guardian_id=guardian.id,
+        first_name="Kuba",
+        last_name="Nowak",
+        date_of_birth=dt.date(2012, 3, 1),
+        gender=Gender.MALE,
+    )
+    younger = ChildProfile(
+        id=uuid.uuid4(),
+        guardian_id=guardian.id,
+        first_name="Zosia",
+        last_name="Nowak",
+        date_of_birth=dt.date(2016, 9, 1),
+        gender=Gender.FEMALE,
+    )
+    doctor = Doctor(id=uuid.uuid4(), user_id=doctor_user.id, specialization="Psychologia dziecięca")
+    service = Service(
+        id=uuid.uuid4(),
+        name=f"Terapia {suffix}",
+        description="Terapia indywidualna.",
+        service_type=ServiceType.INDIVIDUAL,
+        default_duration_minutes=50,
+        default_price=Decimal("150.00"),
+    )
+    upcoming = [
+        _appointment(doctor, service, guardian, older, now + dt.timedelta(days=day))
+        for day in range(1, DASHBOARD_ITEMS_PER_CHILD + 3)
+    ]
+    past = _appointment(doctor, service, guardian, younger, now - dt.timedelta(days=7), AppointmentStatus.COMPLETED)
+    encounter = Encounter(
+        id=uuid.uuid4(),
+        appointment_id=past.id,
+        doctor_id=doctor.id,
+        guardian_id=guardian.id,
+        child_id=younger.id,
+        status=EncounterStatus.CLOSED,
+        started_at=past.start_at,
+    )
+    prescription = Prescription(
+        id=uuid.uuid4(),
+        appointment_id=past.id,
+        doctor_id=doctor.id,
+        child_id=younger.id,
+        code=f"RX-{suffix[:8]}",
+        issued_at=past.start_at,
+    )
+    attachment = Attachment(
+        id=uuid.uuid4(),
+        encounter_id=encounter.id,
+        uploaded_by_user_id=doctor_user.id,
+        file_name="opinia.pdf",
+        mime_type="application/pdf",
+        size_bytes=2048,
+        storage_key=f"attachments/{suffix}.pdf",
+    )
+    invoice = Invoice(
+        id=uuid.uuid4(),
+        appointment_id=past.id,
+        guardian_id=guardian.id,
+        number=f"FV/TEST/{suffix[:10]}",
+        status=InvoiceStatus.UNPAID,
+        issued_at=now,
+        due_at=now + dt.timedelta(days=14),
+        total_amount=Decimal("150.00"),
+        currency="PLN",
+    )
+    return {
+        "guardian_user": guardian_user,
+        "doctor_user": doctor_user,
+        "guardian": guardian,
+        "older": older,
+        "younger": younger,
+        "doctor": doctor,
+        "service": service,
+        "upcoming": upcoming,
+        "past": past,
+        "encounter": encounter,
+        "prescription": prescription,
+        "attachment": attachment,
+        "invoice": invoice,
+    }
+
+
+def _save_family(session, family) -> None:
+    session.add_all([family["guardian_user"], family["doctor_user"]])
+    session.flush()
+    session.add_all([family["guardian"], family["doctor"], family["service"]])
+    session.flush()
+    session.add_all([family["older"], family["younger"]])
+    session.flush()
+    session.add_all([*family["upcoming"], family["past"]])
+    session.flush()
+    session.add(family["encounter"])
+    session.flush()
+    session.add_all([family["prescription"], family["attachment"], family["invoice"]])
+    session.commit()
+
+
+def _delete_family(session, family, extra_appointments=()) -> None:
+    session.rollback()
+    session.execute(sa.delete(Invoice).where(Invoice.id == family["invoice"].id))
+    session.execute(sa.delete(Attachment).where(Attachment.id == family["attachment"].id))
+    session.execute(sa.delete(Prescription).where(Prescription.id == family["prescription"].id))
+    session.execute(sa.delete(Encounter).where(Encounter.id == family["encounter"].id))
+    appointments = [*family["upcoming"], family["past"], *extra_appointments]
+    session.execute(sa.delete(Appointment).where(Appointment.id.in_([item.id for item in appointments])))
+    session.execute(sa.delete(ChildProfile).where(ChildProfile.guardian_id == family["guardian"].id))
+    session.execute(sa.delete(PatientProfile).where(PatientProfile.id == family["guardian"].id))
+    session.execute(sa.delete(Doctor).where(Doctor.id == family["doctor"].id))
+    session.execute(sa.delete(Service).where(Service.id == family["service"].id))
+    session.execute(
+        sa.delete(User).where(User.id.in_([family["guardian_user"].id, family["doctor_user"].id]))
+    )
+    session.commit()
+    session.close()
+    guardian_dashboard_cache.clear()
+
+
+def _login(client, family) -> dict[str, str]:
+    login = client.post("/auth/login", json={"email": family["guardian_user"].email, "password": "demo123"})
+    assert login.status_code == 200
+    return {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+
+def _audited(family, action: str) -> list[tuple[str, str | None]]:
+    audit_log_buffer.flush_all()
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            sa.select(AuditLog.resource_type, AuditLog.resource_id).where(
+                AuditLog.actor_user_id == family["guardian_user"].id, AuditLog.action == action
+            )
+        ).all()
+    finally:
+        db.close()
+    return [tuple(row) for row in rows]
+
+
+def test_guardian_dashboard_batches_children_and_is_invalidated_by_writes(query_budget_client):
+    client = query_budget_client
+    now = dt.datetime.now(dt.timezone.utc)
+    family = _create_family(now)
+    older, younger = family["older"], family["younger"]
+    added: list[Appointment] = []
+
+    session = SessionLocal()
+    try:
+        _save_family(session, family)
+        headers = _login(client, family)
+
+        response = client.get("/patient/dashboard", headers=headers)
+        assert response.status_code == 200
+        payload = response.json()
+        assert payload["guardian"]["id"] == str(family["guardian"].id)
+        assert [child["id"] for child in payload["children"]] == [str(older.id), str(younger.id)]
+        first, second = payload["children"]
+        assert [item["id"] for item in first["upcoming_appointments"]] == [
+            str(appointment.id) for appointment in family["upcoming"][:DASHBOARD_ITEMS_PER_CHILD]
+        ]
+        assert first["recent_prescriptions"] == [] and first["latest_attachments"] == []
+        assert second["upcoming_appointments"] == []
+        assert [item["id"] for item in second["recent_prescriptions"]] == [str(family["prescription"].id)]
+        # Attached to the encounter only, yet listed under its child.
+        assert [item["id"] for item in second["latest_attachments"]] == [str(family["attachment"].id)]
+        assert [item["number"] for item in payload["unpaid_invoices"]] == [family["invoice"].number]
+
+        cached = client.get("/patient/dashboard", headers=headers)
+        assert cached.json() == payload
+        assert client.recorder.count == 1  # authentication only
+
+        # An ORM commit touching one of the children drops the guardian's entry.
+        start_at = now + dt.timedelta(days=2, hours=3)
+        added.append(_appointment(family["doctor"], family["service"], family["guardian"], younger, start_at))
+        session.add(added[0])
+        session.commit()
+        refreshed = client.get("/patient/dashboard", headers=headers)
+        assert [item["id"] for item in refreshed.json()["children"][1]["upcoming_appointments"]] == [str(added[0].id)]
+        assert client.recorder.count > 1
+
+        # Each of the three reads, cached or not, is logged against every child it showed.
+        assert sorted(_audited(family, "GET /patient/dashboard")) == sorted(
+            [("patient", str(older.id)), ("patient", str(younger.id))] * 3
+        )
+    finally:
+        _delete_family(session, family, added)
+
+
+def test_children_endpoints_batch_every_requested_child(query_budget_client):
+    client = query_budget_client
+    family = _create_family(dt.datetime.now(dt.timezone.utc))
+    older, younger = family["older"], family["younger"]
+
+    session = SessionLocal()
+    try:
+        _save_family(session, family)
+        headers = _login(client, family)
+        both = {"child_id": [str(older.id), str(younger.id)]}
+
+        summaries = client.get("/patient/children", headers=headers)
+        assert summaries.status_code == 200
+        assert [child["id"] for child in summaries.json()] == [str(older.id), str(younger.id)]
+
+        appointments = client.get("/patient/children/appointments", params=both, headers=headers)
+        assert appointments.status_code == 200
+        by_child = {group["child_id"]: group["items"] for group in appointments.json()}
+        assert len(by_child[str(older.id)]) == len(family["upcoming"])
+        assert [item["id"] for item in by_child[str(younger.id)]] == [str(family["past"].id)]
+
+        upcoming_only = client.get(
+            "/patient/children/appointments",
+            params={"child_id": str(younger.id), "status": "CONFIRMED"},
+            headers=headers,
+        )
+        assert upcoming_only.json() == [{"child_id": str(younger.id), "items": []}]
+
+        encounters = client.get("/patient/children/encounters", headers=headers)
+        assert [[item["id"] for item in group["items"]] for group in encounters.json()] == [
+            [],
+            [str(family["encounter"].id)],
+        ]
+
+        prescriptions = client.get("/patient/children/prescriptions", params=both, headers=headers)
+        assert [[item["id"] for item in group["items"]] for group in prescriptions.json()] == [
+            [],
+            [str(family["prescription"].id)],
+        ]
+
+        attachments = client.get("/patient/children/attachments", params=both, headers=headers)
+        assert attachments.json()[1]["child_id"] == str(younger.id)
+        assert [item["id"] for item in attachments.json()[1]["items"]] == [str(family["attachment"].id)]
+
+        # One foreign id fails the whole request, exactly like the single-child endpoints.
+        foreign = client.get(
+            "/patient/children/prescriptions",
+            params={"child_id": [str(older.id), str(uuid.uuid4())]},
+            headers=headers,
+        )
+        assert foreign.status_code == 404
+
+        children = sorted([("patient", str(older.id)), ("patient", str(younger.id))])
+        # "All my children" and explicit ids are both logged per child read.
+        assert sorted(_audited(family, "GET /patient/children/encounters")) == children
+        assert sorted(_audited(family, "GET /patient/children/appointments")) == sorted(
+            children + [("patient", str(younger.id))]
+        )
+        audit_log_buffer.flush_all()
+        rejected = session.execute(
+            sa.select(AuditLog.resource_id, AuditLog.meta).where(
+                AuditLog.actor_user_id == family["guardian_user"].id,
+                AuditLog.action == "GET /patient/children/prescriptions",
+                AuditLog.resource_type == "children",
+            )
+        ).one()
+        assert rejected.resource_id is None and rejected.meta["status"] == 404
+        assert rejected.meta["query"]["child_id"] == foreign.request.url.params.get_list("child_id")
+    finally:
+        _delete_family(session, family)
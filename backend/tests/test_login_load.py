@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+import pytest
+import sqlalchemy as sa
+
+if not os.getenv("DATABASE_URL"):
+    pytest.skip("DATABASE_URL not set", allow_module_level=True)
+if not os.getenv("LOGIN_LOAD_TEST_USERS"):
+    pytest.skip("LOGIN_LOAD_TEST_USERS not set", allow_module_level=True)
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.main import app
+from app.core.rate_limit import login_rate_limiter
+from app.core.security import get_password_hash, password_hash_pool
+from app.db.enums import UserRole
+from app.db.models import User
+from app.db.session import SessionLocal
+
+CONCURRENT_LOGINS = int(os.getenv("LOGIN_LOAD_TEST_USERS", "500"))
+
+logger = logging.getLogger(__name__)
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def _run_burst(emails: list[str]) -> tuple[list[int], list[float], list[float]]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        login_latencies: list[float] = []
+        probe_latencies: list[float] = []
+        done = asyncio.Event()
+
+        async def login(email: str) -> int:
+            started = time.perf_counter()
+            response = await client.post("/auth/login", json={"email": email, "password": "demo123"})
+            login_latencies.append(time.perf_counter() - started)
+            return response.status_code
+
+        async def probe() -> None:
+            # An unrelated request that only needs the threadpool and the event loop.
+            while not done.is_set():
+                started = time.perf_counter()
+                await client.get(f"/patient/children/{uuid.uuid4()}/summary")
+                probe_latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0.02)
+
+        probe_task = asyncio.create_task(probe())
+        statuses = await asyncio.gather(*(login(email) for email in emails))
+        done.set()
+        await probe_task
+        return list(statuses), login_latencies, probe_latencies
+
+
+def test_login_burst_is_served_by_hash_pool(monkeypatch):
+    # Every request comes from the same in-process client address.
+    monkeypatch.setattr(login_rate_limiter, "enabled", False)
+    session = SessionLocal()
+    tag = uuid.uuid4().hex[:8]
+    hashed = get_password_hash("demo123")
+    emails = [f"load-{tag}-{index}@example.com" for index in range(CONCURRENT_LOGINS)]
+    session.execute(
+        sa.insert(User),
+        [
+            {"email": email, "hashed_password": hashed, "role": UserRole.GUARDIAN, "is_active": True}
+            for email in emails
+        ],
+    )
+    session.commit()
+    try:
+        before = password_hash_pool.stats()
+        started = time.perf_counter()
+        statuses, login_latencies, probe_latencies = asyncio.run(_run_burst(emails))
+        elapsed = time.perf_counter() - started
+        after = password_hash_pool.stats()
+
+        login_p50 = statistics.median(login_latencies)
+        probe_p95 = _percentile(probe_latencies, 0.95)
+        # Shown with -o log_cli=true; the assertions below are what the test checks.
+        logger.info(
+            "%d logins in %.1fs on %d hash workers; login p50=%.0fms p95=%.0fms; probe p95=%.0fms; max queue depth=%d",
+            CONCURRENT_LOGINS,
+            elapsed,
+            after.workers,
+            login_p50 * 1000,
+            _percentile(login_latencies, 0.95) * 1000,
+            probe_p95 * 1000,
+            after.max_pending_seen,
+        )
+        assert statuses == [200] * CONCURRENT_LOGINS
+        assert after.completed_total - before.completed_total == CONCURRENT_LOGINS
+        assert after.rejected_total == before.rejected_total
+        assert after.pending == 0
+        assert after.max_pending_seen <= after.max_pending
+        # Hashing stays off the event loop and the request threadpool, so unrelated requests
+        # keep answering while the logins queue for hash workers.
+        assert probe_latencies and probe_p95 < login_p50
+    finally:
+        session.execute(sa.delete(User).where(User.email.in_(emails)))
+        session.commit()
+        session.close()
@@ -0,0 +1,85 @@
+import os
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.core.rate_limit import InMemoryTokenBucketBackend, LoginRateLimiter, TokenBucketRule
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _limiter(clock: FakeClock) -> LoginRateLimiter:
+    return LoginRateLimiter(
+        InMemoryTokenBucketBackend(clock=clock),
+        ip_rule=TokenBucketRule.per_minute(4, 60),
+        email_rule=TokenBucketRule.per_minute(2, 6),
+    )
+
+
+def test_email_bucket_limits_and_refills():
+    clock = FakeClock()
+    limiter = _limiter(clock)
+
+    assert limiter.check(ip="10.0.0.1", email="Anna@Example.com") == 0
+    assert limiter.check(ip="10.0.0.2", email="anna@example.com ") == 0
+    assert limiter.check(ip="10.0.0.3", email="anna@example.com") == pytest.approx(10.0)
+
+    clock.now += 10
+    assert limiter.check(ip="10.0.0.4", email="anna@example.com") == 0
+    assert limiter.stats().limited_by_email_total == 1
+
+
+def test_ip_bucket_is_checked_before_email():
+    clock = FakeClock()
+    limiter = _limiter(clock)
+
+    for index in range(4):
+        assert limiter.check(ip="10.0.0.9", email=f"user{index}@example.com") == 0
+    assert limiter.check(ip="10.0.0.9", email="fresh@example.com") == pytest.approx(1.0)
+    # The rejected attempt did not consume the email's tokens.
+    assert limiter.check(ip="10.0.0.10", email="fresh@example.com") == 0
+
+    stats = limiter.stats()
+    assert (stats.allowed_total, stats.limited_by_ip_total, stats.limited_by_email_total) == (5, 1, 0)
+
+
+def test_in_memory_backend_evicts_least_recently_touched():
+    clock = FakeClock()
+    backend = InMemoryTokenBucketBackend(max_keys=2, clock=clock)
+    rule = TokenBucketRule(capacity=1, refill_per_second=0.001)
+
+    assert backend.take("a", rule) == 0
+    assert backend.take("b", rule) == 0
+    assert backend.take("a", rule) > 0
+    assert backend.take("c", rule) == 0
+    assert backend.take("a", rule) > 0
+    assert backend.take("b", rule) == 0
+
+
+@pytest.mark.skipif(not os.getenv("DATABASE_URL"), reason="DATABASE_URL not set")
+def test_login_returns_429_before_credentials_are_checked(sql_statements):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    client = TestClient(app)
+    credentials = {"email": f"nobody-{uuid.uuid4().hex[:8]}@example.com", "password": "wrong"}
+    statuses = [client.post("/auth/login", json=credentials).status_code for _ in range(5)]
+    assert statuses == [401] * 5
+
+    with sql_statements.capture():
+        limited = client.post("/auth/login", json=credentials)
+    assert limited.status_code == 429
+    assert int(limited.headers["Retry-After"]) >= 1
+    assert sql_statements.statements == []
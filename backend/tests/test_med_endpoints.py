@@ -6,7 +6,6 @@ from decimal import Decimal
 from pathlib import Path
 
 import pytest
-from fastapi.testclient import TestClient
 import sqlalchemy as sa
 
 if not os.getenv("DATABASE_URL"):
@@ -41,6 +40,7 @@ from app.db.models import (
     User,
 )
 from app.db.session import SessionLocal
+from app.services.note_draft_service import note_draft_buffer
 from app.utils.storage import resolve_storage_path
 
 
@@ -169,8 +169,8 @@ def _create_seed_data():
     }
 
 
-def test_med_patient_endpoints_smoke():
-    client = TestClient(app)
+def test_med_patient_endpoints_smoke(sql_statements, query_budget_client):
+    client = query_budget_client
     session = SessionLocal()
     data = _create_seed_data()
     try:
@@ -191,7 +191,7 @@ def test_med_patient_endpoints_smoke():
 
         patient_id = data["child"].id
         login_doctor = client.post(
-            "/auth/login",
+            "/auth/staff-login",
             json={"email": data["doctor_user"].email, "password": "demo123"},
         )
         assert login_doctor.status_code == 200
@@ -297,6 +297,29 @@ def test_med_patient_endpoints_smoke():
         assert len(attachments_payload) == 1
         assert attachments_payload[0]["id"] == str(data["attachment"].id)
 
+        timeline = client.get(f"/med/patients/{patient_id}/timeline", headers=headers)
+        assert timeline.status_code == 200
+        timeline_payload = timeline.json()
+        assert timeline_payload["next_cursor"] is None
+        timeline_kinds = {item["kind"] for item in timeline_payload["items"]}
+        assert timeline_kinds == {"appointment", "encounter", "prescription", "invoice", "attachment"}
+        occurred = [item["occurred_at"] for item in timeline_payload["items"]]
+        assert occurred == sorted(occurred, reverse=True)
+
+        first_page = client.get(f"/med/patients/{patient_id}/timeline?limit=2", headers=headers)
+        assert first_page.status_code == 200
+        first_page_payload = first_page.json()
+        assert len(first_page_payload["items"]) == 2
+        assert first_page_payload["next_cursor"]
+        second_page = client.get(
+            f"/med/patients/{patient_id}/timeline",
+            params={"limit": 10, "cursor": first_page_payload["next_cursor"]},
+            headers=headers,
+        )
+        assert second_page.status_code == 200
+        paged_ids = [item["id"] for item in first_page_payload["items"] + second_page.json()["items"]]
+        assert paged_ids == [item["id"] for item in timeline_payload["items"]]
+
         med_file_content = b"med-attachment"
         med_upload = client.post(
             f"/med/patients/{patient_id}/attachments",
@@ -345,10 +368,36 @@ def test_med_patient_endpoints_smoke():
         assert update_data["current_version"]["version_number"] == 2
         assert update_data["current_version"]["is_addendum"] is False
 
+        search_response = client.get(
+            "/med/notes/search", params={"query": "rozpoznanie"}, headers=headers
+        )
+        assert search_response.status_code == 200
+        search_hits = [hit for hit in search_response.json()["items"] if hit["note_id"] == note_id]
+        assert len(search_hits) == 1
+        assert search_hits[0]["patient_id"] == str(patient_id)
+        assert "<mark>Rozpoznanie</mark>" in search_hits[0]["headline"]
+
+        with sql_statements.capture():
+            encounters_with_notes = client.get(
+                f"/med/patients/{patient_id}/encounters",
+                params={"include_notes": "true"},
+                headers=headers,
+            )
+        assert encounters_with_notes.status_code == 200
+        listed_note = encounters_with_notes.json()[0]["note"]
+        assert listed_note["id"] == note_id
+        assert listed_note["current_version"]["version_number"] == 2
+        assert listed_note["current_version"]["diagnosis_text"] == "Rozpoznanie testowe"
+        assert len([stmt for stmt in sql_statements.statements if "note_versions" in stmt]) == 1
+
         sign_response = client.post(f"/med/notes/{note_id}/sign", json={}, headers=headers)
         assert sign_response.status_code == 200
         sign_data = sign_response.json()
         assert sign_data["status"] == "SIGNED"
+        assert sign_data["current_version"]["version_number"] == 2
+        assert sign_data["current_version"]["history_text"] == "Wywiad uzupełniony"
+        assert sign_data["current_version"]["diagnosis_text"] == "Rozpoznanie testowe"
+        assert sign_data["current_version"]["recommendations_text"] is None
 
         addendum_payload = {
             "recommendations_text": "Aneks zaleceń",
@@ -455,3 +504,213 @@ def test_med_patient_endpoints_smoke():
         session.execute(sa.delete(User).where(User.id == data["doctor_user"].id))
         session.commit()
         session.close()
+
+
+def test_note_draft_autosave_coalesces_versions(query_budget_client):
+    client = query_budget_client
+    session = SessionLocal()
+    data = _create_seed_data()
+    try:
+        session.add_all([data["guardian_user"], data["doctor_user"]])
+        session.commit()
+        session.add_all([data["guardian"], data["doctor"], data["service"]])
+        session.commit()
+        session.add(data["child"])
+        session.commit()
+        session.add_all([data["appointment"], data["encounter"]])
+        session.commit()
+
+        login_doctor = client.post(
+            "/auth/staff-login",
+            json={"email": data["doctor_user"].email, "password": "demo123"},
+        )
+        assert login_doctor.status_code == 200
+        headers = {"Authorization": f"Bearer {login_doctor.json()['access_token']}"}
+
+        note_response = client.post(
+            f"/med/encounters/{data['encounter'].id}/notes",
+            json={"history_text": "Wywiad"},
+            headers=headers,
+        )
+        assert note_response.status_code == 201
+        note_id = note_response.json()["id"]
+
+        revision = None
+        history_text = "Wywiad"
+        for index in range(10):
+            history_text = f"{history_text} zdanie {index}."
+            autosave = client.put(
+                f"/med/notes/{note_id}/draft",
+                json={"history_text": history_text, "base_version": 1, "revision": revision},
+                headers=headers,
+            )
+            assert autosave.status_code == 200
+            autosave_payload = autosave.json()
+            assert autosave_payload["base_version"] == 1
+            assert autosave_payload["is_flushed"] is False
+            revision = autosave_payload["revision"]
+        assert revision == 10
+
+        stale = client.put(
+            f"/med/notes/{note_id}/draft",
+            json={"history_text": "nieaktualny", "revision": 3},
+            headers=headers,
+        )
+        assert stale.status_code == 409
+
+        draft = client.get(f"/med/notes/{note_id}/draft", headers=headers)
+        assert draft.status_code == 200
+        assert draft.json()["history_text"] == history_text
+
+        versions_before_commit = session.execute(
+            sa.select(sa.func.count()).select_from(NoteVersion).where(NoteVersion.note_id == note_id)
+        ).scalar_one()
+        assert versions_before_commit == 1
+
+        committed = client.post(f"/med/notes/{note_id}/draft/commit", headers=headers)
+        assert committed.status_code == 200
+        committed_payload = committed.json()
+        assert committed_payload["version"] == 2
+        assert committed_payload["current_version"]["history_text"] == history_text
+
+        after_commit = client.put(
+            f"/med/notes/{note_id}/draft",
+            json={"history_text": f"{history_text} Koniec.", "revision": revision},
+            headers=headers,
+        )
+        assert after_commit.status_code == 200
+        assert after_commit.json()["base_version"] == 2
+
+        # Once the flusher reports a conflict, autosaves are refused until the editor rebases.
+        note_draft_buffer.mark_conflicted(uuid.UUID(note_id), after_commit.json()["revision"], "Note changed")
+        unrebased = client.put(
+            f"/med/notes/{note_id}/draft",
+            json={"history_text": f"{history_text} Koniec.", "revision": after_commit.json()["revision"]},
+            headers=headers,
+        )
+        assert unrebased.status_code == 409
+        assert unrebased.json()["detail"] == "Note changed"
+        rebased = client.put(
+            f"/med/notes/{note_id}/draft",
+            json={"history_text": f"{history_text} Koniec.", "base_version": 2},
+            headers=headers,
+        )
+        assert rebased.status_code == 200
+        assert rebased.json()["conflict"] is None
+
+        signed = client.post(f"/med/notes/{note_id}/sign", json={}, headers=headers)
+        assert signed.status_code == 200
+        signed_payload = signed.json()
+        assert signed_payload["status"] == "SIGNED"
+        assert signed_payload["current_version"]["version_number"] == 3
+        assert signed_payload["current_version"]["history_text"] == f"{history_text} Koniec."
+
+        total_versions = session.execute(
+            sa.select(sa.func.count()).select_from(NoteVersion).where(NoteVersion.note_id == note_id)
+        ).scalar_one()
+        assert total_versions == 3
+
+        missing_draft = client.get(f"/med/notes/{note_id}/draft", headers=headers)
+        assert missing_draft.status_code == 404
+    finally:
+        session.rollback()
+        if "note_id" in locals():
+            session.execute(sa.delete(NoteVersion).where(NoteVersion.note_id == note_id))
+            session.execute(sa.delete(ClinicalNote).where(ClinicalNote.id == note_id))
+        session.execute(sa.delete(Encounter).where(Encounter.id == data["encounter"].id))
+        session.execute(sa.delete(Appointment).where(Appointment.id == data["appointment"].id))
+        session.execute(sa.delete(ChildProfile).where(ChildProfile.id == data["child"].id))
+        session.execute(sa.delete(PatientProfile).where(PatientProfile.id == data["guardian"].id))
+        session.execute(sa.delete(Doctor).where(Doctor.id == data["doctor"].id))
+        session.execute(sa.delete(Service).where(Service.id == data["service"].id))
+        session.execute(sa.delete(User).where(User.id == data["guardian_user"].id))
+        session.execute(sa.delete(User).where(User.id == data["doctor_user"].id))
+        session.commit()
+        session.close()
+
+
+def test_write_endpoints_do_not_reread_after_write(sql_statements, query_budget_client):
+    client = query_budget_client
+    session = SessionLocal()
+    data = _create_seed_data()
+    try:
+        session.add_all([data["guardian_user"], data["doctor_user"]])
+        session.commit()
+        session.add_all([data["guardian"], data["doctor"], data["service"]])
+        session.commit()
+        session.add(data["child"])
+        session.commit()
+        session.add_all([data["appointment"], data["encounter"]])
+        session.commit()
+
+        login_doctor = client.post(
+            "/auth/staff-login",
+            json={"email": data["doctor_user"].email, "password": "demo123"},
+        )
+        headers = {"Authorization": f"Bearer {login_doctor.json()['access_token']}"}
+        login_guardian = client.post(
+            "/auth/login",
+            json={"email": data["guardian_user"].email, "password": "demo123"},
+        )
+        guardian_headers = {"Authorization": f"Bearer {login_guardian.json()['access_token']}"}
+        patient_id = data["child"].id
+
+        calls = [
+            ("create_note", lambda: client.post(
+                f"/med/encounters/{data['encounter'].id}/notes",
+                json={"history_text": "Wywiad"},
+                headers=headers,
+            )),
+            ("update_note", lambda: client.patch(
+                f"/med/notes/{note_id}", json={"history_text": "Wywiad uzupełniony"}, headers=headers
+            )),
+            ("sign_note", lambda: client.post(f"/med/notes/{note_id}/sign", json={}, headers=headers)),
+            ("add_note_addendum", lambda: client.post(
+                f"/med/notes/{note_id}/addendum", json={"recommendations_text": "Aneks"}, headers=headers
+            )),
+            ("upload_patient_attachment", lambda: client.post(
+                f"/med/patients/{patient_id}/attachments",
+                headers=headers,
+                files={"file": ("skan.pdf", b"med", "application/pdf")},
+            )),
+            ("upload_child_attachment", lambda: client.post(
+                f"/patient/children/{patient_id}/attachments",
+                headers=guardian_headers,
+                files={"file": ("zgoda.txt", b"guardian", "text/plain")},
+            )),
+        ]
+        uploaded_ids = []
+        for name, call in calls:
+            with sql_statements.capture():
+                response = call()
+            assert response.status_code in {200, 201}, name
+            if name == "create_note":
+                note_id = response.json()["id"]
+            if name.startswith("upload"):
+                uploaded_ids.append(uuid.UUID(response.json()["id"]))
+            assert sql_statements.statements_after_first_write(), name
+            assert sql_statements.reads_after_first_write() == [], name
+    finally:
+        session.rollback()
+        for attachment_id in locals().get("uploaded_ids", []):
+            attachment_row = session.execute(
+                sa.select(Attachment).where(Attachment.id == attachment_id)
+            ).scalar_one_or_none()
+            if attachment_row:
+                path = resolve_storage_path(attachment_row.storage_key)
+                if path.exists():
+                    path.unlink()
+            session.execute(sa.delete(Attachment).where(Attachment.id == attachment_id))
+        if "note_id" in locals():
+            session.execute(sa.delete(NoteVersion).where(NoteVersion.note_id == note_id))
+            session.execute(sa.delete(ClinicalNote).where(ClinicalNote.id == note_id))
+        session.execute(sa.delete(Encounter).where(Encounter.id == data["encounter"].id))
+        session.execute(sa.delete(Appointment).where(Appointment.id == data["appointment"].id))
+        session.execute(sa.delete(ChildProfile).where(ChildProfile.id == data["child"].id))
+        session.execute(sa.delete(PatientProfile).where(PatientProfile.id == data["guardian"].id))
+        session.execute(sa.delete(Doctor).where(Doctor.id == data["doctor"].id))
+        session.execute(sa.delete(Service).where(Service.id == data["service"].id))
+        session.execute(sa.delete(User).where(User.id == data["guardian_user"].id))
+        session.execute(sa.delete(User).where(User.id == data["doctor_user"].id))
+        session.commit()
+        session.close()
@@ -0,0 +1,69 @@
+import os
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.core.metrics import MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.labels("/a").observe(value)
+
+    lines = registry.render().splitlines()
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1"} 3' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 4' in lines
+    assert 'latency_seconds_count{route="/a"} 4' in lines
+    assert "# TYPE latency_seconds histogram" in lines
+
+
+def test_counter_shards_do_not_lose_concurrent_increments():
+    registry = MetricsRegistry()
+    hits = registry.counter("hits_total", "Hits.")
+
+    def work() -> None:
+        for _ in range(20000):
+            hits.inc()
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert "hits_total 160000" in registry.render().splitlines()
+
+
+@pytest.mark.skipif(not os.getenv("DATABASE_URL"), reason="DATABASE_URL not set")
+def test_metrics_endpoint_reports_route_templates(monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.api import metrics as metrics_api
+    from app.core.metrics import METRICS_EXPOSED
+    from app.main import app
+
+    client = TestClient(app)
+    client.get("/med/patients/00000000-0000-0000-0000-000000000000/timeline")
+    # Without METRICS_BEARER_TOKEN (or METRICS_PUBLIC) the app does not serve metrics at all.
+    if not METRICS_EXPOSED:
+        assert client.get("/metrics").status_code == 404
+
+    monkeypatch.setattr(metrics_api, "METRICS_BEARER_TOKEN", "scrape-token")
+    scraper = FastAPI()
+    scraper.include_router(metrics_api.router)
+    scrape = TestClient(scraper)
+    assert scrape.get("/metrics").status_code == 401
+    assert scrape.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    body = scrape.get("/metrics", headers={"Authorization": "Bearer scrape-token"}).text
+
+    assert 'route="/med/patients/{patient_id}/timeline",status="401"' in body
+    assert 'db_pool_connections{state="checkedout"}' in body
+    assert "password_hash_pending" in body
@@ -0,0 +1,45 @@
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.services.note_draft_service import NoteDraftBuffer
+
+
+def _save(buffer: NoteDraftBuffer, note_id: uuid.UUID, editor_id: uuid.UUID, text: str, **kwargs):
+    return buffer.save(
+        note_id=note_id,
+        editor_user_id=editor_id,
+        texts={"history_text": text},
+        is_visible_to_guardian=None,
+        updated_by_user_id=editor_id,
+        expected_revision=None,
+        **kwargs,
+    )
+
+
+def test_conflicted_draft_is_kept_until_its_editor_rebases_it():
+    buffer = NoteDraftBuffer()
+    note_id, editor_id = uuid.uuid4(), uuid.uuid4()
+    draft = _save(buffer, note_id, editor_id, "pierwsza wersja", base_version=1)
+
+    buffer.mark_conflicted(note_id, draft.revision, "Note changed since draft was started")
+    assert buffer.collect(idle_seconds=0, retention_seconds=3600) == []
+    # A plain autosave would keep the stale base and conflict again, so it is sent back to the note.
+    with pytest.raises(KeyError):
+        _save(buffer, note_id, editor_id, "druga wersja")
+    current = buffer.get(note_id)
+    assert current.dirty and current.conflict == "Note changed since draft was started"
+
+    rebased = _save(buffer, note_id, editor_id, "druga wersja", base_version=2)
+    assert rebased.conflict is None and rebased.base_version == 2
+    buffer.mark_conflicted(note_id, draft.revision, "stale")
+    assert [item.revision for item in buffer.collect(idle_seconds=0, retention_seconds=3600)] == [rebased.revision]
+
+    buffer.mark_conflicted(note_id, rebased.revision, "Note changed since draft was started")
+    buffer.collect(idle_seconds=0, retention_seconds=0)
+    assert buffer.get(note_id) is None
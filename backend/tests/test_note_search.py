@@ -0,0 +1,165 @@
+import datetime as dt
+import os
+import sys
+import uuid
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+import sqlalchemy as sa
+
+if not os.getenv("DATABASE_URL"):
+    pytest.skip("DATABASE_URL not set", allow_module_level=True)
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.core.security import get_password_hash
+from app.db.enums import AppointmentSource, AppointmentStatus, EncounterStatus, ServiceType, UserRole
+from app.db.models import (
+    Appointment,
+    ChildProfile,
+    ClinicalNote,
+    Doctor,
+    Encounter,
+    NoteVersion,
+    PatientProfile,
+    Service,
+    User,
+)
+from app.db.session import SessionLocal
+
+
+def _staff(role: UserRole, suffix: str) -> tuple[User, Doctor]:
+    user = User(
+        id=uuid.uuid4(),
+        email=f"{role.value.lower()}_{suffix}_{uuid.uuid4().hex[:6]}@example.com",
+        hashed_password=get_password_hash("demo123"),
+        role=role,
+    )
+    return user, Doctor(id=uuid.uuid4(), user_id=user.id, specialization="Psychiatria dzieci i młodzieży")
+
+
+def _headers(client, user: User) -> dict[str, str]:
+    login = client.post("/auth/staff-login", json={"email": user.email, "password": "demo123"})
+    assert login.status_code == 200
+    return {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+
+def test_doctors_only_find_notes_of_their_own_encounters(query_budget_client, monkeypatch):
+    client = query_budget_client
+    now = dt.datetime.now(dt.timezone.utc)
+    suffix = uuid.uuid4().hex
+    author_user, author = _staff(UserRole.DOCTOR, suffix)
+    colleague_user, colleague = _staff(UserRole.DOCTOR, suffix)
+    guardian_user = User(
+        id=uuid.uuid4(),
+        email=f"guardian_{suffix}@example.com",
+        hashed_password=get_password_hash("demo123"),
+        role=UserRole.GUARDIAN,
+    )
+    guardian = PatientProfile(id=uuid.uuid4(), user_id=guardian_user.id, full_name="Ewa Wiśniewska")
+    child = ChildProfile(
+        id=uuid.uuid4(),
+        guardian_id=guardian.id,
+        first_name="Staś",
+        last_name="Wiśniewski",
+        date_of_birth=dt.date(2014, 1, 20),
+    )
+    service = Service(
+        id=uuid.uuid4(),
+        name=f"Konsultacja {suffix}",
+        description="Konsultacja psychiatryczna.",
+        service_type=ServiceType.INDIVIDUAL,
+        default_duration_minutes=50,
+        default_price=Decimal("200.00"),
+    )
+    # The colleague also treats the child, so both may open the patient.
+    shared_visit = Appointment(
+        doctor_id=colleague.id,
+        service_id=service.id,
+        guardian_id=guardian.id,
+        child_id=child.id,
+        status=AppointmentStatus.CONFIRMED,
+        source=AppointmentSource.ONLINE,
+        start_at=now + dt.timedelta(days=1),
+        end_at=now + dt.timedelta(days=1, minutes=50),
+        price_amount=Decimal("200.00"),
+    )
+    encounter, follow_up = (
+        Encounter(
+            id=uuid.uuid4(),
+            doctor_id=author.id,
+            guardian_id=guardian.id,
+            child_id=child.id,
+            status=EncounterStatus.OPEN,
+            started_at=started_at,
+        )
+        for started_at in (now, now + dt.timedelta(hours=1))
+    )
+    term = f"zespol{suffix[:10]}"
+
+    session = SessionLocal()
+    try:
+        session.add_all([author_user, colleague_user, guardian_user])
+        session.flush()
+        session.add_all([author, colleague, guardian, service])
+        session.flush()
+        session.add(child)
+        session.flush()
+        session.add_all([shared_visit, encounter, follow_up])
+        session.commit()
+
+        author_headers = _headers(client, author_user)
+        created = client.post(
+            f"/med/encounters/{encounter.id}/notes",
+            json={"diagnosis_text": f"Podejrzenie {term} <script>alert(1)</script> & obserwacja"},
+            headers=author_headers,
+        )
+        assert created.status_code == 201
+
+        own = client.get("/med/notes/search", params={"query": term}, headers=author_headers)
+        assert own.status_code == 200
+        assert [hit["note_id"] for hit in own.json()["items"]] == [created.json()["id"]]
+        assert own.json()["truncated"] is False
+        # Only the highlight is markup; the note's own text comes back escaped.
+        headline = own.json()["items"][0]["headline"]
+        assert f"<mark>{term}</mark>" in headline
+        assert "&lt;script&gt;" in headline and "<script>" not in headline and "&amp; obserwacja" in headline
+
+        colleague_headers = _headers(client, colleague_user)
+        assert client.get(f"/med/patients/{child.id}/summary", headers=colleague_headers).status_code == 200
+        for params in ({"query": term}, {"query": term, "patient_id": str(child.id)}):
+            leaked = client.get("/med/notes/search", params=params, headers=colleague_headers)
+            assert leaked.status_code == 200
+            assert leaked.json() == {"items": [], "truncated": False}
+
+        later = client.post(
+            f"/med/encounters/{follow_up.id}/notes", json={"history_text": f"Kontrola {term}"}, headers=author_headers
+        )
+        assert later.status_code == 201
+        # With room to rank only one match, the older note is left out and the page says so.
+        monkeypatch.setattr("app.services.note_search_service.NOTE_SEARCH_RANK_WINDOW", 1)
+        windowed = client.get("/med/notes/search", params={"query": term}, headers=author_headers).json()
+        assert [hit["note_id"] for hit in windowed["items"]] == [later.json()["id"]]
+        assert windowed["truncated"] is True
+        past_window = client.get("/med/notes/search", params={"query": term, "offset": 1}, headers=author_headers)
+        assert past_window.json() == {"items": [], "truncated": True}
+    finally:
+        session.rollback()
+        encounter_ids = [encounter.id, follow_up.id]
+        note_ids = sa.select(ClinicalNote.id).where(ClinicalNote.encounter_id.in_(encounter_ids))
+        session.execute(sa.update(ClinicalNote).where(ClinicalNote.id.in_(note_ids)).values(current_version_id=None))
+        session.execute(sa.delete(NoteVersion).where(NoteVersion.note_id.in_(note_ids)))
+        session.execute(sa.delete(ClinicalNote).where(ClinicalNote.encounter_id.in_(encounter_ids)))
+        session.execute(sa.delete(Encounter).where(Encounter.id.in_(encounter_ids)))
+        session.execute(sa.delete(Appointment).where(Appointment.child_id == child.id))
+        session.execute(sa.delete(ChildProfile).where(ChildProfile.id == child.id))
+        session.execute(sa.delete(PatientProfile).where(PatientProfile.id == guardian.id))
+        session.execute(sa.delete(Doctor).where(Doctor.id.in_([author.id, colleague.id])))
+        session.execute(sa.delete(Service).where(Service.id == service.id))
+        session.execute(
+            sa.delete(User).where(User.id.in_([author_user.id, colleague_user.id, guardian_user.id]))
+        )
+        session.commit()
+        session.close()
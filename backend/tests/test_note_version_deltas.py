@@ -0,0 +1,81 @@
+import json
+import random
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.utils.text_delta import (
+    apply_fields_delta,
+    apply_text_delta,
+    encode_fields_delta,
+    encode_text_delta,
+)
+
+FIELDS = ("history_text", "diagnosis_text", "recommendations_text", "therapy_plan_text", "guardian_summary_text")
+WORDS = (
+    "pacjent zgłasza trudności z koncentracją w szkole oraz zaburzenia snu "
+    "matka obserwuje nasilenie objawów wieczorem zalecono kontrolę za miesiąc"
+).split()
+
+
+def _autosave_trace(seed: int, saves: int) -> list[dict[str, str | None]]:
+    rng = random.Random(seed)
+    texts: dict[str, str | None] = {field: None for field in FIELDS}
+    trace = []
+    for _ in range(saves):
+        field = rng.choice(FIELDS[:3])
+        current = texts[field] or ""
+        chunk = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 6)))
+        if current and rng.random() < 0.2:
+            position = rng.randint(0, len(current))
+            texts[field] = current[:position] + chunk + current[position:]
+        elif current and rng.random() < 0.1:
+            position = rng.randint(0, len(current) - 1)
+            texts[field] = current[:position] + current[position + 1:]
+        else:
+            texts[field] = f"{current} {chunk}".strip()
+        trace.append(dict(texts))
+    return trace
+
+
+def test_text_delta_round_trip():
+    cases = [
+        (None, "nowy tekst"),
+        ("stary tekst", None),
+        ("Rozpoznanie: F90.0", "Rozpoznanie: F90.1"),
+        ("abc", "abc"),
+        ("", "wpis"),
+        ("aaaa", "aa"),
+        ("wywiad", "wywiad uzupełniony"),
+        ("zalecenia kontrolne", "nowe zalecenia kontrolne"),
+    ]
+    for old, new in cases:
+        assert apply_text_delta(old, encode_text_delta(old, new)) == new
+
+
+def test_fields_delta_reconstructs_autosave_trace():
+    trace = _autosave_trace(seed=7, saves=200)
+    previous: dict[str, str | None] = {field: None for field in FIELDS}
+    for texts in trace:
+        delta = encode_fields_delta(previous, texts)
+        assert apply_fields_delta(previous, delta) == texts
+        previous = texts
+
+
+def test_autosave_trace_storage_reduction():
+    snapshot_interval = 20
+    trace = _autosave_trace(seed=11, saves=300)
+    full_bytes = 0
+    stored_bytes = 0
+    previous = None
+    for index, texts in enumerate(trace):
+        full_size = sum(len(value.encode("utf-8")) for value in texts.values() if value)
+        full_bytes += full_size
+        if previous is None or index % snapshot_interval == 0:
+            stored_bytes += full_size
+        else:
+            stored_bytes += len(json.dumps(encode_fields_delta(previous, texts), ensure_ascii=False).encode("utf-8"))
+        previous = texts
+    assert stored_bytes * 5 < full_bytes
@@ -0,0 +1,174 @@
+import datetime as dt
+import os
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.services.notification_service import retry_delay
+
+
+def test_retry_delay_grows_exponentially_up_to_the_cap():
+    delays = [retry_delay(attempt, base_seconds=30, max_seconds=600).total_seconds() for attempt in range(1, 8)]
+
+    assert 24 <= delays[0] <= 36
+    assert 48 <= delays[1] <= 72
+    assert all(delay <= 720 for delay in delays)
+    assert delays[-1] >= 480
+
+
+class _RecordingTransport:
+    def __init__(self, error: Exception | None = None) -> None:
+        self.error = error
+        self.sent = []
+
+    def send(self, message) -> None:
+        if self.error:
+            raise self.error
+        self.sent.append(message)
+
+
+def test_dispatcher_sends_due_notifications_and_backs_off_failures():
+    if not os.getenv("DATABASE_URL"):
+        pytest.skip("DATABASE_URL not set")
+    from app.db.enums import NotificationChannel, NotificationStatus, UserRole
+    from app.db.models import Notification, User
+    from app.db.session import SessionLocal
+    from app.services.notification_service import NotificationDispatcher
+    from app.services.notification_transports import NotificationDeliveryError
+
+    db = SessionLocal()
+    now = dt.datetime.now(dt.timezone.utc)
+    user = User(email=f"notify_{uuid.uuid4().hex}@example.com", hashed_password="x", role=UserRole.GUARDIAN)
+    db.add(user)
+    db.flush()
+
+    def notification(channel=NotificationChannel.EMAIL, scheduled_at=None):
+        row = Notification(
+            id=uuid.uuid4(),
+            user_id=user.id,
+            channel=channel,
+            template="custom",
+            payload={"subject": "Przypomnienie", "body": "Wizyta jutro o 10:00"},
+            scheduled_at=scheduled_at,
+        )
+        db.add(row)
+        return row
+
+    due, future, no_phone, locked = (
+        notification(scheduled_at=now - dt.timedelta(minutes=1)),
+        notification(scheduled_at=now + dt.timedelta(hours=1)),
+        notification(channel=NotificationChannel.SMS),
+        notification(scheduled_at=now - dt.timedelta(minutes=2)),
+    )
+    db.commit()
+
+    other_worker = SessionLocal()
+    try:
+        other_worker.execute(
+            Notification.__table__.select().where(Notification.id == locked.id).with_for_update()
+        ).all()
+        email = _RecordingTransport()
+        NotificationDispatcher(db, {NotificationChannel.EMAIL: email, NotificationChannel.SMS: email}).dispatch_batch()
+    finally:
+        other_worker.rollback()
+        other_worker.close()
+
+    for row in (due, future, no_phone, locked):
+        db.refresh(row)
+    assert [message.notification_id for message in email.sent] == [due.id]
+    assert (due.status, due.attempts, due.sent_at is not None) == (NotificationStatus.SENT, 1, True)
+    assert (future.status, future.attempts) == (NotificationStatus.PENDING, 0)
+    assert (no_phone.status, no_phone.attempts) == (NotificationStatus.FAILED, 1)
+    assert (locked.status, locked.attempts) == (NotificationStatus.PENDING, 0)
+
+    failing = _RecordingTransport(NotificationDeliveryError("connection refused"))
+    dispatcher = NotificationDispatcher(
+        db, {NotificationChannel.EMAIL: failing}, max_attempts=2, retry_base_seconds=60
+    )
+    dispatcher.dispatch_batch()
+    db.refresh(locked)
+    assert (locked.status, locked.attempts, locked.error) == (NotificationStatus.PENDING, 1, "connection refused")
+    assert locked.scheduled_at > now + dt.timedelta(seconds=45)
+
+    locked.scheduled_at = now
+    db.commit()
+    dispatcher.dispatch_batch()
+    db.refresh(locked)
+    assert (locked.status, locked.attempts) == (NotificationStatus.FAILED, 2)
+    db.delete(user)
+    db.commit()
+    db.close()
+
+
+def test_file_sink_reports_io_errors_as_retryable_delivery_errors(tmp_path):
+    from app.db.enums import NotificationChannel
+    from app.services.notification_transports import FileSinkTransport, NotificationDeliveryError, OutgoingMessage
+
+    blocked = tmp_path / "outbox"
+    blocked.write_text("not a directory")
+    message = OutgoingMessage(uuid.uuid4(), NotificationChannel.EMAIL, "a@example.com", "Temat", "Treść")
+
+    with pytest.raises(NotificationDeliveryError):
+        FileSinkTransport(blocked).send(message)
+
+
+def test_unexpected_errors_fail_only_their_own_notification():
+    if not os.getenv("DATABASE_URL"):
+        pytest.skip("DATABASE_URL not set")
+    from app.db.enums import NotificationChannel, NotificationStatus, UserRole
+    from app.db.models import Notification, User
+    from app.db.session import SessionLocal
+    from app.services.notification_service import NotificationDispatcher
+
+    db = SessionLocal()
+    now = dt.datetime.now(dt.timezone.utc)
+    user = User(
+        email=f"notify_{uuid.uuid4().hex}@example.com", hashed_password="x", role=UserRole.GUARDIAN, phone="500600700"
+    )
+    db.add(user)
+    db.flush()
+    poison, healthy, sms = (
+        Notification(
+            id=uuid.uuid4(),
+            user_id=user.id,
+            channel=channel,
+            template="custom",
+            payload={"subject": "Przypomnienie", "body": "Wizyta jutro o 10:00"},
+            scheduled_at=now - dt.timedelta(minutes=minutes),
+        )
+        for channel, minutes in (
+            (NotificationChannel.EMAIL, 3),
+            (NotificationChannel.EMAIL, 2),
+            (NotificationChannel.SMS, 1),
+        )
+    )
+    db.add_all([poison, healthy, sms])
+    db.commit()
+
+    class _PoisonedTransport(_RecordingTransport):
+        def send(self, message) -> None:
+            if message.notification_id == poison.id:
+                raise UnicodeEncodeError("ascii", "ż", 0, 1, "ordinal not in range")
+            super().send(message)
+
+    email = _PoisonedTransport()
+    try:
+        # No SMS transport is configured: that row fails for good instead of aborting the batch.
+        NotificationDispatcher(db, {NotificationChannel.EMAIL: email}, retry_base_seconds=60).dispatch_batch()
+        for row in (poison, healthy, sms):
+            db.refresh(row)
+        assert [message.notification_id for message in email.sent] == [healthy.id]
+        assert healthy.status == NotificationStatus.SENT
+        assert (poison.status, poison.attempts) == (NotificationStatus.PENDING, 1)
+        assert poison.error.startswith("UnicodeEncodeError") and poison.scheduled_at > now
+        assert (sms.status, sms.attempts) == (NotificationStatus.FAILED, 1)
+    finally:
+        db.rollback()
+        db.delete(user)
+        db.commit()
+        db.close()
@@ -0,0 +1,136 @@
+import os
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+import sqlalchemy as sa
+
+if not os.getenv("DATABASE_URL"):
+    pytest.skip("DATABASE_URL not set", allow_module_level=True)
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.main import app
+from app.core.security import get_password_hash
+from app.db.enums import UserRole
+from app.db.models import ChildContact, ChildProfile, Consent, GuardianContact, PatientProfile, User
+from app.db.session import SessionLocal
+from app.services.patient_import_service import PatientImportService
+
+
+def test_patient_import_reports_row_errors_and_activates_accounts(query_budget_client):
+    client = query_budget_client
+    session = SessionLocal()
+    tag = uuid.uuid4().hex[:8]
+    admin = User(
+        email=f"admin-{tag}@example.com",
+        hashed_password=get_password_hash("demo123"),
+        role=UserRole.ADMIN,
+        is_active=True,
+        is_verified=True,
+    )
+    session.add(admin)
+    session.commit()
+    pesel = str(uuid.uuid4().int)[:11]
+    csv_body = "\n".join(
+        [
+            "guardian_full_name,guardian_email,guardian_phone,child_first_name,child_last_name,"
+            "child_date_of_birth,child_pesel,child_city,consent_rodo",
+            f"Anna Nowak,anna-{tag}@example.com,+48500100200,Ola,Nowak,2016-04-01,{pesel},Kraków,true",
+            f"Anna Nowak,anna-{tag}@example.com,+48500100200,Jan,Nowak,2018-09-12,,,false",
+            f"Piotr Lis,piotr-{tag}@example.com,,Ewa,Lis,not-a-date,,,false",
+            f"Maria Wójcik,maria-{tag}@example.com,,Adam,Wójcik,2015-01-20,{pesel},,false",
+            f"Admin,admin-{tag}@example.com,,Zofia,Kowal,2017-06-30,,,false",
+        ]
+    )
+    guardian_emails = [f"anna-{tag}@example.com"]
+    try:
+        login = client.post(
+            "/auth/staff-login", json={"email": admin.email, "password": "demo123"}
+        )
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+        response = client.post(
+            "/admin/patients/import",
+            headers=headers,
+            files={"file": ("clinic.csv", csv_body.encode("utf-8"), "text/csv")},
+        )
+        assert response.status_code == 200
+        payload = response.json()
+        assert payload["imported_count"] == 2
+        errors = {error["line"]: error["message"] for error in payload["errors"]}
+        assert sorted(errors) == [4, 5, 6]
+        assert errors[4].startswith("child_date_of_birth:")
+        assert errors[5] == "Duplicate PESEL"
+        assert errors[6] == "User already exists"
+        siblings = payload["patients"]
+        assert siblings[0]["guardian_id"] == siblings[1]["guardian_id"]
+        assert siblings[0]["record_code"] != siblings[1]["record_code"]
+
+        guardian_id = uuid.UUID(siblings[0]["guardian_id"])
+        assert session.execute(
+            sa.select(sa.func.count()).select_from(GuardianContact).where(GuardianContact.guardian_id == guardian_id)
+        ).scalar_one() == 2
+        assert session.execute(
+            sa.select(sa.func.count()).select_from(Consent).where(Consent.guardian_id == guardian_id)
+        ).scalar_one() == 1
+
+        # The background task has hashed the temporary password by the time the client returns.
+        guardian_login = client.post(
+            "/auth/login",
+            json={"email": guardian_emails[0], "password": siblings[0]["temporary_password"]},
+        )
+        assert guardian_login.status_code == 200
+    finally:
+        session.rollback()
+        guardians = session.execute(
+            sa.select(PatientProfile).where(PatientProfile.email.in_(guardian_emails))
+        ).scalars().all()
+        for guardian in guardians:
+            child_ids = sa.select(ChildProfile.id).where(ChildProfile.guardian_id == guardian.id)
+            session.execute(sa.delete(ChildContact).where(ChildContact.child_id.in_(child_ids)))
+            session.execute(sa.delete(Consent).where(Consent.guardian_id == guardian.id))
+            session.execute(sa.delete(ChildProfile).where(ChildProfile.guardian_id == guardian.id))
+            session.execute(sa.delete(GuardianContact).where(GuardianContact.guardian_id == guardian.id))
+            session.execute(sa.delete(PatientProfile).where(PatientProfile.id == guardian.id))
+        session.execute(sa.delete(User).where(User.email.in_(guardian_emails + [admin.email])))
+        session.commit()
+        session.close()
+
+
+def test_patient_import_accounts_cannot_log_in_before_hashing():
+    session = SessionLocal()
+    email = f"pending-{uuid.uuid4().hex[:8]}@example.com"
+    try:
+        result = PatientImportService(session).import_rows(
+            [
+                (
+                    1,
+                    '{"guardian_full_name": "Jan Test", "guardian_email": "%s", '
+                    '"child_first_name": "Kuba", "child_last_name": "Test", '
+                    '"child_date_of_birth": "2019-02-03"}' % email,
+                )
+            ]
+        )
+        assert not result.errors
+        client = TestClient(app)
+        credentials = {"email": email, "password": result.imported[0].temporary_password}
+        assert client.post("/auth/login", json=credentials).status_code == 401
+
+        PatientImportService(session).hash_pending_passwords(result.pending_credentials)
+        assert client.post("/auth/login", json=credentials).status_code == 200
+    finally:
+        session.rollback()
+        guardian = session.execute(
+            sa.select(PatientProfile).where(PatientProfile.email == email)
+        ).scalar_one_or_none()
+        if guardian:
+            session.execute(sa.delete(ChildProfile).where(ChildProfile.guardian_id == guardian.id))
+            session.execute(sa.delete(GuardianContact).where(GuardianContact.guardian_id == guardian.id))
+            session.execute(sa.delete(PatientProfile).where(PatientProfile.id == guardian.id))
+        session.execute(sa.delete(User).where(User.email == email))
+        session.commit()
+        session.close()
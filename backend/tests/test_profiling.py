@@ -0,0 +1,67 @@
+import os
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+if not os.getenv("DATABASE_URL"):
+    pytest.skip("DATABASE_URL not set", allow_module_level=True)
+
+from fastapi.testclient import TestClient
+
+from app.core.profiling import ProfilingMiddleware, RequestProfileStore
+from app.db.session import engine
+from app.main import app
+
+
+def test_profiles_attribute_statements_to_call_sites():
+    store = RequestProfileStore()
+    client = TestClient(ProfilingMiddleware(app, engine=engine, store=store, sample_rate=1.0))
+
+    credentials = {"email": f"nobody-{uuid.uuid4().hex[:8]}@example.com", "password": "wrong"}
+    assert client.post("/auth/login", json=credentials).status_code == 401
+
+    [profile] = store.recent()
+    assert (profile.method, profile.route, profile.status_code) == ("POST", "/auth/login", 401)
+    assert profile.statement_count >= 1
+    assert 0 < profile.db_ms <= profile.wall_ms
+    assert profile.slowest_statements[0].sql.lstrip().upper().startswith("SELECT")
+    assert any(item.location.startswith("services/auth_service.py:") for item in profile.locations)
+    assert profile.stacks is not None
+
+    [summary] = store.route_summaries()
+    assert (summary.route, summary.requests) == ("/auth/login", 1)
+
+
+def test_profiling_endpoints_are_admin_only():
+    from app.core.security import get_password_hash
+    from app.db.enums import UserRole
+    from app.db.models import User
+    from app.db.session import SessionLocal
+
+    client = TestClient(app)
+    assert client.get("/profiling/requests").status_code == 401
+    assert client.get("/profiling/routes").status_code == 401
+
+    # Profiles carry SQL text and parameters, so registration staff may not read them.
+    db = SessionLocal()
+    registration = User(
+        email=f"registration-{uuid.uuid4().hex[:8]}@example.com",
+        hashed_password=get_password_hash("demo123"),
+        role=UserRole.REGISTRATION,
+    )
+    db.add(registration)
+    db.commit()
+    try:
+        login = client.post("/auth/staff-login", json={"email": registration.email, "password": "demo123"})
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        assert client.get("/profiling/requests", headers=headers).status_code == 403
+        assert client.get("/profiling/routes", headers=headers).status_code == 403
+    finally:
+        db.delete(registration)
+        db.commit()
+        db.close()
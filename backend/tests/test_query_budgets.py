@@ -0,0 +1,112 @@
+import os
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.api import admin, med, patient, services
+from query_budgets import QUERY_BUDGETS
+
+
+def test_every_route_declares_a_budget():
+    routes = {
+        (method, route.path)
+        for router in (med.router, patient.router, admin.router, services.router)
+        for route in router.routes
+        for method in route.methods
+    }
+
+    assert sorted(routes - QUERY_BUDGETS.keys()) == []
+    assert sorted(QUERY_BUDGETS.keys() - routes) == []
+
+
+def test_admin_and_onboarding_routes_stay_within_budget(query_budget_client):
+    from app.core.security import get_password_hash
+    from app.db.enums import UserRole
+    from app.db.models import User
+    from app.db.session import SessionLocal
+    from sqlalchemy import select
+
+    client = query_budget_client
+    session = SessionLocal()
+    tag = uuid.uuid4().hex[:8]
+    session.add(
+        User(
+            email=f"admin-{tag}@example.com",
+            hashed_password=get_password_hash("demo123"),
+            role=UserRole.ADMIN,
+            is_active=True,
+            is_verified=True,
+        )
+    )
+    session.commit()
+    session.close()
+
+    login = client.post("/auth/staff-login", json={"email": f"admin-{tag}@example.com", "password": "demo123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    # Two of each so a per-row lookup in the list endpoints would exceed the budget.
+    for index in range(2):
+        doctor = client.post(
+            "/admin/doctors",
+            json={"email": f"doctor-{index}-{tag}@example.com", "specialization": "Neurologopedia"},
+            headers=headers,
+        )
+        assert doctor.status_code == 201
+        created = client.post(
+            "/admin/patients",
+            json={
+                "guardian_full_name": "Anna Budzet",
+                "guardian_email": f"guardian-{index}-{tag}@example.com",
+                "child_first_name": "Ola",
+                "child_last_name": "Budzet",
+                "child_date_of_birth": "2018-05-01",
+                "consent_rodo": True,
+                "consent_guardian": True,
+            },
+            headers=headers,
+        )
+        assert created.status_code == 201
+    assert len(client.get("/admin/doctors?limit=2", headers=headers).json()) == 2
+    assert len(client.get("/admin/patients?limit=2", headers=headers).json()) == 2
+
+    reset = client.post(f"/admin/users/{doctor.json()['user_id']}/reset-password", headers=headers)
+    assert reset.status_code == 200
+
+    doctor_login = client.post(
+        "/auth/staff-login",
+        json={"email": doctor.json()["email"], "password": reset.json()["temporary_password"]},
+    )
+    doctor_headers = {"Authorization": f"Bearer {doctor_login.json()['access_token']}"}
+    assert client.get("/med/doctor/appointments", headers=doctor_headers).status_code == 200
+
+    register = client.post(
+        "/auth/register",
+        json={"email": f"onboarding-{tag}@example.com", "password": "demo12345"},
+    )
+    assert register.status_code == 201
+    onboarding = client.post(
+        "/patient/onboarding",
+        json={
+            "guardian_full_name": "Ewa Budzet",
+            "guardian_phone": "+48 600 100 200",
+            "child_first_name": "Jas",
+            "child_last_name": "Budzet",
+            "child_date_of_birth": "2019-03-02",
+            "consent_rodo": True,
+            "consent_guardian": True,
+        },
+        headers={"Authorization": f"Bearer {register.json()['access_token']}"},
+    )
+    assert onboarding.status_code == 201
+
+    session = SessionLocal()
+    try:
+        phone = session.execute(select(User.phone).where(User.email == f"onboarding-{tag}@example.com")).scalar_one()
+    finally:
+        session.close()
+    assert phone == "+48 600 100 200"
@@ -0,0 +1,105 @@
+import datetime as dt
+import os
+import sys
+import uuid
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+
+def test_reminder_planning_is_idempotent_and_follows_moves_and_cancellations():
+    if not os.getenv("DATABASE_URL"):
+        pytest.skip("DATABASE_URL not set")
+    from sqlalchemy import select
+
+    from app.db.enums import AppointmentStatus, Gender, NotificationStatus, ServiceType, UserRole
+    from app.db.models import Appointment, ChildProfile, Doctor, Notification, PatientProfile, Service, User
+    from app.db.session import SessionLocal
+    from app.services.reminder_service import ReminderService
+
+    db = SessionLocal()
+    now = dt.datetime(2030, 3, 1, 8, 0, tzinfo=dt.timezone.utc)
+    tag = uuid.uuid4().hex
+    guardian_user = User(email=f"guardian_{tag}@example.com", hashed_password="x", role=UserRole.GUARDIAN)
+    doctor_user = User(email=f"doctor_{tag}@example.com", hashed_password="x", role=UserRole.DOCTOR)
+    db.add_all([guardian_user, doctor_user])
+    db.flush()
+    guardian = PatientProfile(user_id=guardian_user.id, full_name="Anna Nowak")
+    doctor = Doctor(user_id=doctor_user.id, specialization="Psychologia kliniczna")
+    service = Service(
+        name=f"Konsultacja {tag}",
+        description="Konsultacja psychologiczna.",
+        service_type=ServiceType.INDIVIDUAL,
+        default_duration_minutes=50,
+        default_price=Decimal("200.00"),
+    )
+    db.add_all([guardian, doctor, service])
+    db.flush()
+    child = ChildProfile(
+        guardian_id=guardian.id, first_name="Ola", last_name="Nowak", date_of_birth=dt.date(2018, 1, 1), gender=Gender.FEMALE
+    )
+    db.add(child)
+    db.flush()
+
+    def appointment(hours_ahead: float) -> Appointment:
+        start = now + dt.timedelta(hours=hours_ahead)
+        row = Appointment(
+            doctor_id=doctor.id,
+            service_id=service.id,
+            guardian_id=guardian.id,
+            child_id=child.id,
+            status=AppointmentStatus.CONFIRMED,
+            start_at=start,
+            end_at=start + dt.timedelta(minutes=50),
+            price_amount=Decimal("200.00"),
+        )
+        db.add(row)
+        return row
+
+    later, soon, cancelled = appointment(30), appointment(5), appointment(10)
+    db.commit()
+    ids = [later.id, soon.id, cancelled.id]
+    service_under_test = ReminderService(db)
+
+    def reminders():
+        rows = db.execute(select(Notification).where(Notification.appointment_id.in_(ids))).scalars().all()
+        return {(row.appointment_id, row.template): row for row in rows}
+
+    first = service_under_test.plan(now=now, appointment_ids=ids)
+    db.commit()
+    assert (first.planned, first.removed) == (4, 0)
+    assert (soon.id, "appointment_reminder_24h") not in reminders()
+    assert reminders()[(later.id, "appointment_reminder_24h")].scheduled_at == later.start_at - dt.timedelta(hours=24)
+    assert reminders()[(later.id, "appointment_reminder_2h")].payload["start_local"] == "02.03.2030 15:00"
+
+    again = service_under_test.plan(now=now, appointment_ids=ids)
+    db.commit()
+    assert (again.planned, again.removed) == (0, 0)
+
+    later.start_at += dt.timedelta(hours=10)
+    later.end_at += dt.timedelta(hours=10)
+    cancelled.status = AppointmentStatus.CANCELLED
+    reminders()[(soon.id, "appointment_reminder_2h")].status = NotificationStatus.SENT
+    db.commit()
+    replanned = service_under_test.plan(now=now, appointment_ids=ids)
+    db.commit()
+    db.expire_all()
+
+    current = reminders()
+    assert (replanned.planned, replanned.removed) == (2, 1)
+    assert {key for key in current if key[0] == cancelled.id} == set()
+    assert current[(later.id, "appointment_reminder_2h")].scheduled_at == later.start_at - dt.timedelta(hours=2)
+    assert current[(soon.id, "appointment_reminder_2h")].status == NotificationStatus.SENT
+
+    soon.start_at += dt.timedelta(hours=1)
+    soon.end_at += dt.timedelta(hours=1)
+    db.commit()
+    service_under_test.plan(now=now, appointment_ids=ids)
+    db.commit()
+    db.expire_all()
+    assert reminders()[(soon.id, "appointment_reminder_2h")].status == NotificationStatus.PENDING
+    db.close()
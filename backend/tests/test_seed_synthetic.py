@@ -0,0 +1,72 @@
+import datetime as dt
+import os
+import random
+import sys
+import uuid
+from collections import Counter
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.db.seed_synthetic import SyntheticClinic, SyntheticSize
+
+TINY = SyntheticSize(doctors=2, families=40, years=1)
+SERVICES = [(uuid.UUID(int=1), "Psychoterapia", 50, Decimal("200.00"))]
+
+
+def _generate(seed: int) -> dict[str, list]:
+    clinic = SyntheticClinic(TINY, seed=seed, end_date=dt.date(2026, 1, 15), services=SERVICES, password_hash="x")
+    rows: dict[str, list] = {}
+    for batch in clinic.batches(families_per_batch=15):
+        for table, table_rows in batch.rows.items():
+            rows.setdefault(table, []).extend(tuple(row) for row in table_rows)
+    return rows
+
+
+def test_synthetic_clinic_is_deterministic_and_never_double_books():
+    first, again, other = _generate(7), _generate(7), _generate(8)
+
+    assert first == again
+    assert first["appointments"] != other["appointments"]
+    doctor_starts = Counter((row[1], row[7]) for row in first["appointments"])
+    assert max(doctor_starts.values()) == 1
+    pesels = [row[6] for row in first["child_profiles"]]
+    assert len(set(pesels)) == len(pesels)
+
+
+def test_synthetic_clinic_loads_and_reads_back():
+    if not os.getenv("DATABASE_URL"):
+        pytest.skip("DATABASE_URL not set")
+    from sqlalchemy import func, select
+
+    from app.db.models import ClinicalNote, Encounter, PatientProfile, Service, User
+    from app.db.seed_services import seed_services
+    from app.db.seed_synthetic import delete_synthetic_clinic, load_synthetic_clinic, synthetic_email
+    from app.db.session import SessionLocal
+    from app.services.note_version_service import NoteVersionService
+
+    seed_services()
+    seed = random.randrange(10**6)
+    session = SessionLocal()
+    try:
+        counts = load_synthetic_clinic(session, TINY, seed=seed, end_date=dt.date(2026, 1, 15))
+        guardians = select(PatientProfile.id).join(User).where(User.email.like(synthetic_email(seed, "%")))
+        note_ids = session.execute(
+            select(ClinicalNote.id)
+            .join(Encounter, Encounter.id == ClinicalNote.encounter_id)
+            .where(Encounter.guardian_id.in_(guardians), ClinicalNote.search_vector.is_not(None))
+        ).scalars().all()
+
+        assert counts["patient_profiles"] == TINY.families
+        assert len(note_ids) == counts["clinical_notes"] > 0
+        contents = NoteVersionService(session).get_current_contents(note_ids)
+        assert len(contents) == len(note_ids)
+        assert all(content.texts["diagnosis_text"] for content in contents.values())
+    finally:
+        session.rollback()
+        delete_synthetic_clinic(session, seed)
+        session.close()
@@ -0,0 +1,84 @@
+import os
+import sys
+import uuid
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+
+def test_service_catalog_is_served_from_a_snapshot_with_a_strong_etag(query_budget_client):
+    if not os.getenv("DATABASE_URL"):
+        pytest.skip("DATABASE_URL not set")
+    from app.db.enums import ServiceType
+    from app.db.models import Service
+    from app.db.session import SessionLocal
+    from app.services.service_catalog import service_catalog
+
+    client = query_budget_client
+    service_catalog.snapshot()
+    first = client.get("/services")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert etag.startswith('"') and first.headers["cache-control"].startswith("public, max-age=")
+
+    cached = client.get("/services", headers={"If-None-Match": f'"other", W/{etag}'})
+    assert cached.status_code == 304 and cached.content == b"" and cached.headers["etag"] == etag
+
+    db = SessionLocal()
+    service = Service(
+        name=f"Konsultacja {uuid.uuid4().hex}",
+        description="Konsultacja psychologiczna.",
+        service_type=ServiceType.INDIVIDUAL,
+        default_duration_minutes=50,
+        default_price=Decimal("210.00"),
+    )
+    db.add(service)
+    db.commit()
+    try:
+        # The commit invalidated the snapshot; rebuild it outside the zero-query budget.
+        service_catalog.snapshot()
+        changed = client.get("/services", headers={"If-None-Match": etag})
+        assert changed.status_code == 200 and changed.headers["etag"] != etag
+        listed = {item["name"]: item for item in changed.json()}
+        assert listed[service.name]["price"] == 210.0
+        assert listed[service.name]["duration_minutes"] == 50
+    finally:
+        db.delete(service)
+        db.commit()
+        db.close()
+
+
+def test_a_commit_during_a_rebuild_is_not_hidden_by_the_stale_build():
+    import datetime as dt
+    import time
+
+    from app.services.service_catalog import SERVICE_CATALOG_TIMEZONE, CatalogSnapshot, ServiceCatalog
+
+    class _Session:
+        def close(self) -> None:
+            pass
+
+    class _RacingCatalog(ServiceCatalog):
+        builds = 0
+
+        def build(self, db) -> CatalogSnapshot:
+            snapshot = CatalogSnapshot(
+                body=b"[]",
+                etag=f'"{self.builds}"',
+                built_on=dt.datetime.now(SERVICE_CATALOG_TIMEZONE).date(),
+                built_at=time.monotonic(),
+            )
+            if self.builds == 0:
+                # A service edit commits after this build read the tables.
+                self.invalidate()
+            self.builds += 1
+            return snapshot
+
+    catalog = _RacingCatalog(_Session)
+    assert catalog.snapshot().etag == '"0"'
+    assert catalog.snapshot().etag == '"1"'
+    assert catalog.snapshot().etag == '"1"' and catalog.builds == 2
@@ -0,0 +1,87 @@
+import datetime as dt
+import os
+import sys
+import uuid
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+if not os.getenv("DATABASE_URL"):
+    pytest.skip("DATABASE_URL not set", allow_module_level=True)
+
+from app.services.service_price_service import PriceHistory, PriceQuote, ServicePriceCache, ServicePriceService
+
+
+def _quote(price: str, valid_from: dt.date, valid_to: dt.date | None = None) -> PriceQuote:
+    return PriceQuote(Decimal(price), "PLN", valid_from, valid_to)
+
+
+def test_price_history_prefers_the_latest_started_range():
+    history = PriceHistory(
+        [
+            _quote("200.00", dt.date(2026, 1, 1)),
+            _quote("180.00", dt.date(2026, 3, 1), dt.date(2026, 4, 1)),
+            _quote("250.00", dt.date(2026, 6, 1)),
+        ]
+    )
+
+    assert history.price_at(dt.date(2025, 12, 31)) is None
+    assert [history.price_at(dt.date(2026, month, 15)).price for month in (1, 3, 4, 5, 6, 12)] == [
+        Decimal(price) for price in ("200.00", "180.00", "200.00", "200.00", "250.00", "250.00")
+    ]
+    assert history.price_at(dt.date(2026, 4, 1)).price == Decimal("200.00")
+
+
+def test_price_cache_matches_the_database_and_is_invalidated_on_commit():
+    from app.db.enums import ServiceType
+    from app.db.models import Service, ServicePrice
+    from app.db.session import SessionLocal
+    from app.services.service_price_service import service_price_cache
+
+    db = SessionLocal()
+    service = Service(
+        name=f"Konsultacja {uuid.uuid4().hex}",
+        description="Konsultacja psychologiczna.",
+        service_type=ServiceType.INDIVIDUAL,
+        default_duration_minutes=50,
+        default_price=Decimal("200.00"),
+    )
+    db.add(service)
+    db.flush()
+    db.add_all(
+        [
+            ServicePrice(service_id=service.id, price=Decimal("200.00"), valid_from=dt.date(2026, 1, 1)),
+            ServicePrice(
+                service_id=service.id, price=Decimal("180.00"), valid_from=dt.date(2026, 3, 1), valid_to=dt.date(2026, 4, 1)
+            ),
+        ]
+    )
+    db.commit()
+
+    cache = service_price_cache
+    cached, cold = ServicePriceService(db, cache), ServicePriceService(db, ServicePriceCache())
+    cache.load(db)
+    days = [dt.date(2025, 12, 31), dt.date(2026, 3, 31), dt.date(2026, 4, 1), dt.date(2027, 1, 1)]
+    assert [cached.price_at(service.id, day) for day in days] == [cold.price_at(service.id, day) for day in days]
+    assert cached.price_at(uuid.uuid4(), dt.date(2026, 1, 1)) is None
+
+    try:
+        db.add(ServicePrice(service_id=service.id, price=Decimal("250.00"), valid_from=dt.date(2026, 6, 1)))
+        db.flush()
+        db.rollback()
+        assert cache.loaded
+        db.add(ServicePrice(service_id=service.id, price=Decimal("250.00"), valid_from=dt.date(2026, 6, 1)))
+        db.commit()
+        assert not cache.loaded
+        assert cached.price_at(service.id, dt.date(2027, 1, 1)).price == Decimal("250.00")
+        cache.load(db)
+        assert cached.price_at(service.id, dt.date(2027, 1, 1)).price == Decimal("250.00")
+    finally:
+        cache.reset()
+        db.delete(service)
+        db.commit()
+        db.close()